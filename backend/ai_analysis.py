@@ -76,6 +76,7 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 import google.generativeai as genai
 from typing import Dict, Any
 from dotenv import load_dotenv
+from metrics import upstream_timer
 from datetime import datetime
 
 # .env 파일 로드 (명시적 경로 설정)
@@ -104,6 +105,7 @@ def get_text_model():
     """일반 텍스트 출력을 위한 Gemini 모델 반환"""
     return genai.GenerativeModel('gemini-3.5-flash-lite')
 
+@upstream_timer("gemini")
 def generate_with_retry(prompt: str, json_mode: bool = True, timeout: int = 40, temperature: float = 0.1, models_to_try: list = None):
     """
     여러 모델을 순차적으로 시도하여 API 제한/오류를 우회합니다.
@@ -1622,11 +1624,7 @@ def generate_stock_briefing(symbol: str) -> Dict[str, Any]:
 # [New] Portfolio Analysis Integration
 # ==========================================
 
-from portfolio_analysis import (
-    analyze_portfolio_composition,
-    get_dividend_calendar,
-    analyze_portfolio_factors
-)
+from portfolio_analysis import diagnose_portfolio
 
 def analyze_portfolio_data(portfolio_items: list[str]) -> Dict[str, Any]:
     """
@@ -1651,24 +1649,15 @@ def analyze_portfolio_data(portfolio_items: list[str]) -> Dict[str, Any]:
     portfolio_str = ", ".join(portfolio_items)
     
     try:
-        composition_data = analyze_portfolio_composition(portfolio_items)
-        calendar_data = get_dividend_calendar(portfolio_items)
-        factor_data = analyze_portfolio_factors(portfolio_items)
-        
-        # [New] 개별 종목 리스크 분석 (MDD, 변동성 등)
-        from risk_analyzer import analyze_stock_risk
+        # 구성/배당/팩터/개별 종목 리스크(MDD, 변동성 등)를 종목 해석 1회 + 병렬 조회로 한 번에
+        diagnosis = diagnose_portfolio(portfolio_items)
+        composition_data = diagnosis["composition"]
+        calendar_data = diagnosis["calendar"]
+        factor_data = diagnosis["factors"]
+        portfolio_risks = diagnosis["stock_risks"]
+
         import numpy as np
-        portfolio_risks = {}
-        mdds = []
-        for sym in portfolio_items:
-            try:
-                r_data = analyze_stock_risk(sym)
-                portfolio_risks[sym] = r_data
-                if r_data and r_data.get('max_drawdown'):
-                    mdds.append(r_data['max_drawdown'])
-            except Exception as e:
-                print(f"Risk error for {sym}: {e}")
-                
+        mdds = [r['max_drawdown'] for r in portfolio_risks.values() if r and r.get('max_drawdown')]
         portfolio_mdd = round(np.nanmean(mdds), 2) if mdds else 0.0
 
     except Exception as e:
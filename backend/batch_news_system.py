@@ -36,9 +36,11 @@ from typing import Dict, List, Set, Optional
 from collections import defaultdict
 from db_manager import get_db_connection, get_watchlist, get_user_fcm_tokens
 from ai_analysis import generate_with_retry
+from upstream_hosts import NAVER_OPENAPI_URL
 from firebase_config import send_multicast_notification
 from stock_data import get_korean_stock_name
 from holiday_checker import is_holiday
+from news_dedup import news_deduper
 
 # ─── 일반 시장 기사 및 스팸/봇 기사 제외 패턴 ────────────────────────────
 # 이런 기사들은 특정 종목 이름이 나와도 단순 시세 나열이거나 기계 생성(봇) 기사일 확률이 높음
@@ -87,7 +89,7 @@ FOREIGN_KR_SEARCH_NAME = {
 # ─── 네이버 Open API 설정 ──────────────────────────────────────────────────
 NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID", "")
 NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET", "")
-NAVER_NEWS_API_URL = "https://openapi.naver.com/v1/search/news.json"
+NAVER_NEWS_API_URL = f"{NAVER_OPENAPI_URL}/v1/search/news.json"
 
 # ─── 인기 종목 판단 기준 ────────────────────────────────────────────────────
 TOP_STOCK_MIN_USERS = 1   # 1명 이상 관심 등록 → 인기 종목 (10분 주기)
@@ -583,15 +585,20 @@ class BatchNewsSystem:
             # 관련 뉴스만 필터링
             relevant = self.filter_relevant_news(news_items, symbol, kr_name)
 
+            # 이미 발송된 링크 제외 후, 언론사만 다른 같은 기사(근접 중복)는 대표 1건으로 묶음
+            # (relevant는 관련성 순 정렬 → 가장 관련성 높은 기사가 대표)
+            unsent = []
             for item in relevant:
-                # 고유 ID: 링크 기반
                 article_id = item.get("link", "") or str(hash(item.get("title", "")))
-                if not article_id:
-                    continue
+                if article_id and not self._is_already_sent(symbol, article_id):
+                    unsent.append(item)
+            representatives = news_deduper.collapse(symbol, unsent)
+            if len(representatives) < len(unsent):
+                print(f"[BatchNews] 🧬 [{symbol}] 근접 중복 {len(unsent) - len(representatives)}건 병합")
 
-                # 이미 발송된 뉴스 스킵
-                if self._is_already_sent(symbol, article_id):
-                    continue
+            for item in representatives:
+                # 고유 ID: 링크 기반
+                article_id = item.get("link", "") or str(hash(item.get("title", "")))
 
                 # 발송 대기 목록에 추가
                 key = f"{symbol}_{article_id}"
@@ -627,6 +634,7 @@ class BatchNewsSystem:
                         article_id,
                         send_data["news"].get("title", "")
                     )
+                    news_deduper.remember(send_data["symbol"], send_data["news"], article_id)
                     sent_count += 1
             except Exception as e:
                 print(f"[BatchNews] FCM 발송 오류: {e}")
@@ -746,6 +754,7 @@ class BatchNewsSystem:
             "usage_percent": round(self.api_call_count_today / 25000 * 100, 1),
             "cached_symbols": len(self.news_cache),
             "sent_log_symbols": len(self.sent_log),
+            "dedup": news_deduper.get_stats(),
         }
 
     async def start(self, interval_minutes: int = 10):
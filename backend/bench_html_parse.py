@@ -0,0 +1,67 @@
+"""
+HTML 파싱 벤치마크 (저장된 네이버 페이지 기준)
+
+    python bench_html_parse.py                      # sise_dump.html
+    python bench_html_parse.py page.html:type_5     # 추가 덤프:대상 table class
+
+각 페이지에 대해 파싱 + 행 선택 1회 평균 시간(ms)과 추출 행 수를 비교합니다.
+  html.parser (기존) / lxml 전체 파싱 / lxml + SoupStrainer (html_parse.parse_html) / lxml XPath (참고)
+"""
+
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from html_parse import PARSER, parse_html
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = [
+    ("sise_dump.html", "type_1"),
+    ("sise_dump.html", "type_2"),
+]
+ROUNDS = 20
+
+
+def _time(fn, rounds=ROUNDS):
+    fn()  # 워밍업
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+
+def bench(path: str, table_class: str):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        html = f.read()
+    selector = f"table.{table_class} tr"
+
+    cases = [
+        ("html.parser (full)", lambda: len(BeautifulSoup(html, "html.parser").select(selector))),
+        (f"{PARSER} (full)", lambda: len(BeautifulSoup(html, PARSER).select(selector))),
+        (f"{PARSER} + strainer", lambda: len(parse_html(html, "table", class_=table_class).select(selector))),
+    ]
+    if PARSER == "lxml":
+        # 참고용 상한선: BeautifulSoup 트리 없이 lxml 트리에서 직접 XPath
+        import lxml.html
+        xpath = f"//table[contains(concat(' ', normalize-space(@class), ' '), ' {table_class} ')]//tr"
+        cases.append(("lxml.html xpath (ref)", lambda: len(lxml.html.fromstring(html).xpath(xpath))))
+    print(f"\n{os.path.basename(path)} ({len(html) / 1024:.0f} KB) → {selector}")
+    baseline = None
+    for label, fn in cases:
+        ms, rows = _time(fn)
+        baseline = baseline or ms
+        print(f"  {label:<22} {ms:8.2f} ms/page  rows={rows:<4} x{baseline / ms:5.1f}")
+
+
+if __name__ == "__main__":
+    fixtures = DEFAULT_FIXTURES
+    if len(sys.argv) > 1:
+        fixtures = [tuple(arg.rsplit(":", 1)) if ":" in arg else (arg, "type_1") for arg in sys.argv[1:]]
+    for name, table_class in fixtures:
+        path = name if os.path.isabs(name) else os.path.join(BASE_DIR, name)
+        if not os.path.exists(path):
+            print(f"[Bench] Fixture not found: {path}")
+            continue
+        bench(path, table_class)
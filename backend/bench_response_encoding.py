@@ -0,0 +1,88 @@
+"""
+응답 직렬화/압축 벤치마크
+
+    python bench_response_encoding.py                  # 합성 페이로드 (전 종목 목록, 차트 히스토리)
+    python bench_response_encoding.py dump.json ...    # 저장된 API 응답 JSON 추가
+
+각 페이로드에 대해 직렬화 1회 평균 시간(ms)과 전송 바이트(원본 / gzip / br)를 비교합니다.
+  표준 json (기존 JSONResponse) / response_encoding.dumps (orjson, 미설치 시 표준 json 대체 경로)
+"""
+
+import gzip
+import json
+import math
+import os
+import random
+import sys
+import time
+
+from response_encoding import BROTLI_QUALITY, GZIP_LEVEL, _to_native, brotli, dumps, orjson
+
+ROUNDS = 20
+
+
+def _time(fn, rounds=ROUNDS):
+    fn()  # 워밍업
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+
+def synthetic_listing(count=4000):
+    """/api/seo/stocks 형태"""
+    markets = ["KOSPI", "KOSDAQ", "ETF", "NASDAQ"]
+    return [{"ticker": f"{i:06d}", "name": f"종목{i}", "market": markets[i % 4]} for i in range(count)]
+
+
+def synthetic_history(days=2500):
+    """차트/ETF 상세 히스토리 형태 (이평선 초반 NaN 포함)"""
+    rows, price = [], 50000.0
+    for i in range(days):
+        price *= 1 + random.uniform(-0.03, 0.03)
+        rows.append({
+            "date": f"2016-01-01+{i}", "open": price * 0.99, "high": price * 1.01, "low": price * 0.98,
+            "close": price, "volume": random.randint(10_000, 5_000_000),
+            "ma5": price if i >= 4 else math.nan, "ma20": price if i >= 19 else math.nan,
+            "ma60": price if i >= 59 else math.nan, "ma120": price if i >= 119 else math.nan,
+        })
+    return {"status": "success", "data": {"symbol": "005930", "history": rows}}
+
+
+def stdlib_dumps(content) -> bytes:
+    # 기존 JSONResponse.render (allow_nan=False라 NaN은 미리 None으로 바꿔야 했음)
+    return json.dumps(_to_native(content), ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def bench(label: str, payload):
+    cases = [("json (stdlib)", lambda: stdlib_dumps(payload)),
+             ("orjson" if orjson else "dumps (fallback)", lambda: dumps(payload))]
+    print(f"\n{label}")
+    baseline = None
+    for name, fn in cases:
+        ms, body = _time(fn)
+        baseline = baseline or ms
+        print(f"  {name:<18} {ms:8.2f} ms  x{baseline / ms:5.1f}")
+
+    sizes = [("identity", len(body))]
+    ms, gz = _time(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL), 5)
+    sizes.append((f"gzip -{GZIP_LEVEL} ({ms:.1f} ms)", len(gz)))
+    if brotli is not None:
+        ms, br = _time(lambda: brotli.compress(body, quality=BROTLI_QUALITY), 5)
+        sizes.append((f"br q{BROTLI_QUALITY} ({ms:.1f} ms)", len(br)))
+    for name, size in sizes:
+        print(f"  {name:<18} {size / 1024:8.1f} KB  ({size / sizes[0][1] * 100:5.1f}%)")
+
+
+if __name__ == "__main__":
+    random.seed(7)
+    payloads = [("listing (4000 stocks)", synthetic_listing()), ("history (2500 days)", synthetic_history())]
+    for path in sys.argv[1:]:
+        if not os.path.exists(path):
+            print(f"[Bench] Fixture not found: {path}")
+            continue
+        with open(path, encoding="utf-8-sig") as f:
+            payloads.append((os.path.basename(path), json.load(f)))
+    for label, payload in payloads:
+        bench(label, payload)
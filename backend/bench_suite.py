@@ -0,0 +1,439 @@
+"""
+오프라인 벤치마크 스위트 (핫패스 회귀 검사)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+파서 / 캐시 / DB 조회 / 알림 평가 / 분석 연산 / 외부 호출 경로를 같은 기준으로 측정합니다.
+외부 호출(upstream 그룹)은 upstream_replay fixture로 재생하므로 네트워크 없이 결정적으로 돌아갑니다.
+
+    python bench_suite.py                                   # 전체 (upstream은 replay)
+    python bench_suite.py -k parse -k cache                 # 이름/그룹 부분 일치 필터
+    python bench_suite.py --save .bench/base.json           # 결과 저장
+    python bench_suite.py --compare .bench/base.json        # 중앙값이 --threshold(기본 1.2)배 이상 느려지면 exit 1
+    python bench_suite.py --record -k upstream              # fixture 녹화 (실제 호출, 1회)
+    UPSTREAM_LATENCY_MS=recorded python bench_suite.py      # 녹화 당시 지연까지 재현
+
+📌 측정: 워밍업 1회 → 1라운드가 MIN_ROUND_MS 이상이 되도록 반복 횟수 보정 → 라운드 반복 (MAX_CASE_SECONDS 한도)
+   통계: min / median / mean / p95 (1회 호출 기준 ms)
+📌 DB 그룹은 임시 SQLite 파일(DB_PATH)에 시드 데이터를 넣고 측정 → 운영 DB 무관
+⚠️ 의존성이 없거나 fixture가 없으면 해당 케이스는 SKIP (사유 출력)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# db_manager는 import 시점에 DB_PATH를 읽으므로 어떤 로컬 모듈보다 먼저 임시 DB로 고정
+_BENCH_DB = os.path.join(tempfile.mkdtemp(prefix="bench_suite_"), "bench.db")
+os.environ["DB_PATH"] = _BENCH_DB
+
+MIN_ROUND_MS = 5.0
+MIN_ROUNDS = 5
+MAX_ROUNDS = 200
+MAX_CASE_SECONDS = float(os.getenv("BENCH_MAX_CASE_SECONDS", "1.0"))
+DEFAULT_THRESHOLD = 1.2
+
+
+class Skip(Exception):
+    """케이스 실행 불가 (의존성/fixture 없음)"""
+
+
+# ─── 측정기 ──────────────────────────────────────────────────────────────────
+class Benchmark:
+    """pytest-benchmark의 benchmark fixture와 같은 호출 방식: benchmark(fn, *args)"""
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self.iterations = 1
+        self.result = None
+
+    def __call__(self, fn: Callable, *args, **kwargs):
+        self.result = fn(*args, **kwargs)  # 워밍업 (lazy import, 내부 캐시 생성 등)
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        once_ms = max((time.perf_counter() - start) * 1000, 1e-4)
+        self.iterations = max(1, int(MIN_ROUND_MS / once_ms))
+
+        deadline = time.perf_counter() + MAX_CASE_SECONDS
+        while len(self.samples) < MAX_ROUNDS and (len(self.samples) < MIN_ROUNDS or time.perf_counter() < deadline):
+            start = time.perf_counter()
+            for _ in range(self.iterations):
+                fn(*args, **kwargs)
+            self.samples.append((time.perf_counter() - start) * 1000 / self.iterations)
+        return self.result
+
+    def run_async(self, coro_fn: Callable, *args, **kwargs):
+        loop = asyncio.new_event_loop()
+        try:
+            return self(lambda: loop.run_until_complete(coro_fn(*args, **kwargs)))
+        finally:
+            loop.close()
+
+    def stats(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "min": round(ordered[0], 4),
+            "median": round(statistics.median(ordered), 4),
+            "mean": round(statistics.fmean(ordered), 4),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+            "rounds": len(ordered),
+            "iterations": self.iterations,
+        }
+
+
+CASES: List[tuple] = []
+
+
+def case(group: str, name: str):
+    """벤치마크 케이스 등록 (id = group.name)"""
+    def decorator(fn):
+        CASES.append((f"{group}.{name}", fn))
+        return fn
+    return decorator
+
+
+def _require(module: str):
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError as e:
+        raise Skip(f"missing dependency: {e.name or module}")
+
+
+# ─── 공용 데이터 ─────────────────────────────────────────────────────────────
+def _read_fixture(name: str) -> str:
+    path = os.path.join(BASE_DIR, name)
+    if not os.path.exists(path):
+        raise Skip(f"fixture not found: {name}")
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _synthetic_ohlcv(days: int = 1250, seed: int = 7):
+    pd = _require("pandas")
+    np = _require("numpy")
+    rng = np.random.default_rng(seed)
+    close = 50000 * np.cumprod(1 + rng.normal(0.0003, 0.02, days))
+    index = pd.bdate_range(end="2026-01-02", periods=days)
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.005, days)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(100_000, 5_000_000, days),
+    }, index=index)
+
+
+_db_ready = False
+
+
+def _seed_db():
+    """임시 DB 초기화 + 대표 규모 시드 (관심종목 50, 시그널 2000, AI 캐시 200, 가격 알림 1000)"""
+    global _db_ready
+    if _db_ready:
+        return
+    import db_manager
+    from price_alerts import create_price_alerts_tables
+
+    db_manager.init_db()
+    create_price_alerts_tables()
+    rng = random.Random(7)
+    symbols = [f"{i:06d}" for i in range(0, 2000, 10)]
+    conn = db_manager.get_db_connection()
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO watchlist (user_id, symbol, added_price, quantity) VALUES (?, ?, ?, ?)",
+            [("bench-user", s, rng.uniform(1000, 90000), rng.randint(1, 100)) for s in symbols[:50]],
+        )
+        conn.executemany(
+            "INSERT INTO price_alerts (user_id, symbol, type, buy_price, threshold, target_price, quantity) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(f"user{i % 100}", rng.choice(symbols), rng.choice(["stop_loss", "take_profit", "target_price"]),
+              50000, 5, 80000, 10) for i in range(1000)],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    for i in range(2000):
+        db_manager.save_signal(rng.choice(symbols), rng.choice(["BUY", "SELL", "WATCH"]),
+                               f"signal {i}", "bench", {"score": rng.random()})
+    for s in symbols:
+        db_manager.save_ai_analysis_cache(s, {"symbol": s, "summary": "bench " * 50, "score": 70})
+    _db_ready = True
+
+
+# ─── parse ───────────────────────────────────────────────────────────────────
+@case("parse", "sise_type_1")
+def bench_parse_type_1(benchmark):
+    _require("bs4")
+    from html_parse import parse_html
+    html = _read_fixture("sise_dump.html")
+    benchmark(lambda: len(parse_html(html, "table", class_="type_1").select("table.type_1 tr")))
+
+
+@case("parse", "sise_type_2")
+def bench_parse_type_2(benchmark):
+    _require("bs4")
+    from html_parse import parse_html
+    html = _read_fixture("sise_dump.html")
+    benchmark(lambda: len(parse_html(html, "table", class_="type_2").select("table.type_2 tr")))
+
+
+@case("parse", "decode_cp949")
+def bench_decode_html(benchmark):
+    _require("bs4")
+    import html_parse
+    content = _read_fixture("sise_dump.html").encode("cp949", errors="replace")
+
+    def run():
+        html_parse._encoding_cache.clear()  # 호스트 캐시 없이 감지 경로 측정
+        return html_parse.decode_html(content, "text/html", "https://finance.naver.com/sise/")
+    benchmark(run)
+
+
+# ─── cache ───────────────────────────────────────────────────────────────────
+@case("cache", "turbo_cache_hit")
+def bench_turbo_cache_hit(benchmark):
+    from turbo_engine import turbo_cache
+
+    @turbo_cache(ttl_seconds=600)
+    def lookup(symbol, period="1m"):
+        return {"symbol": symbol, "rows": list(range(100))}
+
+    benchmark(lookup, "005930", period="3m")
+
+
+@case("cache", "make_cache_key")
+def bench_make_cache_key(benchmark):
+    from turbo_engine import make_cache_key
+    benchmark(make_cache_key, "get_global_ranking", ("KOSPI", "trading_volume"), {"limit": 50})
+
+
+# ─── db ──────────────────────────────────────────────────────────────────────
+@case("db", "get_watchlist")
+def bench_get_watchlist(benchmark):
+    _seed_db()
+    import db_manager
+    benchmark(db_manager.get_watchlist, "bench-user")
+
+
+@case("db", "get_recent_signals")
+def bench_get_recent_signals(benchmark):
+    _seed_db()
+    import db_manager
+    benchmark(db_manager.get_recent_signals, 50)
+
+
+@case("db", "get_cached_ai_analysis")
+def bench_get_cached_ai_analysis(benchmark):
+    _seed_db()
+    import db_manager
+    benchmark(db_manager.get_cached_ai_analysis, "000100")
+
+
+@case("db", "active_price_alerts")
+def bench_active_price_alerts(benchmark):
+    _seed_db()
+    from price_alerts import PriceAlertMonitor
+    benchmark(PriceAlertMonitor().get_active_alerts_from_db)
+
+
+# ─── alerts ──────────────────────────────────────────────────────────────────
+@case("alerts", "check_alert_x1000")
+def bench_check_alert(benchmark):
+    from price_alerts import PriceAlertMonitor
+    monitor = PriceAlertMonitor()
+    kinds = ["stop_loss", "take_profit", "target_price"]
+    # 발동하지 않는 조건만 (발동 시 DB 기록/알림 전송이 섞여 평가 비용이 가려짐)
+    alerts = [{"id": i, "user_id": f"user{i % 100}", "symbol": "005930", "type": kinds[i % 3],
+               "buy_price": 50000, "threshold": 10, "target_price": 90000, "quantity": 1} for i in range(1000)]
+
+    async def run():
+        for alert in alerts:
+            await monitor.check_alert(alert, 51000)
+    benchmark.run_async(run)
+
+
+# ─── analytics ───────────────────────────────────────────────────────────────
+@case("analytics", "momentum_score")
+def bench_momentum_score(benchmark):
+    from turbo_engine import turbo_engine
+    series = _synthetic_ohlcv()["Close"]
+    benchmark(turbo_engine.calculate_momentum_score, series)
+
+
+@case("analytics", "weather_forecast_5y")
+def bench_weather_forecast(benchmark):
+    df = _synthetic_ohlcv()
+    _require("yfinance")
+    from chart_analysis import chart_analyzer
+    benchmark(chart_analyzer.analyze_weather_forecast, "005930.KS", df=df)
+
+
+# ─── upstream (fixture 재생) ─────────────────────────────────────────────────
+def _uncached(fn: Callable):
+    """turbo_cache/lru_cache를 건너뛰어 매 라운드 실제 호출 경로(요청 → 파싱)를 측정"""
+    from turbo_engine import turbo_engine
+    target = getattr(fn, "__wrapped__", fn)
+
+    def run(*args, **kwargs):
+        turbo_engine._cache.clear()  # clear_cache()는 매번 로그를 남김
+        return target(*args, **kwargs)
+    return run
+
+
+def _upstream(benchmark, fn: Callable, *args, is_async: bool = False, **kwargs):
+    from upstream_replay import upstream_replay
+    if upstream_replay.mode == "off":
+        raise Skip("upstream replay not installed (UPSTREAM_MODE=off)")
+    # 1회 시험 호출로 fixture 누락 확인 (누락 시 각 모듈의 오류 처리 경로만 측정하게 되므로 SKIP)
+    missing = upstream_replay.stats["missing"]
+    if is_async:
+        asyncio.run(fn(*args, **kwargs))
+    else:
+        fn(*args, **kwargs)
+    if upstream_replay.mode == "replay" and upstream_replay.stats["missing"] > missing:
+        raise Skip("fixtures missing — record first: python bench_suite.py --record -k upstream")
+    if is_async:
+        benchmark.run_async(fn, *args, **kwargs)
+    else:
+        benchmark(fn, *args, **kwargs)
+
+
+@case("upstream", "naver_stock_data")
+def bench_naver_stock_data(benchmark):
+    _require("bs4")
+    from korea_data import gather_naver_stock_data
+    _upstream(benchmark, _uncached(gather_naver_stock_data), "005930")
+
+
+@case("upstream", "global_ranking")
+def bench_global_ranking(benchmark):
+    _require("bs4")
+    from rank_data import get_global_ranking
+    _upstream(benchmark, _uncached(get_global_ranking), "KOSPI", "trading_volume")
+
+
+@case("upstream", "sector_heatmap")
+def bench_sector_heatmap(benchmark):
+    _require("aiohttp")
+    from korea_data import get_sector_heatmap_data
+    _upstream(benchmark, _uncached(get_sector_heatmap_data), is_async=True)
+
+
+@case("upstream", "naver_news")
+def bench_naver_news(benchmark):
+    _require("requests")
+    from batch_news_system import fetch_naver_news_official
+    _upstream(benchmark, _uncached(fetch_naver_news_official), "삼성전자", display=100)
+
+
+@case("upstream", "dart_disclosures")
+def bench_dart_disclosures(benchmark):
+    _require("bs4")
+    from dart_disclosure import get_dart_disclosures
+    _upstream(benchmark, _uncached(get_dart_disclosures), "005930", "1m")
+
+
+@case("upstream", "yfinance_history")
+def bench_yfinance_history(benchmark):
+    yf = _require("yfinance")
+    _upstream(benchmark, lambda: yf.Ticker("005930.KS").history(period="1y"))
+
+
+# ─── 실행/비교 ───────────────────────────────────────────────────────────────
+def run_cases(filters: List[str]) -> Dict[str, dict]:
+    results = {}
+    for case_id, fn in CASES:
+        if filters and not any(f in case_id for f in filters):
+            continue
+        benchmark = Benchmark()
+        try:
+            # 모듈들의 print 로그가 결과 표를 덮지 않도록 케이스 실행 중 stdout은 버림
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn(benchmark)
+        except ModuleNotFoundError as e:
+            print(f"  {case_id:<34} SKIP  missing dependency: {e.name}")
+            continue
+        except Skip as e:
+            print(f"  {case_id:<34} SKIP  {e}")
+            continue
+        except Exception as e:
+            print(f"  {case_id:<34} ERROR {type(e).__name__}: {e}")
+            continue
+        if not benchmark.samples:
+            print(f"  {case_id:<34} SKIP  no samples")
+            continue
+        s = benchmark.stats()
+        results[case_id] = s
+        print(f"  {case_id:<34} median {s['median']:10.4f} ms  min {s['min']:10.4f}  "
+              f"p95 {s['p95']:10.4f}  ({s['rounds']}x{s['iterations']})")
+    return results
+
+
+def compare(results: Dict[str, dict], baseline_path: str, threshold: float) -> bool:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f).get("results", {})
+    ok = True
+    print(f"\n[Bench] vs {baseline_path} (threshold x{threshold})")
+    for case_id, s in results.items():
+        base = baseline.get(case_id)
+        if not base:
+            print(f"  {case_id:<34} (new)")
+            continue
+        ratio = s["median"] / max(base["median"], 1e-9)
+        regressed = ratio >= threshold
+        ok = ok and not regressed
+        mark = "⚠️ REGRESSION" if regressed else ("faster" if ratio < 1 else "")
+        print(f"  {case_id:<34} {base['median']:10.4f} → {s['median']:10.4f} ms  x{ratio:5.2f} {mark}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline hot-path benchmark suite")
+    parser.add_argument("-k", dest="filters", action="append", default=[], help="케이스 id 부분 일치 (반복 가능)")
+    parser.add_argument("--save", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="기준 결과 JSON (회귀 시 exit 1)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--record", action="store_true", help="upstream fixture 녹화 (실제 호출)")
+    parser.add_argument("--list", action="store_true")
+    args = parser.parse_args()
+
+    if args.list:
+        for case_id, _fn in CASES:
+            print(case_id)
+        return
+
+    from upstream_replay import upstream_replay
+    mode = "record" if args.record else (os.getenv("UPSTREAM_MODE") or "replay")
+    if mode != "off":
+        upstream_replay.install(mode=mode)
+
+    print(f"[Bench] python {sys.version.split()[0]} | upstream={mode} | db={_BENCH_DB}")
+    results = run_cases(args.filters)
+    if mode != "off":
+        print(f"[Bench] upstream {upstream_replay.stats}")
+        upstream_replay.uninstall()
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                       "python": sys.version.split()[0], "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"[Bench] saved → {args.save}")
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ import requests
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
+from upstream_hosts import OPENDART_URL
+
 class DartApiClient:
     """
     💼 금융감독원 Open DART API 연동 클라이언트
@@ -11,7 +13,7 @@ class DartApiClient:
     공식 API를 사용하여 기업의 공시 정보 및 재무제표를 합법적으로 조회합니다.
     """
     
-    BASE_URL = "https://opendart.fss.or.kr/api"
+    BASE_URL = f"{OPENDART_URL}/api"
     _corp_codes_cache: Optional[Dict[str, str]] = None
 
     def __init__(self):
@@ -83,21 +85,7 @@ class DartApiClient:
                 status = data.get("status")
                 
                 if status == "000":  # 정상
-                    reports = data.get("list", [])
-                    cleaned_reports = []
-                    for r in reports:
-                        stock_code = r.get("stock_code", "").strip()
-                        cleaned_reports.append({
-                            "corp_code": r.get("corp_code"),
-                            "corp_name": r.get("corp_name"),
-                            "stock_code": stock_code if stock_code else None,
-                            "report_nm": r.get("report_nm"),
-                            "rcept_no": r.get("rcept_no"),
-                            "flr_nm": r.get("flr_nm"),
-                            "rcept_dt": r.get("rcept_dt"),
-                            "rm": r.get("rm"),
-                            "link": f"https://dart.fss.or.kr/dsaf001/main.do?rcpNo={r.get('rcept_no')}"
-                        })
+                    cleaned_reports = [self._clean_report(r) for r in data.get("list", [])]
                     
                     self._realtime_cache[days_ago] = cleaned_reports
                     self._realtime_cache_time[days_ago] = now_ts
@@ -115,6 +103,80 @@ class DartApiClient:
 
         return []
 
+    @staticmethod
+    def _clean_report(r: Dict) -> Dict:
+        stock_code = (r.get("stock_code") or "").strip()
+        return {
+            "corp_code": r.get("corp_code"),
+            "corp_name": r.get("corp_name"),
+            "stock_code": stock_code if stock_code else None,
+            "report_nm": r.get("report_nm"),
+            "rcept_no": r.get("rcept_no"),
+            "flr_nm": r.get("flr_nm"),
+            "rcept_dt": r.get("rcept_dt"),
+            "rm": r.get("rm"),
+            "link": f"https://dart.fss.or.kr/dsaf001/main.do?rcpNo={r.get('rcept_no')}"
+        }
+
+    def get_disclosures_since(self, last_rcept_no: Optional[str] = None, max_pages: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        📋 증분 공시 수집: last_rcept_no(접수번호 high-water mark) 이후 공시만 페이지 단위로 조회
+        - list.json 은 최신순이므로 mark 이하 접수번호가 나오는 페이지(또는 마지막 페이지)까지 조회
+        - 조회 시작일은 mark 의 접수일 (단, 최대 어제까지만 거슬러 올라감). mark 가 없으면 오늘 첫 페이지만
+        - 경계 페이지의 mark 이하 공시도 함께 반환 → 늦게 게시된 공시는 호출 측 dedupe 테이블로 거름
+        - 반환: 최신순 공시 목록, API 오류 시 None (빈 목록과 구분)
+        ⚠️ 중간 페이지가 하나라도 실패하면 이미 받은 페이지도 버리고 None → 호출 측이 mark 를 옮기지 않아
+           다음 폴링에서 같은 구간을 다시 조회 (일부만 반환하면 mark 가 최신으로 올라가 사이 공시가 영구 누락)
+        - max_pages 를 주면 그 페이지에서 잘라내고 누락 구간을 로그로 남김
+        """
+        if not self.is_available():
+            return None
+
+        today = datetime.now()
+        bgn_de = today.strftime("%Y%m%d")
+        if last_rcept_no:
+            bgn_de = max(str(last_rcept_no)[:8], (today - timedelta(days=1)).strftime("%Y%m%d"))
+            bgn_de = min(bgn_de, today.strftime("%Y%m%d"))
+
+        url = f"{self.BASE_URL}/list.json"
+        reports = []
+        page_no = 0
+        while True:
+            page_no += 1
+            params = {
+                "crtfc_key": self.api_key,
+                "bgn_de": bgn_de,
+                "end_de": today.strftime("%Y%m%d"),
+                "page_no": str(page_no),
+                "page_count": "100"
+            }
+            try:
+                res = requests.get(url, params=params, timeout=10)
+                data = res.json() if res.status_code == 200 else {}
+            except Exception as e:
+                print(f"[DART-API] 증분 조회 예외 발생 (p{page_no}): {e}")
+                return None
+
+            status = data.get("status")
+            if status == "013":  # 조회된 데이터가 없음
+                break
+            if status != "000":
+                print(f"[DART-API] ❌ 증분 조회 오류 (p{page_no}, 상태코드: {status or res.status_code}): {data.get('message')}")
+                return None
+
+            page = [self._clean_report(r) for r in data.get("list", [])]
+            reports.extend(page)
+            if not last_rcept_no or any(str(r.get("rcept_no") or "") <= last_rcept_no for r in page):
+                break
+            total_page = int(data.get("total_page", 1) or 1)
+            if page_no >= total_page:
+                break
+            if max_pages and page_no >= max_pages:
+                print(f"[DART-API] ⚠️ 증분 조회 {max_pages}페이지에서 중단 (전체 {total_page}페이지): "
+                      f"mark={last_rcept_no} ~ {reports[-1].get('rcept_no') if reports else '-'} 사이 공시 누락")
+                break
+        return reports
+
     def get_insider_trading_details(self, corp_code: str, rcept_no: str) -> Optional[Dict]:
         """
         🕵️ 지분공시(elestock.json)를 호출하여 특정 공시(rcept_no)의 변동 내역 파싱
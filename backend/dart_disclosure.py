@@ -4,7 +4,6 @@ Fetch disclosure information from Naver Finance
 """
 
 import requests
-from bs4 import BeautifulSoup
 import re
 import sys
 import os
@@ -13,6 +12,7 @@ from datetime import datetime, timedelta
 # Import from korea_data
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from korea_data import HEADER, decode_safe
+from html_parse import parse_html
 
 def get_dart_disclosures(symbol: str, period: str = "1m"):
     """
@@ -116,7 +116,7 @@ def get_dart_disclosures(symbol: str, period: str = "1m"):
             url = f"https://finance.naver.com/item/news_notice.naver?code={code}&page={page}"
             res = requests.get(url, headers=HEADER, timeout=5)
             html = decode_safe(res)
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = parse_html(html, "table", class_="type6")
             
             table = soup.select_one("table.type6")
             if not table:
@@ -285,7 +285,7 @@ def get_dart_overhang_and_investments(symbol: str):
             url = f"https://finance.naver.com/item/news_notice.naver?code={code}&page={page}"
             res = requests.get(url, headers=HEADER, timeout=5)
             html = decode_safe(res)
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = parse_html(html, "table", class_="type6")
             
             table = soup.select_one("table.type6")
             if not table:
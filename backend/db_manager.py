@@ -1,6 +1,8 @@
 import sqlite3
 import os
+import time
 from datetime import datetime
+from metrics import observe_upstream
 
 # DB File Path
 # Production (Railway): Set DB_PATH=/data/stock_app.db (with Volume mounted at /data)
@@ -14,10 +16,54 @@ if os.environ.get("VERCEL") or os.environ.get("RAILWAY_STATIC_URL") or os.enviro
 else:
     DB_FILE = os.environ.get("DB_PATH", os.path.join(BASE_DIR, "stock_app.db"))
 
+class TimedCursor(sqlite3.Cursor):
+    """execute/executemany 소요 시간을 upstream="sqlite"로 기록 (락 대기 포함)"""
+    def execute(self, *args):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = super().execute(*args)
+            ok = True
+            return result
+        finally:
+            observe_upstream("sqlite", time.perf_counter() - start, ok)
+
+    def executemany(self, *args):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = super().executemany(*args)
+            ok = True
+            return result
+        finally:
+            observe_upstream("sqlite", time.perf_counter() - start, ok)
+
+class TimedConnection(sqlite3.Connection):
+    """get_db_connection 전용 연결: 커서/conn.execute/commit 지연을 메트릭으로 수집"""
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def commit(self):
+        start = time.perf_counter()
+        ok = False
+        try:
+            super().commit()
+            ok = True
+        finally:
+            observe_upstream("sqlite", time.perf_counter() - start, ok)
+
 def get_db_connection():
     # Production-ready connection factory with WAL enforcement
     # Increased timeout to 60s to handle heavy AI analysis writes
-    conn = sqlite3.connect(DB_FILE, timeout=60)
+    start = time.perf_counter()
+    conn = sqlite3.connect(DB_FILE, timeout=60, factory=TimedConnection)
+    observe_upstream("sqlite_connect", time.perf_counter() - start)
     try:
         # WAL mode is crucial for allowing readers (Dashboard) while writers (AI Backfiller) are active
         conn.execute("PRAGMA journal_mode=WAL")
@@ -269,6 +315,8 @@ def init_db():
             PRIMARY KEY (user_id, symbol)
         )
     ''')
+    # PK 가 (user_id, symbol) 이라 종목 기준 조회(공시/뉴스 알림 대상자 찾기)용 인덱스 별도
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_watchlist_symbol ON watchlist(symbol)")
     
     # [NEW] Watchlist Purchases Table (Multiple buys for averaging down)
     cursor.execute('''
@@ -2208,6 +2256,42 @@ def get_user_ids_and_tokens_by_watchlist_symbol(symbol: str) -> list:
     finally:
         conn.close()
 
+def get_watchlist_tokens_by_stock_codes(stock_codes: list) -> dict:
+    """
+    여러 국내 종목코드(6자리)의 관심종목 등록 사용자 (user_id, FCM token) 를 한 번에 조회
+    - '005930', '005930.KS', '005930.KQ' 로 등록된 관심종목을 모두 같은 코드로 묶음
+    Returns: {stock_code: [{"user_id", "token", "symbol"}]}
+    """
+    codes = list(dict.fromkeys(c for c in stock_codes if c))
+    if not codes:
+        return {}
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    grouped, seen = {}, set()
+    try:
+        # SQLite 바인딩 변수 한도(999) 안에서 나눠 조회
+        for i in range(0, len(codes), 300):
+            candidates = [f"{code}{suffix}" for code in codes[i:i + 300] for suffix in ("", ".KS", ".KQ")]
+            placeholders = ",".join("?" * len(candidates))
+            cursor.execute(f"""
+                SELECT DISTINCT w.symbol, ft.user_id, ft.token
+                FROM watchlist w
+                JOIN fcm_tokens ft ON ft.user_id = w.user_id
+                WHERE w.symbol IN ({placeholders})
+            """, candidates)
+            for symbol, user_id, token in cursor.fetchall():
+                code = symbol.split('.')[0]
+                if not token or (code, token) in seen:
+                    continue
+                seen.add((code, token))
+                grouped.setdefault(code, []).append({"user_id": user_id, "token": token, "symbol": symbol})
+        return grouped
+    except Exception as e:
+        print(f"[DB] Get tokens by stock codes error: {e}")
+        return {}
+    finally:
+        conn.close()
+
 # ============================================================
 # [Analytics] Site Visitor & Pageview Tracking Methods
 # ============================================================
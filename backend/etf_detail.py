@@ -138,6 +138,16 @@ def calculate_risk_stats(hist, risk_free_annual=0.035):
     return stats
 
 
+CHART_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "ma5", "ma20", "ma60", "ma120"]
+
+def _chart_rows(hist):
+    """차트용 OHLCV + 이평선 행. NaN(이평선 초반 구간)은 응답 직렬화(FastJSONResponse)에서 null로 변환"""
+    chart = hist[CHART_COLUMNS].rename(columns=str.lower)
+    chart["volume"] = chart["volume"].fillna(0).astype("int64")
+    chart.insert(0, "date", [str(idx).split(' ')[0] for idx in chart.index])
+    return chart.to_dict("records")
+
+
 @turbo_cache(ttl_seconds=3600) # Detail data is cached for 1 hour
 def get_etf_detail(symbol: str):
     symbol = symbol.upper().strip()
@@ -314,20 +324,7 @@ def get_etf_detail(symbol: str):
                 hist['ma120'] = hist['Close'].rolling(window=120).mean()
                 hist = hist.tail(252) # Keep max 252 days for chart
             
-            data["chart_data"] = [
-                {
-                    "date": str(idx).split(' ')[0], 
-                    "open": float(row['Open']),
-                    "high": float(row['High']),
-                    "low": float(row['Low']),
-                    "close": float(row['Close']),
-                    "volume": int(row['Volume']),
-                    "ma5": float(row['ma5']) if pd.notna(row['ma5']) else None,
-                    "ma20": float(row['ma20']) if pd.notna(row['ma20']) else None,
-                    "ma60": float(row['ma60']) if pd.notna(row['ma60']) else None,
-                    "ma120": float(row['ma120']) if pd.notna(row['ma120']) else None
-                } for idx, row in hist.iterrows()
-            ]
+            data["chart_data"] = _chart_rows(hist)
             
             # [환율 추가] Fetch USD/KRW Exchange Rate
             try:
@@ -337,10 +334,13 @@ def get_etf_detail(symbol: str):
                 data["exchange_rate"] = 1350.0
 
             # [Fix] Calculate performance for US ETFs
-            data["performance"] = calculate_performance(hist)
+            # 일괄 계산된 통계 테이블(etf_stats) 우선, 없으면 이 ETF 만 즉석 계산
+            from etf_stats import etf_stats_table
+            precomputed = etf_stats_table.detail(symbol)
+            data["performance"] = precomputed["performance"] if precomputed else calculate_performance(hist)
 
             # [NEW] Risk Stats (MDD, Volatility, Sharpe, 52-week position)
-            data["risk_stats"] = calculate_risk_stats(hist)
+            data["risk_stats"] = precomputed["risk_stats"] if precomputed else calculate_risk_stats(hist)
 
             # [NEW] Sector Weights for US ETFs
             try:
@@ -446,24 +446,17 @@ def get_etf_detail(symbol: str):
                 hist['ma120'] = hist['Close'].rolling(window=120).mean()
                 hist = hist.tail(252)
                 
-                data["chart_data"] = [
-                    {
-                        "date": str(idx).split(' ')[0], 
-                        "open": safe_to_float(row['Open']),
-                        "high": safe_to_float(row['High']),
-                        "low": safe_to_float(row['Low']),
-                        "close": safe_to_float(row['Close']),
-                        "volume": int(row['Volume']),
-                        "ma5": safe_to_float(row['ma5']) if pd.notna(row['ma5']) else None,
-                        "ma20": safe_to_float(row['ma20']) if pd.notna(row['ma20']) else None,
-                        "ma60": safe_to_float(row['ma60']) if pd.notna(row['ma60']) else None,
-                        "ma120": safe_to_float(row['ma120']) if pd.notna(row['ma120']) else None
-                    } for idx, row in hist.iterrows()
-                ]
-                # [NEW] KR ETF 리스크 지표
-                data["risk_stats"] = calculate_risk_stats(hist)
+                data["chart_data"] = _chart_rows(hist)
         except: pass
 
+        # [NEW] KR ETF 리스크 지표 (etf_stats 테이블 우선)
+        from etf_stats import etf_stats_table
+        precomputed = etf_stats_table.detail(clean_sym)
+        if precomputed:
+            data["risk_stats"] = precomputed["risk_stats"]
+        elif not hist.empty:
+            data["risk_stats"] = calculate_risk_stats(hist)
+
         # 2. Naver Mobile API (Primary Data Source)
         try:
             api_url = f"https://m.stock.naver.com/api/stock/{clean_sym}/integration"
@@ -497,6 +490,8 @@ def get_etf_detail(symbol: str):
                             f_val = safe_to_float(ind[k])
                             data["performance"][v] = f"{'+' if f_val > 0 else ''}{f_val:.2f}%"
 
+                if not data["performance"] and precomputed:
+                    data["performance"] = precomputed["performance"]
                 if not data["performance"] and not hist.empty and len(hist) > 1:
                     try:
                         last_close = hist['Close'].iloc[-1]
@@ -0,0 +1,332 @@
+"""
+📈 ETF 전체 유니버스 리스크/성과 통계 (일괄 벡터 계산)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+etf_detail.calculate_performance / calculate_risk_stats 는 상세 페이지 요청 때 ETF 하나씩 계산합니다.
+여기서는 하루 한 번 KR/US ETF 전체의 일별 종가를 (종목 × 거래일) 2차원 배열로 모아
+변동성·MDD·샤프·52주 위치·기간 수익률을 NumPy 배열 연산으로 한 번에 계산하고,
+작은 열 단위 테이블(npz)로 저장해 상세 페이지와 ETF 랭킹 정렬이 같이 읽습니다.
+
+    python etf_stats.py --build                 # 테이블 생성 (KR 전 ETF 수백 건 호출 + US yf.download 1회)
+    python etf_stats.py --market KR --sort=-volatility --top 20
+
+    from etf_stats import etf_stats_table
+    etf_stats_table.detail("069500")            # {"performance": {...}, "risk_stats": {...}} (없으면 None)
+    etf_stats_table.sort_items(items, "sharpe") # 랭킹 항목에 통계 열을 붙여 정렬
+
+📌 열: code, name, market, price, return_1m / return_3m / return_6m / return_1y (%), volatility (연환산 %),
+       mdd (%), sharpe, position_pct / high52 / low52, avg_volume_30d
+📌 정의는 calculate_risk_stats / calculate_performance 와 동일 (일간 단순수익률, 최근 252거래일 창,
+   무위험수익률 연 3.5%, 기간 수익률은 n개월 전과 가장 가까운 거래일 종가 기준)
+📌 정렬: 큰 값 우선, "-volatility" 처럼 부호를 붙이면 작은 값 우선. 통계가 없는 ETF 는 맨 뒤
+⚠️ 저장 위치: ETF_STATS_PATH > DB 파일과 같은 폴더의 etf_stats.npz (조회는 FundamentalsSnapshot 로더 재사용)
+"""
+
+import calendar
+import json
+import math
+import os
+import re
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import requests
+
+from fundamentals_snapshot import FundamentalsSnapshot
+from upstream_hosts import NAVER_API_FINANCE_URL, NAVER_FINANCE_URL
+
+HEADER = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
+
+RISK_WINDOW = 252
+HISTORY_DAYS = 400           # 1년 수익률용 (달력일)
+RISK_FREE_ANNUAL = 0.035
+PERIODS = (("return_1m", "1개월", 1), ("return_3m", "3개월", 3), ("return_6m", "6개월", 6), ("return_1y", "1년", 12))
+BUILD_WORKERS = int(os.getenv("ETF_STATS_WORKERS", "8"))
+
+TEXT_COLUMNS = ("code", "name", "market")
+NUMERIC_COLUMNS = ("price",) + tuple(p[0] for p in PERIODS) + (
+    "volatility", "mdd", "sharpe", "position_pct", "high52", "low52", "avg_volume_30d")
+
+Series = Tuple[List[str], List[float], List[float]]  # (YYYY-MM-DD 날짜, 종가, 거래량) 과거 → 최신
+
+
+def _default_path() -> str:
+    explicit = os.getenv("ETF_STATS_PATH")
+    if explicit:
+        return explicit
+    from db_manager import DB_FILE
+    return os.path.join(os.path.dirname(os.path.abspath(DB_FILE)), "etf_stats.npz")
+
+
+# ─── 수집 ────────────────────────────────────────────────────────────────────
+def fetch_kr_universe() -> List[dict]:
+    """네이버 ETF 전체 목록 → [{code, name}]"""
+    res = requests.get(f"{NAVER_FINANCE_URL}/api/sise/etfItemList.nhn", headers=HEADER, timeout=10)
+    items = json.loads(res.content.decode("cp949", "replace")).get("result", {}).get("etfItemList", [])
+    return [{"code": i["itemcode"], "name": i.get("itemname", i["itemcode"])} for i in items if i.get("itemcode")]
+
+
+def fetch_kr_series(code: str, days: int = HISTORY_DAYS) -> Series:
+    """siseJson 일봉 (etf_detail.get_naver_daily_prices 와 같은 출처, 한 번에 1년+)"""
+    now = datetime.now()
+    url = (f"{NAVER_API_FINANCE_URL}/siseJson.naver?symbol={code}&requestType=1"
+           f"&startTime={(now - timedelta(days=days)).strftime('%Y%m%d')}&endTime={now.strftime('%Y%m%d')}&timeframe=day")
+    res = requests.get(url, headers=HEADER, timeout=5)
+    text = res.content.decode("euc-kr", "replace")
+    rows = re.findall(r'\["(20\d{6})",\s*(\d+),\s*(\d+),\s*(\d+),\s*(\d+),\s*(\d+)', text)
+    return ([f"{r[0][:4]}-{r[0][4:6]}-{r[0][6:]}" for r in rows],
+            [float(r[4]) for r in rows], [float(r[5]) for r in rows])
+
+
+def fetch_us_series(symbols: Sequence[str], days: int = HISTORY_DAYS) -> Dict[str, Series]:
+    """yf.download 한 번으로 전 종목 일봉"""
+    import yfinance as yf
+
+    hist = yf.download(list(symbols), period=f"{days}d", progress=False, auto_adjust=False, threads=True)
+    if hist is None or hist.empty:
+        return {}
+    dates = [str(idx).split(" ")[0] for idx in hist.index]
+    closes, volumes = hist["Close"], hist["Volume"]
+    result = {}
+    for sym in symbols:
+        if sym not in closes.columns:
+            continue
+        close = closes[sym].to_numpy(dtype=float)
+        volume = volumes[sym].to_numpy(dtype=float)
+        keep = ~np.isnan(close)
+        if keep.any():
+            result[sym] = ([d for d, k in zip(dates, keep) if k], close[keep].tolist(), volume[keep].tolist())
+    return result
+
+
+# ─── 벡터 계산 ───────────────────────────────────────────────────────────────
+def align(series: Dict[str, Series]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """종목별 시계열 → (종목, 거래일 축, 종가 2D, 거래량 2D). 상장 전은 NaN, 중간 결측은 직전 종가로 채움"""
+    symbols = list(series)
+    dates = np.array(sorted({d for s in series.values() for d in s[0]}), dtype="datetime64[D]")
+    closes = np.full((len(symbols), len(dates)), np.nan)
+    volumes = np.full_like(closes, np.nan)
+    for row, sym in enumerate(symbols):
+        d, c, v = series[sym]
+        cols = np.searchsorted(dates, np.array(d, dtype="datetime64[D]"))
+        closes[row, cols], volumes[row, cols] = c, v
+    # forward fill: 각 칸에서 마지막으로 값이 있던 열 번호
+    last = np.where(np.isnan(closes), 0, np.arange(closes.shape[1]))
+    np.maximum.accumulate(last, axis=1, out=last)
+    filled = closes[np.arange(len(symbols))[:, None], last]
+    return symbols, dates, filled, volumes
+
+
+def _months_before(day: date, months: int) -> date:
+    month = day.month - 1 - months
+    year, month = day.year + month // 12, month % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def compute_stats(dates: np.ndarray, closes: np.ndarray, volumes: np.ndarray,
+                  risk_free_annual: float = RISK_FREE_ANNUAL) -> Dict[str, np.ndarray]:
+    """(종목 × 거래일) 종가 배열 → 통계 열 배열. 거래일 20일 미만 종목의 리스크 지표는 NaN"""
+    if not closes.size:
+        return {name: np.empty(len(closes)) for name in NUMERIC_COLUMNS}
+    window = closes[:, -RISK_WINDOW:]
+    stats: Dict[str, np.ndarray] = {"price": window[:, -1]}
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 전부 NaN 인 행 (nanmean of empty slice)
+        enough = np.count_nonzero(~np.isnan(window), axis=1) >= 20
+
+        returns = window[:, 1:] / window[:, :-1] - 1
+        enough_ret = enough & (np.count_nonzero(~np.isnan(returns), axis=1) >= 20)
+        stats["volatility"] = np.where(enough_ret, np.nanstd(returns, axis=1, ddof=1) * math.sqrt(252) * 100, np.nan)
+
+        running_max = np.fmax.accumulate(window, axis=1)
+        stats["mdd"] = np.where(enough, np.nanmin((window - running_max) / running_max * 100, axis=1), np.nan)
+
+        excess = returns - risk_free_annual / 252
+        excess_std = np.nanstd(excess, axis=1, ddof=1)
+        sharpe = np.nanmean(excess, axis=1) / excess_std * math.sqrt(252)
+        stats["sharpe"] = np.where(enough_ret & (excess_std > 0), sharpe, np.nan)
+
+        high52, low52 = np.nanmax(window, axis=1), np.nanmin(window, axis=1)
+        has_range = enough & (high52 > low52)
+        stats["position_pct"] = np.where(has_range, (window[:, -1] - low52) / (high52 - low52) * 100, np.nan)
+        stats["high52"] = np.where(has_range, high52, np.nan)
+        stats["low52"] = np.where(has_range, low52, np.nan)
+        stats["avg_volume_30d"] = np.where(enough, np.nanmean(volumes[:, -30:], axis=1), np.nan)
+
+        last_day = dates[-1].astype(object)
+        for column, _label, months in PERIODS:
+            target = np.datetime64(_months_before(last_day, months))
+            idx = int(np.argmin(np.abs(dates - target)))  # 가장 가까운 거래일 (get_indexer method='nearest')
+            past = closes[:, idx]
+            stats[column] = np.where(past > 0, (closes[:, -1] / past - 1) * 100, np.nan)
+    return stats
+
+
+def build_table(path: Optional[str] = None, workers: int = BUILD_WORKERS, limit: Optional[int] = None) -> dict:
+    """KR/US ETF 일봉 수집 → 시장별 2D 배열 → 통계 열 → npz 원자적 교체. 반환: 메타 정보"""
+    from rank_data import US_ETF_NAMES, US_ETF_SYMBOLS
+
+    started = time.time()
+    universe = fetch_kr_universe()
+    if limit:
+        universe = universe[:limit]
+    names = {item["code"]: item["name"] for item in universe}
+
+    def fetch(code):
+        try:
+            return code, fetch_kr_series(code)
+        except Exception as e:
+            print(f"[EtfStats] {code} daily prices failed: {e}")
+            return code, None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        kr_series = {code: s for code, s in executor.map(fetch, names) if s and s[0]}
+    try:
+        us_series = fetch_us_series(sorted(set(US_ETF_SYMBOLS)))
+    except Exception as e:
+        print(f"[EtfStats] US download failed: {e}")
+        us_series = {}
+    names.update({sym: US_ETF_NAMES.get(sym, sym) for sym in us_series})
+
+    parts = []
+    for market, series in (("KR", kr_series), ("US", us_series)):
+        if not series:
+            continue
+        symbols, dates, closes, volumes = align(series)  # 시장별 거래일 축이 달라 따로 계산
+        stats = compute_stats(dates, closes, volumes)
+        parts.append((market, symbols, stats))
+    if not parts:
+        raise RuntimeError("no ETF price history collected")
+
+    cols: Dict[str, np.ndarray] = {
+        "code": np.array([s for _, symbols, _ in parts for s in symbols], dtype=str),
+        "market": np.array([m for m, symbols, _ in parts for _ in symbols], dtype=str),
+    }
+    cols["name"] = np.array([names.get(code, code) for code in cols["code"]], dtype=str)
+    for name in NUMERIC_COLUMNS:
+        cols[name] = np.concatenate([stats[name] for _, _, stats in parts]).astype(float)
+
+    meta = {"built_at": datetime.now().isoformat(timespec="seconds"), "rows": len(cols["code"]),
+            "markets": {m: len(symbols) for m, symbols, _ in parts},
+            "build_seconds": round(time.time() - started, 1)}
+    path = path or _default_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp.npz"
+    np.savez_compressed(tmp, __meta__=np.array(json.dumps(meta, ensure_ascii=False)), **cols)
+    os.replace(tmp, path)
+    print(f"[EtfStats] table saved: {meta['rows']} ETFs in {meta['build_seconds']}s -> {path}")
+    return meta
+
+
+# ─── 조회 ────────────────────────────────────────────────────────────────────
+def _pct(value: float) -> str:
+    return f"{value:+.2f}%"
+
+
+class EtfStatsTable(FundamentalsSnapshot):
+    """etf_stats.npz 조회 (파일 mtime 변경 시 재로딩은 FundamentalsSnapshot 과 동일)"""
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__(path)
+        self._index_map: Dict[str, int] = {}
+        self._index_for = None
+
+    @property
+    def path(self) -> str:
+        return self._path or _default_path()
+
+    def _index(self) -> Dict[str, int]:
+        cols = self._load()
+        if self._index_for is not cols:
+            self._index_map = {code: i for i, code in enumerate(cols["code"].tolist())}
+            self._index_for = cols
+        return self._index_map
+
+    def row(self, symbol: str) -> Optional[dict]:
+        """심볼 1개의 통계 열 (NaN 은 None). 테이블이 없거나 종목이 없으면 None"""
+        try:
+            i = self._index().get(symbol.upper().split(".")[0])
+        except RuntimeError:
+            return None
+        if i is None:
+            return None
+        cols = self._cols
+        return {name: (None if np.isnan(cols[name][i]) else float(cols[name][i])) for name in NUMERIC_COLUMNS}
+
+    def detail(self, symbol: str) -> Optional[dict]:
+        """상세 페이지용: calculate_performance / calculate_risk_stats 와 같은 형식"""
+        row = self.row(symbol)
+        if row is None:
+            return None
+        performance = {label: _pct(row[column]) for column, label, _ in PERIODS if row[column] is not None}
+        risk_stats = {
+            "volatility": f"{row['volatility']:.2f}%" if row["volatility"] is not None else "N/A",
+            "mdd": f"{row['mdd']:.2f}%" if row["mdd"] is not None else "N/A",
+            "sharpe": f"{row['sharpe']:.2f}" if row["sharpe"] is not None else "N/A",
+            "avg_volume_30d": f"{int(row['avg_volume_30d']):,}" if row["avg_volume_30d"] is not None else "N/A",
+            "position_pct": round(row["position_pct"], 1) if row["position_pct"] is not None else None,
+            "high52": round(row["high52"], 2) if row["high52"] is not None else None,
+            "low52": round(row["low52"], 2) if row["low52"] is not None else None,
+        }
+        return {"performance": performance, "risk_stats": risk_stats}
+
+    def sort_items(self, items: List[dict], sort: str) -> List[dict]:
+        """
+        랭킹 항목(symbol 키)에 통계 열을 붙여(stats_*) 정렬한 새 목록 반환 (원본/캐시 항목은 수정하지 않음).
+        sort 는 통계 열 이름, 앞에 '-' 면 작은 값 우선
+        """
+        column = sort.lstrip("-")
+        if column not in NUMERIC_COLUMNS:
+            raise ValueError(f"unknown ETF stat: {column}")
+        try:
+            index, cols = self._index(), self._cols
+        except RuntimeError:
+            return list(items)
+        rows = []
+        for item in items:
+            i = index.get(str(item.get("symbol", "")).upper())
+            extra = {} if i is None else {
+                f"stats_{name}": (None if np.isnan(cols[name][i]) else round(float(cols[name][i]), 4))
+                for name in NUMERIC_COLUMNS}
+            rows.append({**item, **extra})
+        values = np.array([np.nan if r.get(f"stats_{column}") is None else r[f"stats_{column}"] for r in rows])
+        keys = values if sort.startswith("-") else -values
+        order = np.argsort(np.where(np.isnan(keys), np.inf, keys), kind="stable")  # NaN 맨 뒤, 동률은 기존 순서
+        return [rows[i] for i in order]
+
+
+# 전역 인스턴스
+etf_stats_table = EtfStatsTable()
+
+
+def _main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ETF 리스크/성과 통계 테이블")
+    parser.add_argument("--build", action="store_true", help="테이블 생성")
+    parser.add_argument("--limit", type=int, help="KR ETF 수 제한 (점검용)")
+    parser.add_argument("--path", help="npz 경로")
+    parser.add_argument("--market", choices=["KR", "US"], help="조회 시장")
+    parser.add_argument("--sort", default="sharpe", help="정렬 열 (예: --sort=-volatility)")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.build:
+        print(json.dumps(build_table(args.path, limit=args.limit), ensure_ascii=False, indent=2))
+    table = EtfStatsTable(args.path)
+    where = f"market == '{args.market}'" if args.market else None
+    column = args.sort.lstrip("-")
+    start = time.perf_counter()
+    rows = table.screen(where=where, sort=args.sort, limit=args.top,
+                        columns=["code", "name", "market", column, "volatility", "mdd", "sharpe", "return_1y"])
+    print(f"[EtfStats] {len(rows)} rows in {(time.perf_counter() - start) * 1000:.2f} ms ({table.meta.get('built_at')})")
+    for row in rows:
+        print(row)
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,425 @@
+"""
+📊 전 종목 펀더멘털 스냅샷 + 벡터화 스크리너
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+매일 장 마감 후 KRX 상장 전 종목(KOSPI+KOSDAQ)의 지표를 한 번에 수집해 열(column) 단위 NumPy 배열로 저장하고,
+스크리닝은 요청마다 외부 호출 없이 배열 마스크 연산으로 처리합니다. (전 종목 기준 수 ms)
+
+    python fundamentals_snapshot.py --build                     # 스냅샷 생성 (수천 건 호출, 수 분~수십 분)
+    python fundamentals_snapshot.py --where "per < 10 and pbr < 1 and dividend_yield >= 3" --sort=-per
+    python fundamentals_snapshot.py --where "f_score >= 7" --sort momentum_60d --sort=-volatility_60d
+
+    from fundamentals_snapshot import fundamentals_snapshot
+    fundamentals_snapshot.screen(where="market == 'KOSPI' and roe > 10", sort=["f_score", "-per"], limit=30)
+
+📌 열: code, name, market, price, change_pct, market_cap(억원), per, pbr, roe, dividend_yield, f_score,
+       momentum_20d / momentum_60d (%), volatility_60d (연환산 %), revenue / operating_income / net_income /
+       total_assets / total_liabilities / total_equity (원, DART)
+📌 출처: 시가총액 목록(sise_market_sum) → 종목별 integration(PBR/배당수익률) + trend(최근 종가) + DART 주요계정
+📌 f_score: pro_analysis.get_financial_health 의 DART 경로와 같은 9개 항목·기준을 전 종목 배열로 한 번에 계산
+📌 where: 열 이름/숫자/문자열, 비교(< <= > >= == !=, 연쇄 비교 가능), and/or/not, + - * /, abs() 만 허용
+   sort: 식 목록 (앞쪽이 우선, 값이 큰 순서). 낮은 값 우선이면 "-per" 처럼 부호를 바꿔서 지정
+   값이 없는 종목(NaN)은 비교식에서 제외되고 정렬에서는 맨 뒤
+⚠️ 저장 위치: FUNDAMENTALS_SNAPSHOT_PATH > DB 파일과 같은 폴더의 fundamentals_snapshot.npz
+   다른 워커가 새로 만든 파일은 mtime 변경으로 감지해 다음 조회 때 다시 읽음
+"""
+
+import ast
+import json
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import requests
+
+from upstream_hosts import NAVER_FINANCE_URL, NAVER_MOBILE_STOCK_URL
+
+HEADER = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"}
+
+MARKETS = {"KOSPI": 0, "KOSDAQ": 1}
+MAX_LISTING_PAGES = 60
+TREND_DAYS = 61
+BUILD_WORKERS = int(os.getenv("FUNDAMENTALS_WORKERS", "8"))
+
+TEXT_COLUMNS = ("code", "name", "market")
+NUMERIC_COLUMNS = (
+    "price", "change_pct", "market_cap", "per", "pbr", "roe", "dividend_yield", "f_score",
+    "momentum_20d", "momentum_60d", "volatility_60d",
+    "revenue", "operating_income", "net_income", "total_assets", "total_liabilities", "total_equity",
+)
+
+# integration totalInfos 의 code / key(표시명) → 스냅샷 열
+INTEGRATION_FIELDS = {
+    "per": ("per", "PER"),
+    "pbr": ("pbr", "PBR"),
+    "dividend_yield": ("dividendYieldRatio", "배당수익률"),
+}
+
+
+def _default_path() -> str:
+    explicit = os.getenv("FUNDAMENTALS_SNAPSHOT_PATH")
+    if explicit:
+        return explicit
+    from db_manager import DB_FILE
+    return os.path.join(os.path.dirname(os.path.abspath(DB_FILE)), "fundamentals_snapshot.npz")
+
+
+def _num(value) -> float:
+    """'1,234', '12.3배', '2.1%', '+0.5', 'N/A' → float (실패 시 NaN)"""
+    if value is None:
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = re.sub(r"[^0-9.\-]", "", str(value).replace(",", ""))
+    try:
+        return float(cleaned) if cleaned not in ("", "-", ".", "-.") else math.nan
+    except ValueError:
+        return math.nan
+
+
+# ─── 수집 ────────────────────────────────────────────────────────────────────
+def fetch_listing() -> List[dict]:
+    """시가총액 목록 전 페이지 → 상장 종목 기본 지표 (현재가/등락률/시가총액/PER/ROE)"""
+    from html_parse import decode_html, parse_html  # 조회(screen) 경로는 bs4 없이 import 되도록 수집 시에만 로드
+
+    listing, seen = [], set()
+    for market, sosok in MARKETS.items():
+        for page in range(1, MAX_LISTING_PAGES + 1):
+            url = f"{NAVER_FINANCE_URL}/sise/sise_market_sum.naver?sosok={sosok}&page={page}"
+            try:
+                res = requests.get(url, headers=HEADER, timeout=10)
+                soup = parse_html(decode_html(res.content, res.headers.get("Content-Type"), url), "table", class_="type_2")
+            except Exception as e:
+                print(f"[Fundamentals] listing {market} p{page} failed: {e}")
+                break
+            headers = [th.get_text(strip=True) for th in soup.select("table.type_2 thead th")]
+            col = {name: i for i, name in enumerate(headers)}
+            added = 0
+            for row in soup.select("table.type_2 tbody tr"):
+                a_tag = row.select_one("a.tltle")
+                m = re.search(r"code=(\d{6})", a_tag["href"]) if a_tag else None
+                if not m or m.group(1) in seen:
+                    continue
+                tds = row.select("td")
+                cell = lambda name: tds[col[name]].get_text(strip=True) if name in col and col[name] < len(tds) else None
+                seen.add(m.group(1))
+                added += 1
+                listing.append({
+                    "code": m.group(1), "name": a_tag.get_text(strip=True), "market": market,
+                    "price": _num(cell("현재가")), "change_pct": _num(cell("등락률")),
+                    "market_cap": _num(cell("시가총액")), "per": _num(cell("PER")), "roe": _num(cell("ROE")),
+                })
+            if not added:  # 마지막 페이지를 넘기면 같은 목록/빈 표가 옴
+                break
+    return listing
+
+
+def fetch_integration(code: str) -> dict:
+    """PBR / 배당수익률 / (목록에 없을 때) PER"""
+    url = f"{NAVER_MOBILE_STOCK_URL}/api/stock/{code}/integration"
+    res = requests.get(url, headers=HEADER, timeout=5)
+    if res.status_code != 200:
+        return {}
+    infos = res.json().get("totalInfos") or []
+    by_code = {i.get("code"): i.get("value") for i in infos}
+    by_key = {i.get("key"): i.get("value") for i in infos}
+    return {column: _num(by_code.get(c, by_key.get(k))) for column, (c, k) in INTEGRATION_FIELDS.items()}
+
+
+def fetch_closes(code: str, days: int = TREND_DAYS) -> List[float]:
+    """최근 일별 종가 (과거 → 최신)"""
+    url = f"{NAVER_MOBILE_STOCK_URL}/api/stock/{code}/trend?pageSize={days}"
+    res = requests.get(url, headers=HEADER, timeout=5)
+    if res.status_code != 200:
+        return []
+    rows = sorted(res.json() or [], key=lambda r: r.get("bizdate", ""))
+    closes = [_num(r.get("closePrice")) for r in rows]
+    return [c for c in closes if c == c and c > 0]
+
+
+def fetch_accounts(code: str, dart=None) -> dict:
+    """DART 주요계정 (직전 사업연도 → 없으면 그 전 해)"""
+    if dart is None or not dart.is_available():
+        return {}
+    corp_code = dart._load_corp_code(code)
+    if not corp_code:
+        return {}
+    year = datetime.now().year
+    for bsns_year in (str(year - 1), str(year - 2)):
+        items = dart.get_financial_sheets(corp_code, bsns_year)
+        if items:
+            return {k: float(v) for k, v in dart._extract_metrics_from_items(items).items()}
+    return {}
+
+
+def _price_stats(closes: List[float]) -> dict:
+    if len(closes) < 2:
+        return {}
+    arr = np.asarray(closes, dtype=float)
+    returns = np.diff(np.log(arr))
+    stats = {"volatility_60d": float(returns[-60:].std(ddof=1) * math.sqrt(252) * 100) if len(returns) > 2 else math.nan}
+    for days in (20, 60):
+        if len(arr) > days:
+            stats[f"momentum_{days}d"] = float((arr[-1] / arr[-1 - days] - 1) * 100)
+    return stats
+
+
+def compute_f_score(cols: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    pro_analysis.get_financial_health (DART 경로)와 같은 9개 항목을 전 종목 배열로 계산
+    (영업현금흐름=순이익 프록시, 유동비율 항목은 추정치로 항상 +1 — 원본과 동일). 재무 데이터가 없으면 NaN
+    """
+    ni, oi, rev = cols["net_income"], cols["operating_income"], cols["revenue"]
+    assets, liabilities, equity = cols["total_assets"], cols["total_liabilities"], cols["total_equity"]
+    with np.errstate(all="ignore"):
+        roa = np.where(assets > 0, ni / assets * 100, 0.0)
+        debt_ratio = np.where(equity > 0, liabilities / equity * 100, np.inf)
+        margin = np.where(rev > 0, oi / rev * 100, 0.0)
+        turnover = np.where(assets > 0, rev / assets, 0.0)
+        roe = np.where(equity > 0, ni / equity * 100, 0.0)
+        checks = [ni > 0, ni > 0, roa > 0, oi > ni, debt_ratio < 100, np.ones_like(ni, dtype=bool),
+                  margin > 8, turnover > 0.4, roe > 8]
+    score = np.sum(checks, axis=0).astype(float)
+    return np.where(np.isnan(ni) | np.isnan(assets), np.nan, score)
+
+
+def build_snapshot(path: Optional[str] = None, workers: int = BUILD_WORKERS, limit: Optional[int] = None) -> dict:
+    """전 종목 수집 → 열 배열 → npz 원자적 교체. 반환: 메타 정보"""
+    started = time.time()
+    listing = fetch_listing()
+    if limit:
+        listing = listing[:limit]
+    if not listing:
+        raise RuntimeError("empty listing (sise_market_sum)")
+
+    try:
+        from dart_api_client import DartApiClient
+        dart = DartApiClient()
+    except ImportError:
+        dart = None
+
+    def enrich(item):
+        row = dict(item)
+        for fetch in (fetch_integration, lambda c: _price_stats(fetch_closes(c)), lambda c: fetch_accounts(c, dart)):
+            try:
+                for key, value in fetch(item["code"]).items():
+                    # 값이 있는 것만 반영 (목록에서 얻은 PER/ROE를 NaN으로 덮어쓰지 않음)
+                    if value == value or key not in row:
+                        row[key] = value
+            except Exception as e:
+                print(f"[Fundamentals] {item['code']} enrich failed: {e}")
+        return row
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rows = list(executor.map(enrich, listing))
+
+    cols: Dict[str, np.ndarray] = {name: np.array([r[name] for r in rows], dtype=str) for name in TEXT_COLUMNS}
+    for name in NUMERIC_COLUMNS:
+        cols[name] = np.array([r.get(name, math.nan) for r in rows], dtype=float)
+    missing_roe = np.isnan(cols["roe"]) & (cols["total_equity"] > 0)
+    with np.errstate(all="ignore"):
+        cols["roe"] = np.where(missing_roe, cols["net_income"] / cols["total_equity"] * 100, cols["roe"])
+    cols["f_score"] = compute_f_score(cols)
+
+    meta = {"built_at": datetime.now().isoformat(timespec="seconds"), "rows": len(rows),
+            "build_seconds": round(time.time() - started, 1),
+            "coverage": {name: int(np.count_nonzero(~np.isnan(cols[name]))) for name in NUMERIC_COLUMNS}}
+    path = path or _default_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp.npz"
+    np.savez_compressed(tmp, __meta__=np.array(json.dumps(meta, ensure_ascii=False)), **cols)
+    os.replace(tmp, path)
+    print(f"[Fundamentals] snapshot saved: {meta['rows']} rows in {meta['build_seconds']}s -> {path}")
+    return meta
+
+
+# ─── 식 평가 (열 배열 단위) ──────────────────────────────────────────────────
+_BIN_OPS = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide}
+_CMP_OPS = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal,
+            ast.Eq: np.equal, ast.NotEq: np.not_equal}
+
+
+def _evaluate(node, cols: Dict[str, np.ndarray]):
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, cols)
+    if isinstance(node, ast.BoolOp):
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        values = [_evaluate(v, cols) for v in node.values]
+        result = values[0]
+        for value in values[1:]:
+            result = combine(result, value)
+        return result
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand, cols)
+        if isinstance(node.op, ast.Not):
+            return np.logical_not(operand)
+        if isinstance(node.op, ast.USub):
+            return np.negative(operand)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        return _BIN_OPS[type(node.op)](_evaluate(node.left, cols), _evaluate(node.right, cols))
+    if isinstance(node, ast.Compare):
+        left, result = _evaluate(node.left, cols), None
+        for op, comparator in zip(node.ops, node.comparators):
+            if type(op) not in _CMP_OPS:
+                raise ValueError(f"unsupported comparison: {type(op).__name__}")
+            right = _evaluate(comparator, cols)
+            step = _CMP_OPS[type(op)](left, right)
+            result = step if result is None else np.logical_and(result, step)
+            left = right
+        return result
+    if isinstance(node, ast.Name):
+        if node.id not in cols:
+            raise ValueError(f"unknown column: {node.id}")
+        return cols[node.id]
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str, bool)):
+        return node.value
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "abs" and len(node.args) == 1:
+        return np.abs(_evaluate(node.args[0], cols))
+    raise ValueError(f"unsupported expression: {ast.dump(node)[:80]}")
+
+
+def evaluate(expr: str, cols: Dict[str, np.ndarray]):
+    """열 이름을 변수로 하는 식을 배열 단위로 평가 (허용 문법 밖이면 ValueError)"""
+    try:
+        tree = ast.parse(expr.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"invalid expression: {expr!r} ({e.msg})")
+    try:
+        with np.errstate(all="ignore"):
+            return _evaluate(tree, cols)
+    except (TypeError, ArithmeticError) as e:
+        # 문법은 맞지만 타입이 맞지 않는 식 (예: name > 5 → numpy UFuncTypeError)
+        raise ValueError(f"type mismatch in expression {expr!r}: "
+                         f"text columns ({', '.join(TEXT_COLUMNS)}) only support == / != with quoted strings "
+                         f"({type(e).__name__})")
+
+
+# ─── 스냅샷 조회 ─────────────────────────────────────────────────────────────
+class FundamentalsSnapshot:
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._cols: Optional[Dict[str, np.ndarray]] = None
+        self._meta: dict = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path or _default_path()
+
+    def _load(self) -> Dict[str, np.ndarray]:
+        """파일이 바뀌었을 때만 다시 읽음 (os.stat 1회)"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            raise RuntimeError(f"snapshot not built yet: {self.path}")
+        if self._cols is None or mtime != self._mtime:
+            with self._lock:
+                if self._cols is None or mtime != self._mtime:
+                    with np.load(self.path, allow_pickle=False) as data:
+                        cols = {name: data[name] for name in data.files if name != "__meta__"}
+                        self._meta = json.loads(str(data["__meta__"]))
+                    self._cols, self._mtime = cols, mtime
+        return self._cols
+
+    @property
+    def meta(self) -> dict:
+        self._load()
+        return dict(self._meta)
+
+    def mask(self, where: Optional[str] = None, filters: Optional[Dict] = None) -> np.ndarray:
+        """
+        where 식과 scan_with_filters 형식 filters ({"f_score": 6, "per": {"max": 10}})를 함께 적용.
+        filters 의 숫자 값은 최소값, dict 는 min/max 범위
+        """
+        cols = self._load()
+        selected = np.ones(len(cols["code"]), dtype=bool)
+        if where:
+            result = evaluate(where, cols)
+            if np.ndim(result) == 0:
+                result = np.full(len(selected), bool(result))
+            selected &= np.asarray(result, dtype=bool)
+        for name, bound in (filters or {}).items():
+            if name not in cols:
+                raise ValueError(f"unknown column: {name}")
+            values = cols[name]
+            try:
+                if isinstance(bound, dict):
+                    if "min" in bound:
+                        selected &= values >= bound["min"]
+                    if "max" in bound:
+                        selected &= values <= bound["max"]
+                else:
+                    selected &= values >= bound
+            except TypeError:
+                raise ValueError(f"filter {name!r} needs a numeric bound on a numeric column, got {bound!r}")
+        return selected
+
+    def screen(self, where: Optional[str] = None, sort: Union[str, Sequence[str], None] = None,
+               filters: Optional[Dict] = None, limit: Optional[int] = 50,
+               columns: Optional[Sequence[str]] = None) -> List[dict]:
+        """조건 충족 종목을 sort 식 순서(큰 값 우선)로 반환. NaN 은 None"""
+        cols = self._load()
+        idx = np.flatnonzero(self.mask(where, filters))
+        sort_exprs = [sort] if isinstance(sort, str) else list(sort or [])
+        if sort_exprs and len(idx):
+            keys = []
+            for expr in sort_exprs:
+                values = np.broadcast_to(np.asarray(evaluate(expr, cols), dtype=float), cols["code"].shape)[idx]
+                keys.append(np.where(np.isnan(values), np.inf, -values))  # 내림차순, NaN 맨 뒤
+            idx = idx[np.lexsort(keys[::-1])]
+        if limit:
+            idx = idx[:limit]
+        names = list(columns or cols.keys())
+        rows = []
+        for i in idx:
+            row = {}
+            for name in names:
+                value = cols[name][i]
+                if value.dtype.kind == "f":
+                    row[name] = None if np.isnan(value) else round(float(value), 4)
+                else:
+                    row[name] = str(value)
+            rows.append(row)
+        return rows
+
+    def count(self, where: Optional[str] = None, filters: Optional[Dict] = None) -> int:
+        return int(np.count_nonzero(self.mask(where, filters)))
+
+
+# 전역 인스턴스
+fundamentals_snapshot = FundamentalsSnapshot()
+
+
+def _main():
+    import argparse
+    parser = argparse.ArgumentParser(description="KRX fundamentals snapshot builder / screener")
+    parser.add_argument("--build", action="store_true", help="스냅샷 생성")
+    parser.add_argument("--limit", type=int, help="build 시 종목 수 제한 (점검용)")
+    parser.add_argument("--path", help="스냅샷 파일 경로")
+    parser.add_argument("--where")
+    parser.add_argument("--sort", action="append", default=[])
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    snapshot = FundamentalsSnapshot(args.path)
+    if args.build:
+        print(json.dumps(build_snapshot(args.path, limit=args.limit), ensure_ascii=False, indent=2))
+    start = time.perf_counter()
+    rows = snapshot.screen(where=args.where, sort=args.sort, limit=args.top)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"[Fundamentals] {snapshot.count(args.where)} matches / {snapshot.meta['rows']} ({elapsed:.2f} ms)")
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,237 @@
+"""
+🗺️ 업종/테마 히트맵 서비스 (구성 종목 목록 ↔ 실시간 등락률 분리)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+기존 get_sector_heatmap_data / get_theme_heatmap_data 는 요청마다 그룹 목록 + 상세 페이지 최대 30개를
+새 세션으로 긁어 왔습니다. 여기서는 거의 바뀌지 않는 "그룹 → 구성 종목" 목록은 몇 시간에 한 번만 수집하고,
+등락률은 전체 구성 종목을 네이버 Polling 배치 API(100종목/요청)로 한 번에 갱신한 뒤
+히트맵 응답은 메모리에서 조립합니다.
+
+    from heatmap_service import heatmap_service
+    data = await heatmap_service.get_heatmap("sector")      # 또는 "theme"
+
+    python heatmap_service.py --kind theme --top 10          # 수동 점검
+
+📌 그룹 등락률: 구성 종목 등락률의 단순 평균 (네이버 테마/업종 목록의 '전일대비'와 같은 방식)
+📌 구성 종목 목록: 시작 직후 + HEATMAP_CONSTITUENTS_TTL(기본 6시간)마다 재수집 (heavy 작업, 워커마다 실행)
+📌 등락률: HEATMAP_QUOTES_TTL(기본 30초)보다 오래되면 갱신. 최근 10분간 조회가 없으면 스케줄러는 건너뛰고
+   다음 조회 때 한 번 갱신 (장 마감 후/야간 불필요한 호출 방지)
+⚠️ 구성 종목 목록이 아직 없으면 (기동 직후) 기존 korea_data 크롤링 경로로 응답
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from upstream_hosts import NAVER_FINANCE_URL
+
+HEADER = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
+
+# kind → 그룹 목록 경로 (상세 페이지 링크는 목록의 href 를 그대로 사용)
+KINDS = {
+    "sector": "/sise/sise_group.naver?type=upjong",
+    "theme": "/sise/theme.naver",
+}
+MAX_LIST_PAGES = 10
+DETAIL_WORKERS = int(os.getenv("HEATMAP_WORKERS", "5"))
+CONSTITUENTS_TTL = int(os.getenv("HEATMAP_CONSTITUENTS_TTL", str(6 * 3600)))
+QUOTES_TTL = int(os.getenv("HEATMAP_QUOTES_TTL", "30"))
+IDLE_SKIP_SECONDS = 600
+TOP_GROUPS = 30
+STOCKS_PER_GROUP = 3
+
+
+# ─── 구성 종목 수집 ──────────────────────────────────────────────────────────
+def fetch_groups(kind: str) -> List[dict]:
+    """그룹 목록 페이지(들) → [{name, url}] (테마는 여러 페이지)"""
+    from html_parse import decode_html, parse_html
+
+    path = KINDS[kind]
+    groups, seen = [], set()
+    pages = MAX_LIST_PAGES if kind == "theme" else 1
+    for page in range(1, pages + 1):
+        url = f"{NAVER_FINANCE_URL}{path}" + (f"?page={page}" if kind == "theme" else "")
+        try:
+            res = requests.get(url, headers=HEADER, timeout=5)
+            soup = parse_html(decode_html(res.content, res.headers.get("Content-Type"), url), "table", class_="type_1")
+        except Exception as e:
+            print(f"[Heatmap] {kind} list p{page} failed: {e}")
+            break
+        added = 0
+        for link in soup.select("table.type_1 td a"):
+            href = link.get("href") or ""
+            m = re.search(r"no=(\d+)", href)
+            name = link.get_text(strip=True)
+            if "sise_group_detail" not in href or not m or not name or m.group(1) in seen:
+                continue
+            seen.add(m.group(1))
+            added += 1
+            groups.append({"name": name, "url": NAVER_FINANCE_URL + href})
+        if not added:  # 마지막 페이지를 넘기면 빈 표/같은 목록이 옴
+            break
+    return groups
+
+
+def fetch_members(url: str) -> List[dict]:
+    """그룹 상세 페이지 → 구성 종목 [{code, name}]"""
+    from html_parse import decode_html, parse_html
+
+    res = requests.get(url, headers=HEADER, timeout=5)
+    soup = parse_html(decode_html(res.content, res.headers.get("Content-Type"), url), "table", class_="type_5")
+    members, seen = [], set()
+    for link in soup.select("table.type_5 td a"):
+        m = re.search(r"code=(\d{6})", link.get("href") or "")
+        if m and m.group(1) not in seen:
+            seen.add(m.group(1))
+            members.append({"code": m.group(1), "name": link.get_text(strip=True)})
+    return members
+
+
+def fetch_constituents(kind: str, workers: int = DETAIL_WORKERS) -> List[dict]:
+    """그룹 목록 + 상세 페이지를 스레드 풀로 수집 → [{name, url, members}]"""
+    groups = fetch_groups(kind)
+
+    def enrich(group):
+        try:
+            return {**group, "members": fetch_members(group["url"])}
+        except Exception as e:
+            print(f"[Heatmap] {kind} detail '{group['name']}' failed: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(enrich, groups))
+    return [g for g in results if g and g["members"]]
+
+
+# ─── 서비스 ──────────────────────────────────────────────────────────────────
+class HeatmapService:
+    def __init__(self):
+        self._groups: Dict[str, List[dict]] = {}
+        self._groups_at: Dict[str, float] = {}
+        self._quotes: Dict[str, float] = {}
+        self._quotes_at = 0.0
+        self._last_access = 0.0
+        self._refresh_lock = threading.Lock()
+
+    # ── 갱신 ──
+    def refresh_constituents(self, kinds=tuple(KINDS)) -> Dict[str, int]:
+        """구성 종목 목록 재수집. 실패해 비어 있으면 기존 목록 유지"""
+        counts = {}
+        for kind in kinds:
+            start = time.time()
+            groups = fetch_constituents(kind)
+            if groups:
+                self._groups[kind] = groups
+                self._groups_at[kind] = time.time()
+            counts[kind] = len(self._groups.get(kind, []))
+            print(f"[Heatmap] {kind} constituents: {counts[kind]} groups in {time.time() - start:.1f}s")
+        return counts
+
+    def refresh_quotes(self, force: bool = False) -> int:
+        """전체 구성 종목 등락률을 Polling 배치 API로 한 번에 갱신 (동시 호출은 하나로 합침)"""
+        with self._refresh_lock:
+            if not force and time.time() - self._quotes_at < QUOTES_TTL:
+                return len(self._quotes)
+            codes = sorted({m["code"] for groups in self._groups.values() for g in groups for m in g["members"]})
+            if not codes:
+                return 0
+            from stock_data import fetch_batch_realtime_prices
+            batch = fetch_batch_realtime_prices(codes)
+            if batch:
+                # dict 통째로 교체 → 조립 중인 요청은 이전 스냅샷을 그대로 읽음
+                self._quotes = {code: q["change_percent"] for code, q in batch.items()}
+                self._quotes_at = time.time()
+            return len(self._quotes)
+
+    def constituents_stale(self) -> bool:
+        return any(time.time() - self._groups_at.get(kind, 0) > CONSTITUENTS_TTL for kind in KINDS)
+
+    # ── 조립 ──
+    def build(self, kind: str, top: int = TOP_GROUPS, per_group: int = STOCKS_PER_GROUP) -> List[dict]:
+        """메모리의 구성 종목 + 등락률 → 기존 히트맵 응답과 같은 형태"""
+        quotes = self._quotes
+        label = "name" if kind == "sector" else "theme"
+        result = []
+        for group in self._groups.get(kind, []):
+            stocks = [{"name": m["name"], "change": round(quotes[m["code"]], 2)}
+                      for m in group["members"] if m["code"] in quotes]
+            if not stocks:
+                continue
+            change = round(sum(s["change"] for s in stocks) / len(stocks), 2)
+            stocks.sort(key=lambda s: s["change"], reverse=True)
+            result.append({
+                label: group["name"],
+                "percent": f"{change:+.2f}%",
+                "change": change,
+                "stocks": stocks[:per_group],
+            })
+        result.sort(key=lambda x: x["change"], reverse=True)
+        return result[:top]
+
+    async def get_heatmap(self, kind: str) -> List[dict]:
+        if kind not in KINDS:
+            raise ValueError(f"unknown heatmap kind: {kind}")
+        self._last_access = time.time()
+        if not self._groups.get(kind):
+            from korea_data import get_sector_heatmap_data, get_theme_heatmap_data
+            legacy = get_sector_heatmap_data if kind == "sector" else get_theme_heatmap_data
+            return await legacy()
+        if time.time() - self._quotes_at >= QUOTES_TTL:
+            await asyncio.to_thread(self.refresh_quotes)
+        return self.build(kind)
+
+    # ── 스케줄러 작업 ──
+    def constituents_job(self):
+        """[Heatmap] 업종/테마 구성 종목 목록 재수집"""
+        if self.constituents_stale():
+            self.refresh_constituents()
+
+    def quotes_job(self):
+        """[Heatmap] 구성 종목 등락률 배치 갱신 (최근 조회가 있을 때만)"""
+        if time.time() - self._last_access > IDLE_SKIP_SECONDS:
+            return
+        self.refresh_quotes()
+
+    def status(self) -> dict:
+        now = time.time()
+        return {
+            "groups": {kind: len(self._groups.get(kind, [])) for kind in KINDS},
+            "constituents_age": {kind: round(now - at) for kind, at in self._groups_at.items()},
+            "quotes": len(self._quotes),
+            "quotes_age": round(now - self._quotes_at) if self._quotes_at else None,
+        }
+
+
+# 전역 인스턴스
+heatmap_service = HeatmapService()
+
+
+def _main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="업종/테마 히트맵 수동 점검")
+    parser.add_argument("--kind", choices=list(KINDS), default="sector")
+    parser.add_argument("--top", type=int, default=TOP_GROUPS)
+    args = parser.parse_args()
+
+    heatmap_service.refresh_constituents(kinds=(args.kind,))
+    start = time.perf_counter()
+    heatmap_service.refresh_quotes(force=True)
+    print(f"[Heatmap] quotes: {len(heatmap_service._quotes)} codes in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    rows = heatmap_service.build(args.kind, top=args.top)
+    print(f"[Heatmap] build: {(time.perf_counter() - start) * 1000:.2f} ms")
+    for row in rows:
+        name = row.get("name") or row.get("theme")
+        stocks = ", ".join(f"{s['name']} {s['change']:+.2f}" for s in row["stocks"])
+        print(f"{row['percent']:>8}  {name}  ({stocks})")
+
+
+if __name__ == "__main__":
+    _main()
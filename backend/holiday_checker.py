@@ -27,6 +27,22 @@ def is_holiday(market_type: str) -> bool:
         
     return False
 
+def is_trading_day(market_type: str, day) -> bool:
+    """
+    지정한 날짜(date)가 해당 시장의 거래일인지 반환 (스케줄러 market-calendar 트리거용).
+    market_type: "kor"/"KR" 또는 "us"/"US". 미국은 호출 측에서 뉴욕 날짜를 넘겨야 합니다.
+    """
+    if day.weekday() >= 5:
+        return False
+    market = market_type.lower()
+    if market in ("kor", "kr"):
+        return day not in holidays.KR(years=day.year)
+    if market == "us":
+        # 연방 공휴일 중 콜럼버스/재향군인의 날은 뉴욕증시 개장 → 가능하면 NYSE 달력 사용
+        calendar = getattr(holidays, "NYSE", None) or holidays.US
+        return day not in calendar(years=day.year)
+    return True
+
 def is_market_open_hours(market_type: str) -> bool:
     """
     현재 시간(KST)이 정규장 및 시간외(프리/애프터마켓 포함 넉넉한 범위) 운영 시간인지 확인합니다.
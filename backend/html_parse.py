@@ -0,0 +1,138 @@
+"""
+⚡ 공용 HTML 파싱 헬퍼 (lxml + SoupStrainer)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+네이버 금융 페이지 전체를 순수 파이썬 파서('html.parser')로 파싱한 뒤
+테이블 하나(table.type_5 등)만 골라 쓰던 스크래퍼용.
+
+📌 parse_html(markup, "table", class_="type_5")
+  - C 기반 lxml 파서 사용 (미설치 시 html.parser로 자동 대체)
+  - 대상 태그(+ 하위 트리)만 트리로 만들어 나머지 DOM 생성 비용 제거
+  - 반환값은 BeautifulSoup 그대로 → 기존 .select()/.select_one() 코드 변경 불필요
+    (단, 대상 밖의 조상 요소를 가리키는 선택자는 사용 불가)
+
+📌 decode_html(content, content_type, url)
+  - HTTP/meta charset 우선 신뢰 (앞부분 표본으로 검증만)
+  - 선언이 없거나 틀리면 앞부분 표본(최대 8KB)만으로 cp949/utf-8 점수 비교
+  - 추정 결과는 host+path 단위로 캐시 → 같은 페이지 유형은 다음부터 디코딩 1회
+
+📌 벤치마크: python bench_html_parse.py (sise_dump.html 등 저장된 페이지로 파싱 시간 비교)
+"""
+
+import re
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+
+def parse_html(markup, name=None, parser: Optional[str] = None, **attrs) -> BeautifulSoup:
+    """
+    markup: str 또는 bytes (bytes면 meta charset 기준으로 파서가 디코딩)
+    name / attrs: SoupStrainer 조건 (예: "table", class_="type_1" / id=["_per", "_pbr"])
+                  생략하면 문서 전체 파싱
+    """
+    parse_only = SoupStrainer(name, **attrs) if (name is not None or attrs) else None
+    return BeautifulSoup(markup, parser or PARSER, parse_only=parse_only)
+
+
+# ─── 인코딩 판별 ─────────────────────────────────────────────────────────────
+SAMPLE_BYTES = 8192
+META_SCAN_BYTES = 4096
+ENCODING_CACHE_MAX = 1024
+
+_CHARSET_ALIASES = {
+    "euc-kr": "cp949", "euc_kr": "cp949", "ks_c_5601-1987": "cp949", "ksc5601": "cp949",
+    "x-windows-949": "cp949", "ms949": "cp949", "utf8": "utf-8",
+}
+_HEADER_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+_HANGUL = re.compile(r"[\uac00-\ud7a3]")
+
+# host+path -> 추정 인코딩 (선언이 없거나 틀린 페이지 유형만 저장)
+_encoding_cache: Dict[str, str] = {}
+
+
+def _normalize_charset(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    name = name.strip().lower()
+    return _CHARSET_ALIASES.get(name, name)
+
+
+def _sample(content: bytes) -> bytes:
+    """첫 비ASCII 바이트 부근부터 최대 SAMPLE_BYTES (앞쪽 스크립트/CSS 구간은 판별에 무의미)"""
+    match = _NON_ASCII.search(content)
+    if match is None:
+        return b""
+    start = max(0, match.start() - 16)
+    return content[start:start + SAMPLE_BYTES]
+
+
+def _score(sample: bytes, encoding: str) -> int:
+    try:
+        decoded = sample.decode(encoding, errors="replace")
+    except LookupError:
+        return -1 << 30
+    # 표본 양끝에서 잘린 멀티바이트 문자 1~2개는 감점하지 않음
+    replacements = max(0, decoded.count("\ufffd") - 2)
+    return len(_HANGUL.findall(decoded)) - replacements * 10
+
+
+def _verified(sample: bytes, encoding: Optional[str]) -> bool:
+    if not encoding:
+        return False
+    try:
+        decoded = sample.decode(encoding, errors="replace")
+    except LookupError:
+        return False
+    return decoded.count("\ufffd") <= 2
+
+
+def detect_encoding(content: bytes, content_type: Optional[str] = None, url: Optional[str] = None) -> str:
+    sample = _sample(content)
+    if not sample:
+        return "utf-8"   # 순수 ASCII
+
+    # [1] HTTP 헤더 charset → [2] meta charset (표본으로 검증되면 그대로 사용)
+    header = _HEADER_CHARSET.search(content_type or "")
+    declared = _normalize_charset(header.group(1)) if header else None
+    if _verified(sample, declared):
+        return declared
+    meta = _META_CHARSET.search(content[:META_SCAN_BYTES])
+    declared_meta = _normalize_charset(meta.group(1).decode("ascii", "ignore")) if meta else None
+    if declared_meta != declared and _verified(sample, declared_meta):
+        return declared_meta
+
+    # [3] 같은 페이지 유형의 이전 추정 결과
+    key = None
+    if url:
+        parts = urlsplit(url)
+        key = f"{parts.hostname}{parts.path}"
+        cached = _encoding_cache.get(key)
+        if cached and _verified(sample, cached):
+            return cached
+
+    # [4] 표본 점수 비교 (한글 수 - 깨짐 x10)
+    encoding = max(("cp949", "utf-8"), key=lambda enc: _score(sample, enc))
+    if _score(sample, encoding) < 0:
+        encoding = "iso-8859-1"
+    if key:
+        if len(_encoding_cache) >= ENCODING_CACHE_MAX:
+            _encoding_cache.clear()
+        _encoding_cache[key] = encoding
+    return encoding
+
+
+def decode_html(content: bytes, content_type: Optional[str] = None, url: Optional[str] = None) -> str:
+    """응답 본문 전체를 한 번만 디코딩"""
+    if not content:
+        return ""
+    return content.decode(detect_encoding(content, content_type, url), errors="replace")
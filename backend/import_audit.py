@@ -0,0 +1,188 @@
+"""
+기동(import) 시간 감사 도구
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+main.py가 포트를 바인딩하기 전에 무엇을 import하는지, 그 비용이 얼마인지 확인합니다.
+
+    python import_audit.py                      # python -X importtime -c "import main" 결과 요약
+    python import_audit.py --budget-ms 1500     # 누적 import 시간이 예산 초과 시 exit 1 (회귀 검사)
+    python import_audit.py --budget-ms          # 예산 = STARTUP_IMPORT_BUDGET_MS (기본 1500)
+    python import_audit.py --static             # 의존성 미설치 환경용: AST로 모듈 최상위 import 그래프만 추적
+                                                # (HEAVY_PACKAGES가 기동 경로에 있으면 exit 1)
+
+📌 출력
+  - 전체 import 시간, 상위 N개 모듈(누적 시간), 최상위 패키지별 합계
+  - HEAVY_PACKAGES 중 기동 시 로드된 것 (지연 import 대상 후보)
+  - --static: 기동 경로에서 최상위 import되는 외부 패키지와 최초 경로 (main → routes.x → y → pandas)
+"""
+
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+# 라우트 최초 사용 시점까지 미뤄야 하는 무거운 패키지/모듈
+HEAVY_PACKAGES = {
+    "pandas", "numpy", "scipy", "yfinance", "FinanceDataReader", "firebase_admin", "google",
+    "plotly", "selenium", "bs4", "lxml", "aiohttp", "pyupbit", "curl_cffi", "dateparser",
+    "korea_data", "stock_data", "ai_analysis", "portfolio_analysis", "rank_data",
+}
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+# ─── 런타임 (-X importtime) ──────────────────────────────────────────────────
+def run_importtime(target: str = "main") -> List[Tuple[str, int, int, int]]:
+    """[(module, self_us, cumulative_us, depth)] (import 순서)"""
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    if proc.returncode != 0:
+        tail = "\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:"))[-2000:]
+        raise RuntimeError(f"import {target} failed:\n{tail}")
+    return rows
+
+
+def summarize(rows, top: int = 25) -> dict:
+    total_us = sum(r[2] for r in rows if r[3] == 0)
+    by_package: Dict[str, int] = {}
+    for name, self_us, _cum, _depth in rows:
+        pkg = name.split(".")[0]
+        by_package[pkg] = by_package.get(pkg, 0) + self_us
+    slowest = sorted(rows, key=lambda r: -r[2])[:top]
+    heavy = sorted(p for p in by_package if p in HEAVY_PACKAGES)
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(rows),
+        "slowest": [(n, round(c / 1000, 1)) for n, _s, c, _d in slowest],
+        "packages": sorted(((p, round(us / 1000, 1)) for p, us in by_package.items()), key=lambda x: -x[1])[:top],
+        "heavy_loaded": heavy,
+    }
+
+
+# ─── 정적 분석 (AST) ─────────────────────────────────────────────────────────
+def _module_path(name: str) -> Optional[str]:
+    parts = name.split(".")
+    for candidate in (os.path.join(BASE_DIR, *parts) + ".py", os.path.join(BASE_DIR, *parts, "__init__.py")):
+        if os.path.exists(candidate):
+            return candidate
+    if os.path.isdir(os.path.join(BASE_DIR, *parts)):
+        return ""   # __init__.py 없는 로컬 패키지 (routes/, utils/)
+    return None
+
+
+def _is_type_checking(test: ast.expr) -> bool:
+    """TYPE_CHECKING / typing.TYPE_CHECKING"""
+    return (isinstance(test, ast.Name) and test.id == "TYPE_CHECKING") or \
+        (isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING")
+
+
+def _top_level_imports(path: str) -> List[str]:
+    """함수/클래스 본문 밖(모듈 로드 시 실행되는) import만 수집. try/if 블록 안도 포함 (TYPE_CHECKING 블록 제외)"""
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = []
+
+    def visit(nodes):
+        for node in nodes:
+            if isinstance(node, ast.Import):
+                names.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                names.append(node.module)
+                # from routes import market → routes.market
+                names.extend(f"{node.module}.{alias.name}" for alias in node.names)
+            elif isinstance(node, ast.If) and "__main__" in ast.dump(node.test):
+                continue   # if __name__ == "__main__": 블록은 기동 경로 아님
+            elif isinstance(node, ast.If) and _is_type_checking(node.test):
+                visit(node.orelse)   # if TYPE_CHECKING: 본문은 타입 검사기 전용 (런타임 import 아님)
+            elif isinstance(node, (ast.If, ast.Try, ast.With)):
+                for field in ("body", "orelse", "finalbody", "handlers"):
+                    for child in getattr(node, field, []) or []:
+                        visit(child.body if isinstance(child, ast.ExceptHandler) else [child])
+    visit(tree.body)
+    return names
+
+
+def static_graph(target: str = "main") -> Dict[str, List[str]]:
+    """외부 패키지(+ 무거운 로컬 모듈) → 최초 도달 경로 (BFS라 가장 짧은 경로)"""
+    external: Dict[str, List[str]] = {}
+    seen = {target}
+    queue = [(target, [target])]
+    while queue:
+        module, chain = queue.pop(0)
+        path = _module_path(module)
+        if not path:
+            continue
+        for name in _top_level_imports(path):
+            if _module_path(name) is not None:
+                if name not in seen:
+                    seen.add(name)
+                    queue.append((name, chain + [name]))
+                    if name in HEAVY_PACKAGES:
+                        external.setdefault(name, chain + [name])
+            elif _module_path(name.split(".")[0]) is None:
+                pkg = name.split(".")[0]
+                if pkg not in sys.stdlib_module_names and pkg not in external:
+                    external[pkg] = chain + [pkg]
+    return external
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Startup import-time audit")
+    parser.add_argument("--target", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--budget-ms", type=float, nargs="?", const=DEFAULT_BUDGET_MS, default=None,
+                        help=f"예산 초과 시 exit 1 (값 생략 시 STARTUP_IMPORT_BUDGET_MS={DEFAULT_BUDGET_MS:.0f})")
+    parser.add_argument("--static", action="store_true", help="AST 기반 최상위 import 그래프 (의존성 불필요)")
+    args = parser.parse_args()
+
+    if args.static:
+        external = static_graph(args.target)
+        heavy = {p: c for p, c in external.items() if p in HEAVY_PACKAGES}
+        print(f"[ImportAudit] {args.target}: 외부 패키지 {len(external)}개 (기동 시 로드)")
+        for pkg, chain in sorted(external.items(), key=lambda x: (x[0] not in HEAVY_PACKAGES, x[0])):
+            mark = "⚠️ " if pkg in HEAVY_PACKAGES else "   "
+            print(f"  {mark}{pkg:<20} {' → '.join(chain)}")
+        # 회귀 검사: 무거운 패키지가 하나라도 기동 경로에 있으면 exit 1
+        sys.exit(1 if heavy else 0)
+
+    try:
+        rows = run_importtime(args.target)
+    except RuntimeError as e:
+        print(f"[ImportAudit] {e}")
+        sys.exit(2)
+    summary = summarize(rows, args.top)
+    print(f"[ImportAudit] import {args.target}: {summary['total_ms']} ms ({summary['modules']} modules)")
+    print("\n  누적 시간 상위 모듈")
+    for name, ms in summary["slowest"]:
+        print(f"    {ms:9.1f} ms  {name}")
+    print("\n  패키지별 자체 시간")
+    for pkg, ms in summary["packages"]:
+        mark = "⚠️" if pkg in HEAVY_PACKAGES else "  "
+        print(f"    {ms:9.1f} ms  {mark} {pkg}")
+    if summary["heavy_loaded"]:
+        print(f"\n  ⚠️ 기동 시 로드된 무거운 패키지: {', '.join(summary['heavy_loaded'])}")
+
+    budget = args.budget_ms
+    if budget is not None:
+        ok = summary["total_ms"] <= budget
+        print(f"\n[ImportAudit] budget {budget:.0f} ms → {'OK' if ok else 'EXCEEDED'}")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,525 @@
+"""
+⏰ 통합 작업 스케줄러 (Job Scheduler)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+기존에는 main.startup_event가 20여 개의 `while True: ... asyncio.sleep()` 루프와
+scheduler_service의 벽시계 폴링 스레드(last_run_* 변수 수십 개)를 따로 띄워
+실행 시각이 밀리고, 같은 분에 무거운 작업이 몰리고, 상태를 확인할 방법이 없었습니다.
+
+📌 구성
+  - 작업 레지스트리: add_job(name, func, trigger, ...) 으로 등록
+  - 트리거
+      cron("30 8 * * mon-fri", tz="Asia/Seoul", calendar="KR")   # 분 시 일 월 요일
+      every(300, start_delay=300)                                 # 고정 간격
+    calendar="KR"/"US" → 해당 시장 휴장일(주말/공휴일)에는 건너뜀 (날짜는 트리거 tz 기준이므로
+                          미국장 작업은 tz="America/New_York"으로 등록)
+  - jitter: 실행 시각에 0~N초 무작위 지연 → 같은 분에 몰리는 작업 분산
+  - overlap="skip" | "queue": 이전 실행이 끝나지 않았을 때 건너뛰거나 1회 대기열에 적재
+  - heavy=True: 무거운 작업은 HEAVY_JOB_SLOTS 개까지만 동시 실행 (나머지는 슬롯 대기)
+  - misfire_grace: 재시작 등으로 놓친 cron 실행을 유예 시간 내라면 기동 직후 1회 보충
+  - leader_only (기본 True): 알림 발송/DB 갱신 작업은 리더 리스를 가진 워커에서만 실행.
+    프로세스 메모리 캐시를 채우는 워머는 leader_only=False 로 모든 워커에서 실행
+    (스케줄러 루프는 모든 워커에서 돌고, set_leader() 로 리더 전용 작업만 켜고 끔)
+  - 실행 이력: SQLite(job_runs)에 시작/종료/소요시간/상태 기록 → /api/system/admin/jobs
+
+✅ 동기 함수는 asyncio.to_thread로 실행되어 이벤트 루프를 막지 않습니다.
+"""
+
+import asyncio
+import heapq
+import inspect
+import random
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from db_manager import get_db_connection
+
+KST = "Asia/Seoul"
+
+# 무거운 작업(AI 생성, 대량 크롤링, 서브프로세스 봇) 동시 실행 한도
+HEAVY_JOB_SLOTS = 2
+# 실행 이력 보관 기간 (일)
+HISTORY_RETENTION_DAYS = 7
+# 스케줄러 루프 최대 대기 (초) - 등록/해제가 늦게 반영되는 것을 방지
+MAX_IDLE_SECONDS = 30
+
+_DOW_NAMES = {"sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6}
+
+
+def _parse_field(expr: str, low: int, high: int, names: Dict[str, int] = None) -> set:
+    """cron 필드 파싱: *, */n, a-b, a-b/n, a,b,c (요일 이름 허용)"""
+    values = set()
+    for part in expr.lower().split(','):
+        step = 1
+        if '/' in part:
+            part, step_str = part.split('/', 1)
+            step = int(step_str)
+        if part in ('*', ''):
+            start, end = low, high
+        elif '-' in part:
+            a, b = part.split('-', 1)
+            start = names.get(a, None) if names and a in names else int(a)
+            end = names.get(b, None) if names and b in names else int(b)
+        else:
+            start = names[part] if names and part in names else int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"cron field out of range: {expr}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronTrigger:
+    """
+    5필드 cron (분 시 일 월 요일). 요일은 0=일요일 (mon-fri 등 이름 사용 가능).
+    tz 기준 벽시계로 계산하므로 미국장 일정도 서머타임 자동 반영.
+    """
+
+    def __init__(self, expr: str, tz: str = KST, calendar: Optional[str] = None):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expr}")
+        self.expr = expr
+        self.tz = ZoneInfo(tz)
+        self.tz_name = tz
+        self.calendar = calendar
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        dows = _parse_field(fields[4].replace('7', '0'), 0, 6, _DOW_NAMES)
+        self.dows = dows
+        self.any_day = fields[2] == '*'
+        self.any_dow = fields[4] == '*'
+
+    def describe(self) -> str:
+        return f"cron({self.expr}, {self.tz_name}" + (f", {self.calendar} trading days)" if self.calendar else ")")
+
+    def _day_matches(self, d) -> bool:
+        if d.month not in self.months:
+            return False
+        cron_dow = (d.weekday() + 1) % 7
+        # 표준 cron: 일/요일 둘 다 지정되면 OR
+        if self.any_day and self.any_dow:
+            ok = True
+        elif self.any_day:
+            ok = cron_dow in self.dows
+        elif self.any_dow:
+            ok = d.day in self.days
+        else:
+            ok = d.day in self.days or cron_dow in self.dows
+        if ok and self.calendar:
+            from holiday_checker import is_trading_day
+            ok = is_trading_day(self.calendar, d)
+        return ok
+
+    def next_after(self, ts: float) -> Optional[float]:
+        """ts 이후 첫 실행 시각 (epoch seconds)"""
+        local = datetime.fromtimestamp(ts, self.tz).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        limit = local + timedelta(days=400)
+        while local < limit:
+            if not self._day_matches(local.date()):
+                local = (local + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if local.hour not in self.hours:
+                local = (local + timedelta(hours=1)).replace(minute=0)
+                continue
+            if local.minute not in self.minutes:
+                local += timedelta(minutes=1)
+                continue
+            aware = local.replace(tzinfo=self.tz)
+            # 서머타임 전환으로 존재하지 않는 시각은 건너뜀
+            if aware.astimezone(ZoneInfo("UTC")).astimezone(self.tz).replace(tzinfo=None) != local:
+                local += timedelta(minutes=1)
+                continue
+            return aware.timestamp()
+        return None
+
+    def prev_before(self, ts: float, within: float) -> Optional[float]:
+        """ts 이전 within초 안에 예정되어 있던 마지막 실행 시각 (misfire 보충용)"""
+        candidate = self.next_after(ts - within - 60)
+        last = None
+        while candidate is not None and candidate <= ts:
+            last = candidate
+            candidate = self.next_after(candidate)
+        return last
+
+
+class IntervalTrigger:
+    def __init__(self, seconds: float, start_delay: float = 0):
+        self.seconds = seconds
+        self.start_delay = start_delay
+
+    def describe(self) -> str:
+        return f"every({int(self.seconds)}s)"
+
+    def next_after(self, ts: float) -> float:
+        return ts + self.seconds
+
+
+def cron(expr: str, tz: str = KST, calendar: Optional[str] = None) -> CronTrigger:
+    return CronTrigger(expr, tz=tz, calendar=calendar)
+
+
+def every(seconds: float, start_delay: float = 0) -> IntervalTrigger:
+    return IntervalTrigger(seconds, start_delay=start_delay)
+
+
+class Job:
+    def __init__(self, name: str, func: Callable, trigger, jitter: float = 0, max_instances: int = 1,
+                 overlap: str = "skip", heavy: bool = False, timeout: Optional[float] = None,
+                 misfire_grace: float = 0, leader_only: bool = True, description: str = ""):
+        if overlap not in ("skip", "queue"):
+            raise ValueError(f"unknown overlap policy: {overlap}")
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.jitter = jitter
+        self.max_instances = max_instances
+        self.overlap = overlap
+        self.heavy = heavy
+        self.timeout = timeout
+        self.misfire_grace = misfire_grace
+        self.leader_only = leader_only
+        self.description = description or (inspect.getdoc(func) or "").split('\n')[0]
+        self.is_async = inspect.iscoroutinefunction(func)
+        self.next_run: Optional[float] = None
+        self.running = 0
+        self.pending = False
+        self.paused = False
+        self.recent = deque(maxlen=20)  # 최근 실행 (status, started_at, duration_ms, error)
+
+
+class NotLeaderError(RuntimeError):
+    """리더 전용 작업을 리더가 아닌 워커에서 실행하려 할 때"""
+
+
+class JobScheduler:
+    """
+    단일 asyncio 태스크가 다음 실행 시각 힙을 보고 작업을 깨웁니다.
+
+    사용 예:
+        job_scheduler.add_job("hourly_briefing", run_hourly_briefing, cron("0 9,12,16 * * *", calendar="KR"))
+        job_scheduler.start()             # 모든 워커
+        job_scheduler.set_leader(True)    # 리더 리스 획득 시 (리더 전용 작업 활성화)
+    """
+
+    def __init__(self, heavy_slots: int = HEAVY_JOB_SLOTS):
+        self.jobs: Dict[str, Job] = {}
+        self.heavy_slots = heavy_slots
+        self._heavy_sem: Optional[asyncio.Semaphore] = None
+        self._heap: List[tuple] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._history_ready = False
+        self.is_leader = False
+
+    # ─── 등록 ────────────────────────────────────────────────────────────────
+    def add_job(self, name: str, func: Callable, trigger, **options) -> Job:
+        """작업 등록 (같은 이름이면 교체)"""
+        job = Job(name, func, trigger, **options)
+        self.jobs[name] = job
+        if self._task is not None:
+            self._schedule(job, time.time(), first=True)
+        return job
+
+    def remove_job(self, name: str):
+        job = self.jobs.pop(name, None)
+        if job is not None:
+            job.next_run = None
+
+    def _schedule(self, job: Job, now: float, first: bool = False):
+        if first and isinstance(job.trigger, IntervalTrigger):
+            base = now + job.trigger.start_delay
+        else:
+            base = job.trigger.next_after(now)
+        if base is None:
+            job.next_run = None
+            return
+        if job.jitter:
+            base += random.uniform(0, job.jitter)
+        job.next_run = base
+        heapq.heappush(self._heap, (base, job.name, id(job)))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ─── 실행 루프 ───────────────────────────────────────────────────────────
+    def start(self):
+        """이벤트 루프 안에서 호출 (중복 호출 무시)"""
+        if self._task is not None and not self._task.done():
+            print("[JobScheduler] Already running. Skipping duplicate start.")
+            return
+        self._loop = asyncio.get_running_loop()
+        self._heavy_sem = asyncio.Semaphore(self.heavy_slots)
+        self._wakeup = asyncio.Event()
+        self._heap = []
+        now = time.time()
+        for job in self.jobs.values():
+            self._schedule(job, now, first=True)
+        self._task = asyncio.create_task(self._run_loop())
+        print(f"[JobScheduler] Started with {len(self.jobs)} jobs (heavy slots: {self.heavy_slots}, leader: {self.is_leader})")
+
+    def set_leader(self, is_leader: bool):
+        """리더 리스 획득/반납 시 호출. 획득 시 리더 전용 간격 작업은 start_delay 부터 다시 예약하고 놓친 cron 보충"""
+        if is_leader == self.is_leader:
+            return
+        self.is_leader = is_leader
+        print(f"[JobScheduler] Leader-only jobs {'enabled' if is_leader else 'disabled'}")
+        if not is_leader or self._task is None:
+            return
+        now = time.time()
+        for job in self.jobs.values():
+            if job.leader_only and isinstance(job.trigger, IntervalTrigger):
+                self._schedule(job, now, first=True)
+        asyncio.create_task(self._recover_misfires(leader_only=True))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def restart(self):
+        """스케줄러 루프 재기동 (워치독 오토힐링용, 작업 스레드에서 호출 가능)"""
+        if self._loop is None:
+            return
+
+        def _restart():
+            if self._task is not None:
+                self._task.cancel()
+                self._task = None
+            self.start()
+
+        self._loop.call_soon_threadsafe(_restart)
+
+    async def _run_loop(self):
+        from system_watchdog import update_heartbeat
+        await asyncio.to_thread(self._ensure_history_table)
+        await self._recover_misfires()
+        while True:
+            try:
+                update_heartbeat("Job_Scheduler")
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    run_at, name, job_id = heapq.heappop(self._heap)
+                    job = self.jobs.get(name)
+                    # 교체/삭제되었거나 다시 예약된 작업의 낡은 항목은 무시
+                    if job is None or id(job) != job_id or job.next_run != run_at:
+                        continue
+                    self._schedule(job, max(now, run_at))
+                    if not job.paused and (self.is_leader or not job.leader_only):
+                        self._fire(job)
+                delay = MAX_IDLE_SECONDS
+                if self._heap:
+                    delay = min(delay, max(0.0, self._heap[0][0] - time.time()))
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[JobScheduler] Loop error: {e}")
+                await asyncio.sleep(5)
+
+    async def _recover_misfires(self, leader_only: bool = False):
+        """재시작(또는 리더 인계) 직전 놓친 cron 실행을 유예 시간 내라면 1회 보충"""
+        now = time.time()
+        for job in list(self.jobs.values()):
+            if not job.misfire_grace or not isinstance(job.trigger, CronTrigger):
+                continue
+            if (leader_only and not job.leader_only) or (job.leader_only and not self.is_leader):
+                continue
+            missed = job.trigger.prev_before(now, job.misfire_grace)
+            if missed is None:
+                continue
+            last_start = await asyncio.to_thread(self._last_started_at, job.name)
+            if last_start is None or last_start < missed:
+                print(f"[JobScheduler] Recovering missed run: {job.name} (scheduled {datetime.fromtimestamp(missed, ZoneInfo(KST)):%H:%M})")
+                self._fire(job)
+
+    def _fire(self, job: Job) -> bool:
+        if job.running >= job.max_instances:
+            if job.overlap == "queue":
+                job.pending = True
+            else:
+                job.recent.append(("skipped", time.time(), 0.0, "previous run still active"))
+                asyncio.create_task(asyncio.to_thread(self._record, job.name, time.time(), time.time(), "skipped", "previous run still active"))
+            return False
+        job.running += 1
+        asyncio.create_task(self._execute(job))
+        return True
+
+    async def _execute(self, job: Job):
+        while True:
+            started = time.time()
+            status, error = "ok", None
+            try:
+                if job.heavy:
+                    async with self._heavy_sem:
+                        started = time.time()  # 슬롯 대기 시간은 소요 시간에서 제외
+                        await self._invoke(job)
+                else:
+                    await self._invoke(job)
+            except asyncio.TimeoutError:
+                status, error = "timeout", f"exceeded {job.timeout}s"
+            except asyncio.CancelledError:
+                status, error = "cancelled", None
+                raise
+            except Exception as e:
+                status, error = "error", f"{type(e).__name__}: {e}"
+                print(f"[JobScheduler] {job.name} failed: {error}")
+                traceback.print_exc()
+            finally:
+                finished = time.time()
+                job.recent.append((status, started, (finished - started) * 1000, error))
+                await asyncio.to_thread(self._record, job.name, started, finished, status, error)
+                if status == "cancelled" or not job.pending:
+                    job.running -= 1
+            if not job.pending:
+                return
+            job.pending = False
+
+    async def _invoke(self, job: Job):
+        if job.is_async:
+            coro = job.func()
+            if job.timeout:
+                await asyncio.wait_for(coro, timeout=job.timeout)
+            else:
+                await coro
+        else:
+            # 스레드 작업은 취소할 수 없으므로 timeout은 비동기 작업에만 적용
+            await asyncio.to_thread(job.func)
+
+    async def run_now(self, name: str) -> bool:
+        """관리자 수동 실행 (겹침 정책은 동일하게 적용). 리더 전용 작업을 비리더 워커에서 부르면 NotLeaderError"""
+        job = self.jobs.get(name)
+        if job is None:
+            return False
+        if job.leader_only and not self.is_leader:
+            raise NotLeaderError(f"{name} runs on the leader worker only")
+        if self._task is None:
+            raise RuntimeError("job scheduler is not running")
+        return self._fire(job)
+
+    # ─── 실행 이력 ───────────────────────────────────────────────────────────
+    def _ensure_history_table(self):
+        if self._history_ready:
+            return
+        try:
+            conn = get_db_connection()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_name TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    finished_at REAL,
+                    duration_ms REAL,
+                    status TEXT,
+                    error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_runs_name_started ON job_runs(job_name, started_at)")
+            conn.commit()
+            conn.close()
+            self._history_ready = True
+        except Exception as e:
+            print(f"[JobScheduler] History table init failed: {e}")
+
+    def _record(self, name: str, started: float, finished: float, status: str, error: Optional[str]):
+        try:
+            self._ensure_history_table()
+            conn = get_db_connection()
+            conn.execute(
+                "INSERT INTO job_runs (job_name, started_at, finished_at, duration_ms, status, error) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, started, finished, round((finished - started) * 1000, 1), status, (error or "")[:500] or None)
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"[JobScheduler] Failed to record run for {name}: {e}")
+
+    def _last_started_at(self, name: str) -> Optional[float]:
+        try:
+            conn = get_db_connection()
+            row = conn.execute(
+                "SELECT MAX(started_at) FROM job_runs WHERE job_name = ? AND status IN ('ok', 'error', 'timeout')",
+                (name,)
+            ).fetchone()
+            conn.close()
+            return row[0] if row else None
+        except Exception:
+            return None
+
+    def cleanup_history(self) -> int:
+        """보관 기간이 지난 실행 이력 삭제"""
+        self._ensure_history_table()
+        conn = get_db_connection()
+        cur = conn.execute("DELETE FROM job_runs WHERE started_at < ?", (time.time() - HISTORY_RETENTION_DAYS * 86400,))
+        deleted = cur.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    # ─── 조회 ────────────────────────────────────────────────────────────────
+    def _history_stats(self) -> Dict[str, dict]:
+        try:
+            self._ensure_history_table()
+            conn = get_db_connection()
+            rows = conn.execute("""
+                SELECT job_name, COUNT(*), AVG(duration_ms), MAX(duration_ms),
+                       SUM(CASE WHEN status != 'ok' AND status != 'skipped' THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN status = 'skipped' THEN 1 ELSE 0 END)
+                FROM job_runs WHERE started_at >= ? GROUP BY job_name
+            """, (time.time() - HISTORY_RETENTION_DAYS * 86400,)).fetchall()
+            conn.close()
+            return {r[0]: {"runs": r[1], "avg_ms": round(r[2] or 0, 1), "max_ms": round(r[3] or 0, 1),
+                           "failures": r[4], "skipped": r[5]} for r in rows}
+        except Exception:
+            return {}
+
+    def get_jobs(self) -> List[dict]:
+        """관리자 화면용: 다음 실행 시각 순 정렬 + 최근 실행/소요 시간 + 같은 분 충돌"""
+        tz = ZoneInfo(KST)
+        stats = self._history_stats()
+        minute_slots: Dict[int, List[str]] = {}
+        for job in self.jobs.values():
+            if job.next_run and job.heavy:
+                minute_slots.setdefault(int(job.next_run // 60), []).append(job.name)
+
+        result = []
+        for job in sorted(self.jobs.values(), key=lambda j: j.next_run or float('inf')):
+            last = job.recent[-1] if job.recent else None
+            collides = []
+            if job.next_run and job.heavy:
+                collides = [n for n in minute_slots.get(int(job.next_run // 60), []) if n != job.name]
+            result.append({
+                "name": job.name,
+                "description": job.description,
+                "trigger": job.trigger.describe(),
+                "next_run": datetime.fromtimestamp(job.next_run, tz).isoformat() if job.next_run else None,
+                "heavy": job.heavy,
+                "leader_only": job.leader_only,
+                "overlap": job.overlap,
+                "jitter": job.jitter,
+                "running": job.running,
+                "paused": job.paused,
+                "last_run": {
+                    "status": last[0],
+                    "started_at": datetime.fromtimestamp(last[1], tz).isoformat(),
+                    "duration_ms": round(last[2], 1),
+                    "error": last[3],
+                } if last else None,
+                "history": stats.get(job.name, {}),
+                "collides_with": collides,
+            })
+        return result
+
+
+# ─── 전역 인스턴스 ──────────────────────────────────────────────────────────
+job_scheduler = JobScheduler()
@@ -0,0 +1,140 @@
+"""
+🧪 로컬 KIS 실시간 WebSocket 모의 서버
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+kis_mux(공유 시세 멀티플렉서) 검증용. 실제 KIS 서버와 같은 형식으로
+구독 응답(JSON)과 체결 틱(0|H0STCNT0|001|...^...)을 보내고,
+종목별 업스트림 구독 횟수를 집계해 중복 구독 여부를 확인할 수 있습니다.
+
+사용법:
+    python kis_mock_server.py --port 21000 --interval 0.5
+    KIS_WS_URL=ws://127.0.0.1:21000 uvicorn main:app
+
+    # 코드에서 직접 사용
+    server = KisMockServer(port=21000)
+    await server.start()
+    ...
+    print(server.subscribe_counts)   # {"005930": 1}
+    await server.stop()
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Set
+
+import websockets
+
+logger = logging.getLogger("KisMockServer")
+
+
+class KisMockServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 21000, interval: float = 0.5):
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.server = None
+        self.clients: Dict[object, Set[tuple]] = {}       # connection -> {(tr_id, tr_key)}
+        self.subscribe_counts: Dict[str, int] = {}       # tr_key -> 누적 구독 요청 수
+        self.prices: Dict[str, float] = {}
+        self.ticks_sent = 0
+        self._ticker = None
+
+    async def start(self):
+        self.server = await websockets.serve(self._handle, self.host, self.port)
+        self._ticker = asyncio.create_task(self._tick_loop())
+        logger.info(f"[KisMock] Listening on ws://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self._ticker:
+            self._ticker.cancel()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def active_subscriptions(self) -> Dict[str, int]:
+        """tr_key -> 현재 구독 중인 연결 수"""
+        counts: Dict[str, int] = {}
+        for subs in self.clients.values():
+            for _, tr_key in subs:
+                counts[tr_key] = counts.get(tr_key, 0) + 1
+        return counts
+
+    async def _handle(self, connection):
+        self.clients[connection] = set()
+        try:
+            async for raw in connection:
+                try:
+                    msg = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                header = msg.get("header", {})
+                if header.get("tr_id") == "PINGPONG":
+                    continue
+                body_input = msg.get("body", {}).get("input", {})
+                tr_id, tr_key = body_input.get("tr_id"), body_input.get("tr_key")
+                if not tr_id or not tr_key:
+                    continue
+                if header.get("tr_type") == "1":
+                    self.clients[connection].add((tr_id, tr_key))
+                    self.subscribe_counts[tr_key] = self.subscribe_counts.get(tr_key, 0) + 1
+                    result = "SUBSCRIBE SUCCESS"
+                else:
+                    self.clients[connection].discard((tr_id, tr_key))
+                    result = "UNSUBSCRIBE SUCCESS"
+                await connection.send(json.dumps({
+                    "header": {"tr_id": tr_id, "tr_key": tr_key, "encrypt": "N"},
+                    "body": {"rt_cd": "0", "msg_cd": "OPSP0000", "msg1": result},
+                }))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.clients.pop(connection, None)
+
+    def _tick_message(self, tr_id: str, tr_key: str) -> str:
+        price = self.prices.get(tr_key) or (70000.0 if tr_id == "H0STCNT0" else 200.0)
+        price = max(1.0, price * (1 + random.uniform(-0.002, 0.002)))
+        self.prices[tr_key] = price
+        rate = f"{random.uniform(-3, 3):.2f}"
+        now = time.strftime("%H%M%S")
+        if tr_id == "H0STCNT0":
+            # MKSC_SHRN_ISCD ^ STCK_CNTG_HOUR ^ STCK_PRPR ^ PRDY_VRSS_SIGN ^ PRDY_CTRT ^ ...
+            fields = [tr_key, now, str(int(price)), "2", rate] + ["0"] * 8
+        else:
+            # RSYM ^ SYMB ^ LAST ^ ... RATE(4) ... SIGN(7)
+            fields = [tr_key, tr_key[4:], f"{price:.4f}", "0", rate.lstrip("-"), "0", "0", "4" if rate.startswith("-") else "2"]
+        return f"0|{tr_id}|001|{'^'.join(fields)}"
+
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            for connection, subs in list(self.clients.items()):
+                for tr_id, tr_key in list(subs):
+                    try:
+                        await connection.send(self._tick_message(tr_id, tr_key))
+                        self.ticks_sent += 1
+                    except Exception:
+                        break
+
+
+async def _main(args):
+    server = KisMockServer(args.host, args.port, args.interval)
+    await server.start()
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"[KisMock] clients={len(server.clients)} ticks={server.ticks_sent} subs={server.active_subscriptions()}")
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock KIS realtime WebSocket server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=21000)
+    parser.add_argument("--interval", type=float, default=0.5, help="tick interval seconds")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,202 @@
+"""
+📡 KIS 실시간 시세 멀티플렉서
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+사용자마다 KisWebSocket을 따로 열면 같은 종목(예: 005930)을 보는 사용자 수만큼
+업스트림 구독 / 복호화 / 파싱이 반복됩니다.
+
+📌 동작 방식
+  1. 사용자 세션(본인 자격증명으로 연결된 KisWebSocket)을 풀(pool)에 등록
+  2. 종목 구독은 풀 전체에서 한 번만 업스트림에 등록 (가장 여유 있는 세션에 배정)
+     → 사용자별 관심(interest)만 참조 카운트로 관리
+  3. 틱은 배정된 세션에서 한 번만 파싱되어, 관심 사용자 전체에게 한 번에 전달
+  4. 세션이 빠지면 그 세션이 담당하던 종목을 남은 세션으로 이관 (없으면 대기 후 재배정)
+  5. 세션 자체는 소유 사용자의 approval_key를 그대로 사용하므로
+     체결통보 등 개인 스트림은 기존처럼 사용자 세션에 남습니다.
+
+🧪 로컬 검증: `python kis_mock_server.py` 실행 후 KIS_WS_URL=ws://127.0.0.1:21000
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger("KisFeedMux")
+
+# KIS 실시간 등록 한도는 세션당 41건 → 여유 1건
+MAX_SYMBOLS_PER_SESSION = 40
+
+# tick_handler(symbol, price, change_rate, user_ids)
+TickHandler = Callable[[str, str, str, Set[str]], Awaitable[None]]
+
+
+def tick_key(symbol: str) -> str:
+    """틱에 실려 오는 종목 키 (해외: 'GOOGL.O' → 'GOOGL', 국내: 그대로)"""
+    return symbol if symbol.isdigit() else symbol.upper().split('.')[0]
+
+
+class KisFeedMultiplexer:
+    """
+    사용자 KIS 세션 풀 위에서 종목 구독을 중복 제거하고 틱을 팬아웃합니다.
+
+    사용 예:
+        feed_mux.set_tick_handler(handler)
+        await feed_mux.add_session(user_id, kis_ws)      # 연결된 세션 등록
+        await feed_mux.subscribe(user_id, "005930")      # 이미 구독 중이면 업스트림 요청 없음
+        await feed_mux.remove_session(user_id)           # 담당 종목은 다른 세션으로 이관
+    """
+
+    def __init__(self, max_symbols_per_session: int = MAX_SYMBOLS_PER_SESSION):
+        self.max_symbols_per_session = max_symbols_per_session
+        self.sessions: Dict[str, object] = {}            # owner(user_id) -> KisWebSocket
+        self.session_symbols: Dict[str, Set[str]] = {}   # owner -> 담당 종목
+        self.symbol_owner: Dict[str, str] = {}           # symbol -> 담당 세션 owner
+        self.interests: Dict[str, Set[str]] = {}         # symbol -> 관심 user_id
+        self.tick_symbols: Dict[str, str] = {}           # tick_key -> 구독 symbol
+        self.tick_handler: Optional[TickHandler] = None
+        self.lock = asyncio.Lock()
+        self.stats = {
+            "ticks": 0,
+            "deliveries": 0,
+            "stale_ticks": 0,
+            "upstream_subscribes": 0,
+            "deduped_subscribes": 0,
+            "migrations": 0,
+        }
+
+    def set_tick_handler(self, handler: TickHandler):
+        self.tick_handler = handler
+
+    # ─── 세션 풀 ─────────────────────────────────────────────────────────────
+    async def add_session(self, owner: str, ws_client):
+        """사용자 세션을 풀에 등록하고, 담당 세션이 없는 종목을 배정"""
+        async with self.lock:
+            old = self.sessions.get(owner)
+            if old is not None and old is not ws_client:
+                await self._drop_session(owner)
+            ws_client.set_callback(lambda s, p, c, _owner=owner: self._on_tick(_owner, s, p, c))
+            self.sessions[owner] = ws_client
+            self.session_symbols.setdefault(owner, set())
+            for symbol in [s for s in self.interests if s not in self.symbol_owner]:
+                await self._assign(symbol)
+        logger.info(f"[KisMux] Session added: {owner} (Pool: {len(self.sessions)})")
+
+    async def remove_session(self, owner: str):
+        """풀에서 세션 제거 (세션 종료는 호출 측 책임). 담당 종목은 남은 세션으로 이관"""
+        async with self.lock:
+            await self._drop_session(owner)
+        logger.info(f"[KisMux] Session removed: {owner} (Pool: {len(self.sessions)})")
+
+    async def _drop_session(self, owner: str):
+        self.sessions.pop(owner, None)
+        orphaned = self.session_symbols.pop(owner, set())
+        for symbol in orphaned:
+            if self.symbol_owner.get(symbol) == owner:
+                del self.symbol_owner[symbol]
+        for symbol in orphaned:
+            if self.interests.get(symbol):
+                if await self._assign(symbol):
+                    self.stats["migrations"] += 1
+
+    def _pick_session(self) -> Optional[str]:
+        """연결된 세션 중 담당 종목이 가장 적은 세션 (한도 초과 세션 제외)"""
+        best, best_load = None, None
+        for owner, ws in self.sessions.items():
+            load = len(self.session_symbols.get(owner, ()))
+            if load >= self.max_symbols_per_session:
+                continue
+            # 연결된 세션 우선, 동률이면 부하가 낮은 세션
+            key = (0 if getattr(ws, "connected", False) else 1, load)
+            if best_load is None or key < best_load:
+                best, best_load = owner, key
+        return best
+
+    async def _assign(self, symbol: str) -> bool:
+        owner = self._pick_session()
+        if owner is None:
+            logger.warning(f"[KisMux] No session capacity for {symbol} (Pool: {len(self.sessions)})")
+            return False
+        self.symbol_owner[symbol] = owner
+        self.session_symbols[owner].add(symbol)
+        self.tick_symbols[tick_key(symbol)] = symbol
+        self.stats["upstream_subscribes"] += 1
+        try:
+            await self.sessions[owner].subscribe(symbol)
+        except Exception as e:
+            logger.error(f"[KisMux] Upstream subscribe failed for {symbol} on {owner}: {e}")
+        return True
+
+    # ─── 구독 관리 ───────────────────────────────────────────────────────────
+    async def subscribe(self, user_id: str, symbol: str):
+        async with self.lock:
+            users = self.interests.setdefault(symbol, set())
+            users.add(user_id)
+            if symbol in self.symbol_owner:
+                self.stats["deduped_subscribes"] += 1
+                return
+            await self._assign(symbol)
+
+    async def unsubscribe(self, user_id: str, symbol: str):
+        async with self.lock:
+            await self._release(user_id, symbol)
+
+    async def unsubscribe_all(self, user_id: str):
+        async with self.lock:
+            for symbol in [s for s, users in self.interests.items() if user_id in users]:
+                await self._release(user_id, symbol)
+
+    async def _release(self, user_id: str, symbol: str):
+        users = self.interests.get(symbol)
+        if users is None:
+            return
+        users.discard(user_id)
+        if users:
+            return
+        # 마지막 관심 사용자 → 업스트림 구독 해제
+        del self.interests[symbol]
+        self.tick_symbols.pop(tick_key(symbol), None)
+        owner = self.symbol_owner.pop(symbol, None)
+        if owner is None:
+            return
+        self.session_symbols.get(owner, set()).discard(symbol)
+        ws = self.sessions.get(owner)
+        if ws is not None:
+            try:
+                await ws.unsubscribe(symbol)
+            except Exception as e:
+                logger.error(f"[KisMux] Upstream unsubscribe failed for {symbol} on {owner}: {e}")
+
+    def is_served(self, user_id: str, symbol: str) -> bool:
+        """해당 사용자가 이 종목을 멀티플렉서 실시간 틱으로 받고 있는지"""
+        return symbol in self.symbol_owner and user_id in self.interests.get(symbol, ())
+
+    # ─── 틱 디스패치 ─────────────────────────────────────────────────────────
+    async def _on_tick(self, owner: str, symbol: str, price: str, change_rate: str):
+        symbol = self.tick_symbols.get(symbol, symbol)
+        # 이관 직후 이전 세션에서 늦게 도착한 틱은 버림 (중복 전달 방지)
+        if self.symbol_owner.get(symbol) != owner:
+            self.stats["stale_ticks"] += 1
+            return
+        users = self.interests.get(symbol)
+        if not users or self.tick_handler is None:
+            return
+        self.stats["ticks"] += 1
+        self.stats["deliveries"] += len(users)
+        try:
+            await self.tick_handler(symbol, price, change_rate, set(users))
+        except Exception as e:
+            logger.warning(f"[KisMux] Tick handler error for {symbol}: {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "sessions": len(self.sessions),
+            "upstream_symbols": len(self.symbol_owner),
+            "interested_users": len({u for users in self.interests.values() for u in users}),
+            "pending_symbols": len([s for s in self.interests if s not in self.symbol_owner]),
+            "session_load": {owner: len(symbols) for owner, symbols in self.session_symbols.items()},
+        }
+
+
+# ─── 전역 인스턴스 ──────────────────────────────────────────────────────────
+feed_mux = KisFeedMultiplexer()
@@ -2,6 +2,7 @@
 import asyncio
 import json
 import logging
+import os
 import time
 try:
     from Crypto.Cipher import AES
@@ -16,6 +17,9 @@ import base64
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("KisWS")
 
+# 실서버 기본값. 로컬 검증 시 KIS_WS_URL=ws://127.0.0.1:21000 (kis_mock_server.py)
+KIS_WS_URL = os.getenv("KIS_WS_URL", "ws://ops.koreainvestment.com:21000")
+
 class KisWebSocket:
     # [New] 해외거래소 코드 매핑 (KIS HDFSCNT0 tr_key 형식)
     EXCHANGE_MAP = {
@@ -25,8 +29,8 @@ class KisWebSocket:
         '.K': 'NASD',   # NASDAQ 대체어
     }
 
-    def __init__(self, approval_key):
-        self.url = "ws://ops.koreainvestment.com:21000" # Real Server
+    def __init__(self, approval_key, url: str = None):
+        self.url = url or KIS_WS_URL
         self.approval_key = approval_key
         self.connected = False
         self.websocket = None
@@ -36,6 +40,7 @@ class KisWebSocket:
         self.max_reconnect_attempts = 10
         self.reconnect_delay = 5  # Initial delay in seconds
         self.should_reconnect = True
+        self.monitor_task = None  # auto_reconnect task (one per client, survives reconnects)
         
         # Callback for incoming data: function(symbol, price, change_rate)
         self.on_message_callback = None
@@ -55,8 +60,9 @@ class KisWebSocket:
             # Start listener
             asyncio.create_task(self.listen())
             
-            # Start auto-reconnect monitor
-            asyncio.create_task(self.auto_reconnect())
+            # Start auto-reconnect monitor (reconnects reuse the existing monitor)
+            if self.monitor_task is None or self.monitor_task.done():
+                self.monitor_task = asyncio.create_task(self.auto_reconnect())
             
             # Resubscribe if we had subscriptions (reconnection scenario)
             if self.subscriptions:
@@ -2,16 +2,24 @@ import aiohttp
 import asyncio
 import requests
 from bs4 import BeautifulSoup
+from html_parse import decode_html, parse_html
+from upstream_hosts import (
+    NAVER_FINANCE_URL, NAVER_MOBILE_STOCK_URL, NAVER_OPENAPI_URL, NAVER_POLLING_URL,
+    NAVER_STOCK_API_URL, NAVER_STOCK_URL,
+)
 import re
 import datetime
 import urllib.parse
 import json
+import logging
 import unicodedata
 from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from turbo_engine import turbo_cache
 from stock_names import STOCK_MAP
 
+logger = logging.getLogger(__name__)
+
 # [Config]
 HEADER = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
@@ -24,42 +32,18 @@ HEADER = {
 # [Helper] Robust Decoding
 def decode_safe(res: requests.Response) -> str:
     """
-    [v4.0.0] Ultra-Robust Decoding for Naver Finance (EUC-KR Priority).
+    [v4.1.0] Naver Finance 디코딩 (html_parse.decode_html)
+    헤더/meta charset 우선 → 앞부분 표본 점수 → 본문 전체는 1회만 디코딩
     """
     if not res or not res.content:
         return ""
-    
-    # [1] Try to get encoding from headers
-    header_enc = res.encoding
-    if header_enc and header_enc.lower() in ['euc-kr', 'cp949', 'ks_c_5601-1987']:
-        try:
-            return res.content.decode('cp949', errors='replace')
-        except: pass
-
-    # [2] Heuristic Search
-    content = res.content
-    candidates = []
-    # CP949 is the most common for Naver
-    for enc in ['cp949', 'utf-8', 'euc-kr', 'iso-8859-1']:
-        try:
-            decoded = content.decode(enc, errors='replace')
-            # Check for actual Hangul characters (NFC)
-            kor_count = sum(1 for c in decoded if 0xAC00 <= ord(c) <= 0xD7A3)
-            # Penalize replacement characters
-            rep_count = decoded.count('\ufffd')
-            score = kor_count - (rep_count * 10)
-            candidates.append((score, decoded))
-        except:
-            pass
-
-    if not candidates:
+    try:
+        return decode_html(res.content, res.headers.get("Content-Type"), res.url)
+    except Exception:
         return res.text
-    
-    # Sort by score descending
-    candidates.sort(key=lambda x: x[0], reverse=True)
-    return candidates[0][1]
 
 
+@lru_cache(maxsize=4096)
 def robust_name(s: str) -> str:
     """
     [v4.0.0] The Silver Bullet for Naver's mixed-encoding madness.
@@ -119,32 +103,42 @@ get_korean_stock_name = get_korean_name  # Alias
 
 @turbo_cache(ttl_seconds=86400)  # Mapping is stable, cache longer
 def search_stock_code(keyword: str):
-    print(f"\n[TRACE] search_stock_code called with keyword: '{keyword}'")
     """
     [v3.1.0-Enhanced] Mission-Critical Multi-layer Search Engine
     Goal: 100% resolution for Korean stocks with Unicode Normalization (NFC).
     Adds dedicated Naver Finance Search List fallback.
     """
+    logger.debug("[TRACE] search_stock_code called with keyword: %r", keyword)
     if not keyword:
         return None
 
     # Unicode Normalization (NFC) for robust matching (Prevents NFC/NFD
     # mismatch)
     keyword_clean = unicodedata.normalize('NFC', keyword.strip())
-    print(f"\n[Search Tier 0] Processing: '{keyword_clean}' (Standardized)")
+    logger.debug("[Search Tier 0] Processing: %r (Standardized)", keyword_clean)
 
     # 0. Direct Ticker Check (6 digits)
     code = re.sub(r'[^0-9]', '', keyword_clean)
     if len(code) == 6 and code.isdigit():
-        print(f" -> Found direct code: {code}")
+        logger.debug(" -> Found direct code: %s", code)
         return code
 
     # 1. Internal Mapping Table (Fastest & 100% Reliable for major stocks)
     if keyword_clean in STOCK_MAP:
         found_code = STOCK_MAP[keyword_clean]
-        print(f" -> Found in internal map: {found_code}")
+        logger.debug(" -> Found in internal map: %s", found_code)
         return found_code
 
+    # 1-1. Local Symbol Index (listing-wide exact match incl. aliases/US names, no network)
+    try:
+        from symbol_index import symbol_index
+        indexed = symbol_index.resolve(keyword_clean)
+        if indexed:
+            logger.debug(" -> Found in symbol index: %s", indexed)
+            return indexed
+    except Exception as ie:
+        logger.warning("Symbol Index Stage failed: %s", ie)
+
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Referer": "https://finance.naver.com/"}
@@ -180,14 +174,13 @@ def search_stock_code(keyword: str):
     # 3. Naver Finance Search List (Powerful Fallback for exact/partial name
     # matches)
     try:
-        print(
-            f"[Search Tier 3] Trying Naver Finance Search List for '{keyword_clean}'...")
+        logger.debug("[Search Tier 3] Trying Naver Finance Search List for %r...", keyword_clean)
         try:
             euc_query = urllib.parse.quote(keyword_clean.encode('euc-kr'))
         except BaseException:
             euc_query = urllib.parse.quote(keyword_clean)
 
-        search_url = f"https://finance.naver.com/search/searchList.naver?query={euc_query}"
+        search_url = f"{NAVER_FINANCE_URL}/search/searchList.naver?query={euc_query}"
         res_s = requests.get(search_url, headers=headers, timeout=5)
 
         # Decoding: Naver Search List is EUC-KR
@@ -196,7 +189,7 @@ def search_stock_code(keyword: str):
         except BaseException:
             s_html = res_s.text
 
-        s_soup = BeautifulSoup(s_html, 'html.parser')
+        s_soup = parse_html(s_html, class_="tbl_search")
         result_rows = s_soup.select(".tbl_search tbody tr")
         if result_rows:
             for row in result_rows:
@@ -209,16 +202,14 @@ def search_stock_code(keyword: str):
                     if code_match:
                         found_code = code_match.group(1)
                         if keyword_clean in name or name in keyword_clean:
-                            print(
-                                f" -> Found via Finance Search List: {found_code} ({name})")
+                            logger.debug(" -> Found via Finance Search List: %s (%s)", found_code, name)
                             return found_code
     except Exception as se:
-        print(f"  !! Finance Search List Stage failed: {se}")
+        logger.warning("Finance Search List Stage failed: %s", se)
 
     # 4. Yahoo Finance Global Lookup
     try:
-        print(
-            f"[Search Tier 4] Trying Yahoo Finance Fallback for '{keyword_clean}'...")
+        logger.debug("[Search Tier 4] Trying Yahoo Finance Fallback for %r...", keyword_clean)
         encoded_keyword = urllib.parse.quote(keyword_clean)
         yurl = f"https://query2.finance.yahoo.com/v1/finance/search?q={encoded_keyword}&lang=ko-KR"
         res_y = requests.get(yurl, headers=headers, timeout=5)
@@ -229,14 +220,14 @@ def search_stock_code(keyword: str):
                 if symbol.endswith('.KS') or symbol.endswith('.KQ'):
                     ycode = symbol.split('.')[0]
                     if len(ycode) == 6 and ycode.isdigit():
-                        print(f" -> Found via Yahoo: {ycode} ({symbol})")
+                        logger.debug(" -> Found via Yahoo: %s (%s)", ycode, symbol)
                         return ycode
     except Exception as ye:
-        print(f"  !! Yahoo Stage failed: {ye}")
+        logger.warning("Yahoo Stage failed: %s", ye)
 
     # 5. Final Fallback: Naver Integration Search
     try:
-        print(f"[Search Tier 5] Trying Naver Integration Search Fallback...")
+        logger.debug("[Search Tier 5] Trying Naver Integration Search Fallback...")
         query = f"{keyword_clean} 주가"
         encoded = urllib.parse.quote(query)
         url = f"https://search.naver.com/search.naver?where=nexearch&sm=top_hty&fbm=0&ie=utf8&query={encoded}"
@@ -246,12 +237,12 @@ def search_stock_code(keyword: str):
         matches = re.findall(
             r'finance\.naver\.com/item/main\.(?:naver|nhn)\?code=(\d{6})', html)
         if matches:
-            print(f" -> Found via Integration Search: {matches[0]}")
+            logger.debug(" -> Found via Integration Search: %s", matches[0])
             return matches[0]
     except Exception as ie:
-        print(f"  !! Integration Search Stage failed: {ie}")
+        logger.warning("Integration Search Stage failed: %s", ie)
 
-    print(f" -> [Search Failed] No results for '{keyword_clean}' in any tier.")
+    logger.info("[Search Failed] No results for %r in any tier.", keyword_clean)
     return None
 
 
@@ -304,7 +295,7 @@ def gather_naver_stock_data(symbol: str):
             # --- Fallback to Naver Polling API ---
             try:
                 import requests
-                polling_url = f"https://polling.finance.naver.com/api/realtime?query=SERVICE_ITEM:{code}"
+                polling_url = f"{NAVER_POLLING_URL}/api/realtime?query=SERVICE_ITEM:{code}"
                 res = requests.get(polling_url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=5)
                 if res.status_code == 200:
                     data = res.json()
@@ -333,7 +324,7 @@ def gather_naver_stock_data(symbol: str):
                         
                         # fetch market cap from integration API as secondary fallback
                         try:
-                            m_res = requests.get(f"https://m.stock.naver.com/api/stock/{code}/integration", headers={'User-Agent': 'Mozilla/5.0'}, timeout=3)
+                            m_res = requests.get(f"{NAVER_MOBILE_STOCK_URL}/api/stock/{code}/integration", headers={'User-Agent': 'Mozilla/5.0'}, timeout=3)
                             if m_res.status_code == 200:
                                 m_data = m_res.json()
                                 if m_data.get('marketValue'):
@@ -443,11 +434,10 @@ def gather_naver_stock_data(symbol: str):
         if per_val is None or pbr_val is None:
             try:
                 import requests
-                from bs4 import BeautifulSoup
-                url = f"https://finance.naver.com/item/main.naver?code={code}"
+                url = f"{NAVER_FINANCE_URL}/item/main.naver?code={code}"
                 headers = {"User-Agent": "Mozilla/5.0"}
                 res = requests.get(url, headers=headers, timeout=2)
-                soup = BeautifulSoup(res.content.decode('euc-kr', 'replace'), 'html.parser')
+                soup = parse_html(res.content.decode('euc-kr', 'replace'), "em", id=["_per", "_pbr", "_eps", "_bps"])
                 
                 if per_val is None:
                     per_em = soup.select_one("#_per")
@@ -469,7 +459,7 @@ def gather_naver_stock_data(symbol: str):
         # 상업적 이용 제재 가능성이 낮은 모바일 전용 JSON 엔드포인트를 덮어씌우기로 활용
         nxt_data = None
         try:
-            url = f"https://stock.naver.com/api/securityService/integration/price?domesticKrxCodes={code}"
+            url = f"{NAVER_STOCK_URL}/api/securityService/integration/price?domesticKrxCodes={code}"
             headers = {"User-Agent": "Mozilla/5.0 (Linux; Android 13)"}
             res = requests.get(url, headers=headers, timeout=2)
             if res.status_code == 200:
@@ -550,9 +540,9 @@ def get_naver_daily_prices(symbol: str):
         code = symbol.split('.')[0]
         code = re.sub(r'[^0-9]', '', code)
 
-        url = f"https://finance.naver.com/item/sise_day.naver?code={code}"
+        url = f"{NAVER_FINANCE_URL}/item/sise_day.naver?code={code}"
         res = requests.get(url, headers=HEADER, timeout=5)
-        soup = BeautifulSoup(decode_safe(res), 'html.parser')
+        soup = parse_html(decode_safe(res), "table", class_="type2")
 
         history = []
         rows = soup.select("table.type2 tr")
@@ -656,7 +646,6 @@ def get_naver_theme_rank():
     네이버 금융 테마별 시세 페이지를 크롤링하여 실시간 테마 순위를 가져옵니다.
     """
     import requests
-    from bs4 import BeautifulSoup
 
     mega_themes = {
         "온디바이스AI": "기기 내장형 AI 구동",
@@ -685,14 +674,14 @@ def get_naver_theme_rank():
     }
 
     try:
-        url = "https://finance.naver.com/sise/theme.naver"
+        url = f"{NAVER_FINANCE_URL}/sise/theme.naver"
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
             "Referer": "https://finance.naver.com/"
         }
         res = requests.get(url, headers=headers, timeout=5)
         res.encoding = 'euc-kr'
-        soup = BeautifulSoup(res.text, 'html.parser')
+        soup = parse_html(res.text, "table", class_="type_1")
         
         trs = soup.select("table.type_1 tr")
         themes = []
@@ -747,7 +736,7 @@ def get_naver_flash_news():
     Main market news
     """
     try:
-        url = "https://finance.naver.com/news/mainnews.naver"
+        url = f"{NAVER_FINANCE_URL}/news/mainnews.naver"
         res = requests.get(url, headers=HEADER, timeout=5)
         soup = BeautifulSoup(decode_safe(res), 'html.parser')
 
@@ -945,7 +934,7 @@ def get_naver_global_stock_data(symbol: str):
     for suffix in suffixes:
         test_symbol = symbol + suffix
         try:
-            url = f"https://m.stock.naver.com/api/stock/{test_symbol}/basic"
+            url = f"{NAVER_MOBILE_STOCK_URL}/api/stock/{test_symbol}/basic"
             res = requests.get(url, headers=HEADER, timeout=3)
             if res.status_code == 200:
                 data = res.json()
@@ -980,9 +969,9 @@ def get_naver_disclosures(symbol: str):
         code = symbol.split('.')[0]
         code = re.sub(r'[^0-9]', '', code)
 
-        url = f"https://finance.naver.com/item/news_notice.naver?code={code}&page=1"
+        url = f"{NAVER_FINANCE_URL}/item/news_notice.naver?code={code}&page=1"
         res = requests.get(url, headers=HEADER, timeout=5)
-        soup = BeautifulSoup(decode_safe(res), 'html.parser')
+        soup = parse_html(decode_safe(res), "table", class_=["type5", "type6"])
 
         disclosures = []
         rows = soup.select("table.type5 tbody tr, table.type6 tbody tr")
@@ -1032,7 +1021,7 @@ def get_naver_market_details():
 
     for m_id, m_name in markets.items():
         try:
-            url = f"https://finance.naver.com/sise/sise_index.naver?code={m_id}"
+            url = f"{NAVER_FINANCE_URL}/sise/sise_index.naver?code={m_id}"
             res = requests.get(url, headers=HEADER, timeout=5)
             soup = BeautifulSoup(decode_safe(res), 'html.parser')
 
@@ -1092,9 +1081,9 @@ def get_top_market_cap_stocks(limit=10):
 
     for m_name, sosok in market_types.items():
         try:
-            url = f"https://finance.naver.com/sise/sise_market_sum.naver?sosok={sosok}"
+            url = f"{NAVER_FINANCE_URL}/sise/sise_market_sum.naver?sosok={sosok}"
             res = requests.get(url, headers=HEADER, timeout=5)
-            soup = BeautifulSoup(decode_safe(res), 'html.parser')
+            soup = parse_html(decode_safe(res), "table", class_="type_2")
 
             rows = soup.select("table.type_2 tbody tr")
             count = 0
@@ -1181,7 +1170,7 @@ def get_integrated_stock_news(
     if len(code) == 6 and code.isdigit():
         try:
             naver_page_size = 50  # [Fix] API 구조상 각 섹션에 뉴스 1개 → 50개 요청해야 50개 확보
-            url = f"https://m.stock.naver.com/api/news/stock/{code}?pageSize={naver_page_size}"
+            url = f"{NAVER_MOBILE_STOCK_URL}/api/news/stock/{code}?pageSize={naver_page_size}"
             headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
             response = requests.get(url, headers=headers, timeout=8)
             if response.status_code == 200:
@@ -1234,7 +1223,7 @@ def get_integrated_stock_news(
 
     if client_id and client_secret:
         try:
-            url = "https://openapi.naver.com/v1/search/news.json"
+            url = f"{NAVER_OPENAPI_URL}/v1/search/news.json"
             headers = {
                 "X-Naver-Client-Id": client_id,
                 "X-Naver-Client-Secret": client_secret}
@@ -1299,7 +1288,7 @@ def get_naver_stock_info(symbol: str):
     if len(clean_code) == 6 and clean_code.isdigit():
         try:
             # [v6.0.1] New path for domestic stocks
-            url = f"https://stock.naver.com/api/securityService/integration/price?domesticKrxCodes={clean_code}"
+            url = f"{NAVER_STOCK_URL}/api/securityService/integration/price?domesticKrxCodes={clean_code}"
             res = requests.get(url, headers=HEADER, timeout=5)
             if res.status_code == 200:
                 data_root = res.json()
@@ -1438,7 +1427,7 @@ def get_naver_stock_info(symbol: str):
     # 전달된 심볼에 이미 점이 포함되어 있다면 해당 심볼로 먼저 시도
     if '.' in symbol:
         try:
-            url = f"https://api.stock.naver.com/stock/{symbol}/basic"
+            url = f"{NAVER_STOCK_API_URL}/stock/{symbol}/basic"
             res = requests.get(url, headers=HEADER, timeout=7)
             if res.status_code == 200:
                 data = res.json()
@@ -1453,7 +1442,7 @@ def get_naver_stock_info(symbol: str):
         if test_symbol == symbol:
             continue
         try:
-            url = f"https://api.stock.naver.com/stock/{test_symbol}/basic"
+            url = f"{NAVER_STOCK_API_URL}/stock/{test_symbol}/basic"
             res = requests.get(url, headers=HEADER, timeout=7)
             if res.status_code == 200:
                 data = res.json()
@@ -1466,10 +1455,11 @@ def get_naver_stock_info(symbol: str):
     return gather_naver_stock_data(symbol)
 
 
+@lru_cache(maxsize=4096)
 def robust_name(name):
+    # 랭킹/검색 결과마다 같은 종목명이 반복되므로 정리 결과를 캐시 (str/bytes만 전달됨)
     if not name:
         return ""
-    import unicodedata
     try:
         if isinstance(name, bytes):
             # Try common encodings
@@ -1507,7 +1497,7 @@ def fetch_naver_ranking_data(nation: str, order_type: str) -> list:
     try:
         if order_type == "searchTop" and nation == "KOR":
             # [v5.0.0] KOR searchTop: returns reutersCode only, no name
-            url = f"https://stock.naver.com/api/domestic/market/searchTop?nationType={nation}&startIdx=0&pageSize=15"
+            url = f"{NAVER_STOCK_URL}/api/domestic/market/searchTop?nationType={nation}&startIdx=0&pageSize=15"
             res = requests.get(url, headers=headers, timeout=5)
             if res.status_code != 200:
                 return []
@@ -1530,7 +1520,7 @@ def fetch_naver_ranking_data(nation: str, order_type: str) -> list:
                         return code_to_name[code]
                     # Fallback: Naver mobile stock API
                     r = requests.get(
-                        f"https://m.stock.naver.com/api/stock/{code}/basic",
+                        f"{NAVER_MOBILE_STOCK_URL}/api/stock/{code}/basic",
                         headers=headers, timeout=3
                     )
                     if r.status_code == 200:
@@ -1574,7 +1564,7 @@ def fetch_naver_ranking_data(nation: str, order_type: str) -> list:
                 'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Mobile/15E148 Safari/604.1',
                 'Referer': 'https://m.stock.naver.com/',
                 'Accept': 'application/json'}
-            url = f"https://m.stock.naver.com/front-api/market/popularStock?nationType={nation}"
+            url = f"{NAVER_MOBILE_STOCK_URL}/front-api/market/popularStock?nationType={nation}"
             res = requests.get(url, headers=mobile_headers, timeout=5)
             if res.status_code == 200:
                 data = res.json()
@@ -1599,7 +1589,7 @@ def fetch_naver_ranking_data(nation: str, order_type: str) -> list:
 
         elif nation == "KOR":
             # Domestic Volume/Amount
-            url = f"https://stock.naver.com/api/domestic/market/stock/default?tradeType=KRX&marketType=ALL&orderType={order_type}&startIdx=0&pageSize=15"
+            url = f"{NAVER_STOCK_URL}/api/domestic/market/stock/default?tradeType=KRX&marketType=ALL&orderType={order_type}&startIdx=0&pageSize=15"
             res = requests.get(url, headers=headers, timeout=5)
             if res.status_code == 200:
                 data = res.json()
@@ -1631,7 +1621,7 @@ def fetch_naver_ranking_data(nation: str, order_type: str) -> list:
                     return data.get("items") or data.get("stocks") or []
         else:
             # Foreign Volume/Amount
-            url = f"https://stock.naver.com/api/foreign/market/stock/global?nation={nation}&tradeType=ALL&orderType={order_type}&startIdx=0&pageSize=15"
+            url = f"{NAVER_STOCK_URL}/api/foreign/market/stock/global?nation={nation}&tradeType=ALL&orderType={order_type}&startIdx=0&pageSize=15"
             res = requests.get(url, headers=headers, timeout=5)
             if res.status_code == 200:
                 data = res.json()
@@ -2434,9 +2424,9 @@ def get_top_sectors():
     Fetch ALL sectors from Naver (상승/하락 모두 포함)
     """
     try:
-        url = "https://finance.naver.com/sise/sise_group.naver?type=upjong"
+        url = f"{NAVER_FINANCE_URL}/sise/sise_group.naver?type=upjong"
         res = requests.get(url, headers=HEADER, timeout=5)
-        soup = BeautifulSoup(decode_safe(res), 'html.parser')
+        soup = parse_html(decode_safe(res), "table", class_="type_1")
 
         sectors = []
         rows = soup.select("table.type_1 tr")
@@ -2491,9 +2481,9 @@ def get_top_trending_themes(limit: int = 6):
     Fetch top themes from Naver
     """
     try:
-        url = "https://finance.naver.com/sise/theme.naver"
+        url = f"{NAVER_FINANCE_URL}/sise/theme.naver"
         res = requests.get(url, headers=HEADER, timeout=3)
-        soup = BeautifulSoup(decode_safe(res), 'html.parser')
+        soup = parse_html(decode_safe(res), "table", class_="type_1")
 
         themes = []
         rows = soup.select("table.type_1 tr")
@@ -2538,7 +2528,7 @@ def get_investor_history(symbol: str, days: int = 40):
         code = symbol.split('.')[0]
         code = re.sub(r'[^0-9]', '', code)
         
-        url = f"https://m.stock.naver.com/api/stock/{code}/trend?pageSize={days}"
+        url = f"{NAVER_MOBILE_STOCK_URL}/api/stock/{code}/trend?pageSize={days}"
         res = requests.get(url, headers=HEADER, timeout=5)
         
         if res.status_code != 200:
@@ -2596,7 +2586,7 @@ def get_naver_investor_data(symbol: str, trader_day: int = 1):
         code = symbol.split('.')[0]
         code = re.sub(r'[^0-9]', '', code)
 
-        url = f"https://finance.naver.com/item/frgn.naver?code={code}&trader_day={trader_day}"
+        url = f"{NAVER_FINANCE_URL}/item/frgn.naver?code={code}&trader_day={trader_day}"
         res = requests.get(url, headers=HEADER, timeout=5)
         soup = BeautifulSoup(decode_safe(res), 'html.parser')
 
@@ -2673,7 +2663,7 @@ def get_naver_investor_data(symbol: str, trader_day: int = 1):
         # doesn't provide holdings quantity)
         def get_listed_shares():
             try:
-                pc_url = f"https://finance.naver.com/item/main.naver?code={code}"
+                pc_url = f"{NAVER_FINANCE_URL}/item/main.naver?code={code}"
                 res = requests.get(pc_url, headers=HEADER, timeout=5)
                 # Parse <th>상장주식수</th><td><em>5,969,782,550</em></td>
                 m = re.search(
@@ -2700,7 +2690,7 @@ def get_naver_investor_data(symbol: str, trader_day: int = 1):
             try:
                 # Use bizdate cursor for pagination
                 page_size = 50
-                m_url = f"https://m.stock.naver.com/api/stock/{code}/trend?pageSize={page_size}"
+                m_url = f"{NAVER_MOBILE_STOCK_URL}/api/stock/{code}/trend?pageSize={page_size}"
                 if last_bizdate:
                     m_url += f"&bizdate={last_bizdate}"
 
@@ -2959,7 +2949,7 @@ def get_live_investor_estimates(symbol: str):
     # 1. Try fetching real-time provisional data (Scraping)
     all_points = []
     try:
-        url = f"https://finance.naver.com/item/frgn.naver?code={clean_code}"
+        url = f"{NAVER_FINANCE_URL}/item/frgn.naver?code={clean_code}"
         res = requests.get(url, headers=HEADER, timeout=3)
         # frgn.naver is still strictly EUC-KR (CP949)
         html = res.content.decode('cp949', 'ignore')
@@ -3080,7 +3070,7 @@ def get_index_chart_data(index_code: str):
     }
 
     target_code = code_map.get(index_code.upper(), index_code)
-    url = f"https://finance.naver.com/sise/sise_index_day.naver?code={target_code}"
+    url = f"{NAVER_FINANCE_URL}/sise/sise_index_day.naver?code={target_code}"
 
     data = []
 
@@ -3089,7 +3079,7 @@ def get_index_chart_data(index_code: str):
         for page in range(1, 7):
             p_url = f"{url}&page={page}"
             res = requests.get(p_url, headers=HEADER, timeout=3)
-            soup = BeautifulSoup(decode_safe(res), 'html.parser')
+            soup = parse_html(decode_safe(res), "table", class_="type_1")
 
             rows = soup.select("table.type_1 tr")
 
@@ -3133,9 +3123,9 @@ def get_korean_interest_rates():
     ]
 
     try:
-        url = "https://finance.naver.com/marketindex/"
+        url = f"{NAVER_FINANCE_URL}/marketindex/"
         res = requests.get(url, headers=HEADER, timeout=5)
-        soup = BeautifulSoup(decode_safe(res), 'html.parser')
+        soup = parse_html(decode_safe(res), "table", class_="tbl_exchange")
 
         # th CSS 클래스 -> 심볼 매핑
         # th_inter1=콜금리, th_inter2=국채(3년), th_inter3=회사채(3년)
@@ -3223,7 +3213,7 @@ def get_market_summary_stats():
     }
 
     try:
-        url = "https://finance.naver.com/"
+        url = f"{NAVER_FINANCE_URL}/"
         res = requests.get(url, headers=HEADER, timeout=5)
         # 중요: euc-kr 디코드 후 BS4로 파싱해야 정규식이 한글을 제대로 인식합니다.
         html = res.content.decode('euc-kr', 'replace')
@@ -3336,7 +3326,7 @@ def get_live_disclosures():
     네이버 증권 '공시' 탭 최신 뉴스 1페이지를 스크랩하여,
     투자자들이 주목할 만한 특이 공시(계약, 증자, 타법인 등)만 필터링해 반환합니다.
     """
-    url = "https://finance.naver.com/news/news_list.naver?mode=LSS2D&section_id=101&section_id2=258"
+    url = f"{NAVER_FINANCE_URL}/news/news_list.naver?mode=LSS2D&section_id=101&section_id2=258"
     results = []
 
     # 필터링할 관심(특이) 키워드
@@ -3457,8 +3447,7 @@ async def fetch_stocks_for_heatmap(session, item, item_type='sector'):
 
         async with session.get(url, headers=headers, timeout=5) as res:
             text = await res.text('euc-kr', 'replace')
-            from bs4 import BeautifulSoup
-            soup_sub = BeautifulSoup(text, 'html.parser')
+            soup_sub = parse_html(text, "table", class_="type_5")
 
             sub_rows = soup_sub.select("table.type_5 tr")
             for s_row in sub_rows:
@@ -3530,12 +3519,11 @@ async def fetch_stocks_for_heatmap(session, item, item_type='sector'):
 
 async def get_sector_heatmap_data():
     try:
-        url = "https://finance.naver.com/sise/sise_group.naver?type=upjong"
+        url = f"{NAVER_FINANCE_URL}/sise/sise_group.naver?type=upjong"
         async with aiohttp.ClientSession() as session:
-            from bs4 import BeautifulSoup
             async with session.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=5) as res:
                 text = await res.text('euc-kr', 'replace')
-            soup = BeautifulSoup(text, 'html.parser')
+            soup = parse_html(text, "table", class_="type_1")
             rows = soup.select("table.type_1 tr")
 
             candidates = []
@@ -3550,7 +3538,7 @@ async def get_sector_heatmap_data():
                     continue
 
                 sector_name = link.text.strip()
-                sector_url = "https://finance.naver.com" + link['href']
+                sector_url = NAVER_FINANCE_URL + link['href']
                 percent_text = cols[1].text.strip()
 
                 if not sector_name or not percent_text:
@@ -3605,12 +3593,11 @@ async def get_sector_heatmap_data():
 
 async def get_theme_heatmap_data():
     try:
-        url = "https://finance.naver.com/sise/theme.naver"
+        url = f"{NAVER_FINANCE_URL}/sise/theme.naver"
         async with aiohttp.ClientSession() as session:
-            from bs4 import BeautifulSoup
             async with session.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=5) as res:
                 text = await res.text('euc-kr', 'replace')
-            soup = BeautifulSoup(text, 'html.parser')
+            soup = parse_html(text, "table", class_="type_1")
             rows = soup.select("table.type_1 tr")
 
             candidates = []
@@ -3625,7 +3612,7 @@ async def get_theme_heatmap_data():
                     continue
 
                 theme_name = link.text.strip()
-                theme_url = "https://finance.naver.com" + link['href']
+                theme_url = NAVER_FINANCE_URL + link['href']
                 percent_text = cols[1].text.strip()
 
                 if not theme_name or not percent_text:
@@ -4073,7 +4060,6 @@ def get_investor_ranking_data():
     - institution_top: KOSDAQ 거래량 TOP
     """
     import requests
-    from bs4 import BeautifulSoup
     import time
 
     cache_attr = "_investor_ranking_cache"
@@ -4086,7 +4072,7 @@ def get_investor_ranking_data():
     def parse_naver_sise(url, is_rise=False):
         try:
             res = requests.get(url, headers=HEADER, timeout=5)
-            soup = BeautifulSoup(decode_safe(res), "html.parser")
+            soup = parse_html(decode_safe(res), "table", class_="type_2")
             table = soup.select_one("table.type_2")
             if not table:
                 return []
@@ -4156,16 +4142,16 @@ def get_investor_ranking_data():
 
     data = {
         "foreign_sell": parse_naver_sise(
-            "https://finance.naver.com/sise/sise_rise.naver?sosok=0",
+            f"{NAVER_FINANCE_URL}/sise/sise_rise.naver?sosok=0",
             True),
         "institution_sell": parse_naver_sise(
-            "https://finance.naver.com/sise/sise_rise.naver?sosok=1",
+            f"{NAVER_FINANCE_URL}/sise/sise_rise.naver?sosok=1",
             True),
         "foreign_top": parse_naver_sise(
-            "https://finance.naver.com/sise/sise_quant.naver?sosok=0",
+            f"{NAVER_FINANCE_URL}/sise/sise_quant.naver?sosok=0",
             False),
         "institution_top": parse_naver_sise(
-            "https://finance.naver.com/sise/sise_quant.naver?sosok=1",
+            f"{NAVER_FINANCE_URL}/sise/sise_quant.naver?sosok=1",
             False)}
     globals()[cache_attr] = data
     globals()[cache_ts_attr] = time.time()
@@ -4188,10 +4174,10 @@ def get_double_whale_ranking():
     def parse_deal_rank(gubun="9000"):
         results = {}
         for sosok in ["01", "02"]:
-            url = f"https://finance.naver.com/sise/sise_deal_rank_iframe.naver?sosok={sosok}&investor_gubun={gubun}&type=buy"
+            url = f"{NAVER_FINANCE_URL}/sise/sise_deal_rank_iframe.naver?sosok={sosok}&investor_gubun={gubun}&type=buy"
             try:
                 res = requests.get(url, headers=HEADER, timeout=5)
-                soup = BeautifulSoup(decode_safe(res), "html.parser")
+                soup = parse_html(decode_safe(res), "table", class_="type_1")
                 table = soup.select_one("table.type_1")
                 if not table:
                     continue
@@ -4520,7 +4506,7 @@ def get_global_economy_calendar():
             for i in range(7):
                 target_date = datetime.datetime.now() + datetime.timedelta(days=i)
                 target_str = target_date.strftime("%Y%m%d")
-                naver_url = f"https://stock.naver.com/api/securityService/economic/indicator/nations/releaseDate?nationTypeList=KOR&nationTypeList=KOR&page=1&pageSize=30&releaseDate={target_str}"
+                naver_url = f"{NAVER_STOCK_URL}/api/securityService/economic/indicator/nations/releaseDate?nationTypeList=KOR&nationTypeList=KOR&page=1&pageSize=30&releaseDate={target_str}"
                 n_res = requests.get(naver_url, headers=naver_headers, timeout=5)
                 if n_res.status_code == 200:
                     n_data = n_res.json()
@@ -0,0 +1,189 @@
+"""
+👑 백그라운드 작업 리더 선출 (SQLite 리스)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+uvicorn --workers N 또는 배포 중 PM2 인스턴스가 겹치면 startup_event가 프로세스마다
+실행되어 알림/뉴스/브리핑 작업이 N번 발송됩니다.
+
+📌 동작 방식
+  1. 모든 워커가 같은 SQLite DB의 leader_leases 행(name='background')을 두고 경쟁
+  2. 리스가 비었거나 만료(expires_at < now)된 경우에만 원자적 UPSERT로 획득 → term +1
+  3. 리더는 TTL/3 주기로 갱신(heartbeat). 갱신하지 못한 채 만료 시각에 도달하면
+     스스로 강등되어 백그라운드 서비스를 중지 (다른 워커가 만료 후 인계)
+  4. 정상 종료 시 리스를 즉시 만료시켜 다음 워커가 바로 인계
+  5. 웹 요청 처리는 모든 워커가 그대로 담당 → HTTP 처리량만 수평 확장
+
+⚠️ 같은 호스트(같은 DB 파일)를 공유하는 워커 간 선출입니다.
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+LEASE_TTL_SECONDS = float(os.getenv("LEADER_LEASE_TTL", "30"))
+
+
+class LeaderLease:
+    """
+    사용 예:
+        lease = LeaderLease("background")
+        asyncio.create_task(lease.run(on_elected=start_jobs, on_demoted=stop_jobs))
+        ...
+        await asyncio.to_thread(lease.release)   # shutdown
+    """
+
+    def __init__(self, name: str, ttl: float = LEASE_TTL_SECONDS):
+        self.name = name
+        self.ttl = ttl
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.is_leader = False
+        self.term = 0
+        self.expires_at = 0.0
+        self.elected_at: Optional[float] = None
+        self.transitions = 0
+        self._table_ready = False
+
+    # ─── DB ──────────────────────────────────────────────────────────────────
+    def _connect(self):
+        from db_manager import get_db_connection
+        conn = get_db_connection()
+        # 기본 60초 대기는 TTL보다 길다 → 갱신 주기 안에서 포기하도록 단축
+        conn.execute(f"PRAGMA busy_timeout = {int(self.ttl / 3 * 1000)}")
+        return conn
+
+    def _ensure_table(self, conn):
+        if self._table_ready:
+            return
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS leader_leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                term INTEGER NOT NULL DEFAULT 1,
+                acquired_at REAL NOT NULL,
+                renewed_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        conn.commit()
+        self._table_ready = True
+
+    def try_acquire(self) -> bool:
+        """리스 획득 또는 갱신. 현재 보유자이거나 만료된 경우에만 성공 (원자적 UPSERT)"""
+        now = time.time()
+        expires_at = now + self.ttl
+        conn = self._connect()
+        try:
+            self._ensure_table(conn)
+            cur = conn.execute('''
+                INSERT INTO leader_leases (name, holder, term, acquired_at, renewed_at, expires_at)
+                VALUES (?, ?, 1, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    term = CASE WHEN leader_leases.holder = excluded.holder
+                                THEN leader_leases.term ELSE leader_leases.term + 1 END,
+                    acquired_at = CASE WHEN leader_leases.holder = excluded.holder
+                                       THEN leader_leases.acquired_at ELSE excluded.acquired_at END,
+                    holder = excluded.holder,
+                    renewed_at = excluded.renewed_at,
+                    expires_at = excluded.expires_at
+                WHERE leader_leases.holder = excluded.holder OR leader_leases.expires_at < excluded.renewed_at
+            ''', (self.name, self.holder_id, now, now, expires_at))
+            conn.commit()
+            if cur.rowcount != 1:
+                return False
+            row = conn.execute("SELECT term FROM leader_leases WHERE name = ?", (self.name,)).fetchone()
+            self.term = row[0] if row else self.term
+            self.expires_at = expires_at
+            return True
+        finally:
+            conn.close()
+
+    def release(self):
+        """보유 중인 리스를 즉시 만료 (다음 워커가 다음 시도에서 바로 인계)"""
+        if not self.is_leader:
+            return
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE leader_leases SET expires_at = 0 WHERE name = ? AND holder = ?",
+                (self.name, self.holder_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        self.is_leader = False
+        print(f"[Leader] Released '{self.name}' lease (term {self.term})")
+
+    def current_holder(self) -> Optional[dict]:
+        conn = self._connect()
+        try:
+            self._ensure_table(conn)
+            row = conn.execute(
+                "SELECT holder, term, acquired_at, renewed_at, expires_at FROM leader_leases WHERE name = ?",
+                (self.name,),
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        return {
+            "holder": row[0],
+            "term": row[1],
+            "acquired_at": row[2],
+            "renewed_at": row[3],
+            "expires_at": row[4],
+            "expired": row[4] < time.time(),
+        }
+
+    # ─── 선출 루프 ───────────────────────────────────────────────────────────
+    async def run(self, on_elected: Callable[[], Awaitable[None]], on_demoted: Callable[[], Awaitable[None]]):
+        """리스 획득/갱신을 반복하며 리더 전환 시 콜백 호출 (프로세스 수명 동안 실행)"""
+        print(f"[Leader] Candidate {self.holder_id} for '{self.name}' (TTL {self.ttl:.0f}s)")
+        while True:
+            try:
+                try:
+                    held = await asyncio.to_thread(self.try_acquire)
+                except Exception as e:
+                    print(f"[Leader] Lease check failed: {e}")
+                    # DB 일시 장애: 로컬에서 알고 있는 만료 시각까지만 리더 유지
+                    held = self.is_leader and time.time() < self.expires_at
+
+                if held and not self.is_leader:
+                    self.is_leader = True
+                    self.elected_at = time.time()
+                    self.transitions += 1
+                    print(f"[Leader] {self.holder_id} elected for '{self.name}' (term {self.term})")
+                    await on_elected()
+                elif not held and self.is_leader:
+                    self.is_leader = False
+                    self.elected_at = None
+                    self.transitions += 1
+                    print(f"[Leader] {self.holder_id} lost '{self.name}' lease. Stopping background services.")
+                    await on_demoted()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Leader] Election loop error: {e}")
+            await asyncio.sleep(self.ttl / 3)
+
+    def get_status(self) -> dict:
+        try:
+            holder = self.current_holder()
+        except Exception as e:
+            holder = {"error": str(e)}
+        return {
+            "name": self.name,
+            "ttl": self.ttl,
+            "holder_id": self.holder_id,
+            "is_leader": self.is_leader,
+            "term": self.term,
+            "elected_at": self.elected_at,
+            "transitions": self.transitions,
+            "lease": holder,
+        }
+
+
+# ─── 전역 인스턴스 ──────────────────────────────────────────────────────────
+background_lease = LeaderLease("background")
@@ -9,7 +9,17 @@ except Exception:
 
 import os
 import time
+_BOOT_STARTED = time.perf_counter()
+import uuid
+import random
 import asyncio
+import logging
+
+# [Logging] 라우터 import 전에 설정해야 각 모듈의 logging.basicConfig가 무시됨
+# print 진단 로그 포함 전부 비동기 큐 → JSON 한 줄 (structured_logging 참고)
+from structured_logging import setup_logging, request_id_var
+setup_logging()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -31,11 +41,16 @@ from routes.seo import router as seo_router
 from routes.weekend import router as weekend_router
 
 
+# [Response] orjson 직렬화(numpy/pandas/NaN 안전) + br/gzip 압축 (response_encoding 참고)
+from response_encoding import CompressionMiddleware, FastJSONResponse, register_jsonable_encoders
+register_jsonable_encoders()
+
 # Initialize FastAPI
 app = FastAPI(
     title="AI Stock Analyst API",
     version="v3.6.40-STABLE",
-    description="최적의 안정성과 속도를 위해 모든 군더더기를 제거한 원상 복구 버전"
+    description="최적의 안정성과 속도를 위해 모든 군더더기를 제거한 원상 복구 버전",
+    default_response_class=FastJSONResponse
 )
 
 # [Strict CORS Policy for Security]
@@ -56,12 +71,70 @@ app.add_middleware(
 # [Security Watchdog Middleware]
 from security_middleware import SecurityWatchdogMiddleware
 app.add_middleware(SecurityWatchdogMiddleware)
+app.add_middleware(CompressionMiddleware)
+
+# [Metrics] 외부 HTTP 호출(requests/aiohttp)을 호스트별 지연으로 기록 → /api/system/metrics
+from metrics import instrument_http_clients, observe_request
+instrument_http_clients()
+
+# [Replay] UPSTREAM_MODE=replay|record|auto 일 때만 외부 호출을 fixture로 기록/재생 (로컬 재현·부하 테스트용)
+if os.getenv("UPSTREAM_MODE", "off").lower() != "off":
+    from upstream_replay import upstream_replay
+    upstream_replay.install()
+
+# 접근 로그: 오류(4xx/5xx)와 느린 요청은 전부, 정상 요청은 표본만 기록
+ACCESS_LOG_SAMPLE = float(os.getenv("ACCESS_LOG_SAMPLE", "0.05"))
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+access_logger = logging.getLogger("access")
 
 @app.middleware("http")
 async def log_requests(request, call_next):
-    print(f"[Request] {request.method} {request.url.path}")
-    response = await call_next(request)
-    print(f"[Response] {request.method} {request.url.path} -> {response.status_code}")
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:12]
+    token = request_id_var.set(request_id)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        # 라우트 템플릿(/api/analysis/stock/{symbol}) 단위로 집계해야 종목 수만큼 시계열이 늘지 않음
+        route = request.scope.get("route")
+        observe_request(request.method, getattr(route, "path", "unmatched"), status, elapsed)
+        duration_ms = round(elapsed * 1000, 1)
+        if status >= 400 or duration_ms >= ACCESS_LOG_SLOW_MS or random.random() < ACCESS_LOG_SAMPLE:
+            access_logger.log(
+                logging.WARNING if status >= 500 else logging.INFO,
+                f"{request.method} {request.url.path} -> {status} ({duration_ms}ms)",
+                extra={"method": request.method, "path": request.url.path, "status": status, "duration_ms": duration_ms},
+            )
+        request_id_var.reset(token)
+
+@app.middleware("http")
+async def profile_request(request, call_next):
+    """X-Profile: 1 + 관리자 키 → 이 요청 처리 구간만 샘플링, 결과는 X-Profile-Id로 조회 (/api/system/admin/profile/{id})"""
+    if request.headers.get("x-profile") != "1":
+        return await call_next(request)
+    from fastapi import HTTPException
+    from routes.system import check_admin_auth
+    try:
+        check_admin_auth(request.headers.get("x-admin-key"))
+    except HTTPException:
+        return await call_next(request)
+
+    from profiler import sampling_profiler
+    stop = sampling_profiler.start_background()
+    if stop is None:
+        response = await call_next(request)
+        response.headers["X-Profile-Id"] = "busy"
+        return response
+    try:
+        response = await call_next(request)
+    finally:
+        profile = await asyncio.to_thread(stop, f"{request.method} {request.url.path}")
+    response.headers["X-Profile-Id"] = profile["id"]
     return response
 
 # [Route Registration]
@@ -108,7 +181,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.get("/api/etf-detail/{symbol}", tags=["Compatibility"])
 async def legacy_etf_detail(symbol: str):
     from etf_detail import get_etf_detail
-    return get_etf_detail(symbol)
+    return FastJSONResponse(get_etf_detail(symbol))
 
 from auth import AttendanceRequest, attendance_check, get_user_profile
 
@@ -129,9 +202,12 @@ app.include_router(sockets_router, tags=["WebSocket"])
 async def startup_event():
     import concurrent.futures
     loop = asyncio.get_running_loop()
-    loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=50))
+    default_executor = concurrent.futures.ThreadPoolExecutor(max_workers=50)
+    loop.set_default_executor(default_executor)
     """서버 생존(Port Binding)을 최우선으로 하여 가장 쾌적하게 기동합니다."""
     print(f"\n[Startup] Nuclear Stability Mode active on PID: {os.getpid()}")
+    # 라우터 import + 앱 구성 시간 (무거운 의존성은 각 라우트 첫 사용 시 로드 → python import_audit.py)
+    import_ms = (time.perf_counter() - _BOOT_STARTED) * 1000
     
     # 1. 필수 DB 초기화 (비동기 처리로 부팅 속도 극대화)
     try:
@@ -142,6 +218,20 @@ async def startup_event():
     except Exception as e:
         print(f"[Startup] DB Init Warning: {e}")
 
+    # uvicorn은 startup 이벤트가 끝나야 포트를 바인딩하므로 여기까지가 기동 시간
+    budget_ms = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+    ready_ms = (time.perf_counter() - _BOOT_STARTED) * 1000
+    print(f"[Startup] imports {import_ms:.0f}ms, ready {ready_ms:.0f}ms (import budget {budget_ms:.0f}ms)")
+    if import_ms > budget_ms:
+        logging.getLogger("startup").warning(
+            f"Import time {import_ms:.0f}ms exceeds budget {budget_ms:.0f}ms - run `python import_audit.py` to find the new eager import"
+        )
+
+    # [Metrics] 기본 스레드풀 대기열 깊이 + 이벤트 루프 지연 샘플링 (워커별)
+    from metrics import instrument_executor, sample_event_loop_lag
+    instrument_executor(default_executor)
+    asyncio.create_task(sample_event_loop_lag())
+
     # 2. 배경 서비스는 서버가 완전히 안정화되고 입구가 열린 40초 뒤에 아주 천천히 깨웁니다.
     async def gradual_background_startup():
         await asyncio.sleep(40)
@@ -150,267 +240,220 @@ async def startup_event():
             from background_indexer import background_indexer
             asyncio.create_task(background_indexer.run_forever())
         except: pass
-        
-        await asyncio.sleep(5)
-        try:
-            print("[Background] Starting price alerts & batch news...")
-            from price_alerts import price_alert_monitor, create_price_alerts_tables
-            await asyncio.to_thread(create_price_alerts_tables)
-            asyncio.create_task(price_alert_monitor.start())
-            print("[Background] price_alert_monitor task created.")
-        except Exception as e:
-            print(f"[Background] Error starting price alerts: {e}")
-            traceback.print_exc()
-
-        try:
-            # ✅ [v7.0.0] 1만명 규모 배치 뉴스 시스템 (공식 네이버 Open API)
-            # 기존: 이용자별 × 종목별 → API 폭주 (비효율)
-            # 개선: 종목별 1회 수집 → 이용자별 분류 발송 (API 최소화)
-            print("[Background] Starting batch news system...")
-            from batch_news_system import batch_news_system
-            asyncio.create_task(batch_news_system.start(interval_minutes=5))
-            print("[Background] batch_news_system task created. (5 min interval)")
-        except Exception as e:
-            print(f"[Background] Error starting batch news system: {e}")
-            traceback.print_exc()
-
-        try:
-            # Auto Price Alert Monitor
-            from auto_price_alerts import AutoPriceMonitor
-            auto_price_monitor = AutoPriceMonitor()
-            asyncio.create_task(auto_price_monitor.start())
-            print("[Background] auto_price_monitor task created.")
-            
-            # After Hours Alert Monitor
-            from after_hours_alerts import after_hours_alert_loop
-            asyncio.create_task(after_hours_alert_loop())
-            print("[Background] after_hours_alert_loop task created.")
-        except Exception as e:
-            print(f"[Background] Error starting auto price alerts: {e}")
-            traceback.print_exc()
-
-        try:
-            # [BugFix] alerts.json 기반 사용자 설정 알림 체크 루프 (60초마다)
-            async def check_alerts_loop():
-                print("[AlertsLoop] JSON-based alert checker started (60s interval)")
-                await asyncio.sleep(30)  # 서버 안정화 후 시작
-                while True:
-                    try:
-                        from alerts import check_alerts
-                        triggered = await asyncio.to_thread(check_alerts)
-                        if triggered:
-                            print(f"[AlertsLoop] {len(triggered)} alert(s) triggered and sent!")
-                    except Exception as e:
-                        print(f"[AlertsLoop] Error: {e}")
-                    await asyncio.sleep(60)
-            asyncio.create_task(check_alerts_loop())
-            print("[Background] check_alerts_loop task created.")
-        except Exception as e:
-            print(f"[Background] Error starting check_alerts_loop: {e}")
-            traceback.print_exc()
-
-        try:
-            # [Auto-Heal Scraper] 매일 1회 (혹은 12시간마다) KIND 크롤러 헬스체크
-            async def auto_heal_loop():
-                print("[AutoHealLoop] KIND Scraper health checker started")
-                await asyncio.sleep(60) # 서버 안정화 후 시작
-                while True:
-                    try:
-                        from auto_heal_scraper import run_health_check_and_heal
-                        await asyncio.to_thread(run_health_check_and_heal)
-                    except Exception as e:
-                        print(f"[AutoHealLoop] Error: {e}")
-                    # 12시간(43200초) 대기
-                    await asyncio.sleep(43200)
-            asyncio.create_task(auto_heal_loop())
-            print("[Background] auto_heal_loop task created.")
-        except Exception as e:
-            print(f"[Background] Error starting auto_heal_loop: {e}")
-            traceback.print_exc()
-
-        try:
-            # [Theme Precacher] 인기 테마 10개를 3시간마다 사전 캐싱하여 응답 속도 최적화
-            async def theme_precache_loop():
-                print("[ThemePrecacheLoop] Popular theme precacher started")
-                await asyncio.sleep(90) # 서버 안정화 후 시작
-                
-                popular_themes = [
-                    "온디바이스AI", "비만치료제", "전력기기", "자율주행", "K-푸드", 
-                    "화장품", "로봇", "원전", "HBM", "CXL", "유리기판", 
-                    "전고체배터리", "우주항공", "데이터센터", "양자암호", 
-                    "핵융합", "저PBR", "가상화폐", "신재생에너지", "비대면진료", 
-                    "웹툰", "방위산업", "미용기기", "인공지능", "반도체"
-                ]
-                
-                while True:
-                    try:
-                        from db_manager import get_cached_theme
-                        from ai_analysis import analyze_theme
-                        
-                        for theme in popular_themes:
-                            cached = await asyncio.to_thread(get_cached_theme, theme)
-                            if not cached:
-                                print(f"[ThemePrecacheLoop] Precaching uncached/expired theme: {theme}")
-                                # analyze_theme 내부에 save_theme_cache 로직이 있어 자동 캐싱됨
-                                await asyncio.to_thread(analyze_theme, theme)
-                                # 연속적인 API 호출로 인한 Rate Limit 방지용 대기
-                                await asyncio.sleep(10)
-                            else:
-                                print(f"[ThemePrecacheLoop] Theme '{theme}' is already cached.")
-                                
-                    except Exception as e:
-                        print(f"[ThemePrecacheLoop] Error: {e}")
-                        
-                    # 3시간(10800초) 대기 후 다시 확인 (DB 캐시 수명이 3시간이므로)
-                    await asyncio.sleep(10800)
-                    
-            asyncio.create_task(theme_precache_loop())
-            print("[Background] theme_precache_loop task created.")
-        except Exception as e:
-            print(f"[Background] Error starting theme_precache_loop: {e}")
-            traceback.print_exc()
-
-        try:
-            # [Signal Precacher] 최근 글로벌 마켓 시그널 상위 20개 브리핑 사전 캐싱 (타임아웃 방지)
-            async def signal_precache_loop():
-                print("[SignalPrecacheLoop] Global market signal precacher started")
-                await asyncio.sleep(120) # 서버 안정화 후 시작
-                
-                while True:
-                    try:
-                        from db_manager import get_recent_signals
-                        from turbo_engine import turbo_engine
-                        from routes.signals import get_signal_briefing
-                        
-                        # 최근 시그널 20개 가져오기
-                        signals = await asyncio.to_thread(get_recent_signals, 20)
-                        
-                        # 중복되지 않는 symbol 목록 추출
-                        symbols = list(set([s.get("symbol") for s in signals if s.get("symbol")]))
-                        
-                        for sym in symbols:
-                            cache_key = f"signal_briefing_{sym}"
-                            cached = turbo_engine.get_cache(cache_key)
-                            
-                            if not cached:
-                                print(f"[SignalPrecacheLoop] Precaching uncached signal briefing: {sym}")
-                                # get_signal_briefing 내부에 AI 분석 및 캐싱 로직이 포함됨
-                                await asyncio.to_thread(get_signal_briefing, sym)
-                                # AI 분석이 무겁기 때문에 종목 간 15초 대기
-                                await asyncio.sleep(15)
-                                
-                    except Exception as e:
-                        print(f"[SignalPrecacheLoop] Error: {e}")
-                        
-                    # 1시간 대기 후 재스캔
-                    await asyncio.sleep(3600)
-                    
-            asyncio.create_task(signal_precache_loop())
-            print("[Background] signal_precache_loop task created.")
-        except Exception as e:
-            print(f"[Background] Error starting signal_precache_loop: {e}")
-            traceback.print_exc()
-
-        # 4. 장마감 결산 리포트 서비스 시작 (KST 15:40 / 06:10)
-        try:
-            from scheduler_service import start_scheduler
-            start_scheduler()
-        except: pass
 
-        # 5. 공시 및 시간별 브리핑 스케줄러 시작
         try:
-            from scheduler import disclosure_scheduler_loop, hourly_briefing_scheduler_loop, auto_blog_scheduler_loop, watchdog_scheduler_loop, seo_blog_scheduler_loop, google_indexer_scheduler_loop, dividend_alerts_scheduler_loop, weekly_blog_bot_scheduler_loop, weekend_report_scheduler_loop, cleanup_alerts_scheduler_loop, cleanup_system_logs_scheduler_loop, fomo_alert_scheduler_loop, dormant_user_scheduler_loop, whale_alert_scheduler_loop, dart_whale_scheduler_loop, sec_whale_scheduler_loop, premium_report_scheduler_loop
-            from ranking_calculator import ranking_calculator_loop
-            
-            asyncio.create_task(disclosure_scheduler_loop())
-            asyncio.create_task(hourly_briefing_scheduler_loop())
-            asyncio.create_task(auto_blog_scheduler_loop())
-            asyncio.create_task(seo_blog_scheduler_loop())
-            asyncio.create_task(watchdog_scheduler_loop())
-            asyncio.create_task(cleanup_alerts_scheduler_loop())
-            asyncio.create_task(cleanup_system_logs_scheduler_loop())
-            asyncio.create_task(google_indexer_scheduler_loop())
-            asyncio.create_task(dividend_alerts_scheduler_loop())
-            asyncio.create_task(weekly_blog_bot_scheduler_loop())
-            asyncio.create_task(ranking_calculator_loop())
-            asyncio.create_task(weekend_report_scheduler_loop())
-            asyncio.create_task(fomo_alert_scheduler_loop())
-            asyncio.create_task(dormant_user_scheduler_loop())
-            # asyncio.create_task(whale_alert_scheduler_loop())       # 🇰🇷 외국인 순매수 1위 (30분) - 중복 발송 버그로 인해 비활성화 (scheduler_service.py에서 통합 처리)
-            # asyncio.create_task(dart_whale_scheduler_loop())        # 🇰🇷 DART 대량보유/임원거래 (5분) - 중복 발송 버그로 인해 비활성화 (scheduler.py의 disclosure_bot이 통합 처리함)
-            asyncio.create_task(sec_whale_scheduler_loop())         # 🇺🇸 SEC Form4/13F (5분)
-            asyncio.create_task(premium_report_scheduler_loop())    # 💎 VIP 프리미엄 리포트 (15:45)
+            # [Symbol Index] 종목 검색 인덱스 구축 + 상장 목록(KRX/US) 반영 → 종목명 해석 시 원격 검색 최소화
+            from symbol_index import symbol_index
+            asyncio.create_task(asyncio.to_thread(symbol_index.load_listing))
         except Exception as e:
-            print(f"Error starting schedulers: {e}")
-
-        # 6. 전광판 지수 상시 정찰대 (15초마다 미리 수집하여 0초 응답 달성)
-        async def market_ticker_warmer():
+            print(f"[Background] Error starting symbol index: {e}")
+
+        # 3. 주기 작업은 통합 스케줄러(job_scheduler)에 등록 (실행은 리더 워커에서만)
+        from job_scheduler import job_scheduler, every
+
+        async def check_alerts_job():
+            """[BugFix] alerts.json 기반 사용자 설정 알림 체크"""
+            from alerts import check_alerts
+            triggered = await asyncio.to_thread(check_alerts)
+            if triggered:
+                print(f"[AlertsLoop] {len(triggered)} alert(s) triggered and sent!")
+
+        def auto_heal_job():
+            """[Auto-Heal Scraper] KIND 크롤러 헬스체크"""
+            from auto_heal_scraper import run_health_check_and_heal
+            run_health_check_and_heal()
+
+        async def theme_precache_job():
+            """[Theme Precacher] 인기 테마 사전 캐싱 (DB 캐시 수명 3시간)"""
+            from db_manager import get_cached_theme
+            from ai_analysis import analyze_theme
+
+            popular_themes = [
+                "온디바이스AI", "비만치료제", "전력기기", "자율주행", "K-푸드", 
+                "화장품", "로봇", "원전", "HBM", "CXL", "유리기판", 
+                "전고체배터리", "우주항공", "데이터센터", "양자암호", 
+                "핵융합", "저PBR", "가상화폐", "신재생에너지", "비대면진료", 
+                "웹툰", "방위산업", "미용기기", "인공지능", "반도체"
+            ]
+            for theme in popular_themes:
+                cached = await asyncio.to_thread(get_cached_theme, theme)
+                if not cached:
+                    print(f"[ThemePrecacheLoop] Precaching uncached/expired theme: {theme}")
+                    # analyze_theme 내부에 save_theme_cache 로직이 있어 자동 캐싱됨
+                    await asyncio.to_thread(analyze_theme, theme)
+                    # 연속적인 API 호출로 인한 Rate Limit 방지용 대기
+                    await asyncio.sleep(10)
+
+        async def signal_precache_job():
+            """[Signal Precacher] 최근 글로벌 마켓 시그널 상위 20개 브리핑 사전 캐싱 (타임아웃 방지)"""
+            from db_manager import get_recent_signals
+            from turbo_engine import turbo_engine
+            from routes.signals import get_signal_briefing
+
+            signals = await asyncio.to_thread(get_recent_signals, 20)
+            # 중복되지 않는 symbol 목록 추출
+            symbols = list(set([s.get("symbol") for s in signals if s.get("symbol")]))
+            for sym in symbols:
+                if not turbo_engine.get_cache(f"signal_briefing_{sym}"):
+                    print(f"[SignalPrecacheLoop] Precaching uncached signal briefing: {sym}")
+                    # get_signal_briefing 내부에 AI 분석 및 캐싱 로직이 포함됨
+                    await asyncio.to_thread(get_signal_briefing, sym)
+                    # AI 분석이 무겁기 때문에 종목 간 15초 대기
+                    await asyncio.sleep(15)
+
+        def market_ticker_warm_job():
+            """전광판 지수 상시 정찰대 (미리 수집하여 0초 응답 달성)"""
             from stock_data import get_market_data
-            print("[Turbo] Market Ticker Warmer Service Started.")
-            while True:
-                try:
-                    await asyncio.to_thread(get_market_data)
-                except: pass
-                await asyncio.sleep(15) 
-        
-        asyncio.create_task(market_ticker_warmer())
+            get_market_data()
 
-        print("[Background] All services active.")
-
-        # 4. [v5.4.0] 개선된 글로벌 랭킹 캐시 워밍업 (Safe Sequential Mode)
-        async def ranking_cache_warmer():
-            # 소켓 레벨의 타임아웃을 3.0초로 설정하여 외부 통신 무한 대기 방지 (데드락 예방 핵심)
-            import socket
-            socket.setdefaulttimeout(3.0)
-            
-            print("[Turbo] Global Ranking Cache Warmer Started in Safe Mode.")
+        async def ranking_cache_warm_job():
+            """[v5.4.0] 글로벌 랭킹 캐시 워밍업 (Safe Sequential Mode)"""
             from rank_data import get_global_ranking, get_naver_ranking, crawl_naver_movers, get_etf_ranking
             from korea_data import get_market_insights_data
-            
+
+            start_time = time.time()
             combos = [
                 ("KOSPI", "trading_volume"),
                 ("KOSPI", "trading_amount"),
                 ("KOSPI", "popular_search"),
                 ("USA",   "trading_volume"),
             ]
-            
-            while True:
-                start_time = time.time()
-                try:
-                    # [Safety Fix] 스레드 폭주 및 데드락을 방지하기 위해 병렬(gather) 실행 대신
-                    # 0.5초의 텀을 두고 하나씩 안전하게 캐시를 갱신합니다. (1vCPU 최적화)
-                    for market, cat in combos:
-                        await asyncio.to_thread(get_global_ranking, market, cat)
-                        await asyncio.sleep(0.5)
-                    
-                    # ETF 랭킹 워밍업
-                    await asyncio.to_thread(get_etf_ranking, "KR")
-                    await asyncio.sleep(0.5)
-                    await asyncio.to_thread(get_etf_ranking, "US")
-                    await asyncio.sleep(0.5)
-                    
-                    # 국내 인사이트 요약 데이터
-                    await asyncio.to_thread(get_market_insights_data)
-                    await asyncio.sleep(0.5)
-                    
-                    # 거래 상위 랭킹 및 변동주 크롤러 기동
-                    await asyncio.to_thread(get_naver_ranking, "krx", "quant")
-                    await asyncio.sleep(0.5)
-                    await asyncio.to_thread(crawl_naver_movers)
-                    
-                    duration = time.time() - start_time
-                    print(f"[Turbo] Cache Warm-up Completed in {duration:.1f}s.")
-                except Exception as e:
-                    print(f"[Turbo] Cache Warmer Critical Error: {e}")
+            # [Safety Fix] 스레드 폭주 및 데드락을 방지하기 위해 병렬(gather) 실행 대신
+            # 0.5초의 텀을 두고 하나씩 안전하게 캐시를 갱신합니다. (1vCPU 최적화)
+            for market, cat in combos:
+                await asyncio.to_thread(get_global_ranking, market, cat)
+                await asyncio.sleep(0.5)
+
+            # ETF 랭킹 워밍업
+            await asyncio.to_thread(get_etf_ranking, "KR")
+            await asyncio.sleep(0.5)
+            await asyncio.to_thread(get_etf_ranking, "US")
+            await asyncio.sleep(0.5)
+
+            # 국내 인사이트 요약 데이터
+            await asyncio.to_thread(get_market_insights_data)
+            await asyncio.sleep(0.5)
+
+            # 거래 상위 랭킹 및 변동주 크롤러 기동
+            await asyncio.to_thread(get_naver_ranking, "krx", "quant")
+            await asyncio.sleep(0.5)
+            await asyncio.to_thread(crawl_naver_movers)
+            print(f"[Turbo] Cache Warm-up Completed in {time.time() - start_time:.1f}s.")
+
+        # 소켓 레벨의 타임아웃을 3.0초로 설정하여 외부 통신 무한 대기 방지 (데드락 예방 핵심)
+        import socket
+        socket.setdefaulttimeout(3.0)
+
+        try:
+            import scheduler
+            import scheduler_service
+            from ranking_calculator import calculate_rankings
+            from heatmap_service import heatmap_service
+
+            job_scheduler.add_job("check_alerts", check_alerts_job, every(60, start_delay=30))
+            job_scheduler.add_job("auto_heal_scraper", auto_heal_job, every(43200, start_delay=60))
+            # 공유 SQLite 캐시를 채우는 작업 → 리더만 실행
+            job_scheduler.add_job("theme_precache", theme_precache_job, every(10800, start_delay=90), heavy=True)
+            job_scheduler.add_job("signal_precache", signal_precache_job, every(3600, start_delay=120), heavy=True)
+            # 프로세스 메모리 캐시(turbo_engine) 워머는 워커마다 실행 (leader_only=False)
+            job_scheduler.add_job("market_ticker_warmer", market_ticker_warm_job, every(15), leader_only=False)
+            job_scheduler.add_job("ranking_cache_warmer", ranking_cache_warm_job, every(120), leader_only=False)
+            job_scheduler.add_job("ranking_calculator", calculate_rankings, every(300))
+            # 히트맵 구성 종목/등락률도 프로세스 메모리 → 워커마다 갱신 (리더에서만 돌면 나머지 워커는 늘 기존 크롤링 경로)
+            job_scheduler.add_job("heatmap_constituents", heatmap_service.constituents_job, every(1800, start_delay=45), heavy=True, leader_only=False)
+            job_scheduler.add_job("heatmap_quotes", heatmap_service.quotes_job, every(30, start_delay=60), leader_only=False)
+            job_scheduler.add_job("job_history_cleanup", job_scheduler.cleanup_history, every(86400, start_delay=300))
+
+            # 장마감 결산 리포트 / 시장 이벤트 알림 (KST 15:40 / 06:10 등)
+            scheduler_service.register_jobs(job_scheduler)
+            # 공시 및 시간별 브리핑 / 블로그 / 고래 알림
+            scheduler.register_jobs(job_scheduler)
+        except Exception as e:
+            print(f"Error registering scheduler jobs: {e}")
+            traceback.print_exc()
+
+        # 스케줄러 루프는 모든 워커에서 기동 (리더 전용 작업은 리스 획득 후 set_leader(True) 로 활성화)
+        # 주기 작업 실행 시각/소요 시간/이력은 /api/system/admin/jobs
+        job_scheduler.start()
+
+        # 4. 알림/뉴스/브리핑 발송 서비스는 리더 워커 1개에서만 실행
+        #    (uvicorn --workers N / PM2 배포 중첩 시 중복 발송 방지, 리스는 leader_lease 참고)
+        leader_monitors = []
+        leader_tasks = []
+
+        async def start_leader_services():
+            await asyncio.sleep(5)
+            try:
+                print("[Background] Starting price alerts & batch news...")
+                from price_alerts import price_alert_monitor, create_price_alerts_tables
+                await asyncio.to_thread(create_price_alerts_tables)
+                leader_monitors.append(price_alert_monitor)
+                leader_tasks.append(asyncio.create_task(price_alert_monitor.start()))
+                print("[Background] price_alert_monitor task created.")
+            except Exception as e:
+                print(f"[Background] Error starting price alerts: {e}")
+                traceback.print_exc()
+
+            try:
+                # ✅ [v7.0.0] 1만명 규모 배치 뉴스 시스템 (공식 네이버 Open API)
+                # 기존: 이용자별 × 종목별 → API 폭주 (비효율)
+                # 개선: 종목별 1회 수집 → 이용자별 분류 발송 (API 최소화)
+                print("[Background] Starting batch news system...")
+                from batch_news_system import batch_news_system
+                leader_monitors.append(batch_news_system)
+                leader_tasks.append(asyncio.create_task(batch_news_system.start(interval_minutes=5)))
+                print("[Background] batch_news_system task created. (5 min interval)")
+            except Exception as e:
+                print(f"[Background] Error starting batch news system: {e}")
+                traceback.print_exc()
+
+            try:
+                # Auto Price Alert Monitor
+                from auto_price_alerts import AutoPriceMonitor
+                auto_price_monitor = AutoPriceMonitor()
+                leader_monitors.append(auto_price_monitor)
+                leader_tasks.append(asyncio.create_task(auto_price_monitor.start()))
+                print("[Background] auto_price_monitor task created.")
                 
-                # 다음 주기까지 대기 (주기 2분 유지)
-                    await asyncio.sleep(max(30, 120 - (time.time() - start_time)))
+                # After Hours Alert Monitor
+                from after_hours_alerts import after_hours_alert_loop
+                leader_tasks.append(asyncio.create_task(after_hours_alert_loop()))
+                print("[Background] after_hours_alert_loop task created.")
+            except Exception as e:
+                print(f"[Background] Error starting auto price alerts: {e}")
+                traceback.print_exc()
+
+            job_scheduler.set_leader(True)
+            print("[Background] All leader services active.")
+
+        async def stop_leader_services():
+            for monitor in leader_monitors:
+                monitor.stop()
+            for task in leader_tasks:
+                task.cancel()
+            leader_monitors.clear()
+            leader_tasks.clear()
+            job_scheduler.set_leader(False)
+
+        from leader_lease import background_lease
+        asyncio.create_task(background_lease.run(start_leader_services, stop_leader_services))
+        print("[Background] Worker services active. Waiting for leader election...")
 
-        # [v6.5.0] Safe Mode로 개선되어 활성화
-        asyncio.create_task(ranking_cache_warmer())
 
     asyncio.create_task(gradual_background_startup())
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """리더 리스를 즉시 반납하여 다른 워커가 백그라운드 작업을 바로 인계하도록 함"""
+    try:
+        from leader_lease import background_lease
+        await asyncio.to_thread(background_lease.release)
+    except Exception as e:
+        print(f"[Shutdown] Lease release failed: {e}")
+
+    from structured_logging import shutdown_logging
+    shutdown_logging()
+
 @app.get("/")
 def read_root():
     return {"status": "success", "message": "Resilient API is Online."}
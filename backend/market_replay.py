@@ -0,0 +1,754 @@
+"""
+📼 시장 리플레이 엔진 (알림 파이프라인 스트레스 테스트)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+녹화/합성 틱을 수천 종목 규모로 배속 재생하여, 알림 모니터들이 실제로 쓰는 시세 조회 경계에 그대로 주입합니다.
+장이 열려 있지 않아도 급등락·52주 신고가·시간외 상한가 상황을 만들어 모니터 코드를 수정 없이 돌립니다.
+
+    python market_replay.py --symbols 2000 --users 5000 --speed 60        # 합성 1시간 장을 1분에 재생
+    python market_replay.py --speed 0 --monitors price,auto               # 대기 없이 최대 속도 (lockstep)
+    python market_replay.py --crash --users 50000                         # 전 종목 급락일, 사용자 10배
+    python market_replay.py --ticks crash_day.jsonl --speed 10            # 녹화 틱 재생
+    python market_replay.py --save-tape crash_day.jsonl --crash           # 합성 테이프만 저장 (재현용)
+    python market_replay.py --report .bench/replay.json                   # 결과 JSON 저장
+
+📌 대상 모니터 (코드 그대로, poll 주기는 각 모니터 설정값을 장중 시간 기준으로 사용)
+   price        price_alerts.PriceAlertMonitor.check_all_alerts      손절/익절/목표가
+   auto         auto_price_alerts.AutoPriceMonitor.check_all_symbols ±5% 급등락, 52주 신고가, 거래량 급증
+   after_hours  after_hours_alerts.check_after_hours_limit           시간외 +9% (테이프 끝에서 1회)
+   legacy       alerts.check_alerts                                  alerts.json PRICE 알림
+📌 교체 경계: korea_data.get_naver_stock_info / yfinance / firebase_config 발송 함수 / 장 운영시간 판정 / DB(임시 SQLite)
+📌 틱 형식 (JSONL 한 줄 = 한 틱, 또는 같은 헤더의 CSV)
+   ts(장 시작 후 초), symbol, price, prev_close, high_52 [, volume_ratio, nxt_change_pct, name]
+📌 측정
+   - 지연: 조건을 만든 틱 도착 → FCM 발송 함수 호출(enqueue), wall ms / 장중 시간 기준 초(detect lag)
+   - 처리량: 틱/s, 발송/s, 모니터 1회 순회 시간과 poll 주기 초과(overrun) 횟수
+   - 중복 억제: 같은 (채널, 이벤트, 종목, 토큰)이 2번 이상 나가면 위반
+   - 누락: 테이프상 조건을 충족한 관심종목 중 알림이 한 번도 나가지 않은 (종목, 이벤트)
+⚠️ 실제 푸시/시세 네트워크 호출 없음. 의존성이 없는 모니터는 SKIP (사유 출력)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import types
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# db_manager는 import 시점에 DB_PATH를 읽으므로 어떤 로컬 모듈보다 먼저 임시 DB로 고정
+_REPLAY_DIR = tempfile.mkdtemp(prefix="market_replay_")
+os.environ["DB_PATH"] = os.path.join(_REPLAY_DIR, "replay.db")
+
+MONITORS = ("price", "auto", "after_hours", "legacy")
+DEFAULT_POLL = {"price": 10.0, "auto": 300.0, "legacy": 60.0}
+
+# auto_price_alerts 제목 접두사 -> 이벤트 이름
+AUTO_EVENTS = {
+    "🔥 [급등 포착]": "surge",
+    "📉 [급락 포착]": "drop",
+    "🏆 [52주 신고가 경신]": "high_52",
+    "💥 [거래량 급증 포착]": "vol_spike",
+    "🎯 [보조지표 과매도 진입]": "rsi_30",
+}
+
+
+def _clean(symbol) -> str:
+    return str(symbol or "").split(".")[0].upper()
+
+
+# ─── 틱 테이프 ───────────────────────────────────────────────────────────────
+def _listed_codes(size: int) -> List[Tuple[str, str]]:
+    try:
+        from stock_names import STOCK_MAP
+        listed = [(code, name) for name, code in STOCK_MAP.items()
+                  if isinstance(code, str) and code.isdigit() and len(code) == 6]
+    except ImportError:
+        listed = []
+    seen, pairs = set(), []
+    for code, name in listed:
+        if code not in seen:
+            seen.add(code)
+            pairs.append((code, name))
+    # 실제 종목 수가 모자라면 9로 시작하는 가상 코드로 채움
+    i = 0
+    while len(pairs) < size:
+        code = f"9{i:05d}"
+        i += 1
+        if code not in seen:
+            pairs.append((code, f"가상종목{i}"))
+    return pairs[:size]
+
+
+class SyntheticTape:
+    """
+    합성 장중 테이프: 종목별 랜덤 워크 + 일부 종목에 급등/급락/52주 신고가 충격을 주입
+    충격은 ramp 동안 선형으로 목표 등락률까지 이동한 뒤 유지 (poll 주기 사이에 사라지지 않도록)
+    """
+
+    def __init__(self, symbols: int = 2000, duration: float = 3600.0, tick_interval: float = 5.0,
+                 tick_ratio: float = 0.3, shock_ratio: float = 0.05, after_hours_ratio: float = 0.01,
+                 crash: bool = False, ramp: float = 60.0, seed: int = 7):
+        self.duration = duration
+        self.tick_interval = tick_interval
+        self.tick_ratio = tick_ratio
+        self.ramp = ramp
+        self.seed = seed
+        rng = random.Random(seed)
+
+        self.universe: List[dict] = []
+        for code, name in _listed_codes(symbols):
+            prev = round(rng.uniform(1_000, 200_000), -1)
+            self.universe.append({
+                "symbol": code, "name": name, "prev_close": prev,
+                "high_52": round(prev * rng.uniform(1.06, 1.6), -1),
+                "volume_ratio": round(rng.uniform(0.5, 1.5), 2),
+                "nxt_change_pct": round(rng.uniform(-2.0, 2.0), 2),
+            })
+
+        # symbol -> (시작 시각, 종류, 목표 등락률 %)
+        self.shocks: Dict[str, Tuple[float, str, float]] = {}
+        shocked = self.universe if crash else rng.sample(self.universe, int(len(self.universe) * shock_ratio))
+        for base in shocked:
+            start = rng.uniform(0, duration * (0.5 if crash else 0.8))
+            kind = "drop" if crash and rng.random() < 0.9 else rng.choice(("surge", "drop", "high_52"))
+            if kind == "surge":
+                target = rng.uniform(5.5, 12.0)
+            elif kind == "drop":
+                target = -rng.uniform(5.5, 12.0 if not crash else 15.0)
+            else:
+                # 52주 고점을 전일 종가 +2~4%로 당겨두고 살짝 돌파 (±5% 이벤트와 구분)
+                base["high_52"] = round(base["prev_close"] * rng.uniform(1.02, 1.04), -1)
+                target = (base["high_52"] / base["prev_close"] - 1) * 100 + 0.3
+            self.shocks[base["symbol"]] = (start, kind, target)
+
+        for base in rng.sample(self.universe, int(len(self.universe) * after_hours_ratio)):
+            base["nxt_change_pct"] = round(rng.uniform(9.0, 10.0), 2)
+
+    @property
+    def symbols(self) -> List[str]:
+        return [b["symbol"] for b in self.universe]
+
+    def __iter__(self) -> Iterator[Tuple[float, List[dict]]]:
+        rng = random.Random(self.seed + 1)
+        walk = {b["symbol"]: 0.0 for b in self.universe}
+        ts = 0.0
+        while ts < self.duration:
+            batch = []
+            for base in self.universe:
+                sym = base["symbol"]
+                shock = self.shocks.get(sym)
+                in_ramp = shock is not None and shock[0] <= ts <= shock[0] + self.ramp + self.tick_interval
+                if ts > 0 and not in_ramp and rng.random() >= self.tick_ratio:
+                    continue
+                walk[sym] += rng.gauss(0, 0.0008)
+                pct = 0.0
+                vol = base["volume_ratio"]
+                if shock and ts >= shock[0]:
+                    pct = shock[2] * min(1.0, (ts - shock[0]) / self.ramp)
+                    if shock[1] == "surge":
+                        vol = max(vol, 6.0)
+                price = max(1.0, round(base["prev_close"] * (1 + walk[sym]) * (1 + pct / 100)))
+                batch.append({
+                    "ts": ts, "symbol": sym, "name": base["name"], "price": price,
+                    "prev_close": base["prev_close"], "high_52": base["high_52"],
+                    "volume_ratio": vol, "nxt_change_pct": base["nxt_change_pct"],
+                })
+            if batch:
+                yield ts, batch
+            ts += self.tick_interval
+
+
+class RecordedTape:
+    """녹화 틱 파일 (JSONL 또는 CSV) → ts 기준 배치"""
+
+    NUMERIC = ("ts", "price", "prev_close", "high_52", "volume_ratio", "nxt_change_pct")
+
+    def __init__(self, path: str):
+        ticks = []
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".csv"):
+                rows = list(csv.DictReader(f))
+            else:
+                rows = [json.loads(line) for line in f if line.strip()]
+        for row in rows:
+            tick = {k: v for k, v in row.items() if v not in (None, "")}
+            for k in self.NUMERIC:
+                if k in tick:
+                    tick[k] = float(tick[k])
+            tick["symbol"] = _clean(tick["symbol"])
+            ticks.append(tick)
+        ticks.sort(key=lambda t: t["ts"])
+        self.batches: List[Tuple[float, List[dict]]] = []
+        for tick in ticks:
+            if self.batches and self.batches[-1][0] == tick["ts"]:
+                self.batches[-1][1].append(tick)
+            else:
+                self.batches.append((tick["ts"], [tick]))
+        self.duration = self.batches[-1][0] if self.batches else 0.0
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted({t["symbol"] for _ts, batch in self.batches for t in batch})
+
+    def __iter__(self):
+        return iter(self.batches)
+
+
+def save_tape(tape, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for _ts, batch in tape:
+            for tick in batch:
+                f.write(json.dumps(tick, ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+
+# ─── 가상 시계 / 호가판 ──────────────────────────────────────────────────────
+class ReplayClock:
+    """장중 시간(초) ↔ 실제 시간 변환. speed <= 0 이면 대기 없이 테이프 시각으로 바로 이동"""
+
+    def __init__(self, speed: float):
+        self.speed = speed
+        self._ts0 = 0.0
+        self._wall0 = time.perf_counter()
+        self._virtual = 0.0
+
+    @property
+    def realtime(self) -> bool:
+        return self.speed > 0
+
+    def start(self, ts0: float):
+        self._ts0 = self._virtual = ts0
+        self._wall0 = time.perf_counter()
+
+    def now(self) -> float:
+        if not self.realtime:
+            return self._virtual
+        return self._ts0 + (time.perf_counter() - self._wall0) * self.speed
+
+    async def wait_until(self, ts: float) -> float:
+        """ts까지 대기, 이미 지났으면 밀린 시간(장중 초)을 반환"""
+        if not self.realtime:
+            self._virtual = max(self._virtual, ts)
+            return 0.0
+        delay = (ts - self._ts0) / self.speed - (time.perf_counter() - self._wall0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+            return 0.0
+        return -delay * self.speed
+
+    async def sleep(self, seconds: float):
+        """모니터 내부 sleep (장중 시간 기준)을 배속에 맞춰 축소"""
+        if self.realtime and seconds > 0:
+            await asyncio.sleep(seconds / self.speed)
+        else:
+            await asyncio.sleep(0)
+
+
+class QuoteBoard:
+    """
+    재생 중 최신 시세판
+    모니터가 시세를 읽을 때 '읽힌 틱의 도착 시각'을 남겨 두고, 발송 시점과 비교해 지연을 계산합니다.
+    """
+
+    def __init__(self, clock: ReplayClock):
+        self.clock = clock
+        self.quotes: Dict[str, dict] = {}
+        self.arrival: Dict[str, float] = {}   # symbol -> 최신 틱 도착 (perf_counter)
+        self.served: Dict[str, float] = {}    # symbol -> 모니터가 마지막으로 읽은 틱의 도착 시각
+        self.conditions: Dict[Tuple[str, str], Tuple[float, float]] = {}  # (symbol, event) -> (장중 초, 도착)
+        self.ticks = 0
+
+    def apply(self, batch: List[dict]):
+        wall = time.perf_counter()
+        for tick in batch:
+            sym = tick["symbol"]
+            quote = self.quotes.setdefault(sym, {})
+            quote.update(tick)
+            self.arrival[sym] = wall
+            self._detect(sym, quote, tick["ts"], wall)
+        self.ticks += len(batch)
+
+    def _detect(self, sym: str, q: dict, ts: float, wall: float):
+        """auto/after_hours 모니터 기준과 같은 조건으로 '알림이 나가야 하는' 최초 시점 기록"""
+        prev, price = q.get("prev_close"), q.get("price")
+        if not prev or not price:
+            return
+        pct = (price - prev) / prev * 100
+        events = []
+        if abs(pct) <= 30.5:
+            if pct >= 5.0:
+                events.append("surge")
+            elif pct <= -5.0:
+                events.append("drop")
+            if q.get("high_52") and price >= q["high_52"] * 0.99:
+                events.append("high_52")
+            if q.get("volume_ratio", 0.0) >= 5.0 and pct > 0:
+                events.append("vol_spike")
+        if q.get("nxt_change_pct", 0.0) >= 9.0:
+            events.append("after_hours")
+        for event in events:
+            self.conditions.setdefault((sym, event), (ts, wall))
+
+    def read(self, symbol: str) -> Optional[dict]:
+        sym = _clean(symbol)
+        quote = self.quotes.get(sym)
+        if quote is not None:
+            self.served[sym] = self.arrival[sym]
+        return quote
+
+    def naver_info(self, symbol: str) -> Optional[dict]:
+        """korea_data.get_naver_stock_info 와 같은 모양 (가격은 콤마 문자열)"""
+        q = self.read(symbol)
+        if not q:
+            return None
+        prev = q.get("prev_close") or q["price"]
+        pct = (q["price"] - prev) / prev * 100 if prev else 0.0
+        nxt_pct = q.get("nxt_change_pct", 0.0)
+        return {
+            "name": q.get("name", symbol),
+            "price": f"{q['price']:,.0f}",
+            "change_rate": f"{pct:+.2f}",
+            "nxt_data": {"price": f"{q['price'] * (1 + nxt_pct / 100):,.0f}", "change_pct": nxt_pct},
+        }
+
+
+# ─── 발송 싱크 ───────────────────────────────────────────────────────────────
+class PushSink:
+    """firebase_config 발송 함수 대체: 실제 발송 대신 enqueue 시각/토큰을 기록"""
+
+    def __init__(self, board: QuoteBoard, clock: ReplayClock):
+        self.board = board
+        self.clock = clock
+        self.latency_ms: Dict[str, List[float]] = defaultdict(list)
+        self.detect_lag: Dict[str, List[float]] = defaultdict(list)
+        self.deliveries: Dict[tuple, int] = defaultdict(int)
+        self.delivered_events: Dict[Tuple[str, str], float] = {}
+        self.enqueues = 0
+        self.tokens = 0
+        self.by_channel: Dict[str, int] = defaultdict(int)
+
+    def module(self) -> types.ModuleType:
+        mod = types.ModuleType("firebase_config")
+        mod.send_multicast_notification = self.send_multicast_notification
+        mod.send_price_alert_notification = self.send_price_alert_notification
+        mod.__file__ = "<market_replay sink>"
+        return mod
+
+    def send_multicast_notification(self, tokens, title, body, data=None, image_url=None,
+                                    target_users=None, skip_db_save=False) -> dict:
+        data = data or {}
+        kind = data.get("type", "")
+        symbol = _clean(data.get("symbol"))
+        if kind == "auto_price_alert":
+            event = next((e for prefix, e in AUTO_EVENTS.items() if title.startswith(prefix)), "auto")
+            channel = "auto"
+        elif kind == "stock_alert":
+            event, channel = "after_hours", "after_hours"
+        elif kind == "TRADING_ALERT":
+            event, channel = "price", "legacy"
+        else:
+            # 한도 소진 안내 등은 종목과 무관: 토큰당 하루 1회가 정상
+            event, channel = kind or title, "quota"
+        self._record(channel, event, symbol, list(tokens or []))
+        return {"success": True, "success_count": len(tokens or []), "failure_count": 0}
+
+    def send_price_alert_notification(self, tokens, symbol, alert_type, current_price, change_pct,
+                                      message, user_id=None) -> dict:
+        self._record("price", alert_type, _clean(symbol), list(tokens or []), key=user_id)
+        return {"success": True, "success_count": len(tokens or []), "failure_count": 0}
+
+    def _record(self, channel: str, event: str, symbol: str, tokens: List[str], key=None):
+        wall = time.perf_counter()
+        self.enqueues += 1
+        self.tokens += len(tokens)
+        self.by_channel[channel] += 1
+        condition = self.board.conditions.get((symbol, event))
+        if condition:
+            # 조건을 처음 만든 틱 기준 (poll 대기 + 처리 시간 모두 포함)
+            self.latency_ms[channel].append((wall - condition[1]) * 1000)
+            self.detect_lag[channel].append(max(0.0, self.clock.now() - condition[0]))
+        elif symbol in self.board.served:
+            self.latency_ms[channel].append((wall - self.board.served[symbol]) * 1000)
+        if symbol:
+            self.delivered_events.setdefault((symbol, event), self.clock.now())
+        for token in tokens:
+            self.deliveries[(channel, event, symbol, key, token)] += 1
+
+    def duplicates(self) -> Dict[str, int]:
+        dup = defaultdict(int)
+        for (channel, *_rest), count in self.deliveries.items():
+            if count > 1:
+                dup[channel] += count - 1
+        return dict(dup)
+
+
+# ─── 시드 / 경계 교체 ────────────────────────────────────────────────────────
+def seed_db(symbols: List[str], users: int, watch: int, alerts_per_user: int,
+            limited_ratio: float, prices: Dict[str, float], seed: int = 7) -> Dict[str, List[str]]:
+    """사용자/토큰/관심종목/가격 알림 시드. 반환: user_id -> 관심종목"""
+    import db_manager
+    from price_alerts import create_price_alerts_tables
+
+    # alert_history는 db_manager(init_db)와 price_alerts가 서로 다른 스키마로 만듦.
+    # 알림 쓰기 경로 대부분이 쓰는 price_alerts 스키마가 먼저 생기도록 순서를 고정
+    create_price_alerts_tables()
+    db_manager.init_db()
+    rng = random.Random(seed)
+    watchlists = {f"replay-user-{i}": rng.sample(symbols, min(watch, len(symbols))) for i in range(users)}
+    conn = db_manager.get_db_connection()
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO users (id, email, name, is_unlimited_alerts, daily_alert_count) VALUES (?, ?, ?, ?, 0)",
+            [(u, f"{u}@replay.local", u, 0 if rng.random() < limited_ratio else 1) for u in watchlists],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO fcm_tokens (user_id, token, device_type) VALUES (?, ?, 'android')",
+            [(u, f"replay-token-{u}") for u in watchlists],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO watchlist (user_id, symbol, added_price, quantity) VALUES (?, ?, ?, 1)",
+            [(u, s, prices.get(s, 0)) for u, syms in watchlists.items() for s in syms],
+        )
+        rows = []
+        for u, syms in watchlists.items():
+            picks = rng.sample([(s, t) for s in syms for t in ("stop_loss", "take_profit", "target_price")],
+                               min(alerts_per_user, len(syms) * 3))
+            for s, alert_type in picks:
+                base = prices.get(s) or 10_000
+                rows.append((u, s, alert_type, base, 5.0, round(base * 1.05), 1))
+        conn.executemany(
+            "INSERT INTO price_alerts (user_id, symbol, type, buy_price, threshold, target_price, quantity) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return watchlists
+
+
+class Patches:
+    """모듈 속성 / sys.modules 교체를 기록했다가 역순으로 복원"""
+
+    def __init__(self):
+        self._undo = []
+
+    def attr(self, obj, name: str, value):
+        self._undo.append((setattr, obj, name, getattr(obj, name, None)))
+        setattr(obj, name, value)
+
+    def module(self, name: str, module):
+        self._undo.append((self._restore_module, name, None, sys.modules.get(name)))
+        sys.modules[name] = module
+
+    @staticmethod
+    def _restore_module(name, _unused, previous):
+        if previous is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = previous
+
+    def restore(self):
+        while self._undo:
+            fn, a, b, c = self._undo.pop()
+            fn(a, b, c)
+
+
+def _yfinance_module(board: QuoteBoard) -> types.ModuleType:
+    """yfinance.Ticker 대체: fast_info는 시세판에서, history는 재생하지 않음 (RSI 경로는 None 처리됨)"""
+    mod = types.ModuleType("yfinance")
+
+    class Ticker:
+        def __init__(self, symbol):
+            self.ticker = symbol
+
+        @property
+        def fast_info(self):
+            q = board.read(self.ticker) or {}
+            return types.SimpleNamespace(
+                last_price=q.get("price"), previous_close=q.get("prev_close"), year_high=q.get("high_52"),
+                last_volume=q.get("volume_ratio", 0) * 1_000_000, ten_day_average_volume=1_000_000,
+            )
+
+        def history(self, *args, **kwargs):
+            raise RuntimeError("history is not replayed")
+
+    mod.Ticker = Ticker
+    return mod
+
+
+def install_boundaries(patches: Patches, board: QuoteBoard, sink: PushSink, clock: ReplayClock):
+    """monitor import 전에 호출: 이후 import되는 모듈은 교체된 yfinance/firebase_config를 잡음"""
+    patches.module("yfinance", _yfinance_module(board))
+    patches.module("firebase_config", sink.module())
+    try:
+        import korea_data
+        patches.attr(korea_data, "get_naver_stock_info", board.naver_info)
+    except ImportError as e:
+        print(f"[Replay] korea_data unavailable ({e.name}) - monitors will use yfinance replay only")
+
+
+def _scaled_asyncio(clock: ReplayClock):
+    """after_hours_alerts의 rate-limit sleep(0.5s)을 배속에 맞춰 축소한 asyncio 대체"""
+    return types.SimpleNamespace(to_thread=asyncio.to_thread, sleep=clock.sleep)
+
+
+# ─── 모니터 러너 ─────────────────────────────────────────────────────────────
+class MonitorRunner:
+    """poll 주기(장중 초)마다 모니터 1회 순회. 이전 순회가 안 끝났으면 건너뛰고 overrun으로 집계"""
+
+    def __init__(self, name: str, cycle, interval: float):
+        self.name = name
+        self.cycle = cycle
+        self.interval = interval
+        self.next_poll = 0.0
+        self.cycle_ms: List[float] = []
+        self.overruns = 0
+        self.errors = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self):
+        start = time.perf_counter()
+        try:
+            await self.cycle()
+        except Exception as e:
+            self.errors += 1
+            print(f"[Replay] {self.name} cycle error: {type(e).__name__}: {e}", file=sys.stderr)
+        self.cycle_ms.append((time.perf_counter() - start) * 1000)
+
+    async def maybe_poll(self, ts: float, realtime: bool):
+        if ts < self.next_poll:
+            return
+        self.next_poll = ts + self.interval
+        if not realtime:
+            await self.run_once()
+        elif self._task and not self._task.done():
+            self.overruns += 1
+        else:
+            self._task = asyncio.create_task(self.run_once())
+
+    async def drain(self):
+        if self._task:
+            await self._task
+
+
+def build_runners(names: List[str], patches: Patches, board: QuoteBoard, clock: ReplayClock,
+                  watchlists: Dict[str, List[str]], legacy_alerts: int, poll: Optional[float],
+                  seed: int) -> Tuple[List[MonitorRunner], Optional[MonitorRunner], Dict[str, str]]:
+    runners, after_hours, skipped = [], None, {}
+    for name in names:
+        try:
+            if name == "price":
+                from price_alerts import PriceAlertMonitor
+                monitor = PriceAlertMonitor()
+                runners.append(MonitorRunner(name, monitor.check_all_alerts, poll or monitor.check_interval))
+            elif name == "auto":
+                import auto_price_alerts
+                patches.attr(auto_price_alerts, "is_holiday", lambda *_a, **_k: False)
+                patches.attr(auto_price_alerts, "is_market_open_hours", lambda *_a, **_k: True)
+                patches.attr(auto_price_alerts, "yf", sys.modules["yfinance"])
+                monitor = auto_price_alerts.AutoPriceMonitor()
+                runners.append(MonitorRunner(name, monitor.check_all_symbols, poll or monitor.check_interval))
+            elif name == "after_hours":
+                import after_hours_alerts
+                patches.attr(after_hours_alerts, "get_naver_stock_info", board.naver_info)
+                patches.attr(after_hours_alerts, "asyncio", _scaled_asyncio(clock))
+                after_hours = MonitorRunner(name, after_hours_alerts.check_after_hours_limit, 0)
+            elif name == "legacy":
+                import alerts
+                path = os.path.join(_REPLAY_DIR, "alerts.json")
+                rng = random.Random(seed)
+                pairs = [(u, s) for u, syms in watchlists.items() for s in syms]
+                rows = []
+                for i, (u, s) in enumerate(rng.sample(pairs, min(legacy_alerts, len(pairs)))):
+                    base = (board.quotes.get(s) or {}).get("prev_close") or 10_000
+                    above = rng.random() < 0.5
+                    rows.append({"id": i, "symbol": s, "type": "PRICE", "status": "active", "user_id": u,
+                                 "condition": "above" if above else "below", "chat_id": None,
+                                 "target_price": round(base * (1.05 if above else 0.95))})
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(rows, f)
+                patches.attr(alerts, "ALERTS_FILE", path)
+                patches.attr(alerts, "yf", sys.modules["yfinance"])
+
+                async def legacy_cycle():
+                    await asyncio.to_thread(alerts.check_alerts)
+                runners.append(MonitorRunner(name, legacy_cycle, poll or DEFAULT_POLL["legacy"]))
+        except ImportError as e:
+            skipped[name] = f"missing dependency: {e.name}"
+    return runners, after_hours, skipped
+
+
+# ─── 재생 ────────────────────────────────────────────────────────────────────
+def _percentiles(values: List[float]) -> dict:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3)
+    return {"count": len(ordered), "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99),
+            "max": round(ordered[-1], 3), "mean": round(statistics.fmean(ordered), 3)}
+
+
+async def replay(tape, args) -> dict:
+    clock = ReplayClock(args.speed)
+    board = QuoteBoard(clock)
+    sink = PushSink(board, clock)
+    patches = Patches()
+    names = [m.strip() for m in args.monitors.split(",") if m.strip()]
+    log = io.StringIO()
+
+    # 시드용 전일 종가: 테이프 첫 틱 기준
+    prices, first = {}, None
+    for ts, batch in tape:
+        first = (ts, batch)
+        prices = {t["symbol"]: t.get("prev_close") or t["price"] for t in batch}
+        break
+    symbols = list(getattr(tape, "symbols", prices.keys()))
+
+    try:
+        with contextlib.ExitStack() as stack:
+            if not args.verbose:
+                # 알림마다 찍히는 모듈 로그가 결과를 덮지 않도록 재생 중 stdout은 버림
+                stack.enter_context(contextlib.redirect_stdout(log))
+            install_boundaries(patches, board, sink, clock)
+            watchlists = seed_db(symbols, args.users, args.watch, args.alerts_per_user,
+                                 args.limited_ratio, prices, args.seed)
+            if first:
+                board.apply(first[1])
+            runners, after_hours, skipped = build_runners(
+                names, patches, board, clock, watchlists, args.legacy_alerts, args.poll, args.seed)
+
+            behind = []
+            wall0 = time.perf_counter()
+            clock.start(first[0] if first else 0.0)
+            for ts, batch in tape:
+                if not (first and ts == first[0]):  # 첫 배치는 시드 시점에 이미 반영
+                    behind.append(await clock.wait_until(ts))
+                    board.apply(batch)
+                for runner in runners:
+                    await runner.maybe_poll(ts, clock.realtime)
+            for runner in runners:
+                await runner.drain()
+            if after_hours:
+                await after_hours.run_once()
+                runners.append(after_hours)
+            elapsed = time.perf_counter() - wall0
+    finally:
+        patches.restore()
+
+    watched = {s for syms in watchlists.values() for s in syms}
+    checked = [r.name for r in runners]
+    expected_events = {("auto", "surge"), ("auto", "drop"), ("auto", "high_52"), ("auto", "vol_spike"),
+                       ("after_hours", "after_hours")}
+    missed = defaultdict(int)
+    expected = defaultdict(int)
+    for (sym, event) in board.conditions:
+        channel = "after_hours" if event == "after_hours" else "auto"
+        if sym not in watched or channel not in checked or (channel, event) not in expected_events:
+            continue
+        expected[event] += 1
+        if (sym, event) not in sink.delivered_events:
+            missed[event] += 1
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("report", "save_tape")},
+        "skipped": skipped,
+        "elapsed_s": round(elapsed, 3),
+        "virtual_s": round(clock.now() - (first[0] if first else 0.0), 1),
+        "ticks": board.ticks,
+        "ticks_per_s": round(board.ticks / elapsed, 1) if elapsed else None,
+        "enqueues": sink.enqueues,
+        "enqueues_per_s": round(sink.enqueues / elapsed, 1) if elapsed else None,
+        "tokens": sink.tokens,
+        "by_channel": dict(sink.by_channel),
+        "behind_s": _percentiles([b for b in behind if b > 0]),
+        "latency_ms": {ch: _percentiles(v) for ch, v in sink.latency_ms.items()},
+        "detect_lag_s": {ch: _percentiles(v) for ch, v in sink.detect_lag.items()},
+        "monitors": {r.name: {"interval_s": r.interval, "cycles": len(r.cycle_ms), "overruns": r.overruns,
+                              "errors": r.errors, "cycle_ms": _percentiles(r.cycle_ms)} for r in runners},
+        "expected_events": dict(expected),
+        "missed_events": dict(missed),
+        "duplicates": sink.duplicates(),
+    }
+
+
+def print_report(report: dict):
+    print(f"[Replay] {report['ticks']} ticks / {report['virtual_s']}s market time in {report['elapsed_s']}s "
+          f"({report['ticks_per_s']} ticks/s)")
+    for name, reason in report["skipped"].items():
+        print(f"  {name:<12} SKIP  {reason}")
+    for name, m in report["monitors"].items():
+        c = m["cycle_ms"]
+        print(f"  {name:<12} cycles {m['cycles']:>5}  overruns {m['overruns']:>4}  errors {m['errors']:>3}  "
+              f"cycle p50 {c.get('p50', 0):9.1f} ms  p95 {c.get('p95', 0):9.1f} ms  (poll {m['interval_s']}s)")
+    print(f"[Replay] enqueues {report['enqueues']} ({report['enqueues_per_s']}/s), tokens {report['tokens']}, "
+          f"by channel {report['by_channel']}")
+    for ch, lat in report["latency_ms"].items():
+        lag = report["detect_lag_s"].get(ch, {})
+        print(f"  {ch:<12} tick→enqueue p50 {lat['p50']:9.1f} ms  p95 {lat['p95']:9.1f}  p99 {lat['p99']:9.1f}"
+              + (f"  | detect lag p50 {lag['p50']:.0f}s p95 {lag['p95']:.0f}s (market time)" if lag else ""))
+    for event, n in report["expected_events"].items():
+        print(f"  event {event:<11} expected {n:>5}  missed {report['missed_events'].get(event, 0):>5}")
+    dup = report["duplicates"]
+    print(f"[Replay] duplicate suppression: {'OK' if not dup else 'VIOLATED ' + json.dumps(dup)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market replay engine for alert pipeline stress tests")
+    parser.add_argument("--ticks", help="녹화 틱 파일 (.jsonl / .csv). 없으면 합성 테이프")
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--duration", type=float, default=3600.0, help="합성 테이프 길이 (장중 초)")
+    parser.add_argument("--tick-interval", type=float, default=5.0)
+    parser.add_argument("--tick-ratio", type=float, default=0.3, help="간격마다 틱이 오는 종목 비율")
+    parser.add_argument("--shock-ratio", type=float, default=0.05, help="급등/급락/신고가 충격 종목 비율")
+    parser.add_argument("--after-hours-ratio", type=float, default=0.01, help="시간외 +9%% 종목 비율")
+    parser.add_argument("--crash", action="store_true", help="전 종목 급락일 시나리오")
+    parser.add_argument("--speed", type=float, default=60.0, help="배속 (0 = 대기 없이 최대 속도)")
+    parser.add_argument("--monitors", default=",".join(MONITORS), help=f"쉼표 구분: {','.join(MONITORS)}")
+    parser.add_argument("--poll", type=float, help="모든 모니터 poll 주기 강제 (장중 초)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--watch", type=int, default=20, help="사용자당 관심종목 수")
+    parser.add_argument("--alerts-per-user", type=int, default=2, help="사용자당 가격 알림 수 (price 모니터)")
+    parser.add_argument("--legacy-alerts", type=int, default=500, help="alerts.json PRICE 알림 수 (legacy 모니터)")
+    parser.add_argument("--limited-ratio", type=float, default=0.1, help="일일 알림 한도(3회) 적용 사용자 비율")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save-tape", help="합성 테이프를 JSONL로 저장하고 종료")
+    parser.add_argument("--report", help="결과 JSON 저장 경로")
+    parser.add_argument("--verbose", action="store_true", help="모니터 로그 출력")
+    args = parser.parse_args()
+
+    if args.ticks:
+        tape = RecordedTape(args.ticks)
+    else:
+        tape = SyntheticTape(args.symbols, args.duration, args.tick_interval, args.tick_ratio,
+                             args.shock_ratio, args.after_hours_ratio, args.crash, seed=args.seed)
+    if args.save_tape:
+        print(f"[Replay] saved {save_tape(tape, args.save_tape)} ticks -> {args.save_tape}")
+        return
+
+    report = asyncio.run(replay(tape, args))
+    print_report(report)
+    if args.report:
+        os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[Replay] report saved: {args.report}")
+    if report["duplicates"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+📈 경량 메트릭 수집기 (Prometheus 텍스트 포맷)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+"/api/analysis/stock/{symbol}이 왜 느린가?"에 답하기 위한 최소 계측.
+
+📌 수집 항목
+  - http_request_duration_seconds{method,route,status}   라우트 템플릿 단위 지연 히스토그램
+  - upstream_request_duration_seconds{upstream,outcome}  외부 호출 지연 (HTTP 호스트별, gemini, sqlite)
+  - turbo_cache_requests_total{namespace,result}          터보 캐시 hit/stale/expired/miss
+  - event_loop_lag_seconds                                이벤트 루프 지연 (0.5초 주기 샘플링)
+  - executor_queue_depth / executor_threads               기본 스레드풀 대기 작업 수
+
+📌 핫패스 비용: 관측 1회 = dict 조회 + bisect + 락 1회 (수 μs 미만)
+⚠️ 워커별(프로세스별) 값입니다. 다중 워커 환경에서는 스크레이프마다 다른 워커가 응답할 수 있습니다.
+
+사용 예:
+    from metrics import metrics, upstream_timer
+    with upstream_timer("naver"):
+        ...
+    @upstream_timer("gemini")
+    def generate(...): ...
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+LAG_SAMPLE_INTERVAL = 0.5
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count", "lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # 마지막 칸 = +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[idx] += 1
+            self.sum += value
+            self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(names: Tuple[str, ...], values: Tuple[str, ...], le: Optional[str] = None) -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if le is not None:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    def __init__(self):
+        # name -> (help, label_names, buckets, {label_values: Histogram})
+        self.histograms: Dict[str, tuple] = {}
+        # name -> (help, label_names, {label_values: int})
+        self.counters: Dict[str, tuple] = {}
+        # name -> (help, callback)  스크레이프 시점에 값을 읽음
+        self.gauges: Dict[str, tuple] = {}
+        self.lock = threading.Lock()
+
+    # ─── 등록 ────────────────────────────────────────────────────────────────
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.histograms.setdefault(name, (help_text, label_names, buckets, {}))
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.counters.setdefault(name, (help_text, label_names, {}))
+
+    def gauge(self, name: str, help_text: str, callback: Callable[[], Optional[float]]):
+        self.gauges[name] = (help_text, callback)
+
+    # ─── 관측 ────────────────────────────────────────────────────────────────
+    def observe(self, name: str, labels: Tuple[str, ...], value: float):
+        series = self.histograms[name][3]
+        hist = series.get(labels)
+        if hist is None:
+            with self.lock:
+                hist = series.setdefault(labels, Histogram(self.histograms[name][2]))
+        hist.observe(value)
+
+    def inc(self, name: str, labels: Tuple[str, ...], amount: int = 1):
+        series = self.counters[name][2]
+        with self.lock:
+            series[labels] = series.get(labels, 0) + amount
+
+    # ─── 노출 ────────────────────────────────────────────────────────────────
+    def render(self) -> str:
+        lines = []
+        for name, (help_text, label_names, buckets, series) in self.histograms.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, hist in list(series.items()):
+                with hist.lock:
+                    counts, total, count = list(hist.counts), hist.sum, hist.count
+                cumulative = 0
+                for bound, c in zip(buckets, counts):
+                    cumulative += c
+                    lines.append(f"{name}_bucket{_fmt_labels(label_names, labels, str(bound))} {cumulative}")
+                lines.append(f"{name}_bucket{_fmt_labels(label_names, labels, '+Inf')} {count}")
+                lines.append(f"{name}_sum{_fmt_labels(label_names, labels)} {total:.6f}")
+                lines.append(f"{name}_count{_fmt_labels(label_names, labels)} {count}")
+        for name, (help_text, label_names, series) in self.counters.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in list(series.items()):
+                lines.append(f"{name}{_fmt_labels(label_names, labels)} {value}")
+        for name, (help_text, callback) in self.gauges.items():
+            try:
+                value = callback()
+            except Exception:
+                value = None
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# ─── 전역 인스턴스 ──────────────────────────────────────────────────────────
+metrics = MetricsRegistry()
+metrics.histogram("http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status"))
+metrics.histogram("upstream_request_duration_seconds", "Outbound call latency by upstream", ("upstream", "outcome"))
+metrics.histogram("event_loop_lag_seconds", "Event loop scheduling lag", (), LAG_BUCKETS)
+metrics.counter("turbo_cache_requests_total", "Turbo cache lookups by result", ("namespace", "result"))
+
+_loop_lag = {"last": 0.0, "max": 0.0}
+metrics.gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample", lambda: round(_loop_lag["last"], 6))
+metrics.gauge("event_loop_lag_max_seconds", "Max event loop lag since start", lambda: round(_loop_lag["max"], 6))
+
+
+# ─── 헬퍼 ────────────────────────────────────────────────────────────────────
+def observe_request(method: str, route: str, status: int, seconds: float):
+    metrics.observe("http_request_duration_seconds", (method, route, f"{status // 100}xx"), seconds)
+
+
+def observe_upstream(upstream: str, seconds: float, ok: bool = True):
+    metrics.observe("upstream_request_duration_seconds", (upstream, "ok" if ok else "error"), seconds)
+
+
+def count_cache(namespace: str, result: str):
+    metrics.inc("turbo_cache_requests_total", (namespace, result))
+
+
+class upstream_timer:
+    """외부 호출 타이머 (with 문 / 동기·비동기 데코레이터 겸용)"""
+
+    def __init__(self, upstream: str):
+        self.upstream = upstream
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe_upstream(self.upstream, time.perf_counter() - self._start, exc_type is None)
+        return False
+
+    def __call__(self, func):
+        upstream = self.upstream
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with upstream_timer(upstream):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            with upstream_timer(upstream):
+                return func(*args, **kwargs)
+        return sync_wrapper
+
+
+# ─── 계측 설치 (프로세스당 1회) ──────────────────────────────────────────────
+_installed = set()
+
+
+def _host_of(url) -> str:
+    try:
+        return urlsplit(str(url)).hostname or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def instrument_http_clients():
+    """requests / aiohttp의 모든 요청을 호스트별 upstream 지연으로 기록 (yfinance, 네이버, DART 등 공통)"""
+    if "requests" not in _installed:
+        try:
+            import requests
+            original_request = requests.Session.request
+
+            @wraps(original_request)
+            def timed_request(self, method, url, *args, **kwargs):
+                start = time.perf_counter()
+                ok = False
+                try:
+                    response = original_request(self, method, url, *args, **kwargs)
+                    ok = response.status_code < 500
+                    return response
+                finally:
+                    observe_upstream(_host_of(url), time.perf_counter() - start, ok)
+
+            requests.Session.request = timed_request
+            _installed.add("requests")
+        except ImportError:
+            pass
+
+    if "aiohttp" not in _installed:
+        try:
+            import aiohttp
+            original_aio_request = aiohttp.ClientSession._request
+
+            @wraps(original_aio_request)
+            async def timed_aio_request(self, method, str_or_url, *args, **kwargs):
+                start = time.perf_counter()
+                ok = False
+                try:
+                    response = await original_aio_request(self, method, str_or_url, *args, **kwargs)
+                    ok = response.status < 500
+                    return response
+                finally:
+                    observe_upstream(_host_of(str_or_url), time.perf_counter() - start, ok)
+
+            aiohttp.ClientSession._request = timed_aio_request
+            _installed.add("aiohttp")
+        except ImportError:
+            pass
+
+
+def instrument_executor(executor):
+    """기본 스레드풀의 대기 작업 수 / 스레드 수를 게이지로 노출"""
+    metrics.gauge("executor_queue_depth", "Pending work items in the default executor",
+                  lambda: executor._work_queue.qsize())
+    metrics.gauge("executor_threads", "Threads spawned by the default executor",
+                  lambda: len(executor._threads))
+    metrics.gauge("executor_max_workers", "Default executor capacity",
+                  lambda: executor._max_workers)
+
+
+async def sample_event_loop_lag(interval: float = LAG_SAMPLE_INTERVAL):
+    """interval마다 깨어나 예정 시각 대비 지연을 기록 (블로킹 코드가 루프를 잡고 있으면 증가)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - expected)
+        _loop_lag["last"] = lag
+        if lag > _loop_lag["max"]:
+            _loop_lag["max"] = lag
+        metrics.observe("event_loop_lag_seconds", (), lag)
@@ -12,6 +12,7 @@ from typing import Dict, List, Set
 from db_manager import get_db_connection
 from stock_data import get_korean_stock_name, GLOBAL_KOREAN_NAMES
 from dart_disclosure import get_dart_disclosures
+from news_dedup import news_deduper
 
 # 해외 종목 영문 이름 매핑 (구글 뉴스 검색용)
 GLOBAL_ENGLISH_NAMES = {
@@ -400,7 +401,15 @@ class NewsAlertMonitor:
             except Exception:
                 pass
 
-            # 중복 속보 방지 ③: 제목 유사도 검사 (기준 70%로 유지)
+            # 중복 속보 방지 ③: SimHash 근접 중복 검사 (다른 언론사/링크로 재배포된 같은 기사)
+            if item.get('source') != 'disclosure' and news_deduper.is_duplicate(symbol, item):
+                self.last_seen_articles[symbol].append(article_id)
+                if len(self.last_seen_articles[symbol]) > 100:
+                    self.last_seen_articles[symbol].pop(0)
+                print(f"[NewsAlert] 중복 뉴스 차단 (근접 중복, {kr_name}): {item['title'][:40]}")
+                continue
+
+            # 중복 속보 방지 ④: 제목 유사도 검사 (기준 70%로 유지)
             new_title_words = set(re.findall(r'\w+', item['title']))
             is_duplicate = False
 
@@ -433,6 +442,8 @@ class NewsAlertMonitor:
 
             # DB에 발송 이력 저장 (재시작 후에도 중복 방지)
             self._save_sent_log(symbol, article_id, item['title'])
+            if item.get('source') != 'disclosure':
+                news_deduper.remember(symbol, item, article_id)
 
             print(f"[NewsAlert] New article detected for {kr_name}({symbol}): {item['title']}")
             await self.send_news_push(symbol, kr_name, is_korean, item, users)
@@ -0,0 +1,295 @@
+"""
+📰 뉴스 근접 중복(Near-Duplicate) 탐지기
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+같은 통신사 기사가 여러 언론사/링크로 재배포되면 링크 기반 중복 체크로는 걸러지지 않아
+동일한 내용의 FCM 푸시, 알림 내역, 발송 로그가 여러 번 쌓입니다.
+
+📌 동작 방식
+  1. 제목 + 요약을 정규화 (NFKC, 소문자, 태그/괄호말머리/특수문자 제거)
+  2. 문자 3-gram 셔링(shingle)으로 64bit SimHash 지문 생성
+  3. 지문을 8bit × 8밴드로 쪼개 LSH 버킷에 등록
+     → 해밍 거리 7 이하인 지문은 반드시 한 개 이상의 밴드를 공유 (비둘기집 원리)
+  4. 후보 지문만 해밍 거리 비교 → 기준 이하이면 같은 기사로 판단
+  5. 롤링 시간 창(기본 48시간)이 지난 지문은 자동 만료
+  6. 발송된 지문은 SQLite(news_fingerprints)에 저장하여 재시작 후에도 중복 차단 유지
+
+✅ 종목(scope)별로 독립된 인덱스를 사용하므로 서로 다른 종목 기사끼리는 묶이지 않습니다.
+"""
+
+import re
+import html
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from db_manager import get_db_connection
+
+FINGERPRINT_BITS = 64
+LSH_BANDS = 8
+BAND_BITS = FINGERPRINT_BITS // LSH_BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# 해밍 거리 기준 (64bit 중 6bit 이하 차이 → 같은 기사). LSH_BANDS - 1 이하여야 누락이 없음
+MAX_HAMMING_DISTANCE = 6
+# 롤링 시간 창 (시간)
+WINDOW_HOURS = 48
+SHINGLE_SIZE = 3
+# (제목, 요약) → 지문 메모 크기 (뉴스 폴링 주기마다 같은 기사를 다시 검사)
+FINGERPRINT_CACHE_SIZE = 4096
+
+# 말머리/언론사 태그: [속보], [단독], 【특징주】, (종합), <사진> 등
+_TAG_PATTERN = re.compile(r'[\[【<(（][^\]】>)）]{0,12}[\]】>)）]')
+_HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+_NON_WORD_PATTERN = re.compile(r'[^\w가-힣]+')
+
+
+def normalize_news_text(text: str) -> str:
+    """비교용 텍스트 정규화 (태그·말머리·공백·특수문자 제거)"""
+    if not text:
+        return ""
+    text = html.unescape(_HTML_TAG_PATTERN.sub(' ', text))
+    text = unicodedata.normalize('NFKC', text).lower()
+    text = _TAG_PATTERN.sub(' ', text)
+    return _NON_WORD_PATTERN.sub('', text)
+
+
+def _hash64(token: str) -> int:
+    # 내장 hash()는 프로세스마다 시드가 달라 재시작 후 지문이 바뀌므로 blake2b 사용
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(title: str, description: str = "") -> int:
+    """제목(가중치 2) + 요약(가중치 1) 문자 셔링 기반 64bit SimHash"""
+    weights: Dict[str, int] = defaultdict(int)
+    for text, weight in ((normalize_news_text(title), 2), (normalize_news_text(description), 1)):
+        if not text:
+            continue
+        if len(text) <= SHINGLE_SIZE:
+            weights[text] += weight
+            continue
+        for i in range(len(text) - SHINGLE_SIZE + 1):
+            weights[text[i:i + SHINGLE_SIZE]] += weight
+
+    if not weights:
+        return 0
+
+    vector = [0] * FINGERPRINT_BITS
+    for token, weight in weights.items():
+        h = _hash64(token)
+        for bit in range(FINGERPRINT_BITS):
+            if (h >> bit) & 1:
+                vector[bit] += weight
+            else:
+                vector[bit] -= weight
+
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        if vector[bit] > 0:
+            fingerprint |= (1 << bit)
+    return fingerprint
+
+
+@lru_cache(maxsize=FINGERPRINT_CACHE_SIZE)
+def _cached_simhash(title: str, description: str) -> int:
+    return simhash(title, description)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+    return [(i, (fingerprint >> (i * BAND_BITS)) & BAND_MASK) for i in range(LSH_BANDS)]
+
+
+def _to_signed(fingerprint: int) -> int:
+    # SQLite INTEGER는 signed 64bit
+    return fingerprint - (1 << 64) if fingerprint >= (1 << 63) else fingerprint
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class NearDuplicateDetector:
+    """
+    종목별 SimHash + LSH 인덱스 (롤링 시간 창, SQLite 영속화)
+
+    사용 예:
+        reps = news_deduper.collapse(symbol, items)      # 배치 내 + 이력 대비 대표 기사만 남김
+        news_deduper.remember(symbol, item)              # 발송 성공 후 지문 기록
+    """
+
+    def __init__(self, window_hours: int = WINDOW_HOURS, max_distance: int = MAX_HAMMING_DISTANCE):
+        self.window_seconds = window_hours * 3600
+        self.max_distance = min(max_distance, LSH_BANDS - 1)
+        self._lock = threading.Lock()
+        # scope → deque[(timestamp, fingerprint)] (시간순)
+        self._timeline: Dict[str, deque] = defaultdict(deque)
+        # scope → {(band_idx, band_value): {fingerprint: timestamp}}
+        self._buckets: Dict[str, Dict[Tuple[int, int], Dict[int, float]]] = defaultdict(lambda: defaultdict(dict))
+        self.stats = {"checked": 0, "collapsed": 0, "remembered": 0}
+        self._load_fingerprints()
+
+    # ─── 영속화 ────────────────────────────────────────────────────────────
+    def _load_fingerprints(self):
+        """서버 재시작 시 시간 창 이내의 지문 복원"""
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS news_fingerprints (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scope TEXT NOT NULL,
+                    fingerprint INTEGER NOT NULL,
+                    article_id TEXT,
+                    created_at REAL NOT NULL
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_fp_created ON news_fingerprints(created_at)")
+            cutoff = time.time() - self.window_seconds
+            cursor.execute("DELETE FROM news_fingerprints WHERE created_at < ?", (cutoff,))
+            conn.commit()
+            cursor.execute("""
+                SELECT scope, fingerprint, created_at FROM news_fingerprints
+                WHERE created_at >= ? ORDER BY created_at ASC
+            """, (cutoff,))
+            rows = cursor.fetchall()
+            conn.close()
+
+            for scope, fp, created_at in rows:
+                self._index(scope, _to_unsigned(fp), created_at)
+            print(f"[NewsDedup] [OK] 지문 복원: {len(rows)}건")
+        except Exception as e:
+            print(f"[NewsDedup] 지문 복원 실패 (무시): {e}")
+
+    def _persist(self, records: List[Tuple[str, int, str, float]]):
+        if not records:
+            return
+        try:
+            conn = get_db_connection()
+            conn.executemany(
+                "INSERT INTO news_fingerprints (scope, fingerprint, article_id, created_at) VALUES (?, ?, ?, ?)",
+                [(scope, _to_signed(fp), article_id, ts) for scope, fp, article_id, ts in records]
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"[NewsDedup] 지문 저장 실패 (무시): {e}")
+
+    # ─── 인덱스 관리 ─────────────────────────────────────────────────────────
+    def _index(self, scope: str, fingerprint: int, ts: float):
+        self._timeline[scope].append((ts, fingerprint))
+        buckets = self._buckets[scope]
+        for band in _bands(fingerprint):
+            buckets[band][fingerprint] = ts
+
+    def _expire(self, scope: str, now: float):
+        timeline = self._timeline.get(scope)
+        if not timeline:
+            return
+        cutoff = now - self.window_seconds
+        buckets = self._buckets[scope]
+        while timeline and timeline[0][0] < cutoff:
+            ts, fp = timeline.popleft()
+            for band in _bands(fp):
+                bucket = buckets.get(band)
+                # 같은 지문이 이후에 다시 기록되었다면 최신 타임스탬프를 유지
+                if bucket is not None and bucket.get(fp) == ts:
+                    del bucket[fp]
+                    if not bucket:
+                        del buckets[band]
+        if not timeline:
+            self._timeline.pop(scope, None)
+            self._buckets.pop(scope, None)
+
+    def _find_match(self, scope: str, fingerprint: int) -> Optional[int]:
+        buckets = self._buckets.get(scope)
+        if not buckets:
+            return None
+        seen = set()
+        for band in _bands(fingerprint):
+            for candidate in buckets.get(band, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    return candidate
+        return None
+
+    # ─── 공개 API ────────────────────────────────────────────────────────────
+    def fingerprint_item(self, item: dict) -> int:
+        # 기사 dict 는 뉴스 캐시와 공유되므로 지문을 dict 에 써 넣지 않고 (제목, 요약) 기준 LRU 로 재사용
+        return _cached_simhash(item.get("title", ""), item.get("description", ""))
+
+    def is_duplicate(self, scope: str, item: dict) -> bool:
+        """이미 기록된(발송된) 기사와 근접 중복인지 확인"""
+        fp = self.fingerprint_item(item)
+        if not fp:
+            return False
+        with self._lock:
+            self._expire(scope, time.time())
+            self.stats["checked"] += 1
+            return self._find_match(scope, fp) is not None
+
+    def collapse(self, scope: str, items: List[dict]) -> List[dict]:
+        """
+        배치 내 근접 중복 기사를 하나의 클러스터로 묶어 대표 기사만 반환
+        - 입력 순서상 먼저 나온 기사가 대표 (호출 측에서 관련성 순 정렬 후 전달)
+        - 이미 발송 이력이 있는 클러스터는 통째로 제외
+        """
+        if not items:
+            return []
+        representatives: List[dict] = []
+        batch_fps: List[int] = []
+        with self._lock:
+            self._expire(scope, time.time())
+            for item in items:
+                fp = self.fingerprint_item(item)
+                self.stats["checked"] += 1
+                if fp and self._find_match(scope, fp) is not None:
+                    self.stats["collapsed"] += 1
+                    continue
+                if fp and any(hamming_distance(fp, other) <= self.max_distance for other in batch_fps):
+                    self.stats["collapsed"] += 1
+                    continue
+                batch_fps.append(fp)
+                representatives.append(item)
+        return representatives
+
+    def remember(self, scope: str, item: dict, article_id: str = ""):
+        """발송 완료된 기사 지문을 인덱스 + DB에 기록"""
+        self.remember_many(scope, [(item, article_id)])
+
+    def remember_many(self, scope: str, entries: List[Tuple[dict, str]]):
+        now = time.time()
+        records = []
+        with self._lock:
+            self._expire(scope, now)
+            for item, article_id in entries:
+                fp = self.fingerprint_item(item)
+                if not fp:
+                    continue
+                self._index(scope, fp, now)
+                records.append((scope, fp, article_id or item.get("link", ""), now))
+            self.stats["remembered"] += len(records)
+        self._persist(records)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "scopes": len(self._timeline),
+                "fingerprints": sum(len(t) for t in self._timeline.values()),
+                "window_hours": self.window_seconds // 3600,
+                "max_distance": self.max_distance,
+            }
+
+
+# ─── 전역 인스턴스 ──────────────────────────────────────────────────────────
+news_deduper = NearDuplicateDetector()
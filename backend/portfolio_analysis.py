@@ -1,8 +1,11 @@
 ﻿import re
+import warnings
+import requests
 import yfinance as yf
 import pandas as pd
 import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # ==========================================
@@ -10,6 +13,7 @@ from datetime import datetime, timedelta
 # ==========================================
 
 from korea_data import get_naver_stock_info, search_stock_code, get_korean_stock_name
+from turbo_engine import turbo_cache
 
 # ==========================================
 # 1. Account Nutritionist (Sector Analysis)
@@ -86,115 +90,236 @@ def get_korean_character(kor_sector_name):
             return SECTOR_CHARACTER_MAP.get(val, "기타 (미분류)")
     return "기타 (미분류)"
 
-def analyze_portfolio_composition(symbols: list) -> dict:
+# ==========================================
+# 0. Diagnosis Pipeline (resolve → parallel fetch → aggregate)
+# ==========================================
+# 종목 해석은 한 번만, 종목별 외부 조회는 DIAGNOSIS_WORKERS 개 스레드로 동시에,
+# 잘 안 바뀌는 데이터(배당/보호예수/CB, yfinance info)는 turbo_cache 로 종목 단위 공유
+
+DIAGNOSIS_WORKERS = int(os.getenv("PORTFOLIO_DIAGNOSIS_WORKERS", "8"))
+
+
+def resolve_holdings(symbols: list) -> list:
+    """
+    입력 종목(한글명/코드/티커)을 한 번에 해석합니다. 한글명 검색은 병렬.
+    Returns: [{"symbol": 원본 입력, "raw": 공백 제거, "code": 해석 결과, "final_code": 6자리(국내),
+               "is_korean": bool, "resolved": 한글명 해석 성공 여부}]
+    """
+    raw_list = [str(s).strip() for s in symbols]
+    names = list(dict.fromkeys(r for r in raw_list if re.search('[가-힣]', r)))
+    found = dict(zip(names, fan_out(search_stock_code, names))) if names else {}
+
+    holdings = []
+    for symbol, raw_sym in zip(symbols, raw_list):
+        search_code = found.get(raw_sym) or raw_sym
+        is_korean = search_code.endswith(".KS") or search_code.endswith(".KQ") or search_code.isdigit()
+        final_code = search_code
+        if is_korean and "." in search_code and search_code.split('.')[0].isdigit():
+            final_code = search_code.split('.')[0]
+        holdings.append({
+            "symbol": symbol,
+            "raw": raw_sym,
+            "code": search_code,
+            "final_code": final_code,
+            "is_korean": is_korean,
+            "resolved": raw_sym not in found or bool(found[raw_sym]),
+        })
+    return holdings
+
+
+def fan_out(func, items: list, workers: int = DIAGNOSIS_WORKERS) -> list:
+    """items 각각에 func 를 병렬 적용 (입력 순서 유지, 예외는 None)"""
+    def run(item):
+        try:
+            return func(item)
+        except Exception as e:
+            print(f"[PortfolioDiagnosis] {getattr(func, '__name__', func)} failed for {item}: {e}")
+            return None
+
+    if len(items) <= 1:
+        return [run(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(run, items))
+
+
+@turbo_cache(ttl_seconds=3600)
+def _yf_info(ticker: str) -> dict:
+    return yf.Ticker(ticker).info or {}
+
+
+@turbo_cache(ttl_seconds=86400)
+def _yf_dividends(ticker: str):
+    return yf.Ticker(ticker).dividends
+
+
+@turbo_cache(ttl_seconds=3600)
+def _yf_history(ticker: str, period: str):
+    return yf.Ticker(ticker).history(period=period)
+
+
+@turbo_cache(ttl_seconds=86400)
+def _stock_name(code: str):
+    return get_korean_stock_name(code)
+
+
+def diagnose_portfolio(symbols: list) -> dict:
+    """
+    /portfolio/diagnosis 용 통합 진단: 자산 구성 + 배당 캘린더 + 팩터 + 개별 종목 리스크(risk_analyzer).
+    종목 해석 1회 후 (섹션 × 종목) 작업을 하나의 스레드 풀에서 동시에 실행합니다.
+    """
+    from risk_analyzer import analyze_stock_risk
+
+    holdings = resolve_holdings(symbols)
+    sections = {
+        "composition": _composition_item,
+        "calendar": _dividend_events,
+        "factors": _factor_metrics,
+        "stock_risks": lambda h: analyze_stock_risk(h["symbol"]),
+    }
+    jobs = [(name, h) for name in sections for h in holdings]
+    results = fan_out(lambda job: sections[job[0]](job[1]), jobs)
+    by_section = {name: [r for (n, _), r in zip(jobs, results) if n == name] for name in sections}
+
+    return {
+        "composition": _aggregate_composition(holdings, by_section["composition"]),
+        "calendar": _aggregate_calendar(by_section["calendar"]),
+        "factors": _aggregate_factors(by_section["factors"]),
+        "stock_risks": {h["symbol"]: r for h, r in zip(holdings, by_section["stock_risks"]) if r is not None},
+    }
+
+
+def analyze_portfolio_composition(symbols: list, holdings: list = None) -> dict:
     """
     Analyzes portfolio sectors and maps them to 'Asset Characteristics'.
     """
+    holdings = holdings if holdings is not None else resolve_holdings(symbols)
+    return _aggregate_composition(holdings, fan_out(_composition_item, holdings))
+
+
+def _composition_item(h: dict) -> dict:
+    if h["is_korean"]:
+        from korea_data import gather_naver_stock_data
+        info = gather_naver_stock_data(h["final_code"])
+        if info:
+            sector = info.get('sector', 'Unknown')
+            character = get_korean_character(sector)
+        else:
+            sector = "Unknown (KR)"
+            character = "기타 (미분류)"
+    else:
+        # US Stock via yfinance
+        raw_sector = _yf_info(h["code"]).get('sector', 'Unknown')
+        sector = raw_sector
+        character = SECTOR_CHARACTER_MAP.get(raw_sector, "기타 (미분류)")
+    return {
+        "symbol": h["raw"],
+        "code": h["code"],
+        "sector": sector,
+        "character": character
+    }
+
+
+def _aggregate_composition(holdings: list, items: list) -> dict:
     char_counts = {}
     sector_breakdown = {}
     details = [] # [New] Store per-symbol details
-    
     valid_symbols = 0
-    
-    for symbol in symbols:
-        try:
-            sector = "Unknown"
-            nutrient = "기타 (식이섬유)"
-            
-            # Clean input
-            raw_sym = str(symbol).strip()
-            search_code = raw_sym
-            
-            # 1. Check if it is a Korean Name (contains Hangul)
-            if re.search('[가-힣]', raw_sym):
-                found = search_stock_code(raw_sym)
-                if found:
-                    search_code = found
-                else:
-                    # Name search failed
-                    pass
-            
-            # 2. Check for Korean Stock (Numeric code or KS/KQ suffix)
-            is_korean_code = search_code.isdigit() 
-            is_korean = search_code.endswith(".KS") or search_code.endswith(".KQ") or is_korean_code
-            
-            if is_korean:
-                # Cleanup code format
-                final_code = search_code
-                if "." in search_code and search_code.split('.')[0].isdigit():
-                    final_code = search_code.split('.')[0]
-                
-                from korea_data import gather_naver_stock_data
-                info = gather_naver_stock_data(final_code)
-                if info:
-                    sector = info.get('sector', 'Unknown')
-                    character = get_korean_character(sector)
-                else:
-                    sector = "Unknown (KR)"
-                    character = "기타 (미분류)"
-            else:
-                # US Stock via yfinance
-                ticker = yf.Ticker(search_code)
-                info = ticker.info
-                raw_sector = info.get('sector', 'Unknown')
-                sector = raw_sector
-                character = SECTOR_CHARACTER_MAP.get(raw_sector, "기타 (미분류)")
-            
-            # Count
-            char_counts[character] = char_counts.get(character, 0) + 1
-            sector_breakdown[sector] = sector_breakdown.get(sector, 0) + 1
-            valid_symbols += 1
-            
-            # [New] Add to details
-            details.append({
-                "symbol": raw_sym,
-                "code": search_code,
-                "sector": sector,
-                "character": character
-            })
-            
-        except Exception as e:
-            print(f"Error fetching sector for {symbol}: {e}")
+
+    for h, item in zip(holdings, items):
+        if item is None:
             char_counts["기타 (미분류)"] = char_counts.get("기타 (미분류)", 0) + 1
             details.append({
-                "symbol": symbol,
-                "code": symbol,
+                "symbol": h["symbol"],
+                "code": h["symbol"],
                 "sector": "Error",
                 "character": "기타 (미분류)"
             })
-            
+            continue
+        char_counts[item["character"]] = char_counts.get(item["character"], 0) + 1
+        sector_breakdown[item["sector"]] = sector_breakdown.get(item["sector"], 0) + 1
+        valid_symbols += 1
+        details.append(item)
+
     # Calculate Percentages
     composition_data = []
     total = max(valid_symbols, 1) # Avoid div by zero
-    
+
     for character, count in char_counts.items():
         percent = round((count / total) * 100, 1)
-        
+
         # [New] Group symbols by characteristic for frontend display
         relevant_symbols = [d['symbol'] for d in details if d['character'] == character]
-        
+
         composition_data.append({
             "name": character,
             "value": percent,
             "count": count,
             "fill": CHARACTER_COLOR_MAP.get(character, "#94a3b8"),
-            "symbols": relevant_symbols 
+            "symbols": relevant_symbols
         })
-        
+
     # Sort by value
     composition_data.sort(key=lambda x: x['value'], reverse=True)
-        
+
     return {
         "composition": composition_data,
         "sectors": sector_breakdown,
         "total_assets": valid_symbols,
-        "details": details 
+        "details": details
     }
 
 # ==========================================
 # 2. Dividend Calendar (Second Salary)
 # ==========================================
 
+@turbo_cache(ttl_seconds=86400)
+def _seibro_dividend_ranking(year: int) -> dict:
+    """
+    SEIBRO getDividendRankN1 (시가배당률 상위 500, KOSPI) 전체를 한 번 받아 {단축코드: 배당 정보} 로 보관.
+    종목마다 같은 목록을 다시 받던 것을 연도별 1회로 줄임
+    """
+    api_key = os.getenv("SEIBRO_API_KEY")
+    if not api_key:
+        return None
+
+    url = "http://api.seibro.or.kr/openapi/service/StockSvc/getDividendRankN1"
+    # Hex Key는 그대로 사용
+    params = {
+        "ServiceKey": api_key,
+        "year": year, # 작년 기준 실적
+        "rankTpcd": "1", # 시가배당률순
+        "stkTpcd": "1", # KOSPI
+        "listTpcd": "1",
+        "numOfRows": "500", # 상위 500개 조회 (매칭 확률 높이기 위해)
+        "pageNo": "1"
+    }
+
+    res = requests.get(url, params=params, timeout=4)
+    if res.status_code != 200 or "<resultCode>00</resultCode>" not in res.text:
+        return None
+
+    # Simple XML Parsing using ElementTree
+    import xml.etree.ElementTree as ET
+    root = ET.fromstring(res.text)
+
+    ranking = {}
+    # Field: shotnIsin (단축코드) matches stock_code
+    for item in root.findall(".//item"):
+        code_node = item.find("shotnIsin")
+        if code_node is None or not code_node.text:
+            continue
+        amt_node = item.find("divAmtPerStk") # 주당배당금
+        date_node = item.find("setaccMmdd")  # 결산월일 (예: 1231)
+        amount = float(amt_node.text) if amt_node is not None and amt_node.text else 0
+        if amount > 0:
+            ranking[code_node.text] = {
+                "amount": amount,
+                "settlement_date": date_node.text if date_node is not None else "1229",
+                "source": "SEIBRO"
+            }
+    return ranking
+
+
 def fetch_seibro_dividend(stock_code: str) -> dict:
     """
     SEIBRO API를 통해 배당 정보를 조회합니다.
@@ -202,65 +327,20 @@ def fetch_seibro_dividend(stock_code: str) -> dict:
     Note: API Key must be set in env as SEIBRO_API_KEY
     Returns: dict with keys 'amount', 'date', 'type' if found, else None
     """
-    api_key = os.getenv("SEIBRO_API_KEY")
-    if not api_key:
-        return None
-    
     try:
-        url = "http://api.seibro.or.kr/openapi/service/StockSvc/getDividendRankN1"
-        # Hex Key는 그대로 사용
-        params = {
-            "ServiceKey": api_key,
-            "year": datetime.now().year - 1, # 작년 기준 실적
-            "rankTpcd": "1", # 시가배당률순
-            "stkTpcd": "1", # KOSPI
-            "listTpcd": "1",
-            "numOfRows": "500", # 상위 500개 조회 (매칭 확률 높이기 위해)
-            "pageNo": "1"
-        }
-        
-        res = requests.get(url, params=params, timeout=4)
-        
-        if res.status_code == 200 and "<resultCode>00</resultCode>" in res.text:
-            # Simple XML Parsing using ElementTree
-            import xml.etree.ElementTree as ET
-            root = ET.fromstring(res.text)
-            
-            # Find item with matching code
-            # Field: shotnIsin (단축코드) matches stock_code
-            for item in root.findall(".//item"):
-                code_node = item.find("shotnIsin")
-                if code_node is not None and code_node.text == stock_code:
-                    # Found the stock!
-                    amt_node = item.find("divAmtPerStk") # 주당배당금
-                    date_node = item.find("setaccMmdd")  # 결산월일 (예: 1231)
-                    
-                    amount = float(amt_node.text) if amt_node is not None and amt_node.text else 0
-                    date_str = date_node.text if date_node is not None else "1229"
-                    
-                    # Estimate next payment date based on settlement date
-                    # Usually payment is 3-4 months after settlement
-                    # If settlement is 12/31, payment is usually April
-                    if amount > 0:
-                        return {
-                            "amount": amount,
-                            "settlement_date": date_str,
-                            "source": "SEIBRO"
-                        }
-            
-            # If not found in first page, maybe try KOSDAQ? (stkTpcd=2)
-            # But for performance, we skip excessive calls in this loop
-            
+        ranking = _seibro_dividend_ranking(datetime.now().year - 1)
     except Exception as e:
         # print(f"[SEIBRO] Error: {e}")
-        pass
-        
-    return None
+        return None
+    # If not found in first page, maybe try KOSDAQ? (stkTpcd=2)
+    # But for performance, we skip excessive calls in this loop
+    return (ranking or {}).get(stock_code)
 
 # ==========================================
 # 3. Risk Analysis (Lock-up & CB/BW)
 # ==========================================
 
+@turbo_cache(ttl_seconds=21600)  # 보호예수/CB 잔액은 자주 바뀌지 않음
 def fetch_lockup_risk(stock_code: str) -> list:
     """
     의무보호예수 해제 현황을 조회하여 리스크를 분석합니다.
@@ -313,6 +393,7 @@ def fetch_lockup_risk(stock_code: str) -> list:
     
     return risks
 
+@turbo_cache(ttl_seconds=21600)
 def fetch_cb_risk(stock_code: str) -> list:
     """
     주식관련사채(CB/BW) 행사 잔액 정보를 조회합니다.
@@ -358,403 +439,345 @@ def fetch_cb_risk(stock_code: str) -> list:
         
     return risks
 
-def analyze_portfolio_risk(symbols: list) -> list:
+def analyze_portfolio_risk(symbols: list, holdings: list = None) -> list:
     """
     Analyzes risks for the entire portfolio.
     """
+    holdings = holdings if holdings is not None else resolve_holdings(symbols)
     portfolio_risks = []
-    
-    for symbol in symbols:
-        # Only for Korean stocks
-        if not (symbol.endswith(".KS") or symbol.endswith(".KQ") or symbol.isdigit()):
-            continue
-            
-        code = str(symbol).strip()
-        if "." in code:
-            code = code.split(".")[0]
-            
-        # 1. Lock-up Risks
-        lockups = fetch_lockup_risk(code)
-        for r in lockups:
-            r['symbol'] = symbol
-            portfolio_risks.append(r)
-            
-        # 2. CB/BW Risks
-        cbs = fetch_cb_risk(code)
-        for r in cbs:
-            r['symbol'] = symbol
-            portfolio_risks.append(r)
-            
+    for risks in fan_out(_risk_items, holdings):
+        portfolio_risks.extend(risks or [])
     return portfolio_risks
 
-def get_dividend_calendar(symbols: list) -> list:
+
+def _risk_items(h: dict) -> list:
+    # Only for Korean stocks
+    if not h["is_korean"]:
+        return []
+    code = h["final_code"]
+    risks = []
+    # 1. Lock-up Risks / 2. CB/BW Risks (캐시된 결과를 공유하므로 복사본에 symbol 부여)
+    for r in fetch_lockup_risk(code) + fetch_cb_risk(code):
+        risks.append({**r, "symbol": h["symbol"]})
+    return risks
+
+
+def get_dividend_calendar(symbols: list, holdings: list = None) -> list:
     """
     Fetches dividend dates and amounts with improved accuracy.
     - US stocks: Confirmed ex-dividend date from yfinance + historical projection
     - Korean stocks: yfinance .KS history for quarterly detection + Naver fallback
     """
+    holdings = holdings if holdings is not None else resolve_holdings(symbols)
+    return _aggregate_calendar(fan_out(_dividend_events, holdings))
+
+
+def _aggregate_calendar(event_lists: list) -> list:
+    calendar_events = [event for events in event_lists if events for event in events]
+    # Sort by date
+    calendar_events.sort(key=lambda x: x['date'])
+    return calendar_events
+
+
+def _dividend_events(h: dict) -> list:
+    symbol, raw_sym = h["symbol"], h["raw"]
     calendar_events = []
-    
-    for symbol in symbols:
+
+    # --- Step 1: Resolve symbol (resolve_holdings) ---
+    if not h["resolved"]:
+        print(f"[Dividend] Could not resolve Korean name: {raw_sym}")
+        return calendar_events
+
+    # --- Step 2: Determine market type ---
+    if h["is_korean"]:
+        final_code = h["final_code"]
+
+        # === Korean Stock Dividends ===
+        # Priority 0: SEIBRO API (If key works)
+        seibro_data = fetch_seibro_dividend(final_code)
+        if seibro_data:
+            # Estimate payment date (Settlement + 4 months approx)
+            # ex) 1231 -> Next year April
+            settlement_mmdd = seibro_data.get('settlement_date', '1231')
+            try:
+                month = int(settlement_mmdd[:2])
+                day = int(settlement_mmdd[2:])
+            except:
+                month=12; day=31
+
+            year = datetime.now().year
+            # If settlement is Dec, payment is next year April
+            if month >= 11:
+                pay_year = year + 1
+                pay_month = 4
+                pay_day = 15 # Approx
+            else:
+                pay_year = year
+                pay_month = month + 3
+                if pay_month > 12:
+                    pay_year += 1
+                    pay_month -= 12
+                pay_day = 15
+
+            pay_date = f"{pay_year}-{pay_month:02d}-{pay_day:02d}"
+
+            stock_name = _stock_name(final_code) or raw_sym
+            calendar_events.append({
+                "symbol": symbol,
+                "name": stock_name,
+                "date": pay_date,
+                "amount": float(seibro_data.get('amount', 0)),
+                "currency": "KRW",
+                "type": "확정 (현금배당)",
+                "source": "SEIBRO"
+            })
+            return calendar_events
+
+        # Primary: yfinance .KS ticker for actual dividend history
+        yf_ticker_code = f"{final_code}.KS"
+        yf_success = False
         try:
-            # --- Step 1: Resolve symbol ---
-            raw_sym = str(symbol).strip()
-            search_code = raw_sym
-            
-            if re.search('[가-힣]', raw_sym):
-                found = search_stock_code(raw_sym)
-                if found:
-                    search_code = found
-                else:
-                    print(f"[Dividend] Could not resolve Korean name: {raw_sym}")
-                    continue
-            
-            # --- Step 2: Determine market type ---
-            is_korean_code = search_code.isdigit()
-            is_korean = search_code.endswith(".KS") or search_code.endswith(".KQ") or is_korean_code
-            
-            if is_korean:
-                final_code = search_code
-                if "." in search_code and search_code.split('.')[0].isdigit():
-                    final_code = search_code.split(".")[0]
-                
-                # === Korean Stock Dividends ===
-                # Priority 0: SEIBRO API (If key works)
-                seibro_data = fetch_seibro_dividend(final_code)
-                if seibro_data:
-                    # Estimate payment date (Settlement + 4 months approx)
-                    # ex) 1231 -> Next year April
-                    settlement_mmdd = seibro_data.get('settlement_date', '1231') 
-                    try:
-                        month = int(settlement_mmdd[:2])
-                        day = int(settlement_mmdd[2:])
-                    except:
-                        month=12; day=31
-                    
-                    year = datetime.now().year
-                    # If settlement is Dec, payment is next year April
-                    if month >= 11:
-                        pay_year = year + 1
-                        pay_month = 4
-                        pay_day = 15 # Approx
+            dividends = _yf_dividends(yf_ticker_code)
+
+            if dividends is not None and not dividends.empty:
+                now = pd.Timestamp.now()
+                if dividends.index.tz is not None:
+                    now = pd.Timestamp.now(tz=dividends.index.tz)
+
+                eighteen_months_ago = now - pd.DateOffset(months=18)
+                recent_divs = dividends[dividends.index > eighteen_months_ago]
+
+                if not recent_divs.empty:
+                    num_divs = len(recent_divs)
+                    if num_divs >= 4:
+                        div_type = "분기배당"
+                    elif num_divs >= 2:
+                        div_type = "반기배당"
                     else:
-                        pay_year = year
-                        pay_month = month + 3
-                        if pay_month > 12:
-                            pay_year += 1
-                            pay_month -= 12
-                        pay_day = 15
-                        
-                    pay_date = f"{pay_year}-{pay_month:02d}-{pay_day:02d}"
-                    
-                    stock_name = get_korean_stock_name(final_code) or raw_sym
-                    calendar_events.append({
-                        "symbol": symbol,
-                        "name": stock_name,
-                        "date": pay_date,
-                        "amount": float(seibro_data.get('amount', 0)),
-                        "currency": "KRW",
-                        "type": "확정 (현금배당)",
-                        "source": "SEIBRO"
-                    })
-                    continue
-
-                # Primary: yfinance .KS ticker for actual dividend history
-                yf_ticker_code = f"{final_code}.KS"
-                yf_success = False
-                try:
-                    ticker = yf.Ticker(yf_ticker_code)
-                    dividends = ticker.dividends
-                    
-                    if not dividends.empty:
-                        now = pd.Timestamp.now()
-                        if dividends.index.tz is not None:
-                            now = pd.Timestamp.now(tz=dividends.index.tz)
-                        
-                        eighteen_months_ago = now - pd.DateOffset(months=18)
-                        recent_divs = dividends[dividends.index > eighteen_months_ago]
-                        
-                        if not recent_divs.empty:
-                            num_divs = len(recent_divs)
-                            if num_divs >= 4:
-                                div_type = "분기배당"
-                            elif num_divs >= 2:
-                                div_type = "반기배당"
-                            else:
-                                div_type = "연간배당"
-                            
-                            for date, amount in recent_divs.items():
-                                projected_date = date + pd.DateOffset(years=1)
-                                current_time = pd.Timestamp.now(tz=date.tz) if date.tz else pd.Timestamp.now()
-                                if projected_date < current_time:
-                                    projected_date += pd.DateOffset(years=1)
-                                
-                                # Get actual month name for display
-                                month = projected_date.month
-                                quarter_label = f"{month}월"
-                                
-                                calendar_events.append({
-                                    "date": projected_date.strftime("%Y-%m-%d"),
-                                    "symbol": raw_sym,
-                                    "name": get_korean_stock_name(final_code) or raw_sym,
-                                    "amount": float(amount),
-                                    "currency": "KRW",
-                                    "type": div_type,
-                                    "source": "예상 (과거 이력 기반)"
-                                })
-                            yf_success = True
-                except Exception as e:
-                    print(f"[Dividend] yfinance failed for {yf_ticker_code}: {e}")
-
-                # Fallback: Naver stock info (annual only)
-                if not yf_success:
-                    info = get_naver_stock_info(final_code)
-                    if info and info.get('dvr', 0) > 0:
-                        stock_name = info.get('name', raw_sym)
-                        dvr_pct = info.get('dvr', 0) * 100
-                        
+                        div_type = "연간배당"
+
+                    stock_name = _stock_name(final_code) or raw_sym
+                    for date, amount in recent_divs.items():
+                        projected_date = date + pd.DateOffset(years=1)
+                        current_time = pd.Timestamp.now(tz=date.tz) if date.tz else pd.Timestamp.now()
+                        if projected_date < current_time:
+                            projected_date += pd.DateOffset(years=1)
+
                         calendar_events.append({
-                            "date": f"{datetime.now().year}-12-29",
+                            "date": projected_date.strftime("%Y-%m-%d"),
                             "symbol": raw_sym,
                             "name": stock_name,
-                            "amount": info.get('dp_share', 0),
-                            "yield": round(dvr_pct, 2),
+                            "amount": float(amount),
                             "currency": "KRW",
-                            "type": "연간배당",
-                            "source": "예상 (네이버 기반)"
+                            "type": div_type,
+                            "source": "예상 (과거 이력 기반)"
                         })
-                continue
+                    yf_success = True
+        except Exception as e:
+            print(f"[Dividend] yfinance failed for {yf_ticker_code}: {e}")
 
-            # === US/Global Stock Dividends ===
-            ticker = yf.Ticker(search_code)
-            
-            try:
-                info = ticker.info
-            except:
-                info = {}
-            
-            ticker_name = info.get('shortName', raw_sym)
-            ticker_currency = info.get('currency', 'USD')
-            
-            # Method 1: Confirmed next ex-dividend date from yfinance
-            ex_div_timestamp = info.get('exDividendDate')
-            last_div_value = info.get('lastDividendValue', 0)
-            
-            confirmed_date_str = None
-            if ex_div_timestamp and last_div_value:
-                try:
-                    ex_div_date = datetime.fromtimestamp(ex_div_timestamp)
-                    if ex_div_date > datetime.now() - timedelta(days=7):
-                        confirmed_date_str = ex_div_date.strftime("%Y-%m-%d")
-                        calendar_events.append({
-                            "date": confirmed_date_str,
-                            "symbol": raw_sym,
-                            "name": ticker_name,
-                            "amount": float(last_div_value),
-                            "currency": ticker_currency,
-                            "type": "확정 (현금배당)",
-                            "source": "Yahoo Finance"
-                        })
-                except Exception as e:
-                    print(f"[Dividend] Ex-div date parse error for {raw_sym}: {e}")
-            
-            # Method 2: Historical projection for future dates
-            dividends = ticker.dividends
-            if not dividends.empty:
-                now = pd.Timestamp.now()
-                if dividends.index.tz is not None:
-                    now = pd.Timestamp.now(tz=dividends.index.tz)
+        # Fallback: Naver stock info (annual only)
+        if not yf_success:
+            info = get_naver_stock_info(final_code)
+            if info and info.get('dvr', 0) > 0:
+                stock_name = info.get('name', raw_sym)
+                dvr_pct = info.get('dvr', 0) * 100
 
-                one_year_ago = now - pd.DateOffset(years=1)
-                recent_divs = dividends[dividends.index > one_year_ago]
-                
-                num_divs = len(recent_divs)
-                if num_divs >= 4:
-                    div_freq = "Quarterly"
-                elif num_divs >= 2:
-                    div_freq = "Semi-Annual"
-                else:
-                    div_freq = "Annual"
-                
-                for date, amount in recent_divs.items():
-                    projected_date = date + pd.DateOffset(years=1)
-                    current_time = pd.Timestamp.now(tz=date.tz) if date.tz else pd.Timestamp.now()
-                    
-                    if projected_date < current_time:
-                        projected_date += pd.DateOffset(years=1)
-                    
-                    proj_date_str = projected_date.strftime("%Y-%m-%d")
-                    
-                    # Skip if too close to confirmed date (avoid duplicates)
-                    if confirmed_date_str:
-                        try:
-                            confirmed_dt = datetime.strptime(confirmed_date_str, "%Y-%m-%d")
-                            proj_dt = projected_date.to_pydatetime()
-                            if hasattr(proj_dt, 'replace'):
-                                proj_dt = proj_dt.replace(tzinfo=None)
-                            if abs((proj_dt - confirmed_dt).days) < 30:
-                                continue
-                        except:
-                            pass
-                    
-                    calendar_events.append({
-                        "date": proj_date_str,
-                        "symbol": raw_sym,
-                        "name": ticker_name,
-                        "amount": float(amount),
-                        "currency": ticker_currency,
-                        "type": f"예상 ({div_freq})",
-                        "source": "예상 (과거 이력 기반)"
-                    })
-                
+                calendar_events.append({
+                    "date": f"{datetime.now().year}-12-29",
+                    "symbol": raw_sym,
+                    "name": stock_name,
+                    "amount": info.get('dp_share', 0),
+                    "yield": round(dvr_pct, 2),
+                    "currency": "KRW",
+                    "type": "연간배당",
+                    "source": "예상 (네이버 기반)"
+                })
+        return calendar_events
+
+    # === US/Global Stock Dividends ===
+    search_code = h["code"]
+    try:
+        info = _yf_info(search_code) or {}
+    except:
+        info = {}
+
+    ticker_name = info.get('shortName', raw_sym)
+    ticker_currency = info.get('currency', 'USD')
+
+    # Method 1: Confirmed next ex-dividend date from yfinance
+    ex_div_timestamp = info.get('exDividendDate')
+    last_div_value = info.get('lastDividendValue', 0)
+
+    confirmed_date_str = None
+    if ex_div_timestamp and last_div_value:
+        try:
+            ex_div_date = datetime.fromtimestamp(ex_div_timestamp)
+            if ex_div_date > datetime.now() - timedelta(days=7):
+                confirmed_date_str = ex_div_date.strftime("%Y-%m-%d")
+                calendar_events.append({
+                    "date": confirmed_date_str,
+                    "symbol": raw_sym,
+                    "name": ticker_name,
+                    "amount": float(last_div_value),
+                    "currency": ticker_currency,
+                    "type": "확정 (현금배당)",
+                    "source": "Yahoo Finance"
+                })
         except Exception as e:
-            print(f"Error fetching dividends for {symbol}: {e}")
-            
-    # Sort by date
-    calendar_events.sort(key=lambda x: x['date'])
+            print(f"[Dividend] Ex-div date parse error for {raw_sym}: {e}")
+
+    # Method 2: Historical projection for future dates
+    dividends = _yf_dividends(search_code)
+    if dividends is not None and not dividends.empty:
+        now = pd.Timestamp.now()
+        if dividends.index.tz is not None:
+            now = pd.Timestamp.now(tz=dividends.index.tz)
+
+        one_year_ago = now - pd.DateOffset(years=1)
+        recent_divs = dividends[dividends.index > one_year_ago]
+
+        num_divs = len(recent_divs)
+        if num_divs >= 4:
+            div_freq = "Quarterly"
+        elif num_divs >= 2:
+            div_freq = "Semi-Annual"
+        else:
+            div_freq = "Annual"
+
+        for date, amount in recent_divs.items():
+            projected_date = date + pd.DateOffset(years=1)
+            current_time = pd.Timestamp.now(tz=date.tz) if date.tz else pd.Timestamp.now()
+
+            if projected_date < current_time:
+                projected_date += pd.DateOffset(years=1)
+
+            proj_date_str = projected_date.strftime("%Y-%m-%d")
+
+            # Skip if too close to confirmed date (avoid duplicates)
+            if confirmed_date_str:
+                try:
+                    confirmed_dt = datetime.strptime(confirmed_date_str, "%Y-%m-%d")
+                    proj_dt = projected_date.to_pydatetime()
+                    if hasattr(proj_dt, 'replace'):
+                        proj_dt = proj_dt.replace(tzinfo=None)
+                    if abs((proj_dt - confirmed_dt).days) < 30:
+                        continue
+                except:
+                    pass
+
+            calendar_events.append({
+                "date": proj_date_str,
+                "symbol": raw_sym,
+                "name": ticker_name,
+                "amount": float(amount),
+                "currency": ticker_currency,
+                "type": f"예상 ({div_freq})",
+                "source": "예상 (과거 이력 기반)"
+            })
     return calendar_events
 
 # ==========================================
 # 3. Factor Analysis (Radar)
 # ==========================================
 
-def analyze_portfolio_factors(symbols: list) -> dict:
+FACTOR_DEFAULTS = (1.0, 30.0, 0.0, 20.0, 0.0)  # beta, pe, yield(%), volatility(%), momentum(%)
+
+
+def analyze_portfolio_factors(symbols: list, holdings: list = None) -> dict:
     """
     Calculates 6-factor scores for the portfolio.
     Returns simulated/calculated scores normalized to 0-100.
     """
-    
-    # Store aggregate metrics
-    betas = []
-    pe_ratios = [] # Value (Inverse)
-    yields = []
-    volatilities = []
-    momentums = [] # RSI or Return
-    # alphas = [] 
-    
-    for symbol in symbols:
-        try:
-            raw_sym = str(symbol).strip()
-            search_code = raw_sym
-            
-            if re.search('[가-힣]', raw_sym):
-                found = search_stock_code(raw_sym)
-                if found:
-                    search_code = found
-                    
-            is_korean_code = search_code.isdigit()
-            is_korean = search_code.endswith(".KS") or search_code.endswith(".KQ") or is_korean_code
-            
+    holdings = holdings if holdings is not None else resolve_holdings(symbols)
+    return _aggregate_factors(fan_out(_factor_metrics, holdings))
+
+
+def _factor_metrics(h: dict) -> tuple:
+    """종목 1개의 (beta, pe, yield%, volatility%, momentum%)"""
+    beta, pe, div_yield, vol, mom = FACTOR_DEFAULTS
+
+    if h["is_korean"]:
+        from korea_data import gather_naver_stock_data
+        info = gather_naver_stock_data(h["final_code"])
+        if info:
+            # Beta (Manual Default or Future Scrape)
             beta = 1.0
-            pe = 30.0
-            div_yield = 0.0
+
+            # Value (PER)
+            if info.get('per') and float(str(info['per']).replace(',', '')) > 0:
+                pe = float(str(info['per']).replace(',', ''))
+            elif info.get('est_per') and float(str(info['est_per']).replace(',', '')) > 0:
+                pe = float(str(info['est_per']).replace(',', ''))
+
+            # Yield
+            div_yield = float(str(info.get('dvr', 0)).replace(',', '')) / 100.0 # dvr is usually % in gather_naver_stock_data
+
+            # Momentum (High/Low)
+            # Use position in 52w range as proxy for momentum
+            if info.get('year_high') and info.get('year_low') and info.get('price'):
+                h_, l_, p_ = info['year_high'], info['year_low'], info['price']
+                if h_ > l_:
+                    # 0 to 1 scale. 1 = All time high (Strong Momentum)
+                    pos = (p_ - l_) / (h_ - l_)
+                    mom = (pos - 0.5) * 100 # -50 to +50
+                else:
+                    mom = 0
+
+            # Volatility -> Default
             vol = 20.0
-            mom = 0.0
-
-            if is_korean:
-                if "." in search_code:
-                     search_code = search_code.split(".")[0]
-
-                from korea_data import gather_naver_stock_data
-                info = gather_naver_stock_data(search_code)
-                if info:
-                    # Beta (Manual Default or Future Scrape)
-                    beta = 1.0 
-                    
-                    # Value (PER)
-                    if info.get('per') and float(str(info['per']).replace(',', '')) > 0:
-                        pe = float(str(info['per']).replace(',', ''))
-                    elif info.get('est_per') and float(str(info['est_per']).replace(',', '')) > 0:
-                        pe = float(str(info['est_per']).replace(',', ''))
-                        
-                    # Yield
-                    div_yield = float(str(info.get('dvr', 0)).replace(',', '')) / 100.0 # dvr is usually % in gather_naver_stock_data
-                    
-                    # Momentum (High/Low)
-                    # Use position in 52w range as proxy for momentum
-                    if info.get('year_high') and info.get('year_low') and info.get('price'):
-                        h = info['year_high']
-                        l = info['year_low']
-                        p = info['price']
-                        if h > l:
-                            # 0 to 1 scale. 1 = All time high (Strong Momentum)
-                            pos = (p - l) / (h - l)
-                            mom = (pos - 0.5) * 100 # -50 to +50
-                        else:
-                            mom = 0
-                    
-                    # Volatility -> Default
-                    vol = 20.0 
+    else:
+        # US Stock (yfinance)
+        info = _yf_info(h["code"])
 
-            else:
-                # US Stock (yfinance)
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
-                
-                beta = info.get('beta', 1.0) or 1.0
-                pe = info.get('forwardPE', info.get('trailingPE', 30)) or 30
-                div_yield = info.get('dividendYield', 0) or 0
-                
-                # Momentum & Volatility (Need history)
-                hist = ticker.history(period="6mo")
-                if not hist.empty:
-                    returns = hist['Close'].pct_change().dropna()
-                    vol = returns.std() * np.sqrt(252) * 100
-                    mom = ((hist['Close'].iloc[-1] - hist['Close'].iloc[0]) / hist['Close'].iloc[0]) * 100
-
-            betas.append(beta)
-            pe_ratios.append(pe)
-            yields.append(div_yield * 100) # Convert to %
-            volatilities.append(vol)
-            momentums.append(mom)
+        beta = info.get('beta', 1.0) or 1.0
+        pe = info.get('forwardPE', info.get('trailingPE', 30)) or 30
+        div_yield = info.get('dividendYield', 0) or 0
 
-        except Exception as e:
-            print(f"Error fetching factors for {symbol}: {e}")
-            
-    if not betas:
+        # Momentum & Volatility (Need history)
+        hist = _yf_history(h["code"], "6mo")
+        if hist is not None and not hist.empty:
+            closes = hist['Close'].to_numpy(dtype=float)
+            returns = closes[1:] / closes[:-1] - 1
+            vol = float(np.nanstd(returns, ddof=1)) * np.sqrt(252) * 100
+            mom = ((closes[-1] - closes[0]) / closes[0]) * 100
+
+    return beta, pe, div_yield * 100, vol, mom # yield: Convert to %
+
+
+def _aggregate_factors(metrics: list) -> dict:
+    rows = [m for m in metrics if m is not None]
+    if not rows:
         return {}
-        
+
     # --- Aggregation & Normalization (0-100 Scale for Radar) ---
-    
-    # Use nanmean to ignore possible NaN values from individual stocks
-    avg_beta = float(np.nanmean(betas)) if betas else 1.0
-    avg_pe = float(np.nanmean(pe_ratios)) if pe_ratios else 30.0
-    avg_yield = float(np.nanmean(yields)) if yields else 0.0
-    avg_mom = float(np.nanmean(momentums)) if momentums else 0.0
-    avg_vol = float(np.nanmean(volatilities)) if volatilities else 20.0
-    
-    # 1. Beta Score (High Beta = High Risk/Aggressive)
-    score_beta = min(max(avg_beta * 50, 10), 100)
-    
-    # 2. Value Score (Low P/E = High Value)
-    # If P/E is very high, score is low, but let's keep a floor of 10
-    score_value = min(max(100 - (avg_pe * 1.2), 10), 100)
-    
-    # 3. Yield Score (High Yield = High Score)
-    score_yield = min(max(avg_yield * 15, 10), 100)
-    
-    # 4. Momentum Score (High Return = High Score)
-    score_momentum = min(max(50 + avg_mom, 10), 100)
-    
-    # 5. Volatility Score (High Vol = High Score)
-    score_volatility = min(max(avg_vol * 1.5, 10), 100)
-    
-    # 6. Alpha (Relative Performance)
-    raw_alpha = avg_mom - (avg_beta * 3)
-    score_alpha = min(max(50 + raw_alpha, 10), 100)
-    
+    # (종목 × 지표) 배열 한 번에, nanmean 으로 개별 종목 NaN 무시
+    table = np.array(rows, dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        avg_beta, avg_pe, avg_yield, avg_vol, avg_mom = np.nanmean(table, axis=0)
+
+    # beta(높을수록 공격적) / value(낮은 PER 일수록 가치) / yield / momentum / volatility / alpha(상대 성과)
+    raw_scores = np.array([
+        avg_beta * 50,
+        100 - (avg_pe * 1.2),
+        avg_yield * 15,
+        50 + avg_mom,
+        avg_vol * 1.5,
+        50 + (avg_mom - (avg_beta * 3)),
+    ])
+    scores = np.clip(raw_scores, 10, 100)
     # Final NaN/Inf check
-    def clean(val):
-        if np.isnan(val) or np.isinf(val): return 50.0
-        return float(round(val, 1))
+    scores = np.where(np.isfinite(scores), np.round(scores, 1), 50.0)
+    score_beta, score_value, score_yield, score_momentum, score_volatility, score_alpha = (float(s) for s in scores)
 
     return {
-        "beta": clean(score_beta),
-        "value": clean(score_value),
-        "yield": clean(score_yield),
-        "momentum": clean(score_momentum),
-        "volatility": clean(score_volatility),
-        "alpha": clean(score_alpha),
+        "beta": score_beta,
+        "value": score_value,
+        "yield": score_yield,
+        "momentum": score_momentum,
+        "volatility": score_volatility,
+        "alpha": score_alpha,
         "raw_stats": {
             "avg_beta": float(round(np.nan_to_num(avg_beta), 2)),
             "avg_pe": float(round(np.nan_to_num(avg_pe), 1)),
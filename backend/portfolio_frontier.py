@@ -0,0 +1,334 @@
+"""
+🎯 포트폴리오 최적화 엔진 (효율적 투자선 + 추정치 캐시)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+portfolio_opt.optimize_portfolio 는 요청마다 종목 히스토리를 순서대로 받아 최대 샤프 1점만 풀었습니다.
+사용자는 보유 종목을 하나씩 바꿔 가며 여러 번 돌리므로 여기서는
+
+  1) 종목별 일봉을 (티커, 날짜) 단위로 캐시 → 종목 하나 추가 시 그 종목만 새로 받음 (여러 개면 병렬)
+  2) (종목 집합, 날짜, 축소 방식) 단위로 평균/공분산 추정치 캐시
+  3) 최소분산 · 최대샤프 · 목표수익률 구간 점들을 SLSQP(해석적 기울기)로 풀고,
+     직전 점 / 종목 하나만 다른 이전 결과의 비중으로 warm start
+
+해서 캐시가 찬 뒤 재최적화는 수십 ms 안에 끝납니다.
+
+    from portfolio_frontier import portfolio_optimizer
+    result = portfolio_optimizer.frontier(["삼성전자", "SK하이닉스", "NAVER"], shrinkage="ledoit_wolf")
+
+    python portfolio_frontier.py 005930 000660 035420 AAPL --shrinkage none
+
+📌 shrinkage: "ledoit_wolf" (기본, 스케일된 단위행렬 방향 Ledoit-Wolf 축소) | "none" (표본 공분산)
+📌 수익률/변동성은 연환산(252거래일), 무위험수익률 4% (기존 optimize_portfolio 와 동일), 공매도 없음
+📌 날짜 정렬: 모든 종목에 시세가 있는 거래일만 사용 (기존 df.dropna() 와 동일)
+⚠️ 캐시는 프로세스 메모리 (워커별). 날짜가 바뀌면 키가 달라져 자연히 새로 받음
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import scipy.optimize as sco
+    SCIPY_AVAILABLE = True
+except ImportError:
+    sco = None
+    SCIPY_AVAILABLE = False
+
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.04
+HISTORY_PERIOD = "1y"
+FRONTIER_POINTS = 20
+FETCH_WORKERS = 8
+HISTORY_CACHE_SIZE = 512
+RESULT_CACHE_SIZE = 128
+SHRINKAGE_METHODS = ("ledoit_wolf", "none")
+MIN_WEIGHT_PCT = 0.01
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def _lru_put(cache: OrderedDict, key, value, size: int):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+
+# ─── 추정치 ──────────────────────────────────────────────────────────────────
+def ledoit_wolf(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf (2004) 축소 공분산: Σ = δ·μI + (1-δ)·S  (S: 표본 공분산, μ = tr(S)/N)
+    반환: (공분산, 축소 강도 δ)
+    """
+    t, n = returns.shape
+    x = returns - returns.mean(axis=0)
+    sample = x.T @ x / t
+    mu = np.trace(sample) / n
+    target = mu * np.eye(n)
+    delta = np.sum((sample - target) ** 2)
+    # Σ_t ||x_t x_tᵀ - S||² = Σ_t |x_t|⁴ - T·||S||²
+    beta = (np.sum(np.sum(x ** 2, axis=1) ** 2) - t * np.sum(sample ** 2)) / t ** 2
+    shrink = 0.0 if delta <= 0 else float(min(max(beta, 0.0), delta) / delta)
+    return shrink * target + (1 - shrink) * sample, shrink
+
+
+class Estimates:
+    """종목 집합 하나의 일간 평균 수익률 / 공분산 (연환산은 사용하는 쪽에서)"""
+
+    def __init__(self, symbols: List[str], mean: np.ndarray, cov: np.ndarray, observations: int,
+                 shrinkage: str, shrink_intensity: float, dropped: List[str]):
+        self.symbols = symbols
+        self.mean = mean
+        self.cov = cov
+        self.observations = observations
+        self.shrinkage = shrinkage
+        self.shrink_intensity = shrink_intensity
+        self.dropped = dropped
+
+
+# ─── 최적화 (연환산 기준) ─────────────────────────────────────────────────────
+def _performance(w: np.ndarray, mean: np.ndarray, cov: np.ndarray) -> Tuple[float, float]:
+    ret = float(mean @ w) * TRADING_DAYS
+    vol = math.sqrt(max(float(w @ cov @ w), 0.0) * TRADING_DAYS)
+    return ret, vol
+
+
+def _solve(objective, jac, x0: np.ndarray, constraints: list) -> Optional[np.ndarray]:
+    n = len(x0)
+    result = sco.minimize(objective, x0, jac=jac, method="SLSQP", bounds=[(0.0, 1.0)] * n,
+                          constraints=constraints, options={"maxiter": 200, "ftol": 1e-10})
+    # "Positive directional derivative" 등으로 success=False 여도 제약을 만족하면 최적점 근처이므로 채택
+    if not result.success and any(abs(c["fun"](result.x)) > 1e-6 for c in constraints):
+        return None
+    w = np.clip(result.x, 0.0, None)
+    return w / w.sum()
+
+
+def _budget() -> dict:
+    return {"type": "eq", "fun": lambda w: np.sum(w) - 1.0, "jac": lambda w: np.ones_like(w)}
+
+
+def min_variance(mean, cov, x0) -> Optional[np.ndarray]:
+    return _solve(lambda w: w @ cov @ w, lambda w: 2 * cov @ w, x0, [_budget()])
+
+
+def max_sharpe(mean, cov, x0, risk_free_rate: float = RISK_FREE_RATE) -> Optional[np.ndarray]:
+    def objective(w):
+        ret, vol = _performance(w, mean, cov)
+        return -(ret - risk_free_rate) / vol if vol > 0 else 0.0
+
+    def gradient(w):
+        ret, vol = _performance(w, mean, cov)
+        if vol <= 0:
+            return np.zeros_like(w)
+        d_ret = mean * TRADING_DAYS
+        d_vol = cov @ w * TRADING_DAYS / vol
+        return -(d_ret * vol - (ret - risk_free_rate) * d_vol) / vol ** 2
+
+    return _solve(objective, gradient, x0, [_budget()])
+
+
+def target_return(mean, cov, x0, target: float) -> Optional[np.ndarray]:
+    annual = mean * TRADING_DAYS
+    constraint = {"type": "eq", "fun": lambda w: annual @ w - target, "jac": lambda w: annual}
+    return _solve(lambda w: w @ cov @ w, lambda w: 2 * cov @ w, x0, [_budget(), constraint])
+
+
+# ─── 서비스 ──────────────────────────────────────────────────────────────────
+class PortfolioOptimizer:
+    def __init__(self):
+        self._history: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self._estimates: "OrderedDict[tuple, Estimates]" = OrderedDict()
+        self._results: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ── 시세 ──
+    @staticmethod
+    def _fetch_closes(symbol: str) -> Optional[tuple]:
+        """(날짜 datetime64[D] 배열, 수정 종가 배열). 실패/빈 데이터는 None"""
+        import yfinance as yf
+        from portfolio_opt import resolve_ticker
+
+        ticker = resolve_ticker(symbol)
+        try:
+            hist = yf.Ticker(ticker).history(period=HISTORY_PERIOD)
+        except Exception as e:
+            print(f"[PortfolioOpt] Failed to fetch {ticker} (Input: {symbol}): {e}")
+            return None
+        if hist is None or hist.empty:
+            print(f"[PortfolioOpt] Empty data for {ticker} (Input: {symbol})")
+            return None
+        close = hist["Close"].to_numpy(dtype=float)
+        dates = np.array([str(idx).split(" ")[0] for idx in hist.index], dtype="datetime64[D]")
+        keep = ~np.isnan(close)
+        return dates[keep], close[keep]
+
+    def _closes(self, symbols: Sequence[str], today: str) -> Dict[str, Optional[tuple]]:
+        """캐시에 없는 종목만 병렬로 받아 채움 (실패/빈 데이터는 캐시하지 않고 다음 요청에서 재시도)"""
+        with self._lock:
+            cached = {s: self._history[(s, today)] for s in symbols if (s, today) in self._history}
+        missing = [s for s in symbols if s not in cached]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(missing))) as executor:
+                fetched = dict(zip(missing, executor.map(self._fetch_closes, missing)))
+            with self._lock:
+                for s, series in fetched.items():
+                    if series is not None:
+                        _lru_put(self._history, (s, today), series, HISTORY_CACHE_SIZE)
+            cached.update(fetched)
+        return cached
+
+    # ── 추정치 ──
+    def estimates(self, symbols: Sequence[str], shrinkage: str = "ledoit_wolf") -> Estimates:
+        if shrinkage not in SHRINKAGE_METHODS:
+            raise ValueError(f"unknown shrinkage: {shrinkage} (use one of {', '.join(SHRINKAGE_METHODS)})")
+        symbols = list(dict.fromkeys(symbols))
+        today = _today()
+        key = (tuple(sorted(symbols)), today, shrinkage)
+        with self._lock:
+            if key in self._estimates:
+                self._estimates.move_to_end(key)
+                return self._estimates[key]
+
+        series = self._closes(symbols, today)
+        valid = [s for s in symbols if series.get(s) is not None and len(series[s][0]) > 2]
+        dropped = [s for s in symbols if s not in valid]
+        if len(valid) < 2:
+            raise ValueError("No valid data found." if not valid else "At least 2 symbols with price data are required.")
+
+        common = series[valid[0]][0]
+        for s in valid[1:]:
+            common = np.intersect1d(common, series[s][0])
+        if len(common) < 3:
+            raise ValueError("Not enough overlapping trading days.")
+        closes = np.column_stack([series[s][1][np.searchsorted(series[s][0], common)] for s in valid])
+        returns = closes[1:] / closes[:-1] - 1
+
+        if shrinkage == "ledoit_wolf":
+            cov, intensity = ledoit_wolf(returns)
+        else:
+            cov, intensity = np.cov(returns, rowvar=False, ddof=1), 0.0
+        result = Estimates(valid, returns.mean(axis=0), cov, len(returns), shrinkage, intensity, dropped)
+        with self._lock:
+            _lru_put(self._estimates, key, result, RESULT_CACHE_SIZE)
+        return result
+
+    # ── 효율적 투자선 ──
+    def _warm_start(self, symbols: List[str], today: str, shrinkage: str) -> Tuple[Optional[dict], Optional[tuple]]:
+        """같은 집합 또는 종목 하나만 다른 직전 결과 → 이름별 비중 (새 종목은 0)"""
+        target = set(symbols)
+        with self._lock:
+            for key in reversed(self._results):
+                syms, day, method, _ = key
+                if day == today and method == shrinkage and len(target.symmetric_difference(syms)) <= 1:
+                    return self._results[key], key
+        return None, None
+
+    @staticmethod
+    def _seed(previous: Optional[dict], name: str, symbols: List[str]) -> np.ndarray:
+        n = len(symbols)
+        if previous and previous.get(name):
+            weights = previous[name]
+            x0 = np.array([weights.get(s, 0.0) for s in symbols])
+            if x0.sum() > 0:
+                return x0 / x0.sum()
+        return np.full(n, 1.0 / n)
+
+    def frontier(self, symbols: Sequence[str], shrinkage: str = "ledoit_wolf", points: int = FRONTIER_POINTS,
+                 risk_free_rate: float = RISK_FREE_RATE) -> dict:
+        """
+        최소분산 · 최대샤프 · 효율적 투자선(최소분산 수익률 ~ 최고 종목 수익률 구간 points 개) 계산.
+        반환 비중/수익률/변동성은 % 단위
+        """
+        if not SCIPY_AVAILABLE:
+            raise RuntimeError("scipy is not installed on this server. Portfolio optimization is unavailable.")
+        started = time.perf_counter()
+        est = self.estimates(symbols, shrinkage)
+        estimated = time.perf_counter()
+        today = _today()
+        key = (tuple(sorted(est.symbols)), today, shrinkage, (points, risk_free_rate))
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]["result"]
+
+        names, mean, cov = est.symbols, est.mean, est.cov
+        previous, previous_key = self._warm_start(names, today, shrinkage)
+        mv = min_variance(mean, cov, self._seed(previous, "min_variance", names))
+        ms = max_sharpe(mean, cov, self._seed(previous, "max_sharpe", names), risk_free_rate)
+        if mv is None or ms is None:
+            raise RuntimeError("optimizer did not converge")
+
+        curve = []
+        low = _performance(mv, mean, cov)[0]
+        high = float(np.max(mean)) * TRADING_DAYS
+        x0 = mv
+        for target in np.linspace(low, high, points) if high > low else [low]:
+            w = target_return(mean, cov, x0, float(target))
+            if w is None:
+                continue
+            x0 = w  # 다음 목표수익률은 바로 앞 점에서 출발
+            curve.append(w)
+
+        def point(w):
+            ret, vol = _performance(w, mean, cov)
+            return {
+                "expected_return": round(ret * 100, 2),
+                "volatility": round(vol * 100, 2),
+                "sharpe_ratio": round((ret - risk_free_rate) / vol, 2) if vol > 0 else 0.0,
+                "weights": {s: round(float(x) * 100, 2) for s, x in zip(names, w) if x * 100 > MIN_WEIGHT_PCT},
+            }
+
+        result = {
+            "symbols": names,
+            "dropped": est.dropped,
+            "min_variance": point(mv),
+            "max_sharpe": point(ms),
+            "frontier": [point(w) for w in curve],
+            "estimates": {
+                "observations": est.observations,
+                "shrinkage": est.shrinkage,
+                "shrink_intensity": round(est.shrink_intensity, 4),
+            },
+            "timing_ms": {
+                "estimates": round((estimated - started) * 1000, 1),
+                "optimize": round((time.perf_counter() - estimated) * 1000, 1),
+            },
+            "warm_start": list(previous_key[0]) if previous_key else None,
+        }
+        raw = {"min_variance": dict(zip(names, mv)), "max_sharpe": dict(zip(names, ms))}
+        with self._lock:
+            _lru_put(self._results, key, {"result": result, **raw}, RESULT_CACHE_SIZE)
+        return result
+
+
+# 전역 인스턴스
+portfolio_optimizer = PortfolioOptimizer()
+
+
+def _main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="효율적 투자선 계산")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--shrinkage", choices=SHRINKAGE_METHODS, default="ledoit_wolf")
+    parser.add_argument("--points", type=int, default=FRONTIER_POINTS)
+    args = parser.parse_args()
+
+    result = portfolio_optimizer.frontier(args.symbols, args.shrinkage, args.points)
+    print(json.dumps({k: v for k, v in result.items() if k != "frontier"}, ensure_ascii=False, indent=2))
+    for p in result["frontier"]:
+        print(f"  ret {p['expected_return']:>7.2f}%  vol {p['volatility']:>6.2f}%  sharpe {p['sharpe_ratio']:>5.2f}")
+
+
+if __name__ == "__main__":
+    _main()
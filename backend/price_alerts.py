@@ -6,7 +6,6 @@ Price Alert Monitor (가격 알림 모니터)
 import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime
-import yfinance as yf
 from db_manager import get_db_connection
 
 class PriceAlertMonitor:
@@ -83,6 +82,7 @@ class PriceAlertMonitor:
                 clean_sym = symbol.split('.')[0] if ('.' in symbol and not symbol.split('.')[0].isdigit()) else symbol
                 if clean_sym.isdigit() and len(clean_sym) == 6:
                     clean_sym = f"{clean_sym}.KS"
+                import yfinance as yf
                 ticker = yf.Ticker(clean_sym)
                 data = ticker.history(period="1d", interval="1m")
                 if not data.empty:
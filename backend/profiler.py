@@ -0,0 +1,173 @@
+"""
+🔥 통계적 샘플링 프로파일러 (운영 환경 핫패스 분석용)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+단일 vCPU에서 CPU가 튈 때 어느 모듈(BeautifulSoup 파싱, pandas, 정규식, JSON 인코딩 등)이
+원인인지 확인하기 위한 도구. 별도 의존성 없이 sys._current_frames()로 모든 스레드
+(이벤트 루프 + 기본 스레드풀 50개)의 스택을 주기적으로 채집합니다.
+
+📌 출력: collapsed stack 포맷 (flamegraph.pl / speedscope / inferno 호환)
+    MainThread;main.py:log_requests;korea_data.py:get_naver_stock_info;... 37
+
+📌 사용
+  - POST /api/system/admin/profile?seconds=10           → N초 전체 스레드 프로파일
+  - 요청 헤더 X-Profile: 1 (+ 관리자 키)                 → 해당 요청 처리 구간만 프로파일,
+    응답 헤더 X-Profile-Id → GET /api/system/admin/profile/{id}
+
+⚠️ 프로파일은 한 번에 하나만 수행 (동시 요청 시 busy). 기본 10ms 간격 ≈ 오버헤드 1~3%.
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+DEFAULT_INTERVAL = 0.01
+MAX_SECONDS = 60
+RECENT_PROFILES = 20
+
+# 대기 중(유휴) 스레드의 리프 프레임 → 기본적으로 제외 (CPU 사용 지점만 남김)
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("selectors.py", "EpollSelector.select"),
+    ("selectors.py", "KqueueSelector.select"),
+    ("threading.py", "Condition.wait"),
+    ("threading.py", "Event.wait"),
+    ("thread.py", "_worker"),
+    ("queue.py", "Queue.get"),
+    ("ssl.py", "SSLSocket.read"),
+    ("socket.py", "SocketIO.readinto"),
+}
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels: Dict[object, tuple] = {}   # code object -> (file, qualname)
+        self.recent: "collections.OrderedDict[str, dict]" = collections.OrderedDict()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def _label(self, code) -> tuple:
+        label = self._labels.get(code)
+        if label is None:
+            filename = os.path.basename(code.co_filename)
+            if filename == "__init__.py":
+                # 패키지 초기화 모듈은 패키지명으로 구분 (re/__init__.py, bs4/__init__.py)
+                filename = os.path.join(os.path.basename(os.path.dirname(code.co_filename)), filename)
+            label = (filename, getattr(code, "co_qualname", code.co_name))
+            self._labels[code] = label
+        return label
+
+    @staticmethod
+    def _thread_group(name: str) -> str:
+        # ThreadPoolExecutor-0_17 → ThreadPoolExecutor-0 (워커 50개를 한 그룹으로)
+        head, sep, tail = name.rpartition("_")
+        return head if sep and tail.isdigit() else name
+
+    def _sample(self, counts: Dict[str, int], include_idle: bool, skip_ident: int):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip_ident:
+                continue
+            stack = []
+            leaf = None
+            while frame is not None:
+                label = self._label(frame.f_code)
+                if leaf is None:
+                    leaf = label
+                stack.append(f"{label[0]}:{label[1]}")
+                frame = frame.f_back
+            if not include_idle and leaf in IDLE_LEAVES:
+                continue
+            stack.append(self._thread_group(names.get(ident, str(ident))))
+            key = ";".join(reversed(stack))
+            counts[key] = counts.get(key, 0) + 1
+
+    def _collect(self, stop: threading.Event, deadline: float, interval: float, include_idle: bool) -> dict:
+        counts: Dict[str, int] = {}
+        samples = 0
+        me = threading.get_ident()
+        started = time.time()
+        cpu_start = time.process_time()
+        while not stop.is_set() and time.time() < deadline:
+            self._sample(counts, include_idle, me)
+            samples += 1
+            stop.wait(interval)
+        elapsed = time.time() - started
+        return {
+            "started_at": started,
+            "duration": round(elapsed, 3),
+            "interval_ms": round(interval * 1000, 2),
+            "samples": samples,
+            "process_cpu_pct": round((time.process_time() - cpu_start) / elapsed * 100, 1) if elapsed else 0.0,
+            "stacks": counts,
+        }
+
+    def run(self, seconds: float, interval: float = DEFAULT_INTERVAL, include_idle: bool = False) -> Optional[dict]:
+        """seconds 동안 전체 스레드 샘플링 (호출 스레드를 블로킹, 이미 실행 중이면 None)"""
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            seconds = max(0.1, min(float(seconds), MAX_SECONDS))
+            return self._store(self._collect(threading.Event(), time.time() + seconds, interval, include_idle))
+        finally:
+            self._lock.release()
+
+    def start_background(self, interval: float = DEFAULT_INTERVAL, include_idle: bool = False):
+        """요청 단위 프로파일: 샘플러 스레드를 띄우고 stop() 호출 시 결과 반환. 실행 중이면 None"""
+        if not self._lock.acquire(blocking=False):
+            return None
+        stop = threading.Event()
+        result: dict = {}
+
+        def _runner():
+            try:
+                result.update(self._collect(stop, time.time() + MAX_SECONDS, interval, include_idle))
+            finally:
+                self._lock.release()
+
+        thread = threading.Thread(target=_runner, name="SamplingProfiler", daemon=True)
+        thread.start()
+
+        def _stop(label: str = "") -> dict:
+            stop.set()
+            thread.join()
+            if label:
+                result["label"] = label
+            return self._store(result)
+
+        return _stop
+
+    def _store(self, profile: dict) -> dict:
+        profile["id"] = uuid.uuid4().hex[:12]
+        self.recent[profile["id"]] = profile
+        while len(self.recent) > RECENT_PROFILES:
+            self.recent.popitem(last=False)
+        return profile
+
+    @staticmethod
+    def collapsed(profile: dict) -> str:
+        """flamegraph.pl / speedscope 입력용 'frame;frame;frame count' 텍스트"""
+        lines = [f"{stack} {count}" for stack, count in sorted(profile["stacks"].items(), key=lambda x: -x[1])]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def top_functions(profile: dict, limit: int = 20) -> list:
+        """리프(자체 시간) 기준 상위 함수"""
+        self_counts: Dict[str, int] = {}
+        for stack, count in profile["stacks"].items():
+            leaf = stack.rsplit(";", 1)[-1]
+            self_counts[leaf] = self_counts.get(leaf, 0) + count
+        total = sum(self_counts.values()) or 1
+        ranked = sorted(self_counts.items(), key=lambda x: -x[1])[:limit]
+        return [{"frame": f, "samples": c, "pct": round(c / total * 100, 1)} for f, c in ranked]
+
+
+# ─── 전역 인스턴스 ──────────────────────────────────────────────────────────
+sampling_profiler = SamplingProfiler()
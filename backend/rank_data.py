@@ -2,6 +2,7 @@ import json
 import re
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from upstream_hosts import NAVER_FINANCE_URL, NAVER_MOBILE_STOCK_URL, NAVER_STOCK_URL
 
 CACHE_US_ETFS = {"data": [], "timestamp": 0}
 CACHE_US_ETFS_DURATION = 300
@@ -31,7 +32,7 @@ def get_world_stock_integration(reuters_codes):
         return {}
         
     codes_str = ",".join(reuters_codes)
-    url = f"https://stock.naver.com/api/securityService/integration/price?foreignCodes={codes_str}"
+    url = f"{NAVER_STOCK_URL}/api/securityService/integration/price?foreignCodes={codes_str}"
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Referer': 'https://stock.naver.com/',
@@ -64,7 +65,7 @@ def fetch_naver_search_top_api(market="USA"):
     """
     # [v6.1.4] nationType mapping: USA (Global), KOR (Domestic)
     nation_type = "USA" if market in ["USA", "Global"] else "KOR"
-    url = f"https://m.stock.naver.com/front-api/market/popularStock?nationType={nation_type}"
+    url = f"{NAVER_MOBILE_STOCK_URL}/front-api/market/popularStock?nationType={nation_type}"
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Mobile/15E148 Safari/604.1',
@@ -137,6 +138,37 @@ CACHE_US_ETFS_DURATION = 60 * 5  # 5 minutes
 CACHE_KR_ETFS = {"data": [], "timestamp": 0}
 CACHE_KR_ETFS_DURATION = 60 * 5  # 5 minutes
 
+# 미국 ETF 랭킹 대상 (etf_stats 배치 통계도 같은 목록 사용)
+US_ETF_SYMBOLS = [
+    # 지수 추종
+    "SPY", "QQQ", "VOO", "VTI", "IVV", "IWM", "DIA", "RSP", "MDY", "IJR", "VUG", "VTV", "IWF", "IWD",
+    # 레버리지
+    "TQQQ", "SOXL", "UPRO", "TECL", "FAS", "SSO", "QLD", "USD", "DPST", "LABU", "NVDL", "TSLL",
+    # 인버스 / 숏
+    "SQQQ", "SOXS", "SPXU", "PSQ", "SH", "SDS", "QID", "DOG", "DXD", "SDOW", "TZA", "FAZ", "UVXY",
+    # 반도체 & 빅테크 & AI
+    "SOXX", "SMH", "XLK", "ARKK", "BOTZ", "ROBO", "AIQ", "CIBR", "BUG", "XSD", "IGV",
+    # 배당 & 인컴
+    "SCHD", "JEPI", "JEPQ", "VYM", "VIG", "DGRO", "DVY", "SPYD", "HDV", "NOBL",
+    # 채권 & 금리
+    "TLT", "TMF", "IEF", "SHY", "BND", "AGG", "LQD", "HYG", "VCIT", "BSV",
+    # 원자재 & 섹터 & 크립토
+    "IBIT", "GLD", "SLV", "XLE", "XLF", "XLV", "XLY", "XLP", "XLU", "XLI", "XLB", "XLC", "VNQ"
+]
+
+US_ETF_NAMES = {
+    "SPY": "SPDR S&P 500 ETF (S&P500)", "QQQ": "Invesco QQQ Trust (나스닥100)", "VOO": "Vanguard S&P 500 ETF", "VTI": "Vanguard Total Stock Market", 
+    "IVV": "iShares Core S&P 500", "IWM": "iShares Russell 2000 ETF", "DIA": "SPDR Dow Jones Industrial",
+    "SOXX": "iShares Semiconductor ETF (반도체)", "SMH": "VanEck Semiconductor ETF", "TQQQ": "ProShares UltraPro QQQ (나스닥 3X)", 
+    "SQQQ": "ProShares UltraPro Short QQQ (나스닥 -3X)", "SOXL": "Direxion Daily Semiconductor Bull 3X (반도체 3X)",
+    "SOXS": "Direxion Daily Semiconductor Bear 3X (반도체 -3X)", "UPRO": "ProShares UltraPro S&P500 3X", "SPXU": "ProShares Short S&P500 -3X",
+    "SCHD": "Schwab US Dividend Equity (배당성장)", "JEPI": "JPMorgan Equity Premium Income (월배당)", "JEPQ": "JPMorgan Nasdaq Equity Premium",
+    "ARKK": "ARK Innovation ETF", "TLT": "iShares 20+ Year Treasury Bond (미국채 20년+)", "TMF": "Direxion 20+ Year Treasury Bull 3X",
+    "IBIT": "iShares Bitcoin Trust (비트코인)", "GLD": "SPDR Gold Shares (금)", "SLV": "iShares Silver Trust (은)",
+    "XLK": "Technology Select Sector SPDR", "XLE": "Energy Select Sector SPDR", "XLF": "Financial Select Sector SPDR",
+    "XLV": "Health Care Select Sector", "NVDL": "GraniteShares 2x Long NVDA", "TSLL": "Direxion Daily TSLA Bull 2X"
+}
+
 # [New] Global Ranking Cache
 CACHE_GLOBAL_RANKING = {}
 CACHE_GLOBAL_RANKING_DURATION = 60 # 10초 -> 60초 (부하 감소 및 속도 향상)
@@ -381,7 +413,7 @@ def crawl_naver_movers():
     return {"gainers": [], "losers": []}
 
     import requests
-    from bs4 import BeautifulSoup
+    from html_parse import parse_html
     
     headers = {"User-Agent": "Mozilla/5.0"}
     
@@ -393,7 +425,7 @@ def crawl_naver_movers():
                 html = res.content.decode('euc-kr') 
             except:
                 html = res.text
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = parse_html(html, "table", class_="type_2")
             
             # .type_2 table
             # .type_2 table (Relaxed selector)
@@ -439,9 +471,9 @@ def crawl_naver_movers():
             return []
 
     # Rise
-    gainers = parse_naver_rank("https://finance.naver.com/sise/sise_rise.naver?sosok=0") # KOSPI only? Or 0=KOSPI, 1=KOSDAQ
+    gainers = parse_naver_rank(f"{NAVER_FINANCE_URL}/sise/sise_rise.naver?sosok=0") # KOSPI only? Or 0=KOSPI, 1=KOSDAQ
     # Fall
-    losers = parse_naver_rank("https://finance.naver.com/sise/sise_fall.naver?sosok=0")
+    losers = parse_naver_rank(f"{NAVER_FINANCE_URL}/sise/sise_fall.naver?sosok=0")
     
     return {"gainers": gainers, "losers": losers}
 
@@ -712,12 +744,12 @@ def get_naver_ranking(market="krx", rank_type="quant"):
         return []
 
     import requests
-    from bs4 import BeautifulSoup
+    from html_parse import parse_html
     import re
 
     # [New] 인기 검색어 처리
     if rank_type == "popular":
-        url = "https://finance.naver.com/sise/lastsearch2.naver"
+        url = f"{NAVER_FINANCE_URL}/sise/lastsearch2.naver"
         headers = {"User-Agent": "Mozilla/5.0"}
         try:
             res = requests.get(url, headers=headers, timeout=5)
@@ -726,7 +758,7 @@ def get_naver_ranking(market="krx", rank_type="quant"):
             except:
                 html = res.text
             
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = parse_html(html, "table", class_="type_5")
             rows = soup.select("table.type_5 tr")
             
             data = []
@@ -779,7 +811,7 @@ def get_naver_ranking(market="krx", rank_type="quant"):
             print(f"Error parsing Naver popular searches: {e}")
             return []
 
-    base_url = "https://finance.naver.com/sise/"
+    base_url = f"{NAVER_FINANCE_URL}/sise/"
     prefix = "nxt_" if market == "nxt" else ""
     url = f"{base_url}{prefix}sise_{rank_type}.naver"
     
@@ -791,7 +823,7 @@ def get_naver_ranking(market="krx", rank_type="quant"):
         except:
             html = res.text
             
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = parse_html(html, "table", class_="type_2")
         rows = soup.select("table.type_2 tr")
         
         data = []
@@ -850,11 +882,12 @@ def get_naver_ranking(market="krx", rank_type="quant"):
         print(f"Error parsing Naver {market} {rank_type}: {e}")
         return []
 
-def get_etf_ranking(market="KR", category=None):
+def get_etf_ranking(market="KR", category=None, sort=None):
     """
     ETF 랭킹 정보를 가져옵니다.
     market: 'KR' (네이버 크롤링), 'US' (주요 리스트 기반 시세조회)
     category: 'inverse', 'index', 'sector' 등 필터링 키워드
+    sort: etf_stats 통계 열 ('sharpe', '-volatility', 'mdd', 'return_1y' ...). 없으면 거래량 순
     """
     import requests
     from bs4 import BeautifulSoup
@@ -902,7 +935,7 @@ def get_etf_ranking(market="KR", category=None):
             try:
                 import json
                 import urllib.request
-                url = 'https://finance.naver.com/api/sise/etfItemList.nhn'
+                url = f'{NAVER_FINANCE_URL}/api/sise/etfItemList.nhn'
                 req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
                 response = urllib.request.urlopen(req, timeout=10)
                 json_data = json.loads(response.read().decode('cp949'))
@@ -1011,6 +1044,10 @@ def get_etf_ranking(market="KR", category=None):
         # 원본 거래량 순위(rank)를 필터링 전에 미리 부여하여, 필터링 후에도 원래 순위 유지
         for i, item in enumerate(results):
             item['rank'] = i + 1
+
+        if sort:
+            from etf_stats import etf_stats_table
+            results = etf_stats_table.sort_items(results, sort)
             
         for item in results:
             name = item.get('name', '')
@@ -1030,40 +1067,10 @@ def get_etf_ranking(market="KR", category=None):
         if CACHE_US_ETFS["data"] and (current_time - CACHE_US_ETFS["timestamp"] < CACHE_US_ETFS_DURATION):
             us_etfs = CACHE_US_ETFS["data"]
         else:
-            us_symbols = [
-                # 지수 추종
-                "SPY", "QQQ", "VOO", "VTI", "IVV", "IWM", "DIA", "RSP", "MDY", "IJR", "VUG", "VTV", "IWF", "IWD",
-                # 레버리지
-                "TQQQ", "SOXL", "UPRO", "TECL", "FAS", "SSO", "QLD", "USD", "DPST", "LABU", "NVDL", "TSLL",
-                # 인버스 / 숏
-                "SQQQ", "SOXS", "SPXU", "PSQ", "SH", "SDS", "QID", "DOG", "DXD", "SDOW", "TZA", "FAZ", "UVXY",
-                # 반도체 & 빅테크 & AI
-                "SOXX", "SMH", "XLK", "ARKK", "BOTZ", "ROBO", "AIQ", "CIBR", "BUG", "XSD", "IGV",
-                # 배당 & 인컴
-                "SCHD", "JEPI", "JEPQ", "VYM", "VIG", "DGRO", "DVY", "SPYD", "HDV", "NOBL",
-                # 채권 & 금리
-                "TLT", "TMF", "IEF", "SHY", "BND", "AGG", "LQD", "HYG", "VCIT", "BSV",
-                # 원자재 & 섹터 & 크립토
-                "IBIT", "GLD", "SLV", "XLE", "XLF", "XLV", "XLY", "XLP", "XLU", "XLI", "XLB", "XLC", "VNQ"
-            ]
-            
-            name_map = {
-                "SPY": "SPDR S&P 500 ETF (S&P500)", "QQQ": "Invesco QQQ Trust (나스닥100)", "VOO": "Vanguard S&P 500 ETF", "VTI": "Vanguard Total Stock Market", 
-                "IVV": "iShares Core S&P 500", "IWM": "iShares Russell 2000 ETF", "DIA": "SPDR Dow Jones Industrial",
-                "SOXX": "iShares Semiconductor ETF (반도체)", "SMH": "VanEck Semiconductor ETF", "TQQQ": "ProShares UltraPro QQQ (나스닥 3X)", 
-                "SQQQ": "ProShares UltraPro Short QQQ (나스닥 -3X)", "SOXL": "Direxion Daily Semiconductor Bull 3X (반도체 3X)",
-                "SOXS": "Direxion Daily Semiconductor Bear 3X (반도체 -3X)", "UPRO": "ProShares UltraPro S&P500 3X", "SPXU": "ProShares Short S&P500 -3X",
-                "SCHD": "Schwab US Dividend Equity (배당성장)", "JEPI": "JPMorgan Equity Premium Income (월배당)", "JEPQ": "JPMorgan Nasdaq Equity Premium",
-                "ARKK": "ARK Innovation ETF", "TLT": "iShares 20+ Year Treasury Bond (미국채 20년+)", "TMF": "Direxion 20+ Year Treasury Bull 3X",
-                "IBIT": "iShares Bitcoin Trust (비트코인)", "GLD": "SPDR Gold Shares (금)", "SLV": "iShares Silver Trust (은)",
-                "XLK": "Technology Select Sector SPDR", "XLE": "Energy Select Sector SPDR", "XLF": "Financial Select Sector SPDR",
-                "XLV": "Health Care Select Sector", "NVDL": "GraniteShares 2x Long NVDA", "TSLL": "Direxion Daily TSLA Bull 2X"
-            }
-            
             import yfinance as yf
             import pandas as pd
             
-            unique_symbols = list(set(us_symbols))
+            unique_symbols = list(set(US_ETF_SYMBOLS))
             try:
                 hist = yf.download(unique_symbols, period="5d", progress=False)
             except:
@@ -1105,7 +1112,7 @@ def get_etf_ranking(market="KR", category=None):
                     if price > 0:
                         results.append({
                             "symbol": sym,
-                            "name": name_map.get(sym, sym),
+                            "name": US_ETF_NAMES.get(sym, sym),
                             "brand": "US ETF",
                             "category_name": "미국 시장",
                             "price": f"{price:,.2f}",
@@ -1162,8 +1169,11 @@ def get_etf_ranking(market="KR", category=None):
             elif category == "healthcare":
                 keywords = ["Healthcare", "Health", "Bio", "ARKG", "XLV", "VHT", "Biotech", "Pharma", "Medical", "IYH", "XBI", "IBB", "PPH", "XHS"]
                 
-            filtered = [item for item in us_etfs if any(k.lower() in item['name'].lower() or k.lower() in item['symbol'].lower() for k in keywords)]
-            return filtered[:50]
+            us_etfs = [item for item in us_etfs if any(k.lower() in item['name'].lower() or k.lower() in item['symbol'].lower() for k in keywords)]
+
+        if sort:
+            from etf_stats import etf_stats_table
+            us_etfs = etf_stats_table.sort_items(us_etfs, sort)
             
         return us_etfs[:50]
     
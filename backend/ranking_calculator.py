@@ -2,101 +2,153 @@
 from db_manager import get_db_connection
 from datetime import datetime
 
-async def ranking_calculator_loop():
-    print("[RankingCalculator] Started")
-    while True:
+# 재계산 결과는 섀도 테이블에 먼저 쓰고 한 트랜잭션 안에서 이름을 바꿔 교체
+# → /api/ranking/ 은 항상 이전 또는 새 순위표 중 하나만 보고, 쓰는 동안 막히지 않음
+RANKINGS_TABLE = "user_rankings"
+SHADOW_TABLE = "user_rankings_new"
+RETIRED_TABLE = "user_rankings_old"
+# 시세 조회 성공 비율이 이보다 낮으면 (네이버/yfinance 장애, 배치 일부 실패) 이전 순위표 유지
+MIN_PRICE_COVERAGE = 0.9
+
+
+def _is_korean(symbol: str) -> bool:
+    clean_sym = symbol.split('.')[0]
+    return len(clean_sym) == 6 and clean_sym[0].isdigit()
+
+
+def _load_positions():
+    """랭킹 대상 보유 내역 (조회 직후 연결 반환 — 시세 수집 동안 DB를 잡지 않음)"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT user_id, symbol, added_price
+            FROM watchlist
+            WHERE added_price > 0 AND user_id != 'guest'
+        ''')
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def fetch_current_prices(symbols) -> dict:
+    """
+    현재가 일괄 조회: 국내는 네이버 Polling 100종목 단위, 해외는 yfinance 한 번의 다중 티커 호출
+    Returns: { watchlist에 저장된 심볼 그대로: 현재가 }
+    """
+    kr_symbols = [s for s in symbols if _is_korean(s)]
+    us_symbols = [s for s in symbols if not _is_korean(s)]
+    prices = {}
+
+    if kr_symbols:
+        from stock_data import fetch_batch_realtime_prices
+        codes = sorted({s.split('.')[0] for s in kr_symbols})
+        quotes = fetch_batch_realtime_prices(codes)
+        for sym in kr_symbols:
+            quote = quotes.get(sym.split('.')[0])
+            if quote and quote.get("price"):
+                prices[sym] = float(quote["price"])
+
+    if us_symbols:
         try:
-            kst_now = datetime.now()
-            # Calculate ranking twice a day (e.g. 06:00 and 18:00)
-            # Actually, to make it more real-time and fun, let's calculate every 1 hour
-            await calculate_rankings()
+            import yfinance as yf
+            hist = yf.download(sorted(set(us_symbols)), period="5d", progress=False)
+            if not hist.empty:
+                close = hist["Close"]
+                if not hasattr(close, "columns"):  # 단일 티커는 Series로 올 수 있음
+                    close = close.to_frame(us_symbols[0])
+                last = close.ffill().iloc[-1]
+                for sym in us_symbols:
+                    if sym in last.index and last[sym] == last[sym] and last[sym] > 0:
+                        prices[sym] = float(last[sym])
         except Exception as e:
-            print(f"[RankingCalculator] Error: {e}")
-            
-        await asyncio.sleep(3600)  # run every 1 hour
+            print(f"[RankingCalculator] US batch price fetch failed: {e}")
+
+    return prices
+
+
+def score_users(rows, current_prices):
+    """
+    사용자별 평균 수익률(%)을 벡터 연산으로 집계 (종목 수익률 → user별 bincount 합/개수)
+    Returns: [(user_id, avg_return), ...] 수익률 내림차순
+    """
+    import numpy as np
 
-async def calculate_rankings():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get all users with watchlists
-    cursor.execute('''
-        SELECT user_id, symbol, added_price, quantity 
-        FROM watchlist 
-        WHERE added_price > 0 AND user_id != 'guest'
-    ''')
-    rows = cursor.fetchall()
-    
     if not rows:
+        return []
+    user_ids, symbols, added = zip(*rows)
+    users, user_idx = np.unique(np.asarray(user_ids, dtype=object), return_inverse=True)
+    added = np.asarray(added, dtype=float)
+    current = np.fromiter((current_prices.get(s, np.nan) for s in symbols), dtype=float, count=len(symbols))
+
+    valid = ~np.isnan(current) & (added > 0)
+    pct = np.where(valid, (current - added) / np.where(added > 0, added, 1.0) * 100, 0.0)
+    totals = np.bincount(user_idx, weights=pct, minlength=len(users))
+    counts = np.bincount(user_idx, weights=valid, minlength=len(users))
+
+    ranked = np.flatnonzero(counts > 0)
+    avg = totals[ranked] / counts[ranked]
+    order = np.argsort(-avg, kind="stable")
+    return [(str(users[i]), float(a)) for i, a in zip(ranked[order], avg[order])]
+
+
+def _swap_rankings(insert_data):
+    """섀도 테이블에 채운 뒤 RENAME 두 번으로 원자적 교체 (WAL 독자는 커밋 전까지 이전 표를 읽음)"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {SHADOW_TABLE}")
+        cursor.execute(f'''
+            CREATE TABLE {SHADOW_TABLE} (
+                user_id TEXT PRIMARY KEY,
+                nickname TEXT,
+                score REAL DEFAULT 0,
+                rank INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.executemany(f"INSERT INTO {SHADOW_TABLE} (user_id, nickname, score, rank) VALUES (?, ?, ?, ?)", insert_data)
+        conn.commit()
+
+        # 교체 구간만 짧게 쓰기 잠금 (sqlite3 모듈은 DDL 앞에 트랜잭션을 자동으로 열지 않으므로 명시)
+        conn.isolation_level = None
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute(f"DROP TABLE IF EXISTS {RETIRED_TABLE}")
+            cursor.execute(f"ALTER TABLE {RANKINGS_TABLE} RENAME TO {RETIRED_TABLE}")
+            cursor.execute(f"ALTER TABLE {SHADOW_TABLE} RENAME TO {RANKINGS_TABLE}")
+            cursor.execute(f"DROP TABLE {RETIRED_TABLE}")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+    finally:
         conn.close()
+
+
+async def calculate_rankings():
+    """종목 랭킹 재계산 (job_scheduler에서 5분 주기 실행)"""
+    start = datetime.now()
+    rows = await asyncio.to_thread(_load_positions)
+    if not rows:
         return
-        
-    user_portfolio = {}
-    symbols_needed = set()
-    
-    for row in rows:
-        uid, sym, price, qty = row
-        if uid not in user_portfolio:
-            user_portfolio[uid] = []
-        user_portfolio[uid].append({'symbol': sym, 'added_price': price})
-        symbols_needed.add(sym)
-        
-    # Batch fetch current prices using stock_data or korea_data
-    from korea_data import get_naver_stock_info
-    
-    current_prices = {}
-    for sym in symbols_needed:
-        # Keep it simple for Korean stocks
-        clean_sym = sym.split('.')[0]
-        if len(clean_sym) == 6 and clean_sym[0].isdigit():
-            info = await asyncio.to_thread(get_naver_stock_info, sym)
-            if info and info.get("price"):
-                current_prices[sym] = float(str(info["price"]).replace(",", "").replace("원", ""))
-        else:
-            # Maybe yfinance for US
-            import yfinance as yf
-            try:
-                tk = await asyncio.to_thread(yf.Ticker, sym)
-                hist = await asyncio.to_thread(tk.history, period="1d")
-                if not hist.empty:
-                    current_prices[sym] = hist['Close'].iloc[-1]
-            except:
-                pass
-                
-        await asyncio.sleep(0.1) # Be gentle with APIs
-        
-    user_scores = []
-    
-    for uid, portfolio in user_portfolio.items():
-        total_pct = 0
-        valid_items = 0
-        for item in portfolio:
-            sym = item['symbol']
-            add_p = item['added_price']
-            if sym in current_prices and add_p > 0:
-                cur_p = current_prices[sym]
-                pct = ((cur_p - add_p) / add_p) * 100
-                total_pct += pct
-                valid_items += 1
-                
-        if valid_items > 0:
-            avg_return = total_pct / valid_items
-            user_scores.append((uid, avg_return))
-            
-    # Sort by score desc
-    user_scores.sort(key=lambda x: x[1], reverse=True)
-    
-    cursor.execute("DELETE FROM user_rankings")
-    
-    insert_data = []
-    for i, (uid, score) in enumerate(user_scores):
-        rank = i + 1
-        # Get nickname from a conceptual profile, or just use masked ID
-        nickname = f"고수_{uid[:5]}" 
-        insert_data.append((uid, nickname, score, rank))
-        
-    cursor.executemany("INSERT INTO user_rankings (user_id, nickname, score, rank) VALUES (?, ?, ?, ?)", insert_data)
-    conn.commit()
-    conn.close()
-    
-    print(f"[RankingCalculator] Calculated ranks for {len(user_scores)} users.")
+
+    symbols = sorted({sym for _uid, sym, _price in rows})
+    current_prices = await asyncio.to_thread(fetch_current_prices, symbols)
+    coverage = len(current_prices) / len(symbols)
+    if coverage < MIN_PRICE_COVERAGE:
+        print(f"[RankingCalculator] Skipped swap: only {len(current_prices)}/{len(symbols)} prices "
+              f"({coverage:.0%} < {MIN_PRICE_COVERAGE:.0%}), keeping previous rankings.")
+        return
+    user_scores = await asyncio.to_thread(score_users, rows, current_prices)
+    if not user_scores:
+        print("[RankingCalculator] Skipped swap: no scorable users, keeping previous rankings.")
+        return
+
+    # Get nickname from a conceptual profile, or just use masked ID
+    insert_data = [(uid, f"고수_{uid[:5]}", score, rank) for rank, (uid, score) in enumerate(user_scores, start=1)]
+    await asyncio.to_thread(_swap_rankings, insert_data)
+
+    elapsed = (datetime.now() - start).total_seconds()
+    print(f"[RankingCalculator] Calculated ranks for {len(user_scores)} users "
+          f"({len(current_prices)}/{len(symbols)} prices) in {elapsed:.1f}s.")
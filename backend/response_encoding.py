@@ -0,0 +1,207 @@
+"""
+📦 응답 직렬화 + 압축 (orjson · gzip/brotli)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+/api/analysis/stock/{symbol}(전체 히스토리), /api/seo/stocks(전 종목), 차트/ETF 상세처럼
+수백 KB짜리 JSON을 표준 json으로 직렬화하고 압축 없이 모바일로 내려보내던 문제 해결용.
+
+📌 FastJSONResponse (app 기본 응답 클래스)
+  - orjson 직렬화 (미설치 시 표준 json으로 자동 대체)
+  - numpy 스칼라/배열, pandas Timestamp/Series, NaN/Inf(→ null)를 그대로 처리
+    → 핸들러마다 float(...) / pd.notna(...) 로 수동 변환할 필요 없음
+  - 대용량 핸들러는 dict 대신 FastJSONResponse(...)를 직접 반환하면 jsonable_encoder 순회까지 생략
+
+📌 CompressionMiddleware
+  - Accept-Encoding 협상: br(brotli 설치 시) > gzip
+  - COMPRESS_MIN_BYTES(기본 1KB) 이상 + 텍스트/JSON 응답만, 스트리밍 응답은 그대로 통과
+
+📌 벤치마크: python bench_response_encoding.py
+"""
+
+import asyncio
+import datetime
+import decimal
+import gzip
+import json
+import math
+import os
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+# 이보다 큰 본문은 압축을 스레드로 넘겨 이벤트 루프를 막지 않음
+OFFLOAD_BYTES = 512 * 1024
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+# ─── 직렬화 ──────────────────────────────────────────────────────────────────
+def _default(obj: Any):
+    """orjson/json이 모르는 타입 변환 (numpy/pandas는 설치된 경우에만 의미 있음)"""
+    if hasattr(obj, "tolist") and hasattr(obj, "dtype"):      # numpy 배열/스칼라, pandas Series
+        return obj.tolist()
+    if hasattr(obj, "to_dict"):                                # pandas DataFrame
+        return obj.to_dict("records")
+    if hasattr(obj, "isoformat"):                              # pandas Timestamp, date, time
+        try:
+            return obj.isoformat()
+        except ValueError:                                     # NaT
+            return None
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    if hasattr(obj, "model_dump"):                             # pydantic v2
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _to_native(obj: Any):
+    """표준 json 대체 경로용: NaN/Inf → None, 그 외 비표준 타입은 _default로"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, (str, int, bool)) or obj is None:
+        return obj
+    if isinstance(obj, dict):
+        return {k if isinstance(k, str) else str(k): _to_native(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_to_native(v) for v in obj]
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    return _to_native(_default(obj))
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        return json.dumps(_to_native(content), ensure_ascii=False, allow_nan=False,
+                          separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def register_jsonable_encoders():
+    """
+    dict를 반환하는 기존 핸들러는 FastAPI jsonable_encoder를 먼저 거치므로
+    numpy 정수(np.int64 등)에서 실패하지 않도록 변환기를 등록 (numpy 미설치 시 생략)
+    """
+    try:
+        import numpy as np
+        from fastapi.encoders import ENCODERS_BY_TYPE
+    except ImportError:
+        return
+    for np_type in (np.integer, np.floating, np.bool_, np.ndarray):
+        for sub in _all_subclasses(np_type):
+            ENCODERS_BY_TYPE.setdefault(sub, lambda v: v.tolist())
+
+
+def _all_subclasses(cls) -> set:
+    found = {cls}
+    for sub in cls.__subclasses__():
+        found |= _all_subclasses(sub)
+    return found
+
+
+# ─── 압축 ────────────────────────────────────────────────────────────────────
+def choose_encoding(accept_encoding: str) -> str:
+    """Accept-Encoding에서 사용할 코덱 (q=0은 거부로 처리)"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return ""
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """단일 본문 응답을 협상된 코덱으로 압축하는 ASGI 미들웨어 (Starlette GZipMiddleware + brotli)"""
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (message.get("more_body", False)
+                    or len(body) < self.minimum_size
+                    or "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                # 스트리밍/소형/이미 인코딩된 응답은 그대로
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) > OFFLOAD_BYTES:
+                compressed = await asyncio.to_thread(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers and not headers["etag"].startswith("W/"):
+                # 인코딩된 표현은 바이트가 달라지므로 약한 ETag로
+                headers["ETag"] = "W/" + headers["etag"]
+            passthrough = True
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
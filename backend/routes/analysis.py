@@ -5,6 +5,7 @@ import asyncio
 import time
 import urllib.parse
 from turbo_engine import turbo_cache, turbo_engine
+from response_encoding import FastJSONResponse
 
 router = APIRouter()
 
@@ -223,7 +224,8 @@ async def read_stock(symbol: str, skip_ai: bool = False):
     from turbo_engine import CACHE_VERSION
     cache_key = f"{CACHE_VERSION}_stock_full_{symbol}_{skip_ai}"
     cached = turbo_engine.get_cache(cache_key)
-    if cached: return {"status": "success", "data": cached, "turbo": True}
+    # 전체 히스토리 포함 대용량 응답 → jsonable_encoder 순회 없이 바로 직렬화
+    if cached: return FastJSONResponse({"status": "success", "data": cached, "turbo": True})
     
     # Lazy Imports
     from stock_data import get_stock_info
@@ -287,7 +289,7 @@ async def read_stock(symbol: str, skip_ai: bool = False):
             mem_ttl = 10  # 에러 발생 시 10초만 캐시해서 빠른 재시도 유도
             
         turbo_engine.set_cache(cache_key, data, ttl=mem_ttl)
-        return {"status": "success", "data": data, "turbo": False}
+        return FastJSONResponse({"status": "success", "data": data, "turbo": False})
     return {"status": "error", "message": "Stock not found"}
 
 
@@ -418,13 +420,13 @@ async def read_chart_patterns(ticker: str, interval: str = "1d", period: str = N
     cache_key = f"{CACHE_VERSION}_chart_{ticker}_{interval}_{period}"
     cached = turbo_engine.get_cache(cache_key)
     if cached:
-        return {"status": "success", "data": cached, "turbo": True}
+        return FastJSONResponse({"status": "success", "data": cached, "turbo": True})
         
     from chart_analysis import get_chart_analysis_full
     result = await asyncio.to_thread(get_chart_analysis_full, ticker, interval, period)
     if result and "history" in result and len(result["history"]) > 0:
         turbo_engine.set_cache(cache_key, result, ttl=3600)  # 1시간 동안 AI 분석 결과 재사용
-        return {"status": "success", "data": result}
+        return FastJSONResponse({"status": "success", "data": result})
     return {"status": "error", "message": "No data found"}
 
 
@@ -1103,6 +1105,7 @@ def supply_chain_scenario_route(keyword: str, target_symbol: str = Query(None)):
 class PortfolioReq(BaseModel):
     portfolio: list[str] = []
     symbols: list[str] = []
+    shrinkage: str = "ledoit_wolf"  # /portfolio/optimize 공분산 추정: "ledoit_wolf" | "none"
 
 @router.post("/portfolio/diagnosis")
 def analyze_portfolio_route(req: PortfolioReq):
@@ -1141,7 +1144,7 @@ def optimize_portfolio_route(req: PortfolioReq):
     
     from portfolio_opt import optimize_portfolio
     try:
-        data = optimize_portfolio(target)
+        data = optimize_portfolio(target, shrinkage=req.shrinkage)
         if isinstance(data, dict) and "error" in data:
             return {"status": "error", "message": data["error"]}
         return {"status": "success", "data": data}
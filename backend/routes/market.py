@@ -4,7 +4,8 @@ import time
 import urllib.parse
 import unicodedata
 import concurrent.futures
-from turbo_engine import turbo_cache, turbo_engine
+from turbo_engine import http_cache, turbo_cache, turbo_engine
+from response_encoding import FastJSONResponse
 
 router = APIRouter()
 
@@ -73,6 +74,8 @@ def get_market_news():
     }
 
 @router.get("/indices")
+@http_cache(ttl_seconds=15)
+@turbo_cache(ttl_seconds=15)  # 전광판 지수 갱신 주기(market_ticker_warmer 15초)와 동일
 async def market_indices():
     """실시간 시장 지수 전용 데이터 (스파크라인 포함)"""
     from stock_data import get_market_intelligence_indicators
@@ -106,10 +109,15 @@ def read_risk_alerts():
         return {"status": "error", "message": str(e)}
 
 @router.get("/rank/etf")
+@http_cache(ttl_seconds=300)
 @turbo_cache(ttl_seconds=300)
-def read_etf_rank(market: str = "KR", category: Optional[str] = None):
+def read_etf_rank(market: str = "KR", category: Optional[str] = None, sort: Optional[str] = None):
+    """ETF 랭킹 (sort: sharpe, -volatility, mdd, return_1y 등 etf_stats 통계 열로 정렬)"""
     from rank_data import get_etf_ranking
-    data = get_etf_ranking(market, category)
+    try:
+        data = get_etf_ranking(market, category, sort)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
     return {"status": "success", "data": data}
 
 @router.get("/etf-detail/{symbol}")
@@ -118,7 +126,7 @@ def read_etf_detail(symbol: str):
     try:
         from etf_detail import get_etf_detail
         result = get_etf_detail(symbol)
-        return result
+        return FastJSONResponse(result)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -182,6 +190,7 @@ def stock_daily_history(symbol: str, range: str = Query("1mo")):
         return {"status": "error", "message": "Failed to fetch history"}
 
 @router.get("/rank/themes")
+@http_cache(ttl_seconds=60)
 @turbo_cache(ttl_seconds=60)
 def read_theme_rank():
     from korea_data import get_naver_theme_rank
@@ -189,6 +198,7 @@ def read_theme_rank():
     return {"status": "success", "data": data}
 
 @router.get("/rank/top10/{market}")
+@http_cache(ttl_seconds=60)
 @turbo_cache(ttl_seconds=60)
 def read_rank_top10(market: str):
     from rank_data import get_realtime_top10
@@ -197,6 +207,7 @@ def read_rank_top10(market: str):
     return {"status": "success", "data": data}
 
 @router.get("/rank/global")
+@http_cache(ttl_seconds=60)
 @turbo_cache(ttl_seconds=60)
 def read_global_rank(market: str = "KOSPI", category: str = "trading_volume"):
     from rank_data import get_global_ranking
@@ -204,6 +215,7 @@ def read_global_rank(market: str = "KOSPI", category: str = "trading_volume"):
     return {"status": "success", "data": data}
 
 @router.get("/rank/naver/{market}/{rank_type}")
+@http_cache(ttl_seconds=60)
 @turbo_cache(ttl_seconds=60)
 def read_naver_rank(market: str, rank_type: str):
     """네이버 금융 TOP종목 순위 (NaverTopWidget 호환)"""
@@ -215,6 +227,7 @@ def read_naver_rank(market: str, rank_type: str):
         return {"status": "error", "message": str(e)}
 
 @router.get("/rank/movers/{market}")
+@http_cache(ttl_seconds=60)
 @turbo_cache(ttl_seconds=60)
 def read_rank_movers(market: str):
     """실시간 상승/하락 종목 (RankingWidget 호환)"""
@@ -241,7 +254,6 @@ def search_stock_api(q: str = None, query: str = None):
     search_q = q or query
     if not search_q: return {"status": "error", "message": "Query parameter 'q' or 'query' is required"}
     q = search_q # Use the resolved one
-    from stock_data import GLOBAL_KOREAN_NAMES
     from korea_data import search_stock_code
     from global_search import search_global_ticker
     import unicodedata
@@ -279,24 +291,22 @@ def search_stock_api(q: str = None, query: str = None):
         # Looks like a US ticker
         add_result(q_norm.upper(), q_norm.upper(), "Global")
     
-    # 2. High-Priority Global Mapping Check (e.g. '애플' -> 'AAPL')
-    for ticker, ko_names in GLOBAL_KOREAN_NAMES.items():
-        # Support both string and list of names
-        names = ko_names if isinstance(ko_names, list) else [ko_names]
-        for ko_name in names:
-            clean_ko = ko_name.replace(" ", "").strip()
-            if q_norm == clean_ko or q_norm in clean_ko or clean_ko in q_norm:
-                add_result(ticker, names[0], "Global")
-                break # Found for this ticker
+    # 2. Local Symbol Index (exact / prefix / 초성 / fuzzy, e.g. '애플' -> 'AAPL', 'ㅅㅅㅈㅈ' -> '005930')
+    from symbol_index import symbol_index
+    indexed = symbol_index.search(q_norm, limit=10)
+    for item in indexed:
+        add_result(item["symbol"], item["name"], "KR" if item["market"] == "KR" else "Global")
+    has_exact = any(item["match"] == "exact" for item in indexed)
     
-    # 3. Domestic Search Fallback
-    kr_result = search_stock_code(q_norm)
-    if kr_result:
-        m_type = "KR" if (kr_result.isdigit() and len(kr_result) == 6) else "Global"
-        add_result(kr_result, q_norm, m_type)
+    # 3. Domestic Search Fallback (remote tiers only when the local index has no exact hit)
+    if not has_exact:
+        kr_result = search_stock_code(q_norm)
+        if kr_result:
+            m_type = "KR" if (kr_result.isdigit() and len(kr_result) == 6) else "Global"
+            add_result(kr_result, symbol_index.name_for(kr_result) or q_norm, m_type)
         
     # 4. Global Search Fallback
-    if not results or any(c.isalpha() for c in q_norm):
+    if not results or (not has_exact and any(c.isalpha() for c in q_norm)):
         gb_result = search_global_ticker(q_norm)
         if gb_result:
             add_result(gb_result, q_norm, "Global")
@@ -306,6 +316,16 @@ def search_stock_api(q: str = None, query: str = None):
         
     return {"status": "error", "message": f"해당 종목을 찾을 수 없습니다: '{q_norm}'"}
 
+@router.get("/stock/autocomplete")
+def autocomplete_stock_api(q: str = Query(..., min_length=1), limit: int = 10):
+    """
+    로컬 종목 인덱스 기반 자동완성 (원격 호출 없음)
+    - 종목명 접두어, 초성(ㅅㅅㅈㅈ), 오타 허용 3-gram 유사도 순위
+    """
+    from symbol_index import symbol_index
+    q_norm = unicodedata.normalize('NFC', urllib.parse.unquote(q).strip())
+    return {"status": "success", "data": symbol_index.search(q_norm, limit=limit)}
+
 @router.get("/quote/{symbol}")
 def read_quote(symbol: str):
     symbol = urllib.parse.unquote(symbol).strip()
@@ -314,14 +334,9 @@ def read_quote(symbol: str):
     if not re.match(r'^[A-Za-z0-9.]+$', symbol):
         import unicodedata
         from korea_data import search_stock_code
-        from stock_data import GLOBAL_KOREAN_NAMES
+        from symbol_index import symbol_index
         q_norm = unicodedata.normalize('NFC', symbol).replace(" ", "")
-        resolved = None
-        for t, k_names in GLOBAL_KOREAN_NAMES.items():
-            names = k_names if isinstance(k_names, list) else [k_names]
-            if any(q_norm == name.replace(" ", "").strip() or q_norm in name.replace(" ", "").strip() for name in names):
-                resolved = t
-                break
+        resolved = symbol_index.resolve(q_norm)
         if not resolved:
             resolved = search_stock_code(q_norm)
         if resolved:
@@ -406,9 +421,9 @@ def get_multi_quotes(symbols: str = Query(...)):
 @router.get("/korea/sector_heatmap")
 async def read_sector_heatmap():
     """업종별 히트맵 데이터 반환"""
-    from korea_data import get_sector_heatmap_data
+    from heatmap_service import heatmap_service
     try:
-        data = await get_sector_heatmap_data()
+        data = await heatmap_service.get_heatmap("sector")
         return {"status": "success", "data": data}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -416,9 +431,9 @@ async def read_sector_heatmap():
 @router.get("/korea/heatmap")
 async def read_theme_heatmap():
     """테마별 히트맵 데이터 반환"""
-    from korea_data import get_theme_heatmap_data
+    from heatmap_service import heatmap_service
     try:
-        data = await get_theme_heatmap_data()
+        data = await heatmap_service.get_heatmap("theme")
         return {"status": "success", "data": data}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -813,22 +828,40 @@ def get_debug_tokens():
         return {"status": "error", "message": str(e)}
 
 @router.get("/scanner")
+@http_cache(ttl_seconds=30)
 @turbo_cache(ttl_seconds=30)
-def read_market_scanner():
-    """오늘의 증시 스캐너 데이터 (상승/하락 종목 수 및 특이 공시)"""
+def read_market_scanner(where: Optional[str] = None, sort: Optional[str] = None, limit: int = 50):
+    """
+    오늘의 증시 스캐너 데이터 (상승/하락 종목 수 및 특이 공시)
+    where/sort 가 있으면 전 종목 스냅샷 스크리닝 결과(screen)도 함께 반환
+    예) ?where=per < 10 and dividend_yield >= 3&sort=f_score,-per
+    """
     from korea_data import get_market_summary_stats, get_live_disclosures
     import concurrent.futures
     try:
         with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
             f_stats = executor.submit(get_market_summary_stats)
             f_disc = executor.submit(get_live_disclosures)
-            
+
+        data = {
+            "stats": f_stats.result(),
+            "disclosures": f_disc.result()
+        }
+        if where or sort:
+            from fundamentals_snapshot import fundamentals_snapshot
+            try:
+                sort_exprs = [s for s in (sort or "").split(",") if s.strip()]
+                data["screen"] = {
+                    "results": fundamentals_snapshot.screen(where=where, sort=sort_exprs, limit=min(max(limit, 1), 500)),
+                    "total": fundamentals_snapshot.count(where),
+                    "built_at": fundamentals_snapshot.meta.get("built_at"),
+                }
+            except (ValueError, RuntimeError) as e:
+                data["screen"] = {"error": str(e)}
+
         return {
             "status": "success",
-            "data": {
-                "stats": f_stats.result(),
-                "disclosures": f_disc.result()
-            }
+            "data": data
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
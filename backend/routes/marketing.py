@@ -2,12 +2,8 @@
 from pydantic import BaseModel
 import json
 import asyncio
-import aiohttp
 import os
 
-# 기존 AI 인프라 재사용 (gemini api key 설정 및 재시도 로직)
-from ai_analysis import generate_with_retry, get_json_model
-
 router = APIRouter()
 
 class MarketingRequest(BaseModel):
@@ -24,6 +20,8 @@ async def get_auto_keyword():
     
     오직 키워드 문장 한 줄만 응답하세요. 다른 부연 설명이나 따옴표는 넣지 마세요.
     """
+    # 기존 AI 인프라 재사용 (gemini api key 설정 및 재시도 로직) - 첫 호출 시 로드
+    from ai_analysis import generate_with_retry
     try:
         response = await asyncio.to_thread(generate_with_retry, prompt, False, 15, 0.9) # temperature 조금 높게 주어 매번 다양한 주제 추출
         keyword = response.text.strip().replace('"', '').replace("'", "")
@@ -92,6 +90,7 @@ async def generate_marketing_content(request: MarketingRequest):
 
     try:
         # ai_analysis.py 의 기존 인프라 사용
+        from ai_analysis import generate_with_retry
         response = await asyncio.to_thread(generate_with_retry, prompt, True, 60, 0.7)
         return json.loads(response.text)
     except Exception as e:
@@ -127,6 +126,7 @@ async def publish_marketing_content(request: PublishRequest):
             "category": "0"
         }
         
+        import aiohttp
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.post(url, data=data) as resp:
@@ -1,10 +1,13 @@
 ﻿from fastapi import APIRouter, Header, HTTPException
 from pydantic import BaseModel
 from db_manager import get_db_connection
+from turbo_engine import http_cache, turbo_cache
 
 router = APIRouter()
 
 @router.get("/")
+@http_cache(ttl_seconds=60, private=True)  # my_rank가 사용자별(X-User-Id)이므로 private
+@turbo_cache(ttl_seconds=60)
 def get_leaderboard(x_user_id: str = Header(None)):
     conn = get_db_connection()
     cursor = conn.cursor()
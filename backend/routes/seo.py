@@ -1,9 +1,8 @@
 from fastapi import APIRouter
-import FinanceDataReader as fdr
-import yfinance as yf
 import logging
 from cachetools import TTLCache, cached
 from datetime import timedelta
+from response_encoding import FastJSONResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -11,6 +10,7 @@ logger = logging.getLogger(__name__)
 # Cache for 24 hours (86400 seconds)
 @cached(cache=TTLCache(maxsize=1, ttl=86400))
 def get_all_kospi_kosdaq():
+    import FinanceDataReader as fdr  # [Lazy] 기동 시간 절약 (pandas 포함 수백 ms)
     try:
         # Fetch KOSPI and KOSDAQ
         df_kospi = fdr.StockListing('KOSPI')
@@ -51,12 +51,12 @@ def get_all_kospi_kosdaq():
         logger.error(f"Error fetching stock list: {e}")
         return {"status": "error", "message": str(e)}
 
-import requests
-from bs4 import BeautifulSoup
-
 # Cache for 6 hours to prevent rate limits
 @cached(cache=TTLCache(maxsize=2000, ttl=21600))
 def get_cached_stock_info(ticker: str):
+    import requests
+    import yfinance as yf
+    from bs4 import BeautifulSoup
     try:
         import re
         import urllib.parse
@@ -221,7 +221,7 @@ def get_cached_stock_info(ticker: str):
 @router.get("/seo/stocks")
 def get_seo_stocks():
     """Returns all KOSPI/KOSDAQ stocks for sitemap generation"""
-    return get_all_kospi_kosdaq()
+    return FastJSONResponse(get_all_kospi_kosdaq())
 
 @router.get("/seo/stock-info/{ticker}")
 def get_seo_stock_info(ticker: str):
@@ -1,12 +1,11 @@
 ﻿from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 import json
-import asyncio
 
 router = APIRouter()
 
 # [KIS WS Helper]
-async def handle_user_ws_message(user_id: str, symbol: str, price: float, change: str):
-    """Handle incoming real-time data from KIS WebSocket and route to user sockets"""
+async def handle_feed_tick(symbol: str, price: str, change: str, user_ids: set):
+    """Handle one decoded tick from the shared KIS feed and route it to every interested user's sockets"""
     from sockets import manager
     # Create the data payload expected by the frontend
     quote = {
@@ -14,7 +13,14 @@ async def handle_user_ws_message(user_id: str, symbol: str, price: float, change
         "price": price,
         "change": change
     }
-    await manager.send_private_update(user_id, symbol, quote)
+    await manager.send_feed_update(symbol, quote, user_ids)
+
+async def release_user_symbol(user_id: str, symbol: str):
+    """Drop the user's shared-feed interest once none of their sockets watch 'symbol' anymore"""
+    from sockets import manager
+    from user_session import session_manager
+    if symbol and symbol not in manager.get_user_subscriptions(user_id):
+        await session_manager.unsubscribe_user_symbol(user_id, symbol)
 
 @router.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str, user_id: str = Query("guest")):
@@ -24,32 +30,14 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str, user_id: str
     # [Lazy Imports]
     from sockets import manager
     from user_session import session_manager
+    from kis_mux import feed_mux
     from stock_data import get_simple_quote
     
+    # Guest fallback polling: one shared poller per subscribed symbol (inside manager),
+    # skipping sockets whose user already receives that symbol from the shared KIS feed
+    manager.configure_polling(get_simple_quote, feed_mux.is_served)
     await manager.connect(websocket, user_id)
     
-    # Guest fallback polling task
-    async def poll_fallback():
-        last_price = None
-        while True:
-            try:
-                # Only poll if there's NO active private KIS websocket session running for this user
-                if user_id not in session_manager.user_websockets:
-                    symbol = manager.subscriptions.get(websocket)
-                    if symbol:
-                        quote = await asyncio.to_thread(get_simple_quote, symbol)
-                        if quote and quote.get('price') != last_price:
-                            last_price = quote.get('price')
-                            await websocket.send_json({"type": "update", "data": quote})
-                await asyncio.sleep(10) # 10 seconds interval for guest users
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"[WS Poll Fallback] Error: {e}")
-                await asyncio.sleep(10)
-
-    polling_task = asyncio.create_task(poll_fallback())
-    
     try:
         while True:
             data = await websocket.receive_text()
@@ -57,43 +45,48 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str, user_id: str
             msg_type = message.get('type')
             
             if msg_type == 'ping':
-                await websocket.send_json({"type": "pong"})
+                manager.send_json(websocket, {"type": "pong"})
             
             elif msg_type == 'auth':
                 keys = message.get('keys')
                 if keys:
                     manager.set_keys(websocket, keys)
-                    await session_manager.start_user_session(user_id, keys, handle_user_ws_message)
+                    await session_manager.start_user_session(user_id, keys, handle_feed_tick)
                     # Also subscribe existing symbol on the newly created KIS session
                     symbol = manager.subscriptions.get(websocket)
                     if symbol:
                         await session_manager.subscribe_user_symbol(user_id, symbol)
-                    await websocket.send_json({"type": "auth_success"})
+                    manager.send_json(websocket, {"type": "auth_success"})
             
             elif msg_type == 'subscribe':
                 symbol = message.get('symbol')
                 if symbol:
+                    old_symbol = manager.subscriptions.get(websocket)
                     await manager.subscribe(websocket, symbol)
-                    # Subscribe on KIS WebSocket if user session is active
+                    # Subscribe on the shared KIS feed if user session is active
                     await session_manager.subscribe_user_symbol(user_id, symbol)
-                    # Send initial price immediately
-                    initial = await asyncio.to_thread(get_simple_quote, symbol)
-                    if initial:
-                        await websocket.send_json({"type": "update", "data": initial})
+                    if old_symbol != symbol:
+                        await release_user_symbol(user_id, old_symbol)
+                    # Initial price: the shared poller fetches on its first tick and manager.subscribe
+                    # replays last_quotes to late joiners (no per-socket upstream fetch)
             
             elif msg_type == 'unsubscribe':
                 symbol = message.get('symbol')
                 if symbol:
-                    await session_manager.unsubscribe_user_symbol(user_id, symbol)
+                    manager.unsubscribe(websocket, symbol)
+                    await release_user_symbol(user_id, symbol)
                 
     except WebSocketDisconnect:
+        symbol = manager.subscriptions.get(websocket)
         await manager.disconnect(websocket)
         # Cleanup KIS session if no connections left
         remaining = [ws for ws, m in manager.active_connections.items() if m['user_id'] == user_id]
         if not remaining:
             await session_manager.stop_user_session(user_id)
+        else:
+            await release_user_symbol(user_id, symbol)
     except Exception as e:
         print(f"[WS] Error: {e}")
+        symbol = manager.subscriptions.get(websocket)
         await manager.disconnect(websocket)
-    finally:
-        polling_task.cancel()
+        await release_user_symbol(user_id, symbol)
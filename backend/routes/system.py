@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Header, Query, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import os
@@ -601,6 +602,116 @@ def get_admin_hourly_analytics(limit: int = 48, x_admin_key: Optional[str] = Hea
         "data": stats
     }
 
+@router.get("/admin/ws-stats")
+def get_ws_stats(x_admin_key: Optional[str] = Header(None), secret: Optional[str] = Query(None)):
+    """[Admin] 실시간 WebSocket 접속/구독 및 송신 큐(백프레셔) 지표"""
+    check_admin_auth(x_admin_key, secret)
+    from sockets import manager
+    from kis_mux import feed_mux
+    return {
+        "status": "success",
+        "data": {**manager.get_connection_stats(), "kis_feed": feed_mux.get_stats()}
+    }
+
+@router.get("/admin/jobs")
+def get_scheduled_jobs(x_admin_key: Optional[str] = Header(None), secret: Optional[str] = Query(None)):
+    """[Admin] 통합 스케줄러 작업 목록 (다음 실행 시각, 최근 실행 결과, 7일 평균/최대 소요 시간, 같은 분 충돌)"""
+    check_admin_auth(x_admin_key, secret)
+    from job_scheduler import job_scheduler
+    return {
+        "status": "success",
+        "data": job_scheduler.get_jobs()
+    }
+
+@router.get("/metrics")
+def get_metrics(x_admin_key: Optional[str] = Header(None), secret: Optional[str] = Query(None)):
+    """[Admin] Prometheus 텍스트 포맷 메트릭 (라우트/외부 호출 지연, 터보 캐시, 이벤트 루프 지연, 스레드풀 대기열)"""
+    check_admin_auth(x_admin_key, secret)
+    from metrics import metrics
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def _profile_response(profile: dict, format: str):
+    from profiler import sampling_profiler
+    if format == "json":
+        summary = {k: v for k, v in profile.items() if k != "stacks"}
+        summary["top_functions"] = sampling_profiler.top_functions(profile)
+        return {"status": "success", "data": summary}
+    return PlainTextResponse(
+        sampling_profiler.collapsed(profile),
+        headers={"X-Profile-Id": profile["id"], "X-Profile-Samples": str(profile["samples"])}
+    )
+
+@router.post("/admin/profile")
+async def run_profiler(
+    seconds: float = 10,
+    interval_ms: float = 10,
+    include_idle: bool = False,
+    format: str = "collapsed",
+    x_admin_key: Optional[str] = Header(None),
+    secret: Optional[str] = Query(None)
+):
+    """[Admin] N초 동안 전체 스레드(이벤트 루프 + 스레드풀) 샘플링 → collapsed stack (flamegraph 호환) 또는 json 요약"""
+    check_admin_auth(x_admin_key, secret)
+    import asyncio
+    from profiler import sampling_profiler
+    profile = await asyncio.to_thread(sampling_profiler.run, seconds, max(interval_ms, 1) / 1000, include_idle)
+    if profile is None:
+        raise HTTPException(status_code=409, detail="Profiler is already running.")
+    return _profile_response(profile, format)
+
+@router.get("/admin/profile/{profile_id}")
+def get_profile(profile_id: str, format: str = "collapsed", x_admin_key: Optional[str] = Header(None), secret: Optional[str] = Query(None)):
+    """[Admin] 최근 프로파일 조회 (X-Profile 헤더로 수집한 요청 단위 프로파일 포함)"""
+    check_admin_auth(x_admin_key, secret)
+    from profiler import sampling_profiler
+    profile = sampling_profiler.recent.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return _profile_response(profile, format)
+
+@router.get("/admin/logging")
+def get_logging_status(x_admin_key: Optional[str] = Header(None), secret: Optional[str] = Query(None)):
+    """[Admin] 로그 큐 깊이 / 유실(큐 초과) / 속도 제한으로 생략된 건수 / 모듈별 레벨"""
+    check_admin_auth(x_admin_key, secret)
+    from structured_logging import logging_state
+    return {"status": "success", "data": logging_state.get_stats()}
+
+@router.post("/admin/logging/level")
+def set_logging_level(name: str, level: str, x_admin_key: Optional[str] = Header(None), secret: Optional[str] = Query(None)):
+    """[Admin] 런타임 로그 레벨 변경 (예: name=print.korea_data&level=WARNING, name=root&level=DEBUG)"""
+    check_admin_auth(x_admin_key, secret)
+    if level.upper() not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+        raise HTTPException(status_code=400, detail=f"Invalid level: {level}")
+    from structured_logging import set_log_level, logging_state
+    set_log_level(name, level)
+    return {"status": "success", "data": logging_state.get_stats()}
+
+@router.get("/admin/leader")
+def get_leader_status(x_admin_key: Optional[str] = Header(None), secret: Optional[str] = Query(None)):
+    """[Admin] 백그라운드 작업 리더 리스 상태 (이 워커의 리더 여부 + 현재 보유자)"""
+    check_admin_auth(x_admin_key, secret)
+    from leader_lease import background_lease
+    return {
+        "status": "success",
+        "data": background_lease.get_status()
+    }
+
+@router.post("/admin/jobs/{job_name}/run")
+async def run_scheduled_job(job_name: str, x_admin_key: Optional[str] = Header(None), secret: Optional[str] = Query(None)):
+    """[Admin] 작업 즉시 실행 (이미 실행 중이면 겹침 정책에 따라 건너뜀/대기)"""
+    check_admin_auth(x_admin_key, secret)
+    from job_scheduler import job_scheduler, NotLeaderError
+    if job_name not in job_scheduler.jobs:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_name}")
+    try:
+        started = await job_scheduler.run_now(job_name)
+    except NotLeaderError as e:
+        # 리더 전용 작업은 리스를 가진 워커에서만 (/admin/leader 로 현재 보유자 확인)
+        raise HTTPException(status_code=409, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"status": "success", "started": started}
+
 @router.post("/admin/send-daily-report")
 @router.get("/admin/send-daily-report")
 def trigger_daily_report(x_admin_key: Optional[str] = Header(None), secret: Optional[str] = Query(None)):
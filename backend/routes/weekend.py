@@ -1,8 +1,6 @@
 from fastapi import APIRouter
 from datetime import datetime, timedelta
 import pytz
-from utils.weekend_report import get_latest_weekend_report
-from utils.whale_weekend_report import get_latest_whale_report
 
 router = APIRouter()
 
@@ -28,6 +26,7 @@ async def get_weekend_report():
     kst = pytz.timezone('Asia/Seoul')
     now = datetime.now(kst)
     
+    from utils.weekend_report import get_latest_weekend_report
     report = get_latest_weekend_report()
     next_open = get_next_open_time(now)
     
@@ -58,6 +57,7 @@ async def get_weekend_whale_report():
     next_friday = now + timedelta(days=(4 - day) if day < 4 else (11 - day))
     next_open = next_friday.replace(hour=18, minute=0, second=0, microsecond=0)
     
+    from utils.whale_weekend_report import get_latest_whale_report  # requests/bs4 → 첫 조회 시 로드
     report = get_latest_whale_report()
     if report:
         return {
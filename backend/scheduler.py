@@ -2,10 +2,10 @@ import asyncio
 import logging
 import json
 import os
+import time
 import urllib.parse
 from datetime import datetime, timedelta
 from holiday_checker import is_holiday
-from system_watchdog import update_heartbeat
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -24,7 +24,7 @@ def load_state():
                 return json.load(f)
         except Exception as e:
             logger.error(f"Failed to load state: {e}")
-    return {"processed_ids": [], "sec_processed_ids": [], "last_briefing_hour": -1, "last_briefing_date": ""}
+    return {"sec_processed_ids": [], "last_briefing_hour": -1, "last_briefing_date": ""}
 
 def save_state(state):
     try:
@@ -33,16 +33,88 @@ def save_state(state):
     except Exception as e:
         logger.error(f"Failed to save state: {e}")
 
-def mark_processed_and_save(state: dict, processed_ids: dict, doc_id: str):
+# ─── 공시 dedupe 테이블 (rcept_no) ─────────────────────────────────────────
+# 기존 JSON state 의 processed_ids(2,000건 상한, 공시마다 파일 전체 재작성)를 대체.
+# rcept_no 가 PK 이므로 MAX(rcept_no) = 증분 조회 high-water mark
+DISCLOSURE_RETENTION_DAYS = 7
+
+
+def _ensure_disclosure_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS dart_processed_disclosures (
+            rcept_no TEXT PRIMARY KEY,
+            stock_code TEXT,
+            processed_at REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dart_processed_at ON dart_processed_disclosures(processed_at)")
+
+
+def _migrate_legacy_processed_ids(conn, state: dict):
+    """JSON state 의 processed_ids 를 한 번만 테이블로 옮기고 state 에서 제거"""
+    legacy = state.pop("processed_ids", None)
+    if legacy is None:
+        return
+    now = time.time()
+    conn.executemany(
+        "INSERT OR IGNORE INTO dart_processed_disclosures (rcept_no, stock_code, processed_at) VALUES (?, NULL, ?)",
+        [(str(doc_id), now) for doc_id in legacy if doc_id]
+    )
+    conn.commit()
+    save_state(state)
+    logger.info(f"[공시Monitor] 기존 processed_ids {len(legacy)}건 dedupe 테이블로 이전")
+
+
+def get_disclosure_high_water(state: dict) -> str:
+    """마지막으로 처리한 접수번호 (없으면 None)"""
+    from db_manager import get_db_connection
+    conn = get_db_connection()
+    try:
+        _ensure_disclosure_table(conn)
+        _migrate_legacy_processed_ids(conn, state)
+        row = conn.execute("SELECT MAX(rcept_no) FROM dart_processed_disclosures").fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def claim_new_disclosures(items: list) -> list:
     """
-    [핵심 중복방지] 공시 ID를 처리 완료로 즉시 표시하고 파일에 저장.
-    Gemini API 호출 전에 반드시 이 함수를 먼저 호출해야 함.
-    서버가 API 호출 도중 죽어도 재시작 시 같은 공시를 다시 처리하지 않음.
+    [핵심 중복방지] 아직 처리하지 않은 공시만 골라 한 트랜잭션으로 처리 완료 표시 후 반환 (오래된 순).
+    Gemini/FCM 호출 전에 먼저 기록하므로 서버가 도중에 죽어도 재시작 시 같은 공시를 다시 보내지 않음.
     """
-    processed_ids[doc_id] = None
-    state["processed_ids"] = list(processed_ids.keys())[-2000:]
-    save_state(state)
-    logger.debug(f"[Anti-Duplicate] Marked {doc_id} as processed before API call")
+    by_id = {}
+    for item in items:
+        doc_id = str(item.get('rcept_no') or '')
+        if doc_id:
+            by_id.setdefault(doc_id, item)
+    if not by_id:
+        return []
+
+    from db_manager import get_db_connection
+    conn = get_db_connection()
+    try:
+        _ensure_disclosure_table(conn)
+        ids = list(by_id)
+        seen = set()
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows = conn.execute(
+                f"SELECT rcept_no FROM dart_processed_disclosures WHERE rcept_no IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            seen.update(r[0] for r in rows)
+
+        new_ids = sorted(doc_id for doc_id in ids if doc_id not in seen)
+        now = time.time()
+        conn.executemany(
+            "INSERT OR IGNORE INTO dart_processed_disclosures (rcept_no, stock_code, processed_at) VALUES (?, ?, ?)",
+            [(doc_id, by_id[doc_id].get('stock_code'), now) for doc_id in new_ids]
+        )
+        conn.execute("DELETE FROM dart_processed_disclosures WHERE processed_at < ?", (now - DISCLOSURE_RETENTION_DAYS * 86400,))
+        conn.commit()
+        return [by_id[doc_id] for doc_id in new_ids]
+    finally:
+        conn.close()
 
 
 async def check_and_notify_disclosures():
@@ -58,34 +130,39 @@ async def check_and_notify_disclosures():
         logger.warning("[공시Monitor] DART_API_KEY 없음 -> 공시 체크 생략")
         return
 
-    from db_manager import get_user_tokens_by_watchlist_symbol
+    from db_manager import get_watchlist_tokens_by_stock_codes
     from firebase_config import send_multicast_notification
 
     try:
+        # DART HTTP / SQLite 호출은 모두 동기 → 스레드로 넘겨 이벤트 루프를 막지 않음
         state = load_state()
-        # dict.fromkeys를 사용하여 삽입 순서를 유지 (Python 3.7+)
-        # 기존에 set()을 사용하면 순서가 랜덤해져 [-2000:] 슬라이싱 시 최근 공시가 무작위로 삭제되는 치명적 버그 발생
-        processed_ids = dict.fromkeys(state.get("processed_ids", []))
+        high_water = await asyncio.to_thread(get_disclosure_high_water, state)
 
-        # 오늘 올라온 공시 목록 조회 (최대 100건)
-        results = dart_api_client.get_realtime_disclosures(days_ago=0)
+        # high-water mark 이후 공시만 페이지 단위로 조회 (mark 가 없으면 오늘 첫 페이지)
+        results = await asyncio.to_thread(dart_api_client.get_disclosures_since, high_water)
         if not results:
             logger.info("[공시Monitor] 조회된 공시 없음")
             return
 
+        new_items = await asyncio.to_thread(claim_new_disclosures, results)
+        if not new_items:
+            logger.info(f"[공시Monitor] 신규 공시 없음 (mark={high_water})")
+            return
+
+        # 관심종목 등록 사용자: 종목코드별로 한 번에 조회 (KS / KQ 접미사 모두 포함)
+        watchers_by_code = await asyncio.to_thread(
+            get_watchlist_tokens_by_stock_codes, [item.get('stock_code') for item in new_items]
+        )
+
         new_count = 0
         sent_count = 0
 
-        for item in results:
+        for item in new_items:
             doc_id = str(item.get('rcept_no', ''))
-            if not doc_id or doc_id in processed_ids:
-                continue
 
             try:
                 new_count += 1
-                # ✅ [핵심 수정] Gemini API 호출 전에 먼저 ID를 파일에 저장
-                # 서버가 API 호출 도중 죽어도 재시작 시 중복 호출 완전 차단
-                mark_processed_and_save(state, processed_ids, doc_id)
+                # ✅ claim_new_disclosures() 에서 Gemini API 호출 전에 이미 처리 완료로 기록됨
 
                 raw_code = item.get('stock_code')
                 corp = item.get('corp_name', '알 수 없음')
@@ -291,23 +368,12 @@ async def check_and_notify_disclosures():
                         except Exception as e:
                             logger.error(f"[WhaleSiren] Firestore error: {e}")
 
-                # 관심종목 등록 여부 확인 (KS / KQ 접미사 모두 시도)
-                symbol_candidates = [f"{raw_code}.KS", f"{raw_code}.KQ", raw_code]
-                tokens = []
-                target_uids = []
-                matched_symbol = None
-
-                from db_manager import get_user_ids_and_tokens_by_watchlist_symbol
-                for sym in symbol_candidates:
-                    user_tokens = get_user_ids_and_tokens_by_watchlist_symbol(sym)
-                    if user_tokens:
-                        # ✅ [중복 방지] 이미 whale 알림을 받은 사용자는 관심종목 알림에서 제외
-                        filtered = [ut for ut in user_tokens if ut["user_id"] not in whale_alerted_uids]
-                        if filtered:
-                            tokens = [ut["token"] for ut in filtered]
-                            target_uids = [ut["user_id"] for ut in filtered]
-                            matched_symbol = sym
-                            break
+                # 관심종목 등록 사용자 (루프 전에 종목코드별로 묶어 조회)
+                # ✅ [중복 방지] 이미 whale 알림을 받은 사용자는 관심종목 알림에서 제외
+                filtered = [ut for ut in watchers_by_code.get(raw_code, []) if ut["user_id"] not in whale_alerted_uids]
+                tokens = [ut["token"] for ut in filtered]
+                target_uids = [ut["user_id"] for ut in filtered]
+                matched_symbol = filtered[0]["symbol"] if filtered else None
 
                 # 공시 유형별 이모지 결정
                 emoji = "📢"
@@ -369,10 +435,6 @@ async def check_and_notify_disclosures():
                 continue
 
         logger.info(f"[공시Monitor] 완료: 신규 {new_count}건, 알림 {sent_count}건 발송")
-        # 참고: 각 공시 처리 전에 mark_processed_and_save()로 이미 저장됨
-        # 여기서는 혹시 누락된 경우를 위해 최종 한 번 더 저장
-        state["processed_ids"] = list(processed_ids.keys())[-2000:]
-        save_state(state)
 
     except Exception as e:
         logger.error(f"[공시Monitor] DART 체크 오류: {e}")
@@ -636,65 +698,24 @@ async def check_and_notify_sec_disclosures():
         logger.error(f"[SEC Monitor] SEC 체크 오류: {e}")
 
 
-async def hourly_briefing_scheduler_loop():
+async def run_hourly_briefing():
     """
-    매 정각 정기 브리핑 생성 (초경량 실시간 전용 모드)
+    정기 시장 브리핑 생성 (초경량 실시간 전용 모드)
+    비용 절감을 위해 매시간이 아닌 핵심 시간대(장 시작, 점심, 장 마감)에만 실행
     """
-    global ANALYSIS_LOCK
-    ANALYSIS_LOCK = asyncio.Lock()
-
-    logger.info("[Resource-Clean] Hourly Scheduler Active.")
     import pytz
     kst = pytz.timezone('Asia/Seoul')
-    last_cleanup_date = ""
+    now = datetime.now(kst)
+    logger.info(f"[Scheduler] Starting market briefing for: {now.hour}:00")
+    from utils.global_briefing import generate_market_wide_briefing
+    await generate_market_wide_briefing()
+    logger.info(f"[Scheduler] Task completed for {now.hour}:00")
 
-    # ✅ [재시작 중복방지] 마지막 실행 시각을 파일(state)에서 복원하여
-    # 서버 재시작 후에도 같은 시간에 브리핑이 중복 생성되지 않도록 함
-    _state = load_state()
-    last_run_hour = _state.get("last_briefing_hour", -1)
-    last_run_date = _state.get("last_briefing_date", "")
 
-    while True:
-        try:
-            update_heartbeat("Hourly_Briefing")
-            now = datetime.now(kst)
-            current_hour = now.hour
-            current_date = now.strftime("%Y-%m-%d")
-
-            is_weekend = is_holiday("kor")
-
-            # 비용 절감을 위해 매시간이 아닌 핵심 시간대(장 시작, 점심, 장 마감)에만 실행
-            target_hours = [9, 12, 16]
-            is_target_hour = current_hour in target_hours
-            already_ran = (last_run_hour == current_hour and last_run_date == current_date)
-
-            if not is_weekend and is_target_hour and not already_ran:
-                logger.info(f"[Scheduler] Starting market briefing for: {current_hour}:00")
-                from utils.global_briefing import generate_market_wide_briefing
-
-                async with ANALYSIS_LOCK:
-                    await asyncio.wait_for(
-                        generate_market_wide_briefing(),
-                        timeout=180.0
-                    )
-                last_run_hour = current_hour
-                last_run_date = current_date
-                # ✅ 실행 직후 상태 파일에 저장 (재시작 시 중복 방지)
-                _state = load_state()
-                _state["last_briefing_hour"] = last_run_hour
-                _state["last_briefing_date"] = last_run_date
-                save_state(_state)
-                logger.info(f"[Scheduler] Task completed for {current_hour}:00")
-
-            if current_hour == 2 and current_date != last_cleanup_date:
-                from utils.briefing_store import cleanup_old_briefings
-                cleanup_old_briefings()
-                last_cleanup_date = current_date
-
-            await asyncio.sleep(60)
-        except Exception as e:
-            logger.error(f"[Scheduler] Loop error: {e}")
-            await asyncio.sleep(60)
+def run_briefing_cleanup():
+    """오래된 브리핑 정리"""
+    from utils.briefing_store import cleanup_old_briefings
+    cleanup_old_briefings()
 
 
 async def check_and_notify_ipos():
@@ -810,529 +831,186 @@ async def check_and_notify_ipos():
         logger.error(f"Scheduler Error in IPO Check: {e}")
 
 
-async def disclosure_scheduler_loop():
-    """
-    공시 실시간 감시 루프
-    - DART 국내 공시: 5분마다 체크
-    - SEC 해외 공시: 5분마다 체크 (DART와 동시)
-    - IPO 공모주: 30분마다 체크
-    """
-    logger.info("[공시Monitor] 공시 실시간 감시 루프 시작 (5분 주기)")
-
-    # ✅ [크래시 루프 방지] 서버 시작 직후 5분간 공시 체크를 하지 않음
-    # systemd가 5~10초 단위로 재시작할 때 Gemini API를 호출하지 않도록 방어
-    logger.info("[공시Monitor] 서버 안정화를 위해 5분 대기 후 첫 공시 체크 시작...")
-    await asyncio.sleep(300)
+async def run_disclosure_checks():
+    """공시 실시간 감시: DART 국내 공시 + SEC 해외 공시"""
+    # 국내 DART 공시 체크
+    await check_and_notify_disclosures()
 
-    ipo_check_counter = 0  # 5분 * 6 = 30분마다 IPO 체크
+    # 해외 SEC 공시 체크
+    await check_and_notify_sec_disclosures()
 
-    while True:
-        try:
-            update_heartbeat("Disclosure_Monitor")
-            await asyncio.sleep(300)  # 5분 간격
-
-            # 국내 DART 공시 체크
-            await check_and_notify_disclosures()
 
-            # 해외 SEC 공시 체크
-            await check_and_notify_sec_disclosures()
+def _run_bot_script(script_name: str, *args: str):
+    import subprocess
+    import sys
+    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script_name)
+    subprocess.run([sys.executable, script_path, *args])
 
-            # IPO는 30분마다 (5분 * 6 = 30분)
-            ipo_check_counter += 1
-            if ipo_check_counter >= 6:
-                await check_and_notify_ipos()
-                ipo_check_counter = 0
 
-        except asyncio.CancelledError:
-            logger.info("[공시Monitor] 공시 감시 루프 종료")
-            break
-        except Exception as e:
-            logger.error(f"[공시Monitor] 루프 오류: {e}")
-            await asyncio.sleep(60)
+def run_auto_blog_kor():
+    """한국장 마감 블로그 포스팅 & 장마감 텔레그램 브리핑"""
+    logger.info("[AutoBlog] Triggering KOR market blog post & Telegram Closing Summary...")
+    _run_bot_script("auto_blog_bot.py", "kor")
+    try:
+        from social_bot import generate_closing_summary, send_telegram_message
+        send_telegram_message(generate_closing_summary())
+    except Exception as e:
+        logger.error(f"[Telegram] Failed to send closing summary: {e}")
 
 
-async def auto_blog_scheduler_loop():
-    """
-    매일 지정된 시간에 블로그 포스팅 봇을 자동 호출
-    - KOR (국내장): 16:00
-    - US (미국장): 07:00
-    """
-    logger.info("[AutoBlog] Auto Blog Scheduler Active.")
-    import pytz
-    import subprocess
-    import sys
-    kst = pytz.timezone('Asia/Seoul')
-    import json
-    state_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "auto_blog_state.json")
-    
-    def load_state():
-        if os.path.exists(state_file):
-            try:
-                with open(state_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except:
-                pass
-        return {"last_run_date_kor": "", "last_run_date_us": ""}
-        
-    def save_state(state):
-        try:
-            with open(state_file, "w", encoding="utf-8") as f:
-                json.dump(state, f)
-        except:
-            pass
+def run_auto_blog_us():
+    """미국장 마감/한국장 시작전 블로그 포스팅 & 아침 텔레그램 브리핑"""
+    if is_holiday("us"):
+        return
+    logger.info("[AutoBlog] Triggering US market blog post & Telegram Morning Briefing...")
+    _run_bot_script("auto_blog_bot.py", "us")
+    try:
+        from social_bot import generate_morning_briefing, send_telegram_message
+        send_telegram_message(generate_morning_briefing())
+    except Exception as e:
+        logger.error(f"[Telegram] Failed to send morning briefing: {e}")
 
-    state = load_state()
-    
-    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "auto_blog_bot.py")
 
-    while True:
-        try:
-            update_heartbeat("Auto_Blog_Bot")
-            now = datetime.now(kst)
-            current_date = now.strftime("%Y-%m-%d")
-            
-            # 오후 16시 정각 (한국장 마감 포스팅 & 장마감 텔레그램 브리핑)
-            if now.hour == 16 and state.get("last_run_date_kor") != current_date:
-                if not is_holiday("kor"):
-                    logger.info("[AutoBlog] Triggering KOR market blog post & Telegram Closing Summary...")
-                    await asyncio.to_thread(subprocess.run, [sys.executable, script_path, "kor"])
-                    try:
-                        from social_bot import generate_closing_summary, send_telegram_message
-                        send_telegram_message(generate_closing_summary())
-                    except Exception as e:
-                        logger.error(f"[Telegram] Failed to send closing summary: {e}")
-                state["last_run_date_kor"] = current_date
-                save_state(state)
-            
-            # 오전 08시 정각 (미국장 마감/한국장 시작전 포스팅 & 아침 텔레그램 브리핑)
-            if now.hour == 8 and state.get("last_run_date_us") != current_date:
-                if not is_holiday("us"):
-                    logger.info("[AutoBlog] Triggering US market blog post & Telegram Morning Briefing...")
-                    await asyncio.to_thread(subprocess.run, [sys.executable, script_path, "us"])
-                    try:
-                        from social_bot import generate_morning_briefing, send_telegram_message
-                        send_telegram_message(generate_morning_briefing())
-                    except Exception as e:
-                        logger.error(f"[Telegram] Failed to send morning briefing: {e}")
-                state["last_run_date_us"] = current_date
-                save_state(state)
-
-            await asyncio.sleep(60) # 1분 대기
-        except Exception as e:
-            logger.error(f"[AutoBlog] Loop error: {e}")
-            await asyncio.sleep(60)
+def run_seo_blog_post():
+    """SEO 최적화 자동 포스팅 봇 (트래픽 확보용, 하루 3회)"""
+    logger.info("[SEOBlog] Triggering SEO blog post...")
+    _run_bot_script("seo_blog_bot.py")
 
-async def seo_blog_scheduler_loop():
-    """
-    SEO 최적화 자동 포스팅 봇 스케줄러 (하루 N회 실행)
-    - 매일 오전 10시, 오후 2시 등에 트래픽 확보를 위해 실행
-    """
-    logger.info("[SEOBlog] SEO Blog Scheduler Active.")
-    import pytz
-    import subprocess
-    import sys
-    kst = pytz.timezone('Asia/Seoul')
-    last_run_hour = -1
-    
-    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "seo_blog_bot.py")
-
-    while True:
-        try:
-            update_heartbeat("SEO_Blog_Bot")
-            now = datetime.now(kst)
-            
-            # 비용 절감을 위해 하루 3번(아침, 점심, 저녁) 실행하도록 변경
-            target_hours = [9, 13, 18]
-            if now.hour in target_hours and last_run_hour != now.hour:
-                logger.info(f"[SEOBlog] Triggering SEO blog post for hour {now.hour}...")
-                await asyncio.to_thread(subprocess.run, [sys.executable, script_path])
-                last_run_hour = now.hour
-
-            await asyncio.sleep(60)
-        except Exception as e:
-            logger.error(f"[SEOBlog] Loop error: {e}")
-            await asyncio.sleep(60)
 
-async def watchdog_scheduler_loop():
-    """10분 주기로 시스템 워치독 실행"""
-    logger.info("[Watchdog] System Watchdog Active. Checking every 10 mins.")
+def run_watchdog():
+    """시스템 워치독 실행"""
     import system_watchdog
-    while True:
-        try:
-            await asyncio.to_thread(system_watchdog.run_health_checks)
-            await asyncio.sleep(600) # 10분 대기
-        except Exception as e:
-            logger.error(f"[Watchdog] Loop error: {e}")
-            await asyncio.sleep(60)
+    system_watchdog.run_health_checks()
+
 
-async def cleanup_alerts_scheduler_loop():
-    """3일 지난 알림 데이터를 주기적으로 삭제 (6시간 주기)"""
-    logger.info("[CleanupAlerts] Cleanup Alerts Loop Active. Checking every 6 hours.")
+def run_cleanup_alerts():
+    """3일 지난 알림 데이터 삭제"""
     from scheduler_service import delete_old_alerts
-    while True:
-        try:
-            await asyncio.to_thread(delete_old_alerts)
-            await asyncio.sleep(21600) # 6시간 대기
-        except Exception as e:
-            logger.error(f"[CleanupAlerts] Loop error: {e}")
-            await asyncio.sleep(60)
+    delete_old_alerts()
 
-async def cleanup_system_logs_scheduler_loop():
-    """3일 지난 시스템 로그(알림 모니터링)를 주기적으로 삭제 (6시간 주기)"""
-    logger.info("[CleanupSystemLogs] System Logs Cleanup Loop Active. Checking every 6 hours.")
-    while True:
-        try:
-            from db_manager import cleanup_old_system_logs
-            deleted = await asyncio.to_thread(cleanup_old_system_logs, 3)
-            if deleted > 0:
-                logger.info(f"[CleanupSystemLogs] Deleted {deleted} old system log records.")
-            await asyncio.sleep(21600) # 6시간 대기
-        except Exception as e:
-            logger.error(f"[CleanupSystemLogs] Loop error: {e}")
-            await asyncio.sleep(60)
 
-async def google_indexer_scheduler_loop():
-    """매일 새벽 2시에 구글 인덱서 실행"""
-    logger.info("[GoogleIndexer] Google Indexer Scheduler Active.")
-    import subprocess
-    import sys
-    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "google_indexer.py")
-    last_run_day = -1
-    
-    while True:
-        try:
-            now = datetime.now()
-            # 매일 새벽 2시에 한 번 실행
-            if now.hour == 2 and last_run_day != now.day:
-                logger.info(f"[GoogleIndexer] Triggering Google Indexing for today...")
-                await asyncio.to_thread(subprocess.run, [sys.executable, script_path])
-                last_run_day = now.day
-                
-            await asyncio.sleep(60 * 30) # 30분 주기로 체크 (자주 돌 필요 없음)
-        except Exception as e:
-            logger.error(f"[GoogleIndexer] Loop error: {e}")
-            await asyncio.sleep(60)
+def run_cleanup_system_logs():
+    """3일 지난 시스템 로그(알림 모니터링) 삭제"""
+    from db_manager import cleanup_old_system_logs
+    deleted = cleanup_old_system_logs(3)
+    if deleted > 0:
+        logger.info(f"[CleanupSystemLogs] Deleted {deleted} old system log records.")
 
-async def dividend_alerts_scheduler_loop():
-    """매일 저녁 18:00 KST에 배당락일 D-1 푸시 알림 실행"""
-    logger.info("[DividendAlerts] Dividend Alerts Scheduler Active.")
-    import subprocess
-    import sys
-    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dividend_alerts.py")
-    last_run_day = -1
-    
-    # 시간대 처리
-    import pytz
-    kst = pytz.timezone('Asia/Seoul')
-    
-    while True:
-        try:
-            now = datetime.now(kst)
-            # 매일 오후 18시에 1번 실행 (18:00 ~ 18:59 사이 최초 도달 시)
-            if now.hour == 18 and last_run_day != now.day:
-                logger.info(f"[DividendAlerts] Triggering Dividend Alerts for today...")
-                await asyncio.to_thread(subprocess.run, [sys.executable, script_path])
-                last_run_day = now.day
-                
-            await asyncio.sleep(60 * 30) # 30분 주기로 체크
-        except Exception as e:
-            logger.error(f"[DividendAlerts] Loop error: {e}")
-            await asyncio.sleep(60)
-
-async def weekly_blog_bot_scheduler_loop():
-    """매주 토요일 오전 9시 KST에 주간 증시 결산 블로그 포스팅 실행"""
-    logger.info("[WeeklyBlog] Weekly Blog Bot Scheduler Active.")
-    import subprocess
-    import sys
-    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weekly_blog_bot.py")
-    last_run_week = -1
-    
-    import pytz
-    kst = pytz.timezone('Asia/Seoul')
-    
-    while True:
-        try:
-            now = datetime.now(kst)
-            # 5: 토요일 (weekday()는 월요일이 0, 토요일이 5)
-            # 오전 9시에 1번 실행 (09:00 ~ 09:59 사이)
-            current_week = now.isocalendar()[1]
-            if now.weekday() == 5 and now.hour == 9 and last_run_week != current_week:
-                logger.info(f"[WeeklyBlog] Triggering Weekly Blog Posting for week {current_week}...")
-                await asyncio.to_thread(subprocess.run, [sys.executable, script_path])
-                last_run_week = current_week
-                
-            await asyncio.sleep(60 * 30) # 30분 주기로 체크
-        except Exception as e:
-            logger.error(f"[WeeklyBlog] Loop error: {e}")
-            await asyncio.sleep(60)
-
-async def weekend_report_scheduler_loop():
-    """매주 토요일 오전 9시 30분 주말 리포트 생성, 10시에 푸시 알림"""
-    logger.info("[WeekendReport] Weekend Report Scheduler Active.")
-    last_run_week_gen = -1
-    last_run_week_push = -1
-    
-    import pytz
-    kst = pytz.timezone('Asia/Seoul')
-    
-    while True:
-        try:
-            now = datetime.now(kst)
-            current_week = now.isocalendar()[1]
-            
-            # 1. 리포트 생성 (토요일 오전 9시 30분 ~ 9시 59분 사이 1회)
-            if now.weekday() == 5 and now.hour == 9 and now.minute >= 30 and last_run_week_gen != current_week:
-                logger.info(f"[WeekendReport] Generating report for week {current_week}...")
-                from utils.weekend_report import generate_weekend_report
-                await generate_weekend_report()
-                last_run_week_gen = current_week
-                
-            # 2. 푸시 발송 (토요일 오전 10시 00분 ~ 10시 29분 사이 1회)
-            if now.weekday() == 5 and now.hour == 10 and now.minute < 30 and last_run_week_push != current_week:
-                logger.info(f"[WeekendReport] Sending push notifications for week {current_week}...")
-                from firebase_config import send_multicast_notification
-                from db_manager import get_all_fcm_tokens_with_user
-                
-                all_tokens = [t[1] for t in get_all_fcm_tokens_with_user()]
-                if all_tokens:
-                    push_title = "🚨 [주말 한정] 마켓 인사이트 발행 완료"
-                    push_body = "지난주 시장 자금 흐름과 다음 주 핵심 일정을 지금 바로 확인하세요! (일요일 자정 삭제)"
-                    push_data = {
-                        "type": "weekend_report",
-                        "url": "/weekend-report"
-                    }
-                    send_multicast_notification(all_tokens, push_title, push_body, data=push_data)
-                    logger.info(f"[WeekendReport] Push sent to {len(all_tokens)} devices.")
-                
-                last_run_week_push = current_week
-                
-            await asyncio.sleep(60 * 15) # 15분 주기로 체크
-        except Exception as e:
-            logger.error(f"[WeekendReport] Loop error: {e}")
-            await asyncio.sleep(60)
 
-async def fomo_alert_scheduler_loop():
-    """매일 저녁 8시(20시) FOMO 알림 발송"""
-    logger.info("[FOMO] FOMO Alert Scheduler Active.")
-    last_run_date = ""
-    
-    import pytz
-    from datetime import datetime
-    import asyncio
-    kst = pytz.timezone('Asia/Seoul')
-    
-    while True:
-        try:
-            now = datetime.now(kst)
-            date_str = now.strftime("%Y-%m-%d")
-            
-            if now.hour == 20 and now.minute >= 0 and last_run_date != date_str:
-                logger.info(f"[FOMO] Sending FOMO alert for {date_str}...")
-                from scheduler_service import send_fomo_alert
-                send_fomo_alert()
-                last_run_date = date_str
-                
-            await asyncio.sleep(60 * 15) # 15분 마다 체크
-        except Exception as e:
-            logger.error(f"[FOMO] Loop error: {e}")
-            await asyncio.sleep(60)
+def run_google_indexer():
+    """구글 인덱서 실행"""
+    logger.info("[GoogleIndexer] Triggering Google Indexing for today...")
+    _run_bot_script("google_indexer.py")
 
-async def dormant_user_scheduler_loop():
-    """매일 저녁 6시(18시) 휴면 유저 깨우기 알림 발송"""
-    logger.info("[Dormant] Dormant User Alert Scheduler Active.")
-    last_run_date = ""
-    
-    import pytz
-    from datetime import datetime
-    import asyncio
-    kst = pytz.timezone('Asia/Seoul')
-    
-    while True:
-        try:
-            now = datetime.now(kst)
-            date_str = now.strftime("%Y-%m-%d")
-            
-            if now.hour == 18 and now.minute >= 0 and last_run_date != date_str:
-                logger.info(f"[Dormant] Sending Dormant User alert for {date_str}...")
-                from scheduler_service import send_dormant_user_alert
-                send_dormant_user_alert()
-                last_run_date = date_str
-                
-            await asyncio.sleep(60 * 15) # 15분 마다 체크
-        except Exception as e:
-            logger.error(f"[Dormant] Loop error: {e}")
-            await asyncio.sleep(60)
 
+def run_dividend_alerts():
+    """배당락일 D-1 푸시 알림"""
+    logger.info("[DividendAlerts] Triggering Dividend Alerts for today...")
+    _run_bot_script("dividend_alerts.py")
 
-async def whale_alert_scheduler_loop():
-    """
-    🇰🇷 국내 고래 알림 #1 - 외국인 순매수 1위
-    장중(09:00~15:30 KST 평일) 30분마다 실행
-    """
-    logger.info("[Whale KR] Foreign Net Buying Scheduler Active.")
 
-    import pytz
-    from datetime import datetime
-    kst = pytz.timezone('Asia/Seoul')
+def run_weekly_blog_bot():
+    """주간 증시 결산 블로그 포스팅"""
+    logger.info("[WeeklyBlog] Triggering Weekly Blog Posting...")
+    _run_bot_script("weekly_blog_bot.py")
 
-    while True:
-        try:
-            now = datetime.now(kst)
-            weekday = now.weekday()
-            hour = now.hour
-            minute = now.minute
-
-            is_market_hours = (weekday < 5) and (
-                (hour == 9 and minute >= 0) or
-                (10 <= hour <= 14) or
-                (hour == 15 and minute <= 30)
-            )
 
-            if is_market_hours:
-                logger.info("[Whale KR] Checking foreign net buying rank & upper limits...")
-                try:
-                    from whale_alerts import check_whale_alerts
-                    check_whale_alerts()
-                except Exception as e:
-                    logger.error(f"[Whale KR] check_alerts error: {e}")
-            else:
-                logger.debug(f"[Whale KR] Outside market hours ({hour}:{minute:02d} KST), skipping.")
+async def run_weekend_report_generation():
+    """주말 리포트 생성"""
+    logger.info("[WeekendReport] Generating weekend report...")
+    from utils.weekend_report import generate_weekend_report
+    await generate_weekend_report()
 
-            await asyncio.sleep(60 * 30)  # 30분마다 체크
-        except Exception as e:
-            logger.error(f"[Whale KR] Loop error: {e}")
-            await asyncio.sleep(60)
 
+def send_weekend_report_push():
+    """주말 리포트 푸시 알림 발송"""
+    logger.info("[WeekendReport] Sending push notifications...")
+    from firebase_config import send_multicast_notification
+    from db_manager import get_all_fcm_tokens_with_user
 
-async def dart_whale_scheduler_loop():
-    """
-    🇰🇷 국내 고래 알림 #2 - DART 대량보유/임원내부자 거래
-    평일 08:00~18:00 KST (공시 접수 시간) 5분마다 실행
-    """
-    logger.info("[Whale DART] DART Large Holding & Insider Scheduler Active.")
+    all_tokens = [t[1] for t in get_all_fcm_tokens_with_user()]
+    if all_tokens:
+        push_title = "🚨 [주말 한정] 마켓 인사이트 발행 완료"
+        push_body = "지난주 시장 자금 흐름과 다음 주 핵심 일정을 지금 바로 확인하세요! (일요일 자정 삭제)"
+        push_data = {
+            "type": "weekend_report",
+            "url": "/weekend-report"
+        }
+        send_multicast_notification(all_tokens, push_title, push_body, data=push_data)
+        logger.info(f"[WeekendReport] Push sent to {len(all_tokens)} devices.")
 
-    import pytz
-    from datetime import datetime
-    kst = pytz.timezone('Asia/Seoul')
 
-    while True:
-        try:
-            now = datetime.now(kst)
-            weekday = now.weekday()
-            hour = now.hour
+def run_fomo_alert():
+    """FOMO 알림 발송"""
+    logger.info("[FOMO] Sending FOMO alert...")
+    from scheduler_service import send_fomo_alert
+    send_fomo_alert()
 
-            # 평일 08:00~18:00 (DART 공시 접수 시간)
-            is_disclosure_hours = (weekday < 5) and (8 <= hour < 18)
 
-            if is_disclosure_hours:
-                logger.info("[Whale DART] Checking DART large holding & insider trading...")
-                try:
-                    from whale_alerts import check_large_holding_alerts, check_insider_trading_alerts
-                    check_large_holding_alerts()
-                    check_insider_trading_alerts()
-                except Exception as e:
-                    logger.error(f"[Whale DART] error: {e}")
-            else:
-                logger.debug(f"[Whale DART] Outside disclosure hours ({hour}:xx KST), skipping.")
+def run_dormant_user_alert():
+    """휴면 유저 깨우기 알림 발송"""
+    logger.info("[Dormant] Sending Dormant User alert...")
+    from scheduler_service import send_dormant_user_alert
+    send_dormant_user_alert()
 
-            await asyncio.sleep(60 * 5)  # 5분마다 체크
-        except Exception as e:
-            logger.error(f"[Whale DART] Loop error: {e}")
-            await asyncio.sleep(60)
 
+def run_foreign_whale_check():
+    """🇰🇷 국내 고래 알림 #1 - 외국인 순매수 1위"""
+    logger.info("[Whale KR] Checking foreign net buying rank & upper limits...")
+    from whale_alerts import check_whale_alerts
+    check_whale_alerts()
 
-async def sec_whale_scheduler_loop():
-    """
-    🇺🇸 미국 고래 알림 - SEC Form 4 (임원 내부자) + 13F (기관)
-    KST 22:30~06:00 (미국 장시간) 5분마다 실행
-    """
-    logger.info("[Whale SEC] SEC Form4 & 13F Scheduler Active.")
 
-    import pytz
-    from datetime import datetime
-    kst = pytz.timezone('Asia/Seoul')
+def run_dart_whale_check():
+    """🇰🇷 국내 고래 알림 #2 - DART 대량보유/임원내부자 거래"""
+    logger.info("[Whale DART] Checking DART large holding & insider trading...")
+    from whale_alerts import check_large_holding_alerts, check_insider_trading_alerts
+    check_large_holding_alerts()
+    check_insider_trading_alerts()
 
-    while True:
-        try:
-            now = datetime.now(kst)
-            hour = now.hour
 
-            # KST 22:30~익일 06:00 = 미국 장중 (EST 08:30~16:00)
-            is_us_hours = (hour >= 22) or (hour < 6)
+def run_sec_whale_check():
+    """🇺🇸 미국 고래 알림 - SEC Form 4 (임원 내부자) + 13F (기관)"""
+    logger.info("[Whale SEC] Checking SEC Form4 & 13F filings...")
+    from sec_whale_alerts import check_sec_form4_alerts, check_sec_13f_alerts
+    check_sec_form4_alerts()
+    check_sec_13f_alerts()
 
-            if is_us_hours:
-                logger.info("[Whale SEC] Checking SEC Form4 & 13F filings...")
-                try:
-                    from sec_whale_alerts import check_sec_form4_alerts, check_sec_13f_alerts
-                    check_sec_form4_alerts()
-                    check_sec_13f_alerts()
-                except Exception as e:
-                    logger.error(f"[Whale SEC] error: {e}")
-            else:
-                logger.debug(f"[Whale SEC] Outside US market hours ({hour}:xx KST), skipping.")
 
-            await asyncio.sleep(60 * 5)  # 5분마다 체크
-        except Exception as e:
-            logger.error(f"[Whale SEC] Loop error: {e}")
-            await asyncio.sleep(60)
+def run_premium_report():
+    """VIP 프리미엄 리포트(수급 통계) 자동 생성"""
+    logger.info("[Premium Report] Generating today's objective report...")
+    from daily_premium_generator import generate_objective_report
+    generate_objective_report()
 
 
-async def premium_report_scheduler_loop():
+def register_jobs(scheduler):
     """
-    VIP 프리미엄 리포트(수급 통계) 자동 생성 스케줄러
-    평일 15:45 KST (장 마감 직후) 1회 실행
+    공시/브리핑/블로그/알림 작업 등록 (main.startup_event에서 호출)
+    기존 *_scheduler_loop의 주기와 실행 시각을 그대로 옮김
     """
-    import pytz
-    import json
-    import os
-    from datetime import datetime
-    
-    kst = pytz.timezone('Asia/Seoul')
-    logger.info("[Premium Report] Scheduler Active. Runs after 15:45 KST.")
-    
-    state_file = os.path.join(os.path.dirname(__file__), "premium_report_state.json")
-    
-    def load_state():
-        if os.path.exists(state_file):
-            try:
-                with open(state_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                pass
-        return {}
-        
-    def save_state(state):
-        try:
-            with open(state_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f)
-        except:
-            pass
-
-    while True:
-        try:
-            now = datetime.now(kst)
-            weekday = now.weekday()
-            current_date = now.strftime("%Y-%m-%d")
-            
-            # 평일 15:45 이후 실행
-            if weekday < 5 and (now.hour > 15 or (now.hour == 15 and now.minute >= 45)):
-                state = load_state()
-                last_run = state.get("last_run_date", "")
-                
-                if last_run != current_date:
-                    logger.info("[Premium Report] Generating today's objective report...")
-                    try:
-                        from daily_premium_generator import generate_objective_report
-                        generate_objective_report()
-                        
-                        state["last_run_date"] = current_date
-                        save_state(state)
-                    except Exception as e:
-                        logger.error(f"[Premium Report] Generation error: {e}")
-            
-            # 1분 단위 체크
-            await asyncio.sleep(60)
-                
-        except Exception as e:
-            logger.error(f"[Premium Report] Loop error: {e}")
-            await asyncio.sleep(60)
+    from job_scheduler import cron, every
+
+    # 공시: 서버 안정화(크래시 루프 시 Gemini 호출 방지)를 위해 10분 뒤 첫 체크, 이후 5분 주기
+    scheduler.add_job("disclosure_monitor", run_disclosure_checks, every(300, start_delay=600))
+    scheduler.add_job("ipo_check", check_and_notify_ipos, every(1800, start_delay=2100))
+    scheduler.add_job("hourly_briefing", run_hourly_briefing, cron("0 9,12,16 * * *", calendar="KR"),
+                      heavy=True, timeout=180, misfire_grace=3000)
+    scheduler.add_job("briefing_cleanup", run_briefing_cleanup, cron("0 2 * * *"), misfire_grace=3000)
+    scheduler.add_job("auto_blog_kor", run_auto_blog_kor, cron("0 16 * * *", calendar="KR"), heavy=True, misfire_grace=3000)
+    scheduler.add_job("auto_blog_us", run_auto_blog_us, cron("0 8 * * *"), heavy=True, misfire_grace=3000)
+    scheduler.add_job("seo_blog", run_seo_blog_post, cron("0 9,13,18 * * *"), heavy=True, jitter=300)
+    scheduler.add_job("watchdog", run_watchdog, every(600))
+    scheduler.add_job("cleanup_alerts", run_cleanup_alerts, every(21600))
+    scheduler.add_job("cleanup_system_logs", run_cleanup_system_logs, every(21600, start_delay=60))
+    scheduler.add_job("google_indexer", run_google_indexer, cron("0 2 * * *"), heavy=True, jitter=600, misfire_grace=3000)
+    scheduler.add_job("dividend_alerts", run_dividend_alerts, cron("0 18 * * *"), misfire_grace=3000)
+    scheduler.add_job("weekly_blog", run_weekly_blog_bot, cron("0 9 * * sat"), heavy=True, misfire_grace=3000)
+    scheduler.add_job("weekend_report", run_weekend_report_generation, cron("30 9 * * sat"), heavy=True, misfire_grace=1500)
+    scheduler.add_job("weekend_report_push", send_weekend_report_push, cron("0 10 * * sat"), misfire_grace=1500)
+    scheduler.add_job("fomo_alert", run_fomo_alert, cron("0 20 * * *"), misfire_grace=900)
+    scheduler.add_job("dormant_user_alert", run_dormant_user_alert, cron("0 18 * * *"), misfire_grace=900)
+    # 🇰🇷 외국인 순매수(run_foreign_whale_check)는 scheduler_service의 whale_alert 작업이,
+    # DART 대량보유/임원거래(run_dart_whale_check)는 disclosure_monitor가 통합 처리 → 중복 발송 방지를 위해 미등록
+    scheduler.add_job("sec_whale", run_sec_whale_check, cron("*/5 22,23,0-5 * * *"))
+    scheduler.add_job("premium_report", run_premium_report, cron("45 15 * * mon-fri"), heavy=True, misfire_grace=8 * 3600)
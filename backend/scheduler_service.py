@@ -1,5 +1,4 @@
 import time
-import threading
 from datetime import datetime
 import pytz
 import yfinance as yf
@@ -9,7 +8,6 @@ from stock_data import get_simple_quote, get_korean_stock_name
 from firebase_config import send_multicast_notification, initialize_firebase
 from fx_api import get_alpha_vantage_fx
 from holiday_checker import is_holiday
-from system_watchdog import update_heartbeat
 from korea_data import get_top_trending_themes
 
 def is_korean_stock(symbol: str) -> bool:
@@ -563,6 +561,18 @@ def send_closing_notification(market: str):
             print(f"[Scheduler-Error] Failed to send closing notification for user {user_id}: {user_err}")
             continue
 
+def run_fundamentals_snapshot_job():
+    """전 종목 펀더멘털 스냅샷 재생성 (스크리너용, 장 마감 후 1회)"""
+    from fundamentals_snapshot import build_snapshot
+    build_snapshot()
+
+
+def run_etf_stats_job():
+    """KR/US ETF 리스크·성과 통계 테이블 재생성 (상세 페이지/랭킹 정렬용)"""
+    from etf_stats import build_table
+    build_table()
+
+
 def run_dart_daily_cache_update():
     """매일 오전 6:30 DART 재무 데이터 선제 캐싱 (하루에 한 번 자동 실행)
     관심종목 + 최근 7일 검색 종목을 대상으로 DART API를 호출해 캐시를 미리 갱신한다.
@@ -886,415 +896,264 @@ def send_dormant_user_alert():
         print(f"[Scheduler-Error] Failed to send Dormant User alert: {e}")
         return 0
 
-def run_market_scheduler():
-    """시장별 이벤트 감시 메인 루프"""
-    import asyncio
-    from morning_briefing import morning_briefing_service
-    
+# ─── 시장 이벤트 작업 (job_scheduler 등록) ─────────────────────────────────────
+# 기존 run_market_scheduler 스레드(30초 벽시계 폴링 + last_run_* 변수)를 작업 단위로 분리.
+# 실행 시각/휴장일 판단은 트리거가, 중복 실행 방지는 스케줄러(겹침 정책 + 실행 이력)가 담당합니다.
+
+_spike_state = {"last_alert": 0.0}
+_theory_state = {"date": "", "failures": 0}
+
+
+def run_system_health_job():
+    """자정 시스템 헬스체크 리포트"""
+    from system_health_check import run_system_health_check
+    run_system_health_check()
+
+
+def check_traffic_spike():
+    """실시간 동시 접속자 급등 감지 (30분 쿨타임)"""
+    from db_manager import get_realtime_active_count
+    active_count = get_realtime_active_count(minutes=5)
+    if active_count >= 30 and time.time() - _spike_state["last_alert"] >= 1800:
+        from system_watchdog import send_admin_alert
+        send_admin_alert(
+            module_name="📈 트래픽 급등 경고!",
+            error_msg=f"현재 실시간 동시 접속자가 {active_count}명을 돌파했습니다! 사람들이 떼거지로 몰려오고 있습니다."
+        )
+        _spike_state["last_alert"] = time.time()
+        print(f"[Analytics] Spike alert sent: {active_count} users")
+
+
+def check_crypto_surge_job():
+    """[주말/휴장일] 크립토 실시간 불장 감지"""
+    if not is_holiday("kor"):
+        return
+    from crypto_alerts import check_crypto_surge
+    check_crypto_surge()
+
+
+def run_watchlist_news_job():
+    """관심종목 뉴스 속보 감시"""
+    from watchlist_monitor import run_watchlist_news_monitor
+    run_watchlist_news_monitor()
+
+
+def run_watchlist_price_job():
+    """관심종목 가격 급등락 감시 (장중+애프터마켓)"""
+    from watchlist_monitor import run_watchlist_price_monitor
+    run_watchlist_price_monitor()
+
+
+def run_whale_alert_job():
+    """고래/세력 매집 실시간 알림"""
+    from whale_alerts import check_whale_alerts
+    check_whale_alerts()
+
+
+def run_daily_theory_job():
+    """주식 기초 스터디 자동 포스팅 (08:30 / 08:40 / 08:50 최대 3회 시도, 성공하면 그날 재시도 없음)"""
+    from scheduler import load_state, save_state
+
     kst = pytz.timezone('Asia/Seoul')
-    initialize_firebase()
-    
-    last_run_dart_cache = None
-    last_run_daily_report = None
-    last_run_morning_kr = None
-    last_run_morning_us = None
-    last_run_ipo = None
-    last_run_open_kr = ""
-    last_run_close_kr = ""
-    last_run_open_us = ""
-    last_run_close_us = ""
-    last_run_weekend_report = ""
-    last_run_weekend_crypto = ""
-    last_run_analytics = ""
-    last_run_fomo = ""
-    last_run_dormant = ""
-    # [핵심 수정] 서버 재시작 시 오늘 날짜를 기준으로 초기화
-    # Firestore에서 오늘 이미 발행된 글이 있으면 무조건 오늘 날짜로 마킹 → 중복 절대 방지
-    _init_kst = pytz.timezone('Asia/Seoul')
-    _init_now = datetime.now(_init_kst)
-    _init_today = _init_now.strftime('%Y-%m-%d')
+    now = datetime.now(kst)
+    current_date = now.strftime('%Y-%m-%d')
+    if _theory_state["date"] != current_date:
+        _theory_state.update(date=current_date, failures=0)
+
+    # 날짜별 성공 기록 (state 파일 → 재시작 후에도 유지). 08:40 / 08:50 은 앞선 실행이 실패했을 때만 재시도
+    if load_state().get("daily_theory_success_date") == current_date:
+        print(f"[Scheduler] 오늘({current_date}) 강의 발행 성공 기록 있음 → 건너뜀")
+        return
+
+    # 재시작/재시도 시 Firestore에 오늘 글이 이미 있으면 중복 발행 금지
     try:
         from firebase_admin import firestore as _fs
-        _db = _fs.client()
-        _today_slug = f"theory-{_init_now.strftime('%Y%m%d')}"
-        _existing = _db.collection("theory_posts").document(_today_slug).get()
-        if _existing.exists:
-            last_run_daily_theory = _init_today
-            print(f"[Scheduler] 서버 재시작 감지: 오늘({_init_today}) 이미 강의 발행됨 → 중복 방지 마킹")
-        elif _init_now.hour > 8 or (_init_now.hour == 8 and _init_now.minute >= 30):
-            last_run_daily_theory = _init_today  # 실행 시간 이후지만 글이 없으면 실행 허용 안함(재시작 시 안전)
-        else:
-            last_run_daily_theory = ""  # 아직 실행 전이므로 정상 실행 허용
-    except Exception as _e:
-        print(f"[Scheduler] 초기화 중 Firestore 확인 실패: {_e}")
-        if _init_now.hour > 8 or (_init_now.hour == 8 and _init_now.minute >= 30):
-            last_run_daily_theory = _init_today
-        else:
-            last_run_daily_theory = ""
-    last_spike_alert_time = None
+        _today_slug = f"theory-{now.strftime('%Y%m%d')}"
+        if _fs.client().collection("theory_posts").document(_today_slug).get().exists:
+            print(f"[Scheduler] 오늘({current_date}) 이미 강의 발행됨 → 건너뜀")
+            state = load_state()
+            state["daily_theory_success_date"] = current_date
+            save_state(state)
+            return
+    except Exception as e:
+        print(f"[Scheduler] Firestore 확인 실패: {e}")
 
-    last_cleanup_date = ""
-    last_run_health_check = None
-    
-    while True:
+    from daily_theory_bot import post_daily_theory
+    success = False
+    try:
+        success = post_daily_theory()
+    except Exception as e:
+        print(f"[Scheduler] Daily Theory Bot error: {e}")
+
+    attempt = _theory_state["failures"] + 1
+    if success:
+        state = load_state()
+        state["daily_theory_success_date"] = current_date
+        save_state(state)
+        print(f"[Scheduler] Daily Theory Bot succeeded on attempt #{attempt}")
+        return
+
+    _theory_state["failures"] = attempt
+    print(f"[Scheduler] Daily Theory Bot failed attempt #{attempt}")
+    if attempt >= 3:
         try:
-            update_heartbeat("Main_Alert_Scheduler")
-            now = datetime.now(kst)
-            day_of_week = now.weekday()
-            current_date = now.strftime('%Y-%m-%d')
-            
-            # [매일 실행] 자정 ~ 새벽 1시 사이 시스템 헬스체크 (1회 발송)
-            if now.hour == 0 and current_date != last_run_health_check:
-                try:
-                    from system_health_check import run_system_health_check
-                    run_system_health_check()
-                except Exception as e:
-                    print(f"[Scheduler] System health check error: {e}")
-                last_run_health_check = current_date
-                
-            # [실시간] 트래픽 급등 감지 (1분 주기)
-            try:
-                from db_manager import get_realtime_active_count
-                active_count = get_realtime_active_count(minutes=5)
-                if active_count >= 30:
-                    if not last_spike_alert_time or (now - last_spike_alert_time).total_seconds() >= 1800:
-                        # 30분(1800초) 쿨타임
-                        from system_watchdog import send_admin_alert
-                        send_admin_alert(
-                            module_name="📈 트래픽 급등 경고!",
-                            error_msg=f"현재 실시간 동시 접속자가 {active_count}명을 돌파했습니다! 사람들이 떼거지로 몰려오고 있습니다."
-                        )
-                        last_spike_alert_time = now
-                        print(f"[Analytics] Spike alert sent: {active_count} users")
-            except Exception as e:
-                print(f"[Scheduler] Spike alert error: {e}")
-            
-            # [주말 실행] 크립토 실시간 불장 감지 (15분 간격)
-            if now.minute % 15 == 0 and is_holiday("kor"):
-                current_time = now.strftime('%H:%M')
-                if last_run_crypto_surge != current_time:
-                    try:
-                        from crypto_alerts import check_crypto_surge
-                        check_crypto_surge()
-                    except Exception as e:
-                        print(f"[Scheduler] Crypto surge error: {e}")
-                    last_run_crypto_surge = current_time
-                    
-            # [실시간] 관심종목 뉴스 속보 감시 (5분 간격)
-            if now.minute % 5 == 0:
-                current_time = now.strftime('%H:%M')
-                if getattr(run_market_scheduler, "last_run_watchlist_news", None) != current_time:
-                    try:
-                        from watchlist_monitor import run_watchlist_news_monitor
-                        run_watchlist_news_monitor()
-                    except Exception as e:
-                        print(f"[Scheduler] Watchlist news error: {e}")
-                    run_market_scheduler.last_run_watchlist_news = current_time
-
-            # [매일 실행] 오전 8:30 주식 기초 스터디 자동 포스팅 (최대 3회 자동 재시도)
-            # 날짜가 바뀌면 재시도 카운터 초기화
-            if getattr(run_market_scheduler, "theory_retry_date", "") != current_date:
-                run_market_scheduler.theory_retry_count = 0
-                run_market_scheduler.theory_retry_date = current_date
-            
-            retry_count = getattr(run_market_scheduler, "theory_retry_count", 0)
-            theory_is_running = getattr(run_market_scheduler, "theory_is_running", False)
-            
-            if now.hour == 8 and now.minute >= 30 and current_date != last_run_daily_theory and retry_count < 3 and not theory_is_running:
-                run_market_scheduler.theory_is_running = True  # 동시 실행 방지 락
-                success = False
-                try:
-                    from daily_theory_bot import post_daily_theory
-                    success = post_daily_theory()
-                except Exception as e:
-                    print(f"[Scheduler] Daily Theory Bot error: {e}")
-                finally:
-                    run_market_scheduler.theory_is_running = False  # 락 해제
-                
-                if success:
-                    last_run_daily_theory = current_date
-                    run_market_scheduler.theory_retry_count = 0
-                    print(f"[Scheduler] Daily Theory Bot succeeded on attempt #{retry_count + 1}")
-                else:
-                    run_market_scheduler.theory_retry_count = retry_count + 1
-                    print(f"[Scheduler] Daily Theory Bot failed attempt #{retry_count + 1}")
-                    
-                    if run_market_scheduler.theory_retry_count >= 3:
-                        try:
-                            import os, requests as _req
-                            _bot_token = os.environ.get("TELEGRAM_BOT_TOKEN", "")
-                            _chat_id = os.environ.get("TELEGRAM_CHAT_ID", "")
-                            if _bot_token and _chat_id:
-                                _msg = f"⚠️ [에러 경고]\n오늘({current_date}) 주식 이론 강의 자동 작성이 3회 연속 실패했습니다. 서버 로그를 확인해주세요."
-                                _req.post(f"https://api.telegram.org/bot{_bot_token}/sendMessage", json={"chat_id": _chat_id, "text": _msg}, timeout=10)
-                        except Exception as te:
-                            print(f"[Scheduler] Telegram alert error: {te}")
-
-            # [장중+애프터마켓] 관심종목 가격 급등락 감시 (5분 간격, 20:00까지 연장)
-            if not is_holiday("kor") and 9 <= now.hour <= 19 and now.minute % 5 == 0:
-                current_time = now.strftime('%H:%M')
-                if getattr(run_market_scheduler, "last_run_watchlist_price", None) != current_time:
-                    try:
-                        from watchlist_monitor import run_watchlist_price_monitor
-                        run_watchlist_price_monitor()
-                    except Exception as e:
-                        print(f"[Scheduler] Watchlist price error: {e}")
-                    run_market_scheduler.last_run_watchlist_price = current_time
+            import os, requests as _req
+            _bot_token = os.environ.get("TELEGRAM_BOT_TOKEN", "")
+            _chat_id = os.environ.get("TELEGRAM_CHAT_ID", "")
+            if _bot_token and _chat_id:
+                _msg = f"⚠️ [에러 경고]\n오늘({current_date}) 주식 이론 강의 자동 작성이 3회 연속 실패했습니다. 서버 로그를 확인해주세요."
+                _req.post(f"https://api.telegram.org/bot{_bot_token}/sendMessage", json={"chat_id": _chat_id, "text": _msg}, timeout=10)
+        except Exception as te:
+            print(f"[Scheduler] Telegram alert error: {te}")
 
-            # [평일 장중 실행] 고래/세력 매집 실시간 알림 (30분 간격)
-            if not is_holiday("kor") and 9 <= now.hour <= 15 and now.minute % 30 == 0:
-                current_time = now.strftime('%H:%M')
-                if getattr(run_market_scheduler, "last_run_whale_alert", None) != current_time:
-                    try:
-                        from whale_alerts import check_whale_alerts
-                        check_whale_alerts()
-                    except Exception as e:
-                        print(f"[Scheduler] Whale alert error: {e}")
-                    run_market_scheduler.last_run_whale_alert = current_time
-            
-            # 중복된 예전 스케줄러 블록 제거됨
-                
-            # [평일 실행] 오후 4:30 초대량 롱테일 키워드 SEO 공장 (수해전술 봇)
-            if not is_holiday("kor") and now.hour == 16 and 30 <= now.minute <= 35 and current_date != getattr(run_market_scheduler, "last_run_mass_seo", None):
-                try:
-                    import mass_seo_bot
-                    mass_seo_bot.main()
-                except Exception as e:
-                    print(f"[Scheduler] Mass SEO Bot error: {e}")
-                run_market_scheduler.last_run_mass_seo = current_date
 
-            # [매일 실행] 오후 1:30 주식 기초 Q&A 롱테일 봇
-            if now.hour == 13 and 30 <= now.minute <= 35 and current_date != getattr(run_market_scheduler, "last_run_qa_seo", None):
-                try:
-                    import qa_seo_bot
-                    qa_seo_bot.main()
-                except Exception as e:
-                    print(f"[Scheduler] QA SEO Bot error: {e}")
-                run_market_scheduler.last_run_qa_seo = current_date
+def run_mass_seo_job():
+    """초대량 롱테일 키워드 SEO 공장 (수해전술 봇)"""
+    import mass_seo_bot
+    mass_seo_bot.main()
 
-            # [평일 실행] 오후 5:30 오늘의 테마주 싹쓸이 봇
-            if not is_holiday("kor") and now.hour == 17 and 30 <= now.minute <= 35 and current_date != getattr(run_market_scheduler, "last_run_theme_seo", None):
-                try:
-                    import theme_seo_bot
-                    theme_seo_bot.main()
-                except Exception as e:
-                    print(f"[Scheduler] Theme SEO Bot error: {e}")
-                run_market_scheduler.last_run_theme_seo = current_date
 
-            # [매일 실행] 오전 8:45 SEO 자동 블로그 포스팅 (조간)
-            if now.hour == 8 and 45 <= now.minute <= 50 and current_date != getattr(run_market_scheduler, "last_run_seo_blog_morning", None):
-                try:
-                    import seo_blog_bot
-                    seo_blog_bot.post_seo_blog()
-                except Exception as e:
-                    print(f"[Scheduler] SEO Blog Morning Bot error: {e}")
-                run_market_scheduler.last_run_seo_blog_morning = current_date
+def run_qa_seo_job():
+    """주식 기초 Q&A 롱테일 봇"""
+    import qa_seo_bot
+    qa_seo_bot.main()
 
-            # [매일 실행] 오후 4:30 SEO 자동 블로그 포스팅 (장마감)
-            if now.hour == 16 and 30 <= now.minute <= 35 and current_date != getattr(run_market_scheduler, "last_run_seo_blog_afternoon", None):
-                try:
-                    import seo_blog_bot
-                    seo_blog_bot.post_seo_blog()
-                except Exception as e:
-                    print(f"[Scheduler] SEO Blog Afternoon Bot error: {e}")
-                run_market_scheduler.last_run_seo_blog_afternoon = current_date
-            # [매일 실행] 오전 6:30 DART 재무 데이터 선제 캐싱
-            if now.hour == 6 and 30 <= now.minute <= 35 and current_date != last_run_dart_cache:
-                try:
-                    run_dart_daily_cache_update()
-                except Exception as e:
-                    print(f"[Scheduler] DART 캐싱 오류: {e}")
-                last_run_dart_cache = current_date
-                
-            # [금요일 실행] 오후 6:00 주말 한정판 세력/외인 매집 리포트 생성
-            if now.weekday() == 4 and now.hour == 18 and 0 <= now.minute <= 5 and current_date != getattr(run_market_scheduler, "last_run_whale_report_gen", None):
-                try:
-                    from utils.whale_weekend_report import _generate_whale_report_sync
-                    _generate_whale_report_sync()
-                except Exception as e:
-                    print(f"[Scheduler] Whale report gen error: {e}")
-                run_market_scheduler.last_run_whale_report_gen = current_date
-                
-            # [일요일 실행] 오후 8:00 주말 한정판 리포트 오픈 푸시 알림
-            if now.weekday() == 6 and now.hour == 20 and 0 <= now.minute <= 5 and current_date != getattr(run_market_scheduler, "last_run_whale_push", None):
-                try:
-                    title = "🐳 월요일 장 준비 끝!"
-                    body = "주말 한정판 세력/외인 매집 TOP 3 리포트가 도착했습니다. 지금 확인하세요!"
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT DISTINCT fcm_token FROM fcm_tokens")
-                    tokens = [row[0] for row in cursor.fetchall() if row[0]]
-                    conn.close()
-                    if tokens:
-                        send_multicast_notification(tokens, title, body, {"url": "/"})
-                except Exception as e:
-                    print(f"[Scheduler-Error] Failed to send whale report push: {e}")
-                run_market_scheduler.last_run_whale_push = current_date
-                
-            # [토요일 실행] 오전 9:55 주말 한정 프리미엄 리포트 생성 (10시 오픈 대비)
-            if now.weekday() == 5 and now.hour == 9 and 55 <= now.minute <= 59 and current_date != last_run_weekend_report_gen:
-                try:
-                    from utils.weekend_report import _generate_sync_impl
-                    _generate_sync_impl()
-                    
-                    # 푸시 알림 발송
-                    try:
-                        title = "🔓 주말 프리미엄 인사이트 오픈!"
-                        body = "지난주 시장 핵심 요약과 다음 주 필수 체크포인트를 지금 바로 확인하세요."
-                        conn = get_db_connection()
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT DISTINCT fcm_token FROM fcm_tokens")
-                        tokens = [row[0] for row in cursor.fetchall() if row[0]]
-                        conn.close()
-                        if tokens:
-                            send_multicast_notification(tokens, title, body, {"url": "/weekend-report"})
-                    except Exception as e:
-                        print(f"[Scheduler-Error] Failed to send weekend report push: {e}")
-                        
-                except Exception as e:
-                    print(f"[Scheduler] Weekend report generation error: {e}")
-                last_run_weekend_report_gen = current_date
 
-            # [매일 발송] 밤 11시 59분 일일 방문자 및 시스템 보고서 발송 (Admins)
-            if now.hour == 23 and 55 <= now.minute <= 59 and current_date != last_run_daily_report:
-                send_daily_analytics_report()
-                last_run_daily_report = current_date
-                
-            # [매시간 실행] 구글 시트 통계 동기화 (불사조 모드: 누락 방지)
-            if now.minute == 0 and getattr(run_market_scheduler, "last_run_sheets_sync_hour", None) != now.hour:
-                try:
-                    from google_sheets_sync import sync_analytics_to_sheet
-                    sync_analytics_to_sheet()
-                    run_market_scheduler.last_run_sheets_sync_hour = now.hour
-                except Exception as e:
-                    print(f"[Scheduler] Google Sheets sync error: {e}")
-            
-            # [매일 실행] 새벽 3시 구글 색인(Indexing) 봇 자동 실행 (최신 종목/테마 페이지 강제 푸시)
-            if now.hour == 3 and 0 <= now.minute <= 5 and current_date != getattr(run_market_scheduler, "last_run_google_indexer", None):
-                try:
-                    from google_indexer import get_urls_from_sitemap, publish_urls_to_google, SITEMAP_URL
-                    print("[Scheduler] Running Google Auto-Indexer Bot...")
-                    urls = get_urls_from_sitemap(SITEMAP_URL)
-                    if urls:
-                        publish_urls_to_google(urls)
-                except Exception as e:
-                    print(f"[Scheduler-Error] Failed to run Google Indexer: {e}")
-                run_market_scheduler.last_run_google_indexer = current_date
-            
-            # [평일 발송] AI 모닝 브리핑 (KR)
-            if day_of_week <= 4 and not is_market_holiday("KR"):
-                if now.hour == 8 and 0 <= now.minute <= 5 and current_date != last_run_morning_kr:
-                    asyncio.run(morning_briefing_service.run_daily_briefing("KR"))
-                    last_run_morning_kr = current_date
-
-            # [매일 발송] 공모주 청약 일정 알림
-            if day_of_week <= 4:
-                if now.hour == 8 and 15 <= now.minute <= 20 and current_date != last_run_ipo and not is_market_holiday("KR"):
-                    try:
-                        from batch_ipo_alerts import send_ipo_alerts
-                        send_ipo_alerts()
-                    except Exception as e:
-                        print(f"[Scheduler] IPO 알림 오류: {e}")
-                    last_run_ipo = current_date
-            
-            # [매일 발송] 오전 8:30 모닝 테마주 브리핑 전체 웹 푸시 (유사투자자문업 방어 목적: 객관적 사실 전달)
-            # 사용자의 요청으로 발송 중지됨
-            '''
-            if day_of_week <= 4:
-                if now.hour == 8 and 30 <= now.minute <= 35 and current_date != getattr(run_market_scheduler, "last_run_morning_theme_push", None) and not is_market_holiday("KR"):
-                    try:
-                        conn = get_db_connection()
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT DISTINCT token FROM fcm_tokens WHERE token IS NOT NULL")
-                        tokens = [row[0] for row in cursor.fetchall() if row[0]]
-                        conn.close()
-                        
-                        if tokens:
-                            title = "🔔 장 시작 30분 전! (객관적 요약)"
-                            body = "AI가 간추린 오늘의 핵심 테마 브리핑입니다. 특정 종목 추천이 아닌 단순 정보 제공 목적입니다."
-                            send_multicast_notification(tokens, title, body, {"url": "/briefing"})
-                            print(f"[Scheduler] Morning Theme Briefing push sent to {len(tokens)} devices.")
-                    except Exception as e:
-                        print(f"[Scheduler-Error] Failed to send Morning Theme Briefing push: {e}")
-                    run_market_scheduler.last_run_morning_theme_push = current_date
-            '''
-            
-            # [평일 발송] AI 모닝 브리핑 (US)
-            if day_of_week <= 4 and not is_market_holiday("US"):
-                if now.hour == 21 and 30 <= now.minute <= 35 and current_date != last_run_morning_us:
-                    asyncio.run(morning_briefing_service.run_daily_briefing("US"))
-                    last_run_morning_us = current_date
-
-            # 1. 국내 장시작 시가 알림
-            if day_of_week <= 4:
-                if now.hour == 9 and 5 <= now.minute <= 10 and current_date != last_run_open_kr and not is_market_holiday("KR"):
-                    send_opening_notification("KR")
-                    last_run_open_kr = current_date
-
-            # 2. 국내 장마감 종가 리포트
-            if day_of_week <= 4:
-                if now.hour == 15 and 40 <= now.minute <= 45 and current_date != last_run_close_kr and not is_market_holiday("KR"):
-                    send_closing_notification("KR")
-                    last_run_close_kr = current_date
-            
-            # 미국 서머타임(DST) 적용 여부 확인 (미국 동부 시간 기준)
-            ny_tz = pytz.timezone('America/New_York')
-            ny_time = datetime.now(ny_tz)
-            is_dst = ny_time.dst().total_seconds() != 0
-            ny_date = ny_time.strftime('%Y-%m-%d')  # 미국 날짜 (장마감 다음날다룼 계산용)
-
-            # 서머타임 시: KST 22:35 개장 알림 / KST 05:10 마감 알림
-            # 표준시간 시: KST 23:35 개장 알림 / KST 06:10 마감 알림
-            us_open_hour = 22 if is_dst else 23
-            us_close_hour = 5 if is_dst else 6
-
-            # 3. 미국 장시작 시가 알림
-            # - 서머타임/표준시 무관하게 KST 22:35 / 23:35는 미국 09:35이므로 KST 월~금(0~4)에만 발송
-            us_open_days = list(range(0, 5))
-            if day_of_week in us_open_days:
-                if now.hour == us_open_hour and 35 <= now.minute <= 40 and current_date != last_run_open_us and not is_market_holiday("US"):
-                    send_opening_notification("US")
-                    last_run_open_us = current_date
-
-            # 4. 미국 장마감 종가 리포트
-            # - KST 새벽 4~5시는 미국 전날입니다
-            # - ny_date(미국 날짜)를 기준으로 중복 발송 방지
-            us_close_days = list(range(1, 6)) if is_dst else list(range(1, 6))
-            if day_of_week in us_close_days:
-                if now.hour == us_close_hour and 10 <= now.minute <= 15 and ny_date != last_run_close_us and not is_market_holiday("US"):
-                    send_closing_notification("US")
-                    last_run_close_us = ny_date
-                    
-            # 5. 주말 테마 리포트 (일요일 18:00)
-            if day_of_week == 6: # 일요일 (0:월, ..., 6:일)
-                if now.hour == 18 and 0 <= now.minute <= 5 and current_date != last_run_weekend_report:
-                    send_weekend_theme_report()
-                    last_run_weekend_report = current_date
-                    
-            # 6. 주말 코인 리포트 (토요일 18:00)
-            if day_of_week == 5: # 토요일
-                if now.hour == 18 and 0 <= now.minute <= 5 and current_date != last_run_weekend_crypto:
-                    send_weekend_crypto_report()
-                    last_run_weekend_crypto = current_date
-            
-            time.sleep(30)
-            
-        except Exception as e:
-            print(f"[Scheduler] Error: {e}")
-            time.sleep(60)
+def run_theme_seo_job():
+    """오늘의 테마주 싹쓸이 봇"""
+    import theme_seo_bot
+    theme_seo_bot.main()
 
-main_scheduler_thread = None
 
-def start_scheduler():
-    """백그라운드 스레드에서 스케줄러 시작"""
-    global main_scheduler_thread
-    if main_scheduler_thread is not None and main_scheduler_thread.is_alive():
-        print("[Scheduler] Main_Alert_Scheduler is already running. Skipping duplicate spawn.")
-        return
-        
-    main_scheduler_thread = threading.Thread(target=run_market_scheduler, daemon=True)
-    main_scheduler_thread.start()
-    print("[Scheduler] All Intelligence Services Started")
+def run_seo_blog_job():
+    """SEO 자동 블로그 포스팅 (조간/장마감)"""
+    import seo_blog_bot
+    seo_blog_bot.post_seo_blog()
+
+
+def run_whale_report_gen_job():
+    """주말 한정판 세력/외인 매집 리포트 생성"""
+    from utils.whale_weekend_report import _generate_whale_report_sync
+    _generate_whale_report_sync()
+
+
+def _all_fcm_tokens() -> list:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT DISTINCT fcm_token FROM fcm_tokens")
+    tokens = [row[0] for row in cursor.fetchall() if row[0]]
+    conn.close()
+    return tokens
+
+
+def send_whale_report_push():
+    """주말 한정판 리포트 오픈 푸시 알림"""
+    title = "🐳 월요일 장 준비 끝!"
+    body = "주말 한정판 세력/외인 매집 TOP 3 리포트가 도착했습니다. 지금 확인하세요!"
+    tokens = _all_fcm_tokens()
+    if tokens:
+        send_multicast_notification(tokens, title, body, {"url": "/"})
+
+
+def run_weekend_report_gen_job():
+    """주말 한정 프리미엄 리포트 생성 + 오픈 푸시 (10시 오픈 대비)"""
+    from utils.weekend_report import _generate_sync_impl
+    _generate_sync_impl()
+
+    try:
+        title = "🔓 주말 프리미엄 인사이트 오픈!"
+        body = "지난주 시장 핵심 요약과 다음 주 필수 체크포인트를 지금 바로 확인하세요."
+        tokens = _all_fcm_tokens()
+        if tokens:
+            send_multicast_notification(tokens, title, body, {"url": "/weekend-report"})
+    except Exception as e:
+        print(f"[Scheduler-Error] Failed to send weekend report push: {e}")
+
+
+def run_sheets_sync_job():
+    """구글 시트 통계 동기화"""
+    from google_sheets_sync import sync_analytics_to_sheet
+    sync_analytics_to_sheet()
+
+
+def run_google_indexer_job():
+    """구글 색인(Indexing) 봇 (최신 종목/테마 페이지 강제 푸시)"""
+    from google_indexer import get_urls_from_sitemap, publish_urls_to_google, SITEMAP_URL
+    print("[Scheduler] Running Google Auto-Indexer Bot...")
+    urls = get_urls_from_sitemap(SITEMAP_URL)
+    if urls:
+        publish_urls_to_google(urls)
+
+
+def run_morning_briefing_kr():
+    """AI 모닝 브리핑 (KR)"""
+    import asyncio
+    from morning_briefing import morning_briefing_service
+    asyncio.run(morning_briefing_service.run_daily_briefing("KR"))
+
+
+def run_morning_briefing_us():
+    """AI 모닝 브리핑 (US)"""
+    import asyncio
+    from morning_briefing import morning_briefing_service
+    asyncio.run(morning_briefing_service.run_daily_briefing("US"))
+
+
+def run_ipo_alert_job():
+    """공모주 청약 일정 알림"""
+    from batch_ipo_alerts import send_ipo_alerts
+    send_ipo_alerts()
+
+
+def register_jobs(scheduler):
+    """시장별 이벤트 작업 등록 (main.startup_event에서 호출)"""
+    from job_scheduler import cron, every
+    NY = "America/New_York"
+    initialize_firebase()
+
+    # [실시간]
+    scheduler.add_job("traffic_spike", check_traffic_spike, every(60))
+    scheduler.add_job("crypto_surge", check_crypto_surge_job, cron("*/15 * * * *"))
+    scheduler.add_job("watchlist_news", run_watchlist_news_job, cron("*/5 * * * *"), jitter=20)
+    scheduler.add_job("watchlist_price", run_watchlist_price_job, cron("*/5 9-19 * * *", calendar="KR"))
+    scheduler.add_job("whale_alert", run_whale_alert_job, cron("0,30 9-15 * * *", calendar="KR"))
+
+    # [매일]
+    scheduler.add_job("system_health", run_system_health_job, cron("0 0 * * *"), misfire_grace=3600)
+    scheduler.add_job("dart_daily_cache", run_dart_daily_cache_update, cron("30 6 * * *"), heavy=True, misfire_grace=300)
+    scheduler.add_job("fundamentals_snapshot", run_fundamentals_snapshot_job, cron("30 19 * * mon-fri", calendar="KR"), heavy=True, misfire_grace=3600)
+    scheduler.add_job("etf_stats", run_etf_stats_job, cron("50 19 * * mon-fri", calendar="KR"), heavy=True, misfire_grace=3600)
+    scheduler.add_job("daily_theory", run_daily_theory_job, cron("30,40,50 8 * * *"), heavy=True)
+    scheduler.add_job("seo_blog_morning", run_seo_blog_job, cron("45 8 * * *"), heavy=True, jitter=120, misfire_grace=300)
+    scheduler.add_job("qa_seo", run_qa_seo_job, cron("30 13 * * *"), heavy=True, jitter=120, misfire_grace=300)
+    scheduler.add_job("seo_blog_afternoon", run_seo_blog_job, cron("30 16 * * *"), heavy=True, jitter=120, misfire_grace=300)
+    scheduler.add_job("mass_seo", run_mass_seo_job, cron("30 16 * * *", calendar="KR"), heavy=True, jitter=120, misfire_grace=300)
+    scheduler.add_job("theme_seo", run_theme_seo_job, cron("30 17 * * *", calendar="KR"), heavy=True, jitter=120, misfire_grace=300)
+    scheduler.add_job("daily_analytics_report", send_daily_analytics_report, cron("55 23 * * *"), misfire_grace=240)
+    scheduler.add_job("sheets_sync", run_sheets_sync_job, cron("0 * * * *"), jitter=60)
+    scheduler.add_job("google_indexer_sitemap", run_google_indexer_job, cron("0 3 * * *"), misfire_grace=300)
+
+    # [평일 - 국내장]
+    scheduler.add_job("morning_briefing_kr", run_morning_briefing_kr, cron("0 8 * * mon-fri", calendar="KR"), heavy=True, misfire_grace=300)
+    scheduler.add_job("ipo_alert", run_ipo_alert_job, cron("15 8 * * mon-fri", calendar="KR"), misfire_grace=300)
+    scheduler.add_job("open_kr", lambda: send_opening_notification("KR"), cron("5 9 * * mon-fri", calendar="KR"),
+                      misfire_grace=300, description="국내 장시작 시가 알림")
+    scheduler.add_job("close_kr", lambda: send_closing_notification("KR"), cron("40 15 * * mon-fri", calendar="KR"),
+                      misfire_grace=300, description="국내 장마감 종가 리포트")
+
+    # [평일 - 미국장] 뉴욕 시각 기준 → 서머타임 자동 반영 (KST 22:35/23:35 개장, 05:10/06:10 마감)
+    scheduler.add_job("morning_briefing_us", run_morning_briefing_us, cron("30 21 * * mon-fri", calendar="US"), heavy=True, misfire_grace=300)
+    scheduler.add_job("open_us", lambda: send_opening_notification("US"), cron("35 9 * * mon-fri", tz=NY, calendar="US"),
+                      misfire_grace=300, description="미국 장시작 시가 알림")
+    scheduler.add_job("close_us", lambda: send_closing_notification("US"), cron("10 16 * * mon-fri", tz=NY, calendar="US"),
+                      misfire_grace=300, description="미국 장마감 종가 리포트")
+
+    # [주말]
+    scheduler.add_job("whale_report_gen", run_whale_report_gen_job, cron("0 18 * * fri"), heavy=True, misfire_grace=300)
+    scheduler.add_job("weekend_crypto_report", send_weekend_crypto_report, cron("0 18 * * sat"), misfire_grace=300)
+    scheduler.add_job("weekend_report_gen", run_weekend_report_gen_job, cron("55 9 * * sat"), heavy=True, misfire_grace=240)
+    scheduler.add_job("weekend_theme_report", send_weekend_theme_report, cron("0 18 * * sun"), misfire_grace=300)
+    scheduler.add_job("whale_report_push", send_whale_report_push, cron("0 20 * * sun"), misfire_grace=300)
 
 def delete_old_alerts():
     """3일 지난 알림(Firestore 및 DB) 삭제 (관리자 보고서 포함)"""
@@ -6,6 +6,8 @@ import re
 from typing import Dict, Optional, Any, List
 from datetime import datetime
 
+from upstream_hosts import SEC_DATA_URL, SEC_URL
+
 # CIK 캐시 파일 경로
 CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sec_tickers_cache.json")
 CACHE_TTL_SECONDS = 7 * 24 * 3600  # 7일
@@ -33,7 +35,7 @@ def _load_cik_mapping() -> Dict[str, int]:
     # 2. 실시간 SEC 공식 다운로드
     try:
         print("[SEC-Client] Downloading SEC company_tickers mapping...")
-        url = "https://www.sec.gov/files/company_tickers.json"
+        url = f"{SEC_URL}/files/company_tickers.json"
         res = requests.get(url, headers=HEADERS, timeout=10)
         if res.status_code == 200:
             raw_data = res.json()
@@ -88,7 +90,7 @@ def fetch_company_facts(cik_10_digits: str) -> Optional[Dict[str, Any]]:
     """
     SEC EDGAR Facts API를 호출하여 회사 재무 통계 팩트를 가져옵니다.
     """
-    url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik_10_digits}.json"
+    url = f"{SEC_DATA_URL}/api/xbrl/companyfacts/CIK{cik_10_digits}.json"
     try:
         res = requests.get(url, headers=HEADERS, timeout=10)
         if res.status_code == 200:
@@ -104,7 +106,7 @@ def fetch_recent_filings(cik_10_digits: str, limit: int = 15) -> List[Dict[str,
     """
     SEC EDGAR Submissions API를 호출하여 최근 공시(Filing) 목록을 DART 형식과 유사하게 반환합니다.
     """
-    url = f"https://data.sec.gov/submissions/CIK{cik_10_digits}.json"
+    url = f"{SEC_DATA_URL}/submissions/CIK{cik_10_digits}.json"
     disclosures = []
     
     try:
@@ -3,7 +3,6 @@ import urllib.parse
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-from system_watchdog import send_admin_alert
 
 # 알림 폭탄 방지용 (이미 알림을 보낸 해커 IP 기록용 - 차단 용도 아님)
 NOTIFIED_IPS = set()
@@ -57,5 +56,6 @@ class SecurityWatchdogMiddleware(BaseHTTPMiddleware):
             NOTIFIED_IPS.add(ip)
             alert_msg = f"해킹 시도 차단됨 (접속만 거부)!\nIP: {ip}\n원인: {reason}"
             print(f"[Security-Watchdog] 🚨 REJECT: {alert_msg}")
-            # system_watchdog 모듈 재사용하여 관리자에게 긴급 알림 전송
+            # system_watchdog 모듈 재사용하여 관리자에게 긴급 알림 전송 (firebase/yfinance 포함이라 첫 알림 시 로드)
+            from system_watchdog import send_admin_alert
             send_admin_alert("보안 봇 (Security Firewall)", alert_msg)
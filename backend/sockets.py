@@ -1,30 +1,106 @@
 ﻿from fastapi import WebSocket
-from typing import List, Dict
+from typing import List, Dict, Set, Callable, Optional
+from collections import deque
 import json
+import time
 import asyncio
 import logging
 
 # Logger setup
 logger = logging.getLogger("WebSocketManager")
 
+# Shared fallback poller interval (seconds) - one upstream quote fetch per symbol, not per socket
+POLL_INTERVAL = 10
+
+# Backpressure: each client has its own bounded outbox drained by a dedicated writer task
+SEND_QUEUE_MAX = 64          # pending non-quote messages (chat, pings, confirmations) per client
+SEND_TIMEOUT = 5.0           # a single send_text slower than this marks the client as stuck
+SLOW_CONSUMER_GRACE = 10.0   # a queue that overflows and does not drain within this window -> disconnect
+# Send latency histogram bucket upper bounds (ms)
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class ClientOutbox:
+    """
+    Per-connection send queue.
+    - messages: FIFO of generic messages, bounded (oldest dropped on overflow)
+    - quotes: latest 'update' per symbol only (conflation) so a slow client always
+      receives the freshest price instead of a backlog of stale ticks
+    """
+
+    def __init__(self):
+        self.messages: deque = deque()   # (text, enqueued_at)
+        self.quotes: Dict[str, tuple] = {}  # symbol -> (text, enqueued_at)
+        self.wakeup = asyncio.Event()
+        self.overflow_since: Optional[float] = None  # first overflow since the queue last drained
+        self.closing = False
+        self.writer: Optional[asyncio.Task] = None
+
+    def depth(self) -> int:
+        return len(self.messages) + len(self.quotes)
+
+    def pop(self) -> Optional[tuple]:
+        # Generic messages first: keeps "subscribed" ahead of the first update for that symbol
+        if self.messages:
+            return self.messages.popleft()
+        if self.quotes:
+            symbol = next(iter(self.quotes))
+            return self.quotes.pop(symbol)
+        return None
+
+
 class ConnectionManager:
     def __init__(self):
         # socket -> { 'user_id': str, 'keys': dict | None, 'last_ping': float }
         self.active_connections: Dict[WebSocket, dict] = {} 
         self.subscriptions: Dict[WebSocket, str] = {} # socket -> symbol
+        self.symbol_subscribers: Dict[str, Set[WebSocket]] = {} # symbol -> sockets (reverse index)
         self.heartbeat_tasks: Dict[WebSocket, asyncio.Task] = {} # socket -> heartbeat task
+        # symbol -> shared poller task (refcounted by len(symbol_subscribers[symbol]))
+        self.symbol_pollers: Dict[str, asyncio.Task] = {}
+        self.last_quotes: Dict[str, dict] = {} # symbol -> last polled quote (replayed to late subscribers)
+        # Injected by routes/sockets: quote fetcher (sync) and "user already gets live KIS ticks for symbol" predicate
+        self.quote_fetcher: Optional[Callable[[str], Optional[dict]]] = None
+        self.has_private_feed: Callable[[str, str], bool] = lambda user_id, symbol: False
+        self.outboxes: Dict[WebSocket, ClientOutbox] = {} # socket -> bounded send queue + writer task
+        self.send_stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "dropped": 0,
+            "conflated": 0,
+            "send_errors": 0,
+            "send_timeouts": 0,
+            "slow_disconnects": 0,
+            "max_queue_depth": 0,
+        }
+        self.send_latency = {
+            "count": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "buckets": {f"le_{b}": 0 for b in LATENCY_BUCKETS_MS} | {"le_inf": 0},
+        }
+
+    def configure_polling(self, quote_fetcher: Callable[[str], Optional[dict]], has_private_feed: Callable[[str, str], bool] = None):
+        """Register the quote source used by shared symbol pollers (idempotent)"""
+        self.quote_fetcher = quote_fetcher
+        if has_private_feed is not None:
+            self.has_private_feed = has_private_feed
 
     async def connect(self, websocket: WebSocket, user_id: str):
         """Connect a new WebSocket client and start heartbeat"""
         try:
             await websocket.accept()
-            import time
             self.active_connections[websocket] = {
                 'user_id': user_id, 
                 'keys': None,
                 'last_ping': time.time()
             }
             
+            # Dedicated writer: every outgoing message goes through the outbox
+            outbox = ClientOutbox()
+            outbox.writer = asyncio.create_task(self._writer(websocket, outbox))
+            self.outboxes[websocket] = outbox
+
             # Start heartbeat task
             heartbeat_task = asyncio.create_task(self._heartbeat(websocket))
             self.heartbeat_tasks[websocket] = heartbeat_task
@@ -38,17 +114,105 @@ class ConnectionManager:
         try:
             while websocket in self.active_connections:
                 await asyncio.sleep(30)  # Ping every 30 seconds
-                try:
-                    await websocket.send_json({"type": "ping", "timestamp": asyncio.get_event_loop().time()})
-                except Exception as e:
-                    logger.warning(f"[WS] Heartbeat failed, disconnecting: {e}")
-                    await self.disconnect(websocket)
-                    break
+                # Dead sockets are detected by the writer task when the ping fails to send
+                self.send_json(websocket, {"type": "ping", "timestamp": asyncio.get_event_loop().time()})
         except asyncio.CancelledError:
             logger.debug("[WS] Heartbeat task cancelled")
         except Exception as e:
             logger.error(f"[WS] Heartbeat error: {e}")
 
+    async def _writer(self, websocket: WebSocket, outbox: ClientOutbox):
+        """Drain the client's outbox; a stuck or failing send disconnects only this client"""
+        try:
+            while websocket in self.active_connections:
+                await outbox.wakeup.wait()
+                outbox.wakeup.clear()
+                while True:
+                    item = outbox.pop()
+                    if item is None:
+                        break
+                    text, _enqueued_at = item
+                    started = time.perf_counter()
+                    try:
+                        await asyncio.wait_for(websocket.send_text(text), SEND_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        self.send_stats["send_timeouts"] += 1
+                        self.send_stats["slow_disconnects"] += 1
+                        logger.warning(f"[WS] Send timed out after {SEND_TIMEOUT}s, disconnecting slow client")
+                        await self.disconnect(websocket)
+                        return
+                    except Exception as e:
+                        self.send_stats["send_errors"] += 1
+                        logger.warning(f"[WS] Send failed, disconnecting: {e}")
+                        await self.disconnect(websocket)
+                        return
+                    self._record_latency((time.perf_counter() - started) * 1000)
+                    self.send_stats["sent"] += 1
+                # Fully drained: the client has caught up
+                outbox.overflow_since = None
+        except asyncio.CancelledError:
+            pass
+
+    def _record_latency(self, elapsed_ms: float):
+        lat = self.send_latency
+        lat["count"] += 1
+        lat["total_ms"] += elapsed_ms
+        if elapsed_ms > lat["max_ms"]:
+            lat["max_ms"] = elapsed_ms
+        for bound in LATENCY_BUCKETS_MS:
+            if elapsed_ms <= bound:
+                lat["buckets"][f"le_{bound}"] += 1
+                return
+        lat["buckets"]["le_inf"] += 1
+
+    def _track_depth(self, outbox: ClientOutbox):
+        depth = outbox.depth()
+        if depth > self.send_stats["max_queue_depth"]:
+            self.send_stats["max_queue_depth"] = depth
+        outbox.wakeup.set()
+
+    def enqueue(self, websocket: WebSocket, message: str) -> bool:
+        """O(1) non-blocking send. Returns False if the client is gone."""
+        outbox = self.outboxes.get(websocket)
+        if outbox is None or outbox.closing:
+            return False
+        if len(outbox.messages) >= SEND_QUEUE_MAX:
+            outbox.messages.popleft()
+            self.send_stats["dropped"] += 1
+            now = time.monotonic()
+            if outbox.overflow_since is None:
+                outbox.overflow_since = now
+            elif now - outbox.overflow_since > SLOW_CONSUMER_GRACE:
+                self.send_stats["slow_disconnects"] += 1
+                user_id = self.active_connections.get(websocket, {}).get('user_id', 'unknown')
+                logger.warning(f"[WS] Slow consumer {user_id} (queue full for {SLOW_CONSUMER_GRACE}s), disconnecting")
+                outbox.closing = True
+                asyncio.create_task(self.disconnect(websocket))
+                return False
+        outbox.messages.append((message, time.monotonic()))
+        self.send_stats["enqueued"] += 1
+        self._track_depth(outbox)
+        return True
+
+    def enqueue_quote(self, websocket: WebSocket, symbol: str, message: str) -> bool:
+        """Queue a price update; an unsent older update for the same symbol is replaced (conflation)"""
+        outbox = self.outboxes.get(websocket)
+        if outbox is None or outbox.closing:
+            return False
+        if symbol in outbox.quotes:
+            self.send_stats["conflated"] += 1
+        outbox.quotes[symbol] = (message, time.monotonic())
+        self.send_stats["enqueued"] += 1
+        self._track_depth(outbox)
+        return True
+
+    def send_json(self, websocket: WebSocket, data: dict) -> bool:
+        """Serialize and enqueue (use instead of websocket.send_json to keep a single writer per socket)"""
+        return self.enqueue(websocket, json.dumps(data, ensure_ascii=False))
+
+    def send_update(self, websocket: WebSocket, symbol: str, data: dict) -> bool:
+        return self.enqueue_quote(websocket, symbol, json.dumps({"type": "update", "data": data}, ensure_ascii=False))
+
     def set_keys(self, websocket: WebSocket, keys: dict):
         """Register ephemeral keys for this session (RAM only)"""
         if websocket in self.active_connections:
@@ -63,13 +227,18 @@ class ConnectionManager:
             logger.info(f"[WS] Client disconnected: {user_id}")
         
         if websocket in self.subscriptions:
-            del self.subscriptions[websocket]
+            self._remove_subscription(websocket)
         
         # Cancel heartbeat task
         if websocket in self.heartbeat_tasks:
             self.heartbeat_tasks[websocket].cancel()
             del self.heartbeat_tasks[websocket]
 
+        # Stop writer task (it may be the caller when a send failed)
+        outbox = self.outboxes.pop(websocket, None)
+        if outbox is not None and outbox.writer is not None and outbox.writer is not asyncio.current_task():
+            outbox.writer.cancel()
+
         # Force close socket to validly exit any pending await state in main loop
         try:
             await websocket.close()
@@ -78,102 +247,140 @@ class ConnectionManager:
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         """Send a personal message to a specific WebSocket"""
-        try:
-            await websocket.send_text(message)
-        except Exception as e:
-            logger.error(f"[WS] Failed to send personal message: {e}")
-            await self.disconnect(websocket)
+        self.enqueue(websocket, message)
 
     async def broadcast(self, message: str):
-        """Broadcast message to all connected clients"""
-        to_remove = []
-        # Iterate over copy to allow modification during await
-        for connection in list(self.active_connections.keys()):
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.warning(f"[WS] Broadcast failed for client: {e}")
-                to_remove.append(connection)
-        
-        for conn in to_remove:
-            await self.disconnect(conn)
+        """Broadcast message to all connected clients (O(1) enqueue per client, never blocks on a slow one)"""
+        for connection in list(self.outboxes.keys()):
+            self.enqueue(connection, message)
 
     async def broadcast_chat_message(self, data: dict):
         """Broadcast chat message to all connected clients."""
-        import json
-        message = json.dumps(data, ensure_ascii=False)
-        to_remove = []
-        for connection in list(self.active_connections.keys()):
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.warning(f"[WS] Chat Broadcast failed: {e}")
-                to_remove.append(connection)
-        for conn in to_remove:
-            await self.disconnect(conn)
+        await self.broadcast(json.dumps(data, ensure_ascii=False))
                 
     async def broadcast_to_symbol_public(self, symbol: str, data: dict):
         """
         Send updates to ALL subscribers of 'symbol'.
         Used for Simulation/Public Feed.
         """
+        await self._fan_out(symbol, data, list(self.symbol_subscribers.get(symbol, ())))
+
+    async def _fan_out(self, symbol: str, data: dict, connections: List[WebSocket]):
+        """Serialize the update once and queue it (conflated per symbol) for the given subscribers"""
+        if not connections:
+            return
         message = json.dumps({"type": "update", "data": data}, ensure_ascii=False)
-        to_remove = []
-        sent_count = 0
-        
-        # Iterate over copy to allow modification during await key lookup
-        for connection, sub_symbol in list(self.subscriptions.items()):
-            if sub_symbol == symbol:
-                try:
-                    await connection.send_text(message)
-                    sent_count += 1
-                except Exception as e:
-                    logger.warning(f"[WS] Failed to send update for {symbol}: {e}")
-                    to_remove.append(connection)
+        queued = 0
+        for connection in connections:
+            if self.enqueue_quote(connection, symbol, message):
+                queued += 1
         
-        if sent_count > 0:
-            logger.debug(f"[WS] Broadcasted {symbol} to {sent_count} clients")
-                    
-        for conn in to_remove:
-            await self.disconnect(conn)
+        if queued > 0:
+            logger.debug(f"[WS] Queued {symbol} update for {queued} clients")
 
     async def send_private_update(self, user_id: str, symbol: str, data: dict):
         """
         Send update ONLY to specific user's socket(s).
         """
         message = json.dumps({"type": "update", "data": data}, ensure_ascii=False)
-        to_remove = []
-        sent_count = 0
 
-        # Find sockets belonging to user_id AND subscribed to symbol
-        for connection, metadata in self.active_connections.items():
-            if metadata['user_id'] == user_id and self.subscriptions.get(connection) == symbol:
+        # Find sockets subscribed to symbol (reverse index) AND belonging to user_id
+        for connection in list(self.symbol_subscribers.get(symbol, ())):
+            metadata = self.active_connections.get(connection)
+            if metadata and metadata['user_id'] == user_id:
+                self.enqueue_quote(connection, symbol, message)
+
+    async def send_feed_update(self, symbol: str, data: dict, user_ids: Set[str]):
+        """
+        Deliver one decoded KIS tick to every subscriber of 'symbol' owned by one of user_ids.
+        Serialized once regardless of how many users share the upstream subscription.
+        """
+        targets = [
+            ws for ws in list(self.symbol_subscribers.get(symbol, ()))
+            if ws in self.active_connections and self.active_connections[ws]['user_id'] in user_ids
+        ]
+        await self._fan_out(symbol, data, targets)
+
+    def _remove_subscription(self, websocket: WebSocket):
+        """Drop socket from both indexes; stop the symbol poller when the last subscriber leaves"""
+        symbol = self.subscriptions.pop(websocket, None)
+        if symbol is None:
+            return
+        subscribers = self.symbol_subscribers.get(symbol)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.symbol_subscribers[symbol]
+                self._stop_poller(symbol)
+
+    def _ensure_poller(self, symbol: str):
+        task = self.symbol_pollers.get(symbol)
+        if task is None or task.done():
+            self.symbol_pollers[symbol] = asyncio.create_task(self._poll_symbol(symbol))
+            logger.info(f"[WS] Shared poller started for {symbol} (Pollers: {len(self.symbol_pollers)})")
+
+    def _stop_poller(self, symbol: str):
+        task = self.symbol_pollers.pop(symbol, None)
+        self.last_quotes.pop(symbol, None)
+        if task is not None:
+            # A poller that disconnects its own last subscriber simply exits its loop
+            if task is not asyncio.current_task():
+                task.cancel()
+            logger.info(f"[WS] Shared poller stopped for {symbol} (Pollers: {len(self.symbol_pollers)})")
+
+    async def _poll_symbol(self, symbol: str):
+        """
+        One fallback poller per subscribed symbol (guest / non-KIS users).
+        Fetches the quote immediately, then once per interval, and fans it out to every subscriber without a private feed.
+        """
+        try:
+            while symbol in self.symbol_subscribers:
                 try:
-                    await connection.send_text(message)
-                    sent_count += 1
+                    targets = [
+                        ws for ws in list(self.symbol_subscribers.get(symbol, ()))
+                        if ws in self.active_connections
+                        and not self.has_private_feed(self.active_connections[ws]['user_id'], symbol)
+                    ]
+                    if targets and self.quote_fetcher is not None:
+                        quote = await asyncio.to_thread(self.quote_fetcher, symbol)
+                        last = self.last_quotes.get(symbol)
+                        if quote and (last is None or quote.get('price') != last.get('price')):
+                            if symbol in self.symbol_subscribers:
+                                self.last_quotes[symbol] = quote
+                            await self._fan_out(symbol, quote, targets)
                 except Exception as e:
-                    logger.warning(f"[WS] Failed to send private update to {user_id}: {e}")
-                    to_remove.append(connection)
-        
-        if sent_count > 0:
-            logger.debug(f"[WS] Sent private update for {symbol} to {user_id}")
-
-        for conn in to_remove:
-            await self.disconnect(conn)
+                    logger.warning(f"[WS] Poller error for {symbol}: {e}")
+                await asyncio.sleep(POLL_INTERVAL)
+        except asyncio.CancelledError:
+            pass
 
     async def subscribe(self, websocket: WebSocket, symbol: str):
         """Subscribe a WebSocket to a specific symbol"""
         old_symbol = self.subscriptions.get(websocket)
-        self.subscriptions[websocket] = symbol
+        if old_symbol != symbol:
+            self._remove_subscription(websocket)
+            self.subscriptions[websocket] = symbol
+            self.symbol_subscribers.setdefault(symbol, set()).add(websocket)
+            self._ensure_poller(symbol)
         
-        # Confirm subscription
-        try:
-            await websocket.send_text(json.dumps({"type": "subscribed", "symbol": symbol}, ensure_ascii=False))
-            logger.info(f"[WS] Client subscribed to {symbol}" + (f" (was {old_symbol})" if old_symbol else ""))
-        except Exception as e:
-            logger.error(f"[WS] Failed to confirm subscription: {e}")
-            await self.disconnect(websocket)
+        # Confirm subscription (old symbol's pending update is obsolete for this client)
+        outbox = self.outboxes.get(websocket)
+        if outbox is not None and old_symbol and old_symbol != symbol:
+            outbox.quotes.pop(old_symbol, None)
+        self.send_json(websocket, {"type": "subscribed", "symbol": symbol})
+        # Late joiner on an existing poller: replay the last quote instead of waiting for the next price change
+        last = self.last_quotes.get(symbol)
+        metadata = self.active_connections.get(websocket)
+        if last is not None and metadata and not self.has_private_feed(metadata['user_id'], symbol):
+            self.send_update(websocket, symbol, last)
+        logger.info(f"[WS] Client subscribed to {symbol}" + (f" (was {old_symbol})" if old_symbol else ""))
         
+    def unsubscribe(self, websocket: WebSocket, symbol: str):
+        """Unsubscribe a WebSocket from 'symbol' (no-op if subscribed to something else)"""
+        if self.subscriptions.get(websocket) == symbol:
+            self._remove_subscription(websocket)
+            logger.info(f"[WS] Client unsubscribed from {symbol}")
+
     def get_connected_user_ids(self) -> List[str]:
         """Return unique user IDs of all connected clients"""
         return list(set([m['user_id'] for m in self.active_connections.values()]))
@@ -191,7 +398,25 @@ class ConnectionManager:
             "total_connections": len(self.active_connections),
             "total_subscriptions": len(self.subscriptions),
             "unique_users": len(self.get_connected_user_ids()),
-            "subscribed_symbols": len(set(self.subscriptions.values()))
+            "subscribed_symbols": len(self.symbol_subscribers),
+            "active_pollers": len(self.symbol_pollers),
+            "send_queues": self.get_queue_stats()
+        }
+
+    def get_queue_stats(self) -> dict:
+        """Backpressure metrics: queue depth, drops/conflation, send latency"""
+        depths = [o.depth() for o in self.outboxes.values()]
+        lat = self.send_latency
+        return {
+            **self.send_stats,
+            "queued_now": sum(depths),
+            "deepest_queue_now": max(depths) if depths else 0,
+            "send_latency_ms": {
+                "count": lat["count"],
+                "avg": round(lat["total_ms"] / lat["count"], 3) if lat["count"] else 0.0,
+                "max": round(lat["max_ms"], 3),
+                "buckets": dict(lat["buckets"]),
+            },
         }
 
     def get_user_subscriptions(self, user_id: str) -> List[str]:
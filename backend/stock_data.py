@@ -10,6 +10,7 @@ import requests
 import os
 import yfinance as yf
 import pandas as pd
+from upstream_hosts import NAVER_FINANCE_URL, NAVER_MOBILE_STOCK_URL, NAVER_POLLING_URL, OPENDART_URL
 try:
     from GoogleNews import GoogleNews
 except ImportError:
@@ -422,21 +423,16 @@ def get_stock_info(symbol: str, skip_ai: bool = False):
     is_code_already = re.match(r'^\d{6}$', symbol) or symbol.endswith(('.KS', '.KQ', '.O', '.N', '.A'))
     
     if not is_code_already:
-        # 1. Try Global Mapping first (Fastest for popular US stocks)
-        for t, ko_list in GLOBAL_KOREAN_NAMES.items():
-            # Support both string and list of names
-            if isinstance(ko_list, list):
-                if symbol in ko_list:
-                    print(f"[get_stock_info] Resolved '{symbol}' to Global Ticker via Mapping: {t}")
-                    symbol = t
-                    break
-            elif symbol == ko_list:
-                print(f"[get_stock_info] Resolved '{symbol}' to Global Ticker via Mapping: {t}")
-                symbol = t
-                break
+        # 1. Local Symbol Index first (STOCK_MAP + GLOBAL_KOREAN_NAMES + listing, no network)
+        # 대문자 티커 형태(SK, SM 등)는 기존처럼 해외 티커로 취급 → US 종목 별칭만 해석
+        from symbol_index import symbol_index
+        indexed = symbol_index.resolve(symbol, market="US" if re.match(r'^[A-Z]+$', symbol) else None)
+        if indexed:
+            print(f"[get_stock_info] Resolved '{symbol}' via Symbol Index: {indexed}")
+            symbol = indexed
         
         # 2. Try Korean Search if still not resolved (handles Korean names like '삼성전자')
-        if not re.match(r'^[A-Z]+$', symbol):
+        if not re.match(r'^[A-Z]+$', symbol) and not re.match(r'^\d{6}$', symbol):
             found_code = search_korean_stock_symbol(symbol)
             if found_code:
                 print(f"[get_stock_info] Resolved '{symbol}' to code via Search: {found_code}")
@@ -1087,11 +1083,8 @@ def get_simple_quote(symbol: str, broker_client=None, strict=False):
     if not re.match(r'^[A-Za-z0-9.]+$', symbol):
         import unicodedata
         q_norm = unicodedata.normalize('NFC', symbol).replace(" ", "")
-        resolved = None
-        for t, k in GLOBAL_KOREAN_NAMES.items():
-            if q_norm == k or q_norm in k:
-                resolved = t
-                break
+        from symbol_index import symbol_index
+        resolved = symbol_index.resolve(q_norm)
         if not resolved:
             resolved = search_stock_code(q_norm)
         if resolved:
@@ -1428,9 +1421,9 @@ def get_market_data():
         icon = idx.get("icon", "")
         # 1. Primary: Naver Mobile API
         try:
-            url = f"https://m.stock.naver.com/api/index/{idx['naver_code']}/basic"
+            url = f"{NAVER_MOBILE_STOCK_URL}/api/index/{idx['naver_code']}/basic"
             if "FX_" in idx['naver_code']:
-                url = f"https://m.stock.naver.com/api/exchange/{idx['naver_code']}/basic"
+                url = f"{NAVER_MOBILE_STOCK_URL}/api/exchange/{idx['naver_code']}/basic"
             
             res = requests.get(url, timeout=3, headers={"User-Agent": "Mozilla/5.0"})
             if res.status_code == 200:
@@ -1991,7 +1984,7 @@ def get_real_stock_events():
             bgn_de = (today - datetime.timedelta(days=30)).strftime("%Y%m%d")
             end_de = today.strftime("%Y%m%d")
             
-            url = f"https://opendart.fss.or.kr/api/list.json?crtfc_key={dart_api_key}&bgn_de={bgn_de}&end_de={end_de}&page_count=100"
+            url = f"{OPENDART_URL}/api/list.json?crtfc_key={dart_api_key}&bgn_de={bgn_de}&end_de={end_de}&page_count=100"
             res = requests.get(url, timeout=10)
             data = res.json()
             
@@ -2122,7 +2115,7 @@ def get_dart_risk_alerts():
         alerts = []
         # 최신 200건까지 스캔 (100건씩 2페이지) - API 쿼터 절약을 위해 5에서 2로 축소
         for page_no in range(1, 3):
-            url = f"https://opendart.fss.or.kr/api/list.json?crtfc_key={api_key}&bgn_de={bgn_de}&end_de={end_de}&page_count=100&page_no={page_no}"
+            url = f"{OPENDART_URL}/api/list.json?crtfc_key={api_key}&bgn_de={bgn_de}&end_de={end_de}&page_count=100&page_no={page_no}"
             res = requests.get(url, timeout=10)
             data = res.json()
 
@@ -2493,14 +2486,14 @@ def fetch_global_breaking_news() -> list:
     Returns: [{'title': '...', 'link': '...', 'source': '...'}, ...]
     """
     import requests
-    from bs4 import BeautifulSoup
-    url = "https://finance.naver.com/news/news_list.naver?mode=LSS2D&section_id=101&section_id2=258"
+    from html_parse import parse_html
+    url = f"{NAVER_FINANCE_URL}/news/news_list.naver?mode=LSS2D&section_id=101&section_id2=258"
     news_list = []
     try:
         # EUC-KR 인코딩 주의
         headers = {"User-Agent": "Mozilla/5.0"}
         resp = requests.get(url, headers=headers, timeout=5)
-        soup = BeautifulSoup(resp.content.decode('euc-kr', 'replace'), 'html.parser')
+        soup = parse_html(resp.content.decode('euc-kr', 'replace'), class_="newsList")
         
         # 기사 목록 파싱
         ul = soup.select_one(".newsList")
@@ -2535,15 +2528,15 @@ def fetch_batch_realtime_prices(symbols: list) -> dict:
         return {}
         
     result = {}
-    try:
-        # 100개씩 묶어서 조회 (Naver API 권장)
-        chunk_size = 100
-        for i in range(0, len(symbols), chunk_size):
-            chunk = symbols[i:i+chunk_size]
+    # 100개씩 묶어서 조회 (Naver API 권장). 한 묶음이 실패해도 나머지 묶음은 계속 조회
+    chunk_size = 100
+    headers = {"User-Agent": "Mozilla/5.0"}
+    for i in range(0, len(symbols), chunk_size):
+        chunk = symbols[i:i+chunk_size]
+        try:
             syms_str = ",".join(chunk)
-            url = f"https://polling.finance.naver.com/api/realtime/domestic/stock/{syms_str}"
+            url = f"{NAVER_POLLING_URL}/api/realtime/domestic/stock/{syms_str}"
             
-            headers = {"User-Agent": "Mozilla/5.0"}
             resp = requests.get(url, headers=headers, timeout=5)
             if resp.status_code == 200:
                 data = resp.json()
@@ -2563,7 +2556,7 @@ def fetch_batch_realtime_prices(symbols: list) -> dict:
                         "change_percent": change_pct,
                         "name": item.get("stockName", code)
                     }
-    except Exception as e:
-        print(f"[BatchPriceFetch] Error: {e}")
+        except Exception as e:
+            print(f"[BatchPriceFetch] Error (chunk {i // chunk_size + 1}): {e}")
         
     return result
@@ -0,0 +1,275 @@
+"""
+🪵 비동기 구조화 로깅 (Queue 기반 · JSON · 요청 ID · 호출 지점별 속도 제한)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+PM2 아래에서 요청마다 동기 stdout 쓰기가 여러 번 일어나 지연과 수 GB 로그를 만들던 문제 해결용.
+
+📌 구성
+  1. QueueHandler(put_nowait) → 별도 스레드의 QueueListener가 실제 stdout 쓰기 담당
+     (큐가 가득 차면 버리고 개수만 집계 → 요청 경로는 절대 블로킹되지 않음)
+  2. JSON 한 줄 레코드: ts, level, logger, msg, request_id(+ extra 필드)
+  3. 모듈별 레벨: LOG_LEVEL=INFO, LOG_LEVELS="turbo_engine=WARNING,print.korea_data=WARNING"
+  4. 호출 지점(파일:라인)별 속도 제한: INFO 이하는 LOG_RATE_LIMIT건/LOG_RATE_WINDOW초,
+     초과분은 버리고 다음 레코드에 suppressed 개수 표시 (WARNING 이상은 항상 기록)
+  5. 기존 print("[Tag] ...") 진단 로그는 stdout 리다이렉트로 print.<모듈명> 로거를 거침
+     → 코드 수정 없이 모듈별 레벨/속도 제한/JSON 적용
+
+📌 LOG_FORMAT=text 로 로컬 개발 시 사람이 읽기 쉬운 한 줄 포맷 사용
+"""
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+QUEUE_SIZE = 10000
+RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", "20"))
+RATE_WINDOW = float(os.getenv("LOG_RATE_WINDOW", "10"))
+
+request_id_var: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+
+# LogRecord 기본 속성 (이 외의 속성은 extra 필드로 JSON에 포함)
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id", "suppressed"}
+
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            payload["request_id"] = record.request_id
+        if getattr(record, "suppressed", 0):
+            payload["suppressed"] = record.suppressed
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        if getattr(record, "request_id", None):
+            line += f" (req={record.request_id})"
+        if getattr(record, "suppressed", 0):
+            line += f" (+{record.suppressed} suppressed)"
+        return line
+
+
+class ContextFilter(logging.Filter):
+    """호출 스레드/태스크의 요청 ID를 레코드에 고정 (큐를 건너면 contextvar를 읽을 수 없으므로)"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """호출 지점(pathname:lineno)별 창(window) 단위 속도 제한. WARNING 이상은 통과"""
+
+    def __init__(self, limit: int = RATE_LIMIT, window: float = RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.sites: Dict[tuple, list] = {}    # site -> [window_start, count, suppressed]
+        self.total_suppressed = 0
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.limit <= 0:
+            return True
+        site = (record.name, record.pathname, record.lineno)
+        now = record.created
+        with self.lock:
+            state = self.sites.get(site)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self.sites[site] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if state[1] < self.limit:
+                state[1] += 1
+                return True
+            state[2] += 1
+            self.total_suppressed += 1
+            return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_PRINT_LEVEL_PATTERN = re.compile(r"error|exception|traceback|failed|❌", re.IGNORECASE)
+
+
+class PrintToLogger:
+    """sys.stdout 대체: print 한 줄 = 로그 레코드 1건 (로거명 print.<호출 모듈>)"""
+
+    def __init__(self, original):
+        self.original = original
+        self.local = threading.local()
+        self.encoding = getattr(original, "encoding", "utf-8")
+
+    def write(self, text: str) -> int:
+        if not text:
+            return 0
+        buf = getattr(self.local, "buf", None)
+        if buf is None:
+            buf = self.local.buf = []
+            # print를 호출한 지점 (모듈명 → 로거명, 파일:라인 → 속도 제한 단위)
+            try:
+                frame = sys._getframe(1)
+                self.local.site = (frame.f_globals.get("__name__", "unknown"), frame.f_code.co_filename, frame.f_lineno)
+            except Exception:
+                self.local.site = ("unknown", "", 0)
+        buf.append(text)
+        if "\n" in text:
+            lines = "".join(buf).split("\n")
+            tail = lines.pop()
+            site = self.local.site
+            self.local.buf = None
+            for line in lines:
+                line = line.rstrip()
+                if line:
+                    self._emit(site, line)
+            if tail:
+                self.local.buf = [tail]
+                self.local.site = site
+        return len(text)
+
+    @staticmethod
+    def _emit(site: tuple, line: str):
+        module, filename, lineno = site
+        logger = logging.getLogger(f"print.{module}")
+        level = logging.WARNING if _PRINT_LEVEL_PATTERN.search(line) else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.handle(logger.makeRecord(logger.name, level, filename, lineno, line, None, None))
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+    def fileno(self):
+        return self.original.fileno()
+
+    def reconfigure(self, **kwargs):
+        pass
+
+
+class LoggingState:
+    def __init__(self):
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.queue_handler: Optional[NonBlockingQueueHandler] = None
+        self.rate_filter: Optional[RateLimitFilter] = None
+        self.levels: Dict[str, str] = {}
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_handler.queue.qsize() if self.queue_handler else 0,
+            "dropped": self.queue_handler.dropped if self.queue_handler else 0,
+            "rate_limited": self.rate_filter.total_suppressed if self.rate_filter else 0,
+            "root_level": logging.getLevelName(logging.getLogger().level),
+            "levels": dict(self.levels),
+        }
+
+
+# ─── 전역 인스턴스 ──────────────────────────────────────────────────────────
+logging_state = LoggingState()
+
+
+def set_log_level(name: str, level: str):
+    """런타임 레벨 변경 (name='root'는 전체 기본 레벨)"""
+    level = level.upper()
+    if name in ("", "root"):
+        logging.getLogger().setLevel(level)
+    else:
+        logging.getLogger(name).setLevel(level)
+        logging_state.levels[name] = level
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for part in spec.split(","):
+        if "=" in part:
+            name, level = part.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(redirect_print: bool = True):
+    """프로세스당 1회. 루트 로거를 비동기 큐 핸들러로 교체하고 print를 로깅으로 라우팅"""
+    if logging_state.listener is not None:
+        return
+    output = sys.__stdout__ or sys.stdout
+    stream_handler = logging.StreamHandler(output)
+    stream_handler.setFormatter(TextFormatter() if os.getenv("LOG_FORMAT", "json") == "text" else JsonFormatter())
+
+    q: queue.Queue = queue.Queue(QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(q)
+    queue_handler.addFilter(ContextFilter())
+    rate_filter = RateLimitFilter()
+    queue_handler.addFilter(rate_filter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    # uvicorn 로거도 같은 큐로 (접근 로그는 main.log_requests가 대신하므로 기본 WARNING)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uv_logger = logging.getLogger(name)
+        uv_logger.handlers = []
+        uv_logger.propagate = True
+    levels = {"uvicorn.access": "WARNING"}
+    levels.update(_parse_levels(os.getenv("LOG_LEVELS", "")))
+    for name, level in levels.items():
+        set_log_level(name, level)
+
+    listener = logging.handlers.QueueListener(q, stream_handler, respect_handler_level=False)
+    listener.start()
+    logging_state.listener = listener
+    logging_state.queue_handler = queue_handler
+    logging_state.rate_filter = rate_filter
+
+    if redirect_print:
+        sys.stdout = PrintToLogger(output)
+
+
+def shutdown_logging():
+    """남은 레코드를 모두 쓰고 리스너 종료"""
+    if logging_state.listener is not None:
+        logging_state.listener.stop()
+        logging_state.listener = None
+        if isinstance(sys.stdout, PrintToLogger):
+            sys.stdout = sys.stdout.original
@@ -0,0 +1,341 @@
+"""
+🔎 종목 검색 인덱스 (메모리 상주)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+기존 종목명 해석은 GLOBAL_KOREAN_NAMES를 선형 탐색한 뒤 search_stock_code의
+원격 조회(네이버 검색 리스트 → 야후 → 네이버 통합검색, 각 5초 타임아웃)로 넘어갔습니다.
+이미 로컬에 있는 STOCK_MAP(KRX 전 종목) + GLOBAL_KOREAN_NAMES(해외 한글명) +
+routes/seo 상장 목록(KOSPI/KOSDAQ/ETF/US)으로 인덱스를 미리 만들어 두고
+원격 조회는 최후의 수단으로만 사용합니다.
+
+📌 인덱스 구성
+  1. 정확 일치 사전 : NFC 정규화 키(소문자, 공백 제거) → 종목
+  2. 접두어 트라이  : "삼성" → 삼성전자, 삼성SDI, ...
+  3. 초성 트라이    : "ㅅㅅㅈㅈ" → 삼성전자
+  4. 3-gram 인덱스  : 오타/부분 일치 ("삼성전지", "하이닉스") → 유사도 순위
+
+📊 점수 (높을수록 상위)
+  정확 일치 100 > 접두어 80 > 초성 70 > 3-gram 유사도(최대 60)
+  같은 점수대에서는 짧은 이름(질의와 길이 차이가 작은 이름)이 우선
+"""
+
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+CHOSUNG = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+_CHOSUNG_SET = set(CHOSUNG)
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_TRIE_END = '\0'
+
+SCORE_EXACT = 100
+SCORE_PREFIX = 80
+SCORE_CHOSUNG = 70
+SCORE_FUZZY = 60
+MIN_FUZZY_SIMILARITY = 0.35
+
+
+def normalize_key(text: str) -> str:
+    """검색 키 정규화: NFC + 소문자 + 공백 제거"""
+    if not text:
+        return ""
+    return re.sub(r'\s+', '', unicodedata.normalize('NFC', str(text))).lower()
+
+
+def to_chosung(text: str) -> str:
+    """한글 음절을 초성으로 변환 (그 외 문자는 그대로 유지). 예: 삼성전자 → ㅅㅅㅈㅈ"""
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            out.append(CHOSUNG[(code - _HANGUL_BASE) // 588])
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+def is_chosung_query(text: str) -> bool:
+    """초성이 하나 이상 포함되고 완성형 한글 음절이 없는 질의인지 (예: ㅅㅅㅈㅈ, ㅋㅋㅇ뱅 제외)"""
+    has_chosung = False
+    for ch in text:
+        if ch in _CHOSUNG_SET:
+            has_chosung = True
+        elif _HANGUL_BASE <= ord(ch) <= _HANGUL_LAST:
+            return False
+    return has_chosung
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"^{key}$"
+    if len(padded) < 3:
+        return {padded}
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _PrefixTrie:
+    """dict 노드 기반 접두어 트라이 (종료 노드에 엔트리 id 집합 저장)"""
+
+    def __init__(self):
+        self.root: dict = {}
+
+    def insert(self, key: str, entry_id: int):
+        node = self.root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node.setdefault(_TRIE_END, set()).add(entry_id)
+
+    def collect(self, prefix: str, limit: int) -> List[int]:
+        """prefix로 시작하는 엔트리 id를 짧은 키부터(BFS) 최대 limit개 반환"""
+        node = self.root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        found: List[int] = []
+        seen: Set[int] = set()
+        level = [node]
+        while level and len(found) < limit:
+            next_level = []
+            for n in level:
+                for entry_id in sorted(n.get(_TRIE_END, ())):
+                    if entry_id not in seen:
+                        seen.add(entry_id)
+                        found.append(entry_id)
+                for ch, child in n.items():
+                    if ch != _TRIE_END:
+                        next_level.append(child)
+            level = next_level
+        return found[:limit]
+
+
+class _IndexData:
+    """
+    인덱스 한 벌 (엔트리 + 정확 일치 사전 + 트라이 2종 + 3-gram).
+    구축이 끝난 뒤에는 수정하지 않음 → 확장 시 새로 만들어 참조만 교체
+    """
+
+    def __init__(self):
+        # entries[id] = {"symbol", "name", "market", "keys"}
+        self.entries: List[dict] = []
+        self.by_symbol: Dict[str, int] = {}
+        self.exact: Dict[str, List[int]] = {}
+        self.trie = _PrefixTrie()
+        self.chosung_trie = _PrefixTrie()
+        self.grams: Dict[str, Set[int]] = defaultdict(set)
+
+    def add(self, symbol: str, name: str, market: str, aliases: List[str] = None):
+        symbol = str(symbol).strip()
+        name = unicodedata.normalize('NFC', str(name)).strip()
+        if not symbol or not name:
+            return
+
+        entry_id = self.by_symbol.get(symbol)
+        if entry_id is None:
+            entry_id = len(self.entries)
+            self.entries.append({"symbol": symbol, "name": name, "market": market, "keys": set()})
+            self.by_symbol[symbol] = entry_id
+        entry = self.entries[entry_id]
+
+        for raw in [name, symbol] + list(aliases or []):
+            key = normalize_key(raw)
+            if not key or key in entry["keys"]:
+                continue
+            entry["keys"].add(key)
+            self.exact.setdefault(key, []).append(entry_id)
+            self.trie.insert(key, entry_id)
+            chosung = to_chosung(key)
+            if chosung != key:
+                self.chosung_trie.insert(chosung, entry_id)
+            for gram in _trigrams(key):
+                self.grams[gram].add(entry_id)
+
+
+class SymbolSearchIndex:
+    """
+    종목 검색 인덱스
+
+    사용 예:
+        symbol_index.resolve("삼성전자")      # → "005930"
+        symbol_index.search("ㅅㅅㅈ", 10)     # → [{"symbol": "005930", "name": "삼성전자", ...}, ...]
+
+    ⚠️ 조회는 락 없이 self._data 를 한 번 읽어 그 스냅샷만 사용합니다.
+       상장 목록 반영은 새 _IndexData 를 따로 구축한 뒤 참조를 한 번에 교체합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._listing_loaded = False
+        self._data = _IndexData()
+
+    # ─── 구축 ────────────────────────────────────────────────────────────────
+    @staticmethod
+    def _build_base(data: _IndexData):
+        from stock_names import STOCK_MAP
+        from stock_data import GLOBAL_KOREAN_NAMES
+
+        # STOCK_MAP은 공식 종목명이 먼저, 약칭(삼전, 하이닉스 등)이 뒤에 등장 → 첫 이름을 대표명으로 사용
+        for name, code in STOCK_MAP.items():
+            if isinstance(code, str) and code:
+                data.add(code, name, "KR")
+
+        for ticker, names in GLOBAL_KOREAN_NAMES.items():
+            name_list = names if isinstance(names, list) else [names]
+            if name_list:
+                data.add(ticker, name_list[0], "US", name_list[1:])
+
+    def ensure_built(self):
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            data = _IndexData()
+            try:
+                self._build_base(data)
+                print(f"[SymbolIndex] [OK] 인덱스 구축 완료: {len(data.entries)}개 종목, {len(data.exact)}개 키")
+            except Exception as e:
+                print(f"[SymbolIndex] 인덱스 구축 실패: {e}")
+            self._data = data
+            self._built = True
+
+    def load_listing(self) -> int:
+        """
+        routes/seo 상장 목록(KOSPI/KOSDAQ/ETF/S&P500/NASDAQ)으로 인덱스 확장.
+        FinanceDataReader 원격 조회가 포함되므로 백그라운드 스레드에서 호출합니다.
+        """
+        if self._listing_loaded:
+            return 0
+        self.ensure_built()
+        try:
+            from routes.seo import get_all_kospi_kosdaq
+            listing = get_all_kospi_kosdaq()
+        except Exception as e:
+            print(f"[SymbolIndex] 상장 목록 로드 실패 (기본 인덱스 유지): {e}")
+            return 0
+        if listing.get("status") != "success":
+            return 0
+
+        with self._lock:
+            if self._listing_loaded:
+                return 0
+            before = len(self._data.entries)
+            # 기존 인덱스는 그대로 서비스하면서 기본 + 상장 목록으로 새 인덱스 구축 후 교체
+            data = _IndexData()
+            try:
+                self._build_base(data)
+            except Exception as e:
+                print(f"[SymbolIndex] 인덱스 재구축 실패 (기존 인덱스 유지): {e}")
+                return 0
+            for item in listing.get("data", []):
+                market = item.get("market", "")
+                data.add(item.get("ticker", ""), item.get("name", ""), "US" if market == "US" else "KR")
+            self._data = data
+            self._listing_loaded = True
+        added = len(data.entries) - before
+        print(f"[SymbolIndex] 상장 목록 반영: +{added}개 종목 (총 {len(data.entries)}개)")
+        return added
+
+    # ─── 조회 ────────────────────────────────────────────────────────────────
+    @staticmethod
+    def _result(data: _IndexData, entry_id: int, score: float, match: str) -> dict:
+        entry = data.entries[entry_id]
+        return {
+            "symbol": entry["symbol"],
+            "code": entry["symbol"],
+            "name": entry["name"],
+            "market": entry["market"],
+            "score": round(score, 2),
+            "match": match,
+        }
+
+    def resolve(self, query: str, market: Optional[str] = None) -> Optional[str]:
+        """
+        종목명/약칭/티커의 정확 일치만 해석 (원격 조회 없음). 실패 시 None
+        - market: "KR" / "US" 지정 시 해당 시장 종목만 (예: 'SK'를 미국 티커로 다룰 때)
+        """
+        self.ensure_built()
+        data = self._data
+        key = normalize_key(query)
+        if not key:
+            return None
+        for entry_id in data.exact.get(key, []):
+            entry = data.entries[entry_id]
+            if market is None or entry["market"] == market:
+                return entry["symbol"]
+        return None
+
+    def name_for(self, symbol: str) -> Optional[str]:
+        self.ensure_built()
+        data = self._data
+        entry_id = data.by_symbol.get(str(symbol).strip())
+        return data.entries[entry_id]["name"] if entry_id is not None else None
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """자동완성용 순위 검색 (정확 → 접두어 → 초성 → 3-gram 유사도)"""
+        self.ensure_built()
+        data = self._data
+        key = normalize_key(query)
+        if not key:
+            return []
+        limit = max(1, min(limit, 50))
+        # 각 엔트리의 최고 점수만 유지
+        scored: Dict[int, tuple] = {}
+
+        def offer(entry_id: int, score: float, match: str):
+            name_len = len(normalize_key(data.entries[entry_id]["name"]))
+            # 같은 점수대에서는 질의 길이에 가까운(짧은) 이름 우선
+            adjusted = score - min(abs(name_len - len(key)), 15) * 0.5
+            if entry_id not in scored or scored[entry_id][0] < adjusted:
+                scored[entry_id] = (adjusted, match)
+
+        for entry_id in data.exact.get(key, []):
+            offer(entry_id, SCORE_EXACT, "exact")
+
+        if is_chosung_query(key):
+            for entry_id in data.chosung_trie.collect(key, limit * 4):
+                offer(entry_id, SCORE_CHOSUNG, "chosung")
+        else:
+            for entry_id in data.trie.collect(key, limit * 4):
+                offer(entry_id, SCORE_PREFIX, "prefix")
+
+            if len(scored) < limit:
+                query_grams = _trigrams(key)
+                overlap: Dict[int, int] = defaultdict(int)
+                for gram in query_grams:
+                    for entry_id in data.grams.get(gram, ()):
+                        overlap[entry_id] += 1
+                # Dice ≥ t 이려면 공유 3-gram이 최소 t·|q|/2개 이상 필요 → 후보 가지치기
+                min_shared = MIN_FUZZY_SIMILARITY * len(query_grams) / 2
+                for entry_id, shared in overlap.items():
+                    if entry_id in scored or shared < min_shared:
+                        continue
+                    best = 0.0
+                    for entry_key in data.entries[entry_id]["keys"]:
+                        entry_grams = _trigrams(entry_key)
+                        inter = len(query_grams & entry_grams)
+                        if inter:
+                            # Dice 계수
+                            best = max(best, 2 * inter / (len(query_grams) + len(entry_grams)))
+                    if best >= MIN_FUZZY_SIMILARITY:
+                        offer(entry_id, SCORE_FUZZY * best, "fuzzy")
+
+        ranked = sorted(scored.items(), key=lambda kv: (-kv[1][0], data.entries[kv[0]]["name"]))
+        return [self._result(data, entry_id, score, match) for entry_id, (score, match) in ranked[:limit]]
+
+    def get_stats(self) -> dict:
+        data = self._data
+        return {
+            "built": self._built,
+            "listing_loaded": self._listing_loaded,
+            "symbols": len(data.entries),
+            "keys": len(data.exact),
+            "trigrams": len(data.grams),
+        }
+
+
+# 전역 인스턴스 (최초 조회 시 지연 구축)
+symbol_index = SymbolSearchIndex()
@@ -122,21 +122,11 @@ def check_scheduler_heartbeats():
                 print(f"[Watchdog] 오토힐링 발동! {module_name} 봇 강제 부활 시도...")
                 send_admin_alert(f"🤖 {module_name} 봇", f"15분 이상 응답이 없어 오토 힐링(자가치유)을 발동하여 봇을 강제 재가동 시킵니다!")
                 
-                # 순환 참조 방지를 위해 지연 임포트
-                import scheduler
-                import scheduler_service
-                import asyncio
-                import threading
-                
-                if module_name == "Auto_Blog_Bot":
-                    asyncio.create_task(scheduler.auto_blog_scheduler_loop())
-                elif module_name == "Hourly_Briefing":
-                    asyncio.create_task(scheduler.hourly_briefing_scheduler_loop())
-                elif module_name == "Disclosure_Monitor":
-                    asyncio.create_task(scheduler.disclosure_scheduler_loop())
-                elif module_name == "Main_Alert_Scheduler":
-                    # 메인 알림 스케줄러는 일반 Thread 방식임
-                    threading.Thread(target=scheduler_service.start_scheduler, daemon=True).start()
+                if module_name == "Job_Scheduler":
+                    # 모든 주기 작업은 통합 스케줄러 하나가 구동 → 스케줄러 루프만 재기동
+                    # (순환 참조 방지를 위해 지연 임포트)
+                    from job_scheduler import job_scheduler
+                    job_scheduler.restart()
             else:
                 send_admin_alert(f"🤖 {module_name} 스케줄러", "15분 이상 생존 신고(Heartbeat)가 없습니다. 루프가 다운(Crash)되었거나 멈췄습니다.")
             
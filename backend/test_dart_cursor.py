@@ -0,0 +1,104 @@
+import sys
+import os
+import tempfile
+
+# Add backend directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+# 실제 DB/키 대신 임시 SQLite + 더미 키 (import 전에 설정)
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "dart_cursor_test.db")
+os.environ.setdefault("DART_API_KEY", "test-key")
+
+import dart_api_client as dart_module
+import scheduler
+from dart_api_client import DartApiClient
+from scheduler import claim_new_disclosures, get_disclosure_high_water
+
+# processed_ids 이전 시 save_state 가 저장소의 disclosure_state.json 을 덮어쓰지 않도록
+scheduler.STATE_FILE = os.path.join(os.path.dirname(os.environ["DB_PATH"]), "disclosure_state.json")
+
+TODAY = dart_module.datetime.now().strftime("%Y%m%d")
+
+
+def rno(n):
+    """접수번호: 오늘 날짜 + 6자리 일련번호"""
+    return f"{TODAY}{n:06d}"
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+def fake_list_api(newest, oldest, fail_pages=()):
+    """newest..oldest 접수번호를 최신순 100건씩 돌려주는 list.json 흉내 (fail_pages 는 타임아웃)"""
+    numbers = list(range(newest, oldest - 1, -1))
+    total_page = (len(numbers) + 99) // 100
+    calls = []
+
+    def get(url, params=None, timeout=None):
+        page_no = int(params["page_no"])
+        calls.append(page_no)
+        if page_no in fail_pages:
+            raise TimeoutError("read timed out")
+        chunk = numbers[(page_no - 1) * 100:page_no * 100]
+        return FakeResponse({
+            "status": "000",
+            "total_page": total_page,
+            "list": [{"rcept_no": rno(n), "corp_name": f"corp{n}", "stock_code": "005930"} for n in chunk],
+        })
+
+    return get, calls
+
+
+def _client(get):
+    dart_module.requests.get = get
+    client = DartApiClient()
+    client.api_key = "test-key"
+    return client
+
+
+def test_page_error_keeps_mark():
+    # mark=50, 신규 51~300 (3페이지). 2페이지 실패 → 1페이지만 반환하면 51~200 영구 누락
+    get, calls = fake_list_api(300, 1, fail_pages={2})
+    assert _client(get).get_disclosures_since(rno(50)) is None
+    assert calls == [1, 2]
+
+
+def test_pages_until_mark():
+    # 1,000건 넘게 밀려 있어도 mark 가 나오는 페이지까지 조회
+    get, calls = fake_list_api(1300, 1)
+    reports = _client(get).get_disclosures_since(rno(50))
+    assert calls == list(range(1, 14))
+    assert {rno(n) for n in range(51, 1301)} <= {r["rcept_no"] for r in reports}
+
+
+def test_no_mark_first_page_only():
+    get, calls = fake_list_api(300, 1)
+    reports = _client(get).get_disclosures_since(None)
+    assert calls == [1] and len(reports) == 100
+
+
+def test_claim_and_high_water():
+    # 같은 공시는 한 번만 claim, MAX(rcept_no) 가 다음 조회 mark
+    state = {"processed_ids": [rno(1), rno(2)]}
+    assert get_disclosure_high_water(state) == rno(2)
+    assert "processed_ids" not in state
+
+    items = [{"rcept_no": rno(n), "stock_code": "005930"} for n in (5, 3, 2, 4, 3)]
+    assert [i["rcept_no"] for i in claim_new_disclosures(items)] == [rno(3), rno(4), rno(5)]
+    assert claim_new_disclosures(items) == []
+    assert get_disclosure_high_water({}) == rno(5)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS: {name}")
@@ -0,0 +1,104 @@
+import sys
+import os
+import json
+import tempfile
+
+# Add backend directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+import numpy as np
+
+from fundamentals_snapshot import evaluate, FundamentalsSnapshot
+
+COLS = {
+    "code": np.array(["005930", "000660", "035720", "068270"]),
+    "name": np.array(["삼성전자", "SK하이닉스", "카카오", "셀트리온"]),
+    "market": np.array(["KOSPI", "KOSPI", "KOSPI", "KOSDAQ"]),
+    "per": np.array([12.0, 8.0, np.nan, 40.0]),
+    "pbr": np.array([1.2, 0.9, 2.0, 3.5]),
+    "roe": np.array([9.0, 15.0, -2.0, 7.0]),
+}
+
+
+def _raises_value_error(expr):
+    try:
+        evaluate(expr, COLS)
+    except ValueError as e:
+        return str(e)
+    raise AssertionError(f"expected ValueError for {expr!r}")
+
+
+def test_rejected_nodes():
+    # 허용 문법 밖: 임의 함수 호출, 속성 접근, 첨자, 람다, 컴프리헨션, in 비교, 거듭제곱
+    for expr in [
+        "__import__('os').system('true')",
+        "len(name)",
+        "per.__class__",
+        "per[0]",
+        "(lambda: 1)()",
+        "[x for x in per]",
+        "market in ('KOSPI',)",
+        "per ** 2",
+        "abs(per, roe)",
+    ]:
+        _raises_value_error(expr)
+
+
+def test_syntax_error():
+    assert "invalid expression" in _raises_value_error("per <")
+
+
+def test_unknown_column():
+    assert "unknown column: eps" in _raises_value_error("eps > 1")
+    assert "unknown column: eps" in _raises_value_error("per > 1 and abs(eps) < 3")
+
+
+def test_type_mismatch_is_value_error():
+    # numpy UFuncTypeError(TypeError) 는 ValueError 로 바뀌어야 라우트에서 걸러짐
+    assert "type mismatch" in _raises_value_error("name > 5")
+    assert "type mismatch" in _raises_value_error("market + 1")
+
+
+def test_bool_precedence():
+    per, pbr, roe = COLS["per"], COLS["pbr"], COLS["roe"]
+    with np.errstate(invalid="ignore"):
+        # not > and > or (파이썬과 같은 우선순위)
+        expected = (~(per > 10)) | ((pbr < 1) & (roe > 10))
+        assert evaluate("not per > 10 or pbr < 1 and roe > 10", COLS).tolist() == expected.tolist()
+        expected = ((per > 10) | (pbr < 1)) & (roe > 5)
+        assert evaluate("(per > 10 or pbr < 1) and roe > 5", COLS).tolist() == expected.tolist()
+        expected = ~((per > 10) & (roe > 5))
+        assert evaluate("not (per > 10 and roe > 5)", COLS).tolist() == expected.tolist()
+
+
+def test_chained_compare_and_nan():
+    # NaN 은 비교식에서 항상 제외
+    assert evaluate("5 < per <= 12", COLS).tolist() == [True, True, False, False]
+    assert evaluate("market == 'KOSDAQ' and -roe < 0", COLS).tolist() == [False, False, False, True]
+
+
+def test_screen_sort_and_filters():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.npz")
+        np.savez_compressed(path, __meta__=np.array(json.dumps({"rows": 4})), **COLS)
+        snapshot = FundamentalsSnapshot(path)
+
+        rows = snapshot.screen(where="market == 'KOSPI'", sort="-per", columns=["code", "per"])
+        assert [r["code"] for r in rows] == ["000660", "005930", "035720"]
+        assert rows[-1]["per"] is None
+
+        assert snapshot.count(filters={"roe": {"min": 0, "max": 10}}) == 2
+        try:
+            snapshot.count(filters={"name": 5})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError for numeric bound on text column")
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"PASS: {name}")
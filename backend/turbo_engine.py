@@ -1,10 +1,12 @@
 ﻿import time
 import asyncio
-from typing import Dict, Any, List, Callable
-import pandas as pd
-import numpy as np
+from typing import TYPE_CHECKING, Dict, Any, List, Callable
 import logging
 from functools import wraps
+from metrics import count_cache
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # 터보 엔진 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -22,20 +24,34 @@ class TurboEngine:
         self.cache_ttl = 300 
         logger.info("🚀 Turbo Engine Initialized - High Performance Mode")
 
-    def get_cache(self, key: str, allow_expired: bool = False):
-        """저장된 유효 캐시가 있으면 즉시 반환 (조회 속도 0ms 목표). allow_expired=True일 경우 만료된 캐시도 반환"""
+    def get_cache(self, key: str, allow_expired: bool = False, namespace: str = "direct"):
+        """저장된 유효 캐시가 있으면 즉시 반환 (조회 속도 0ms 목표). allow_expired=True일 경우 만료된 캐시도 반환
+        namespace: 메트릭(turbo_cache_requests_total) 집계 단위 (turbo_cache 데코레이터는 함수명)"""
         if key in self._cache:
             entry = self._cache[key]
             # 시간 만료 여부 확인
             ttl = entry.get('ttl', self.cache_ttl)
             if time.time() - entry['timestamp'] < ttl:
-                logger.info(f"⚡ [Cache Hit] {key} - Turbo mode activated (0ms)")
+                count_cache(namespace, "hit")
+                logger.debug(f"⚡ [Cache Hit] {key} - Turbo mode activated (0ms)")
                 return entry['data']
             elif allow_expired:
+                count_cache(namespace, "stale")
                 logger.info(f"⚡ [Cache Hit (Stale)] {key} - Using expired cache as fallback (stale)")
                 return entry['data']
             else:
+                count_cache(namespace, "expired")
                 logger.info(f"⌛ [Cache Expired] {key} - Refreshing data (kept for fallback)...")
+                return None
+        count_cache(namespace, "miss")
+        return None
+
+    def get_entry(self, key: str, namespace: str = "direct"):
+        """유효한 캐시 엔트리(dict) 자체를 반환 (http_cache가 직렬화 결과/ETag를 엔트리에 함께 보관). miss는 집계하지 않음"""
+        entry = self._cache.get(key)
+        if entry is not None and time.time() - entry['timestamp'] < entry.get('ttl', self.cache_ttl):
+            count_cache(namespace, "hit")
+            return entry
         return None
 
     def set_cache(self, key: str, data: Any, ttl: int = None):
@@ -45,7 +61,7 @@ class TurboEngine:
             'timestamp': time.time(),
             'ttl': ttl if ttl is not None else self.cache_ttl
         }
-        logger.info(f"💾 [Cache Set] {key} - Optimized for speed")
+        logger.debug(f"💾 [Cache Set] {key} - Optimized for speed")
 
     def clear_cache(self):
         """캐시 전체 삭제 (시스템 유지보수용)"""
@@ -67,11 +83,12 @@ class TurboEngine:
                 valid_results.append(res)
         return valid_results
 
-    def calculate_momentum_score(self, price_series: pd.Series):
+    def calculate_momentum_score(self, price_series: "pd.Series"):
         """
         [Turbo Score] 초고속 모멘텀 연산 (NumPy 기반)
         대량의 가격 데이터를 퀀트 전용 로직으로 계산하여 가장 유망한 종목을 선정합니다.
         """
+        import numpy as np  # [Lazy] 캐시 용도로만 import하는 라우터들이 numpy/pandas를 끌어오지 않도록
         if price_series.empty or len(price_series) < 20: return 0
         
         # NumPy 벡터 연산으로 속도 극대화
@@ -85,76 +102,24 @@ class TurboEngine:
         score = (momentum / (volatility + 1e-9)) * 100
         return float(np.round(score, 2))
 
-    async def scan_with_filters(self, filters: Dict[str, Any]):
+    async def scan_with_filters(self, filters: Dict[str, Any], where: str = None, limit: int = 100):
         """
         [Turbo Filter] 복합 지표 기반 고속 필터링 스캐너
         사용자가 지정한 전략 필터(F-Score, PER 등)를 시장 전체 종목에 적용합니다.
+        야간에 만든 전 종목 스냅샷(fundamentals_snapshot) 위에서 배열 마스크로 평가 → 외부 호출 없음
         """
-        logger.info(f"🔍 [Turbo Filter] Scanning with: {filters}")
-        
-        # 1단계: 기본 정보 로드 (실제 구현 시 DB나 캐시에서 상위 N개 가져오기)
-        # 여기서는 예시를 위해 korea_data 등에서 가져오는 것으로 가정
-        # (실제 서비스에서는 미리 연산된 지표 테이블을 활용)
-        from korea_data import get_all_stock_codes
-        symbols = get_all_stock_codes()[:100] # 성능상 100개로 제한 (테스트용)
-        
-        results = []
-        
-        # 2단계: 각 종목별 지표 체크 (병렬 처리 권장이나 여기선 로직 집중)
-        # 실제로는 get_financial_summary 등의 데이터를 활용
-        from korea_data import get_financial_summary
-        
-        async def check_stock(symbol_info):
-            symbol = symbol_info['symbol']
-            name = symbol_info['name']
-            
-            # 재무 데이터 가져오기 (캐시 활용)
-            summary = get_financial_summary(symbol)
-            if not summary: return None
-            
-            # 필터 조건 검증 로직
-            match = True
-            
-            # 1. F-Score 필터
-            if "f_score" in filters:
-                target_f = filters["f_score"]
-                current_f = summary.get("f_score", 0)
-                if current_f < target_f: match = False
-                
-            # 2. PER 필터
-            if match and "per" in filters:
-                per_filter = filters["per"]
-                current_per = summary.get("per", 999)
-                if "max" in per_filter and current_per > per_filter["max"]: match = False
-                if "min" in per_filter and current_per < per_filter["min"]: match = False
-                
-            # 3. 배당수익률 필터 (dividend_yield)
-            if match and "dividend_yield" in filters:
-                div_filter = filters["dividend_yield"]
-                current_div = summary.get("dividend_yield", 0)
-                if "min" in div_filter and current_div < div_filter["min"]: match = False
-
-            if match:
-                return {
-                    "symbol": symbol,
-                    "name": name,
-                    "price": summary.get("price", 0),
-                    "change": summary.get("change", 0),
-                    "change_percent": summary.get("change_percent", "0%"),
-                    "f_score": summary.get("f_score", 0),
-                    "per": summary.get("per", 0),
-                    "dividend_yield": summary.get("dividend_yield", 0)
-                }
-            return None
-
-        # 병렬 실행
-        tasks = [check_stock(s) for s in symbols]
-        scan_results = await asyncio.gather(*tasks)
-        results = [r for r in scan_results if r]
-        
-        # F-Score 및 점수순 정렬
-        results.sort(key=lambda x: (x['f_score'], -x['per']), reverse=True)
-        
+        logger.info(f"🔍 [Turbo Filter] Scanning with: {filters} {where or ''}")
+        from fundamentals_snapshot import fundamentals_snapshot
+
+        # F-Score 높은 순 → PER 낮은 순
+        results = await asyncio.to_thread(
+            fundamentals_snapshot.screen,
+            where=where, filters=filters, sort=["f_score", "-per"], limit=limit,
+            columns=["code", "name", "market", "price", "change_pct", "f_score", "per", "pbr", "dividend_yield"],
+        )
+        for r in results:
+            r["symbol"] = r["code"]
+
         logger.info(f"✅ [Turbo Filter] Found {len(results)} matches")
         return results
 
@@ -164,6 +129,10 @@ turbo_engine = TurboEngine()
 # [Global] Cache Versioning to force invalidation
 CACHE_VERSION = "v15"
 
+def make_cache_key(func_name: str, args, kwargs) -> str:
+    key_parts = [CACHE_VERSION, func_name] + [str(a) for a in args] + [f"{k}={v}" for k, v in sorted(kwargs.items())]
+    return ":".join(key_parts)
+
 def turbo_cache(ttl_seconds: int = 300):
     """
     터보 엔진 기반 캐싱 데코레이터.
@@ -172,10 +141,9 @@ def turbo_cache(ttl_seconds: int = 300):
     def decorator(func):
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            key_parts = [CACHE_VERSION, func.__name__] + [str(a) for a in args] + [f"{k}={v}" for k, v in sorted(kwargs.items())]
-            cache_key = ":".join(key_parts)
+            cache_key = make_cache_key(func.__name__, args, kwargs)
             
-            cached_data = turbo_engine.get_cache(cache_key)
+            cached_data = turbo_engine.get_cache(cache_key, namespace=func.__name__)
             if cached_data is not None:
                 return cached_data
                 
@@ -194,7 +162,7 @@ def turbo_cache(ttl_seconds: int = 300):
                     return result
             
             # API 조회가 실패하거나 예외가 났을 때 만료된 기존 캐시 복구 시도
-            stale_data = turbo_engine.get_cache(cache_key, allow_expired=True)
+            stale_data = turbo_engine.get_cache(cache_key, allow_expired=True, namespace=func.__name__)
             if stale_data is not None:
                 logger.warning(f"⚠️ [Stale Fallback] Recovered stale data for async {func.__name__}")
                 return stale_data
@@ -202,10 +170,9 @@ def turbo_cache(ttl_seconds: int = 300):
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            key_parts = [CACHE_VERSION, func.__name__] + [str(a) for a in args] + [f"{k}={v}" for k, v in sorted(kwargs.items())]
-            cache_key = ":".join(key_parts)
+            cache_key = make_cache_key(func.__name__, args, kwargs)
             
-            cached_data = turbo_engine.get_cache(cache_key)
+            cached_data = turbo_engine.get_cache(cache_key, namespace=func.__name__)
             if cached_data is not None:
                 return cached_data
                 
@@ -224,7 +191,7 @@ def turbo_cache(ttl_seconds: int = 300):
                     return result
                     
             # API 조회가 실패하거나 예외가 났을 때 만료된 기존 캐시 복구 시도
-            stale_data = turbo_engine.get_cache(cache_key, allow_expired=True)
+            stale_data = turbo_engine.get_cache(cache_key, allow_expired=True, namespace=func.__name__)
             if stale_data is not None:
                 logger.warning(f"⚠️ [Stale Fallback] Recovered stale data for sync {func.__name__}")
                 return stale_data
@@ -236,3 +203,80 @@ def turbo_cache(ttl_seconds: int = 300):
             return sync_wrapper
 
     return decorator
+
+
+def http_cache(ttl_seconds: int, stale_while_revalidate: int = None, private: bool = False):
+    """
+    turbo_cache 위에 얹는 라우트 전용 응답 캐시 (조건부 GET).
+
+        @router.get("/rank/themes")
+        @http_cache(ttl_seconds=60)
+        @turbo_cache(ttl_seconds=60)
+        def read_theme_rank(): ...
+
+    - 캐시 엔트리별로 직렬화 바이트 + 강한 ETag를 한 번만 만들어 엔트리에 같이 보관
+      (turbo_cache가 값을 새로 채우면 엔트리가 교체되므로 자동 무효화)
+    - If-None-Match 일치 → 304 (본문/직렬화 없음)
+    - Cache-Control: max-age=남은 TTL, stale-while-revalidate (기본 TTL과 동일)
+    - private=True: 사용자별 응답 (헤더 값이 캐시 키에 포함되는 경우)
+    """
+    import hashlib
+    import inspect
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+    swr = ttl_seconds if stale_while_revalidate is None else stale_while_revalidate
+    scope = "private" if private else "public"
+
+    def _render(entry: dict) -> tuple:
+        rendered = entry.get('rendered')
+        if rendered is None:
+            from response_encoding import dumps
+            body = dumps(entry['data'])
+            # 약한 ETag: 압축 미들웨어가 200 응답에 붙이는 W/ 와 304 응답의 검증자를 같게 유지
+            etag = 'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+            rendered = entry['rendered'] = (body, etag)
+        return rendered
+
+    def _etag_matches(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        if header.strip() == "*":
+            return True
+        # 약한 비교 (클라이언트가 강한 형태로 보내도 일치로 간주)
+        opaque = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+    def decorator(func):
+        namespace = func.__name__
+
+        @wraps(func)
+        async def wrapper(*args, request: Request, **kwargs):
+            cache_key = make_cache_key(func.__name__, args, kwargs)
+            entry = turbo_engine.get_entry(cache_key, namespace=namespace)
+            if entry is None:
+                if asyncio.iscoroutinefunction(func):
+                    result = await func(*args, **kwargs)
+                else:
+                    result = await asyncio.to_thread(func, *args, **kwargs)
+                entry = turbo_engine._cache.get(cache_key)
+                if entry is None or entry['data'] is not result:
+                    # 캐시되지 않은 결과 (오류 응답 등) → 평소대로 반환
+                    return result
+
+            body, etag = _render(entry)
+            remaining = max(0, int(entry['ttl'] - (time.time() - entry['timestamp'])))
+            headers = {"ETag": etag, "Cache-Control": f"{scope}, max-age={remaining}, stale-while-revalidate={swr}"}
+            if _etag_matches(request, etag):
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        # FastAPI가 원래 파라미터 + Request를 주입하도록 시그니처 노출
+        sig = inspect.signature(func)
+        params = [p for p in sig.parameters.values() if p.name != "request"]
+        params.append(inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+        wrapper.__signature__ = sig.replace(parameters=params)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,53 @@
+"""
+🌐 외부 업스트림 기본 URL (환경변수로 교체 가능)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+부하 테스트 시 실서버(네이버/DART/SEC)로 트래픽이 나가 IP가 차단되지 않도록
+모든 호출 기본 URL을 이 모듈에서 읽습니다. (사용자에게 보여주는 링크/Referer는 실서버 주소 유지)
+
+📌 우선순위: 개별 환경변수 (예: NAVER_FINANCE_URL) > UPSTREAM_MOCK_URL + 경로 접두사 > 실서버
+📌 로컬 모의 서버와 함께:
+    python upstream_mock_server.py --port 18090
+    UPSTREAM_MOCK_URL=http://127.0.0.1:18090 uvicorn main:app
+⚠️ import 시점에 한 번 읽으므로 변경 시 프로세스 재시작 필요
+"""
+
+import os
+
+UPSTREAM_MOCK_URL = os.getenv("UPSTREAM_MOCK_URL", "").rstrip("/")
+
+# 환경변수 이름 -> (실서버 기본값, 모의 서버 경로 접두사)
+UPSTREAMS = {
+    "NAVER_FINANCE_URL": ("https://finance.naver.com", "/naver-finance"),
+    "NAVER_POLLING_URL": ("https://polling.finance.naver.com", "/naver-polling"),
+    "NAVER_API_FINANCE_URL": ("https://api.finance.naver.com", "/naver-api-finance"),
+    "NAVER_MOBILE_STOCK_URL": ("https://m.stock.naver.com", "/naver-m-stock"),
+    "NAVER_STOCK_URL": ("https://stock.naver.com", "/naver-stock"),
+    "NAVER_STOCK_API_URL": ("https://api.stock.naver.com", "/naver-stock-api"),
+    "NAVER_OPENAPI_URL": ("https://openapi.naver.com", "/naver-openapi"),
+    "OPENDART_URL": ("https://opendart.fss.or.kr", "/opendart"),
+    "SEC_URL": ("https://www.sec.gov", "/sec"),
+    "SEC_DATA_URL": ("https://data.sec.gov", "/sec-data"),
+}
+
+
+def upstream_url(name: str) -> str:
+    default, prefix = UPSTREAMS[name]
+    explicit = os.getenv(name, "").rstrip("/")
+    if explicit:
+        return explicit
+    if UPSTREAM_MOCK_URL:
+        return UPSTREAM_MOCK_URL + prefix
+    return default
+
+
+NAVER_FINANCE_URL = upstream_url("NAVER_FINANCE_URL")
+NAVER_POLLING_URL = upstream_url("NAVER_POLLING_URL")
+NAVER_API_FINANCE_URL = upstream_url("NAVER_API_FINANCE_URL")
+NAVER_MOBILE_STOCK_URL = upstream_url("NAVER_MOBILE_STOCK_URL")
+NAVER_STOCK_URL = upstream_url("NAVER_STOCK_URL")
+NAVER_STOCK_API_URL = upstream_url("NAVER_STOCK_API_URL")
+NAVER_OPENAPI_URL = upstream_url("NAVER_OPENAPI_URL")
+OPENDART_URL = upstream_url("OPENDART_URL")
+SEC_URL = upstream_url("SEC_URL")
+SEC_DATA_URL = upstream_url("SEC_DATA_URL")
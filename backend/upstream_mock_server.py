@@ -0,0 +1,799 @@
+"""
+🧪 로컬 업스트림 모의 서버 (네이버 금융 / Naver Open API / OpenDART / SEC EDGAR)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+알림·뉴스·랭킹 파이프라인 부하 테스트용. 실서버로 트래픽을 보내지 않고(운영 IP 차단 방지)
+korea_data / rank_data / stock_data.fetch_batch_realtime_prices / batch_news_system /
+dart_api_client / sec_api_client가 호출하는 엔드포인트를 같은 스키마의 합성 데이터로 응답합니다.
+
+사용법:
+    python upstream_mock_server.py --port 18090 --universe 2000 --latency 20-80 --error-rate 0.01 --rate-limit 50
+    UPSTREAM_MOCK_URL=http://127.0.0.1:18090 uvicorn main:app       # 호스트별 경로는 upstream_hosts.py
+
+    # 코드에서 직접 사용
+    server = UpstreamMockServer(port=18090, universe=500)
+    await server.start()
+    ...
+    print(server.stats)      # {"/naver-polling/api/realtime/domestic/stock/{codes}": {"requests": 120, ...}}
+    await server.stop()
+
+📌 조절 항목 (실행 중 변경: POST /__mock/config {"latency": "200", "error_rate": 0.1})
+  - latency         : "0" | "50" | "20-80" (ms, 균등분포)
+  - slow_rate/slow_ms : 일부 요청만 slow_ms 지연 (타임아웃 경로 재현)
+  - error_rate      : 5xx 응답 비율
+  - rate_limit      : 호스트(경로 접두사)별 초당 허용 요청 수. 초과 시 실서버와 같은 방식으로 거절
+                      (네이버 429 / SEC 403 / OpenDART 200 + status "020")
+  - universe        : 국내 종목 수 (stock_names의 실제 종목코드 사용, 시세는 조회마다 랜덤워크)
+  - dart_per_minute : 분당 신규 공시 수 (rcept_no 단조 증가 → 증분 폴링 검증용)
+📌 GET /__mock/stats : 경로별 요청/오류/제한 횟수
+⚠️ 종목 상세 화면 스크래핑(item/main.naver 등)은 미구현 → 404 (각 모듈의 기존 폴백 경로로 진행)
+"""
+
+import argparse
+import asyncio
+import datetime
+import hashlib
+import json
+import logging
+import random
+import time
+from email.utils import format_datetime
+from functools import partial
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger("UpstreamMock")
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+SECTORS = ["반도체와반도체장비", "자동차", "화학", "제약", "소프트웨어", "은행", "건설", "조선", "철강", "게임엔터테인먼트",
+           "화장품", "전기장비", "항공사", "식품", "디스플레이장비및부품"]
+THEMES = ["2차전지(소재/부품)", "AI 반도체", "로봇(산업용/협동로봇 등)", "방위산업/전쟁 및 테러", "원자력발전",
+          "바이오시밀러", "자율주행차", "게임", "K-뷰티", "우주항공산업", "HBM(고대역폭메모리)", "전선", "조선기자재", "밸류업"]
+PRESSES = [("001", "연합뉴스", "yna.co.kr"), ("015", "한국경제", "hankyung.com"), ("009", "매일경제", "mk.co.kr"),
+           ("008", "머니투데이", "mt.co.kr"), ("018", "이데일리", "edaily.co.kr"), ("014", "파이낸셜뉴스", "fnnews.com")]
+NEWS_TEMPLATES = ["{name}, {q}분기 영업이익 시장 예상치 상회", "{name} 외국인 순매수 {n}일째", "{name}, 신규 공급계약 체결 공시",
+                  "증권가 \"{name} 목표가 상향\"", "{name} 주가 장중 {pct}% 급등", "{name}, 자사주 소각 결정",
+                  "[특징주] {name} 거래량 급증", "{name} 신사업 진출 기대감에 강세"]
+DART_REPORTS = ["임원ㆍ주요주주특정증권등소유상황보고서", "주식등의대량보유상황보고서(일반)", "단일판매ㆍ공급계약체결",
+                "주요사항보고서(유상증자결정)", "자기주식취득결정", "연결재무제표기준영업(잠정)실적(공정공시)",
+                "결산실적공시예고", "타법인주식및출자증권취득결정", "주요사항보고서(전환사채권발행결정)", "현금ㆍ현물배당결정"]
+US_COMPANIES = [("AAPL", 320193, "Apple Inc.", 228.0), ("MSFT", 789019, "MICROSOFT CORP", 430.0),
+                ("NVDA", 1045810, "NVIDIA CORP", 135.0), ("AMZN", 1018724, "AMAZON COM INC", 190.0),
+                ("GOOGL", 1652044, "Alphabet Inc.", 170.0), ("META", 1326801, "Meta Platforms, Inc.", 560.0),
+                ("TSLA", 1318605, "Tesla, Inc.", 250.0), ("AMD", 2488, "ADVANCED MICRO DEVICES INC", 160.0),
+                ("INTC", 50863, "INTEL CORP", 22.0), ("NFLX", 1065280, "NETFLIX INC", 700.0),
+                ("AVGO", 1730168, "Broadcom Inc.", 170.0), ("PLTR", 1321655, "Palantir Technologies Inc.", 40.0)]
+INDICES = {"KOSPI": ("코스피", 2600.0), "KOSDAQ": ("코스닥", 760.0), "KPI200": ("코스피 200", 350.0),
+           ".INX": ("S&P 500", 5800.0), ".IXIC": ("나스닥 종합", 18400.0), ".DJI": ("다우존스", 42000.0),
+           "FX_USDKRW": ("미국 USD", 1380.0), "FX_JPYKRW": ("일본 JPY", 920.0)}
+
+
+def _fmt(value: float, digits: int = 0) -> str:
+    return f"{value:,.{digits}f}"
+
+
+def _signed(value: float, digits: int = 2) -> str:
+    return f"{value:+,.{digits}f}"
+
+
+def _direction(diff: float) -> dict:
+    if diff > 0:
+        return {"code": "2", "text": "상승", "name": "RISING"}
+    if diff < 0:
+        return {"code": "5", "text": "하락", "name": "FALLING"}
+    return {"code": "3", "text": "보합", "name": "UNCHANGED"}
+
+
+def _stable_rng(*parts) -> random.Random:
+    """같은 입력이면 같은 합성 데이터 (프로세스 간에도 동일)"""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, "big"))
+
+
+class UpstreamMockServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 18090, universe: int = 500, latency: str = "0",
+                 error_rate: float = 0.0, rate_limit: float = 0, slow_rate: float = 0.0, slow_ms: float = 3000,
+                 dart_per_minute: float = 6, seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.config = {
+            "latency": str(latency), "error_rate": float(error_rate), "rate_limit": float(rate_limit),
+            "slow_rate": float(slow_rate), "slow_ms": float(slow_ms), "dart_per_minute": float(dart_per_minute),
+        }
+        self.rng = random.Random(seed)
+        self.stocks = self._build_universe(universe)
+        self.by_code = {s["code"]: s for s in self.stocks}
+        self.indices = {code: {"name": name, "prev": base, "price": base} for code, (name, base) in INDICES.items()}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.filings: List[dict] = []       # 최신순이 아닌 접수순 (rcept_no 오름차순)
+        self._dart_seq = 0
+        self._dart_clock = time.time()
+        self._buckets: Dict[str, list] = {}  # 경로 접두사 -> [남은 토큰, 마지막 충전 시각]
+        self._started_at = time.time()
+        self.runner = None
+        self._seed_filings(200)
+
+    # ─── 서버 수명 ─────────────────────────────────────────────────────────
+    async def start(self):
+        app = web.Application(middlewares=[self._chaos])
+        self._add_routes(app.router)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        logger.info(f"[UpstreamMock] Listening on http://{self.host}:{self.port} ({len(self.stocks)} stocks)")
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def _add_routes(self, router):
+        get = router.add_get
+        get("/__mock/stats", self.handle_stats)
+        get("/__mock/config", self.handle_config)
+        router.add_post("/__mock/config", self.handle_config)
+        # finance.naver.com (EUC-KR HTML)
+        for page in ("sise_quant", "sise_rise", "sise_fall", "sise_market_sum"):
+            get(f"/naver-finance/sise/{page}.naver", partial(self.handle_sise_rank, page))
+        get("/naver-finance/sise/sise_deal_rank_iframe.naver", self.handle_deal_rank)
+        get("/naver-finance/sise/sise_group.naver", self.handle_group_list)
+        get("/naver-finance/sise/theme.naver", self.handle_group_list)
+        get("/naver-finance/sise/sise_group_detail.naver", self.handle_group_detail)
+        get("/naver-finance/news/mainnews.naver", self.handle_main_news)
+        get("/naver-finance/news/news_list.naver", self.handle_news_list)
+        # polling.finance.naver.com
+        get("/naver-polling/api/realtime/domestic/stock/{codes}", self.handle_polling_domestic)
+        get("/naver-polling/api/realtime", self.handle_polling_service_item)
+        # m.stock.naver.com / api.stock.naver.com
+        get("/naver-m-stock/api/stock/{code}/basic", self.handle_stock_basic)
+        get("/naver-stock-api/stock/{code}/basic", self.handle_stock_basic)
+        get("/naver-m-stock/api/stock/{code}/integration", self.handle_stock_integration)
+        get("/naver-m-stock/api/stock/{code}/trend", self.handle_stock_trend)
+        get("/naver-m-stock/api/news/stock/{code}", self.handle_stock_news)
+        get("/naver-m-stock/api/index/{code}/basic", self.handle_index_basic)
+        get("/naver-m-stock/api/exchange/{code}/basic", self.handle_index_basic)
+        get("/naver-m-stock/front-api/market/popularStock", self.handle_popular_stock)
+        # stock.naver.com
+        get("/naver-stock/api/domestic/market/stock/default", self.handle_domestic_market)
+        get("/naver-stock/api/domestic/market/searchTop", self.handle_search_top)
+        # openapi.naver.com
+        get("/naver-openapi/v1/search/news.json", self.handle_openapi_news)
+        # opendart.fss.or.kr
+        get("/opendart/api/list.json", self.handle_dart_list)
+        get("/opendart/api/elestock.json", self.handle_dart_elestock)
+        get("/opendart/api/majorstock.json", self.handle_dart_majorstock)
+        get("/opendart/api/fnlttSinglAcnt.json", self.handle_dart_financials)
+        # www.sec.gov / data.sec.gov
+        get("/sec/files/company_tickers.json", self.handle_sec_tickers)
+        get("/sec-data/submissions/CIK{cik}.json", self.handle_sec_submissions)
+        get("/sec-data/api/xbrl/companyfacts/CIK{cik}.json", self.handle_sec_facts)
+
+    # ─── 지연 / 오류 / 속도 제한 ───────────────────────────────────────────
+    def _delay(self) -> float:
+        cfg = self.config
+        if cfg["slow_rate"] and self.rng.random() < cfg["slow_rate"]:
+            return cfg["slow_ms"] / 1000
+        spec = cfg["latency"] or "0"
+        if "-" in spec:
+            low, high = (float(x) for x in spec.split("-", 1))
+            return self.rng.uniform(low, high) / 1000
+        return float(spec) / 1000
+
+    def _take_token(self, prefix: str) -> bool:
+        limit = self.config["rate_limit"]
+        if limit <= 0:
+            return True
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(prefix, [limit, now])
+        bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * limit)
+        bucket[1] = now
+        if bucket[0] < 1:
+            return False
+        bucket[0] -= 1
+        return True
+
+    @staticmethod
+    def _rate_limited(prefix: str) -> web.Response:
+        if prefix == "/opendart":
+            return web.json_response({"status": "020", "message": "요청 제한을 초과하였습니다."})
+        if prefix.startswith("/sec"):
+            return web.Response(status=403, text="Request Rate Threshold Exceeded")
+        if prefix == "/naver-openapi":
+            return web.json_response({"errorMessage": "Rate limit exceeded. (속도 제한을 초과했습니다.)",
+                                      "errorCode": "012"}, status=429)
+        return web.Response(status=429, text="Too Many Requests")
+
+    @web.middleware
+    async def _chaos(self, request: web.Request, handler):
+        if request.path.startswith("/__mock"):
+            return await handler(request)
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else "(unmatched)"
+        stat = self.stats.setdefault(route, {"requests": 0, "errors": 0, "limited": 0})
+        stat["requests"] += 1
+
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        prefix = "/" + request.path.split("/", 2)[1]
+        if not self._take_token(prefix):
+            stat["limited"] += 1
+            return self._rate_limited(prefix)
+        if self.config["error_rate"] and self.rng.random() < self.config["error_rate"]:
+            stat["errors"] += 1
+            status = self.rng.choice((500, 502, 503))
+            return web.Response(status=status, text=f"mock upstream error {status}")
+        return await handler(request)
+
+    async def handle_stats(self, request):
+        return web.json_response({
+            "uptime_s": round(time.time() - self._started_at, 1), "config": self.config,
+            "stocks": len(self.stocks), "filings": len(self.filings),
+            "total": sum(s["requests"] for s in self.stats.values()), "routes": self.stats,
+        })
+
+    async def handle_config(self, request):
+        if request.method == "POST":
+            changes = await request.json()
+            for key, value in changes.items():
+                if key in self.config:
+                    self.config[key] = str(value) if key == "latency" else float(value)
+        return web.json_response(self.config)
+
+    # ─── 합성 시세 ─────────────────────────────────────────────────────────
+    def _build_universe(self, size: int) -> List[dict]:
+        try:
+            from stock_names import STOCK_MAP
+            listed = [(code, name) for name, code in STOCK_MAP.items() if isinstance(code, str) and code.isdigit() and len(code) == 6]
+        except ImportError:
+            listed = []
+        seen, pairs = set(), []
+        for code, name in listed:
+            if code not in seen:
+                seen.add(code)
+                pairs.append((code, name))
+        # 실제 종목 수보다 크게 요청하면 합성 코드로 채움
+        pairs += [(f"{900000 + i:06d}", f"모의종목{i:04d}") for i in range(max(0, size - len(pairs)))]
+
+        stocks = []
+        for i, (code, name) in enumerate(pairs[:size]):
+            prev = float(self.rng.choice([1000, 5000, 10000, 30000, 70000, 150000]) * self.rng.uniform(0.5, 1.5))
+            prev = round(prev, -1 if prev < 50000 else -2)
+            stocks.append({
+                "code": code, "name": name, "market": "KOSDAQ" if i % 3 == 2 else "KOSPI",
+                "prev": prev, "price": prev, "open": prev, "high": prev, "low": prev,
+                "volume": self.rng.randint(10_000, 3_000_000), "shares": self.rng.randint(5, 600) * 1_000_000,
+                "sector": i % len(SECTORS), "theme": (i * 7) % len(THEMES),
+            })
+        return stocks
+
+    def _tick(self, stock: dict) -> dict:
+        """조회마다 랜덤워크 (상하한 ±30%, 10원 단위)"""
+        price = stock["price"] * (1 + self.rng.gauss(0, 0.004))
+        price = min(stock["prev"] * 1.3, max(stock["prev"] * 0.7, price))
+        stock["price"] = max(10.0, round(price, -1))
+        stock["high"] = max(stock["high"], stock["price"])
+        stock["low"] = min(stock["low"], stock["price"])
+        stock["volume"] += self.rng.randint(0, 20_000)
+        return stock
+
+    @staticmethod
+    def _change(stock: dict):
+        diff = stock["price"] - stock["prev"]
+        return diff, diff / stock["prev"] * 100 if stock["prev"] else 0.0
+
+    def _market(self, sosok: str) -> List[dict]:
+        market = "KOSDAQ" if sosok in ("1", "02") else "KOSPI"
+        return [s for s in self.stocks if s["market"] == market]
+
+    # ─── 응답 헬퍼 ─────────────────────────────────────────────────────────
+    @staticmethod
+    def _html(body: str) -> web.Response:
+        page = f"<html><head><meta http-equiv=\"Content-Type\" content=\"text/html; charset=euc-kr\"></head><body>{body}</body></html>"
+        return web.Response(body=page.encode("cp949", errors="replace"), content_type="text/html", charset="euc-kr")
+
+    @staticmethod
+    def _json(data, status: int = 200) -> web.Response:
+        return web.json_response(data, status=status, dumps=partial(json.dumps, ensure_ascii=False))
+
+    def _rate_cells(self, stock: dict) -> str:
+        diff, pct = self._change(stock)
+        word, color = ("상승", "red02") if diff > 0 else (("하락", "nv01") if diff < 0 else ("보합", ""))
+        return (f'<td class="number"><em class="bu_p"><span class="blind">{word}</span></em>'
+                f'<span class="tah p11 {color}">{_fmt(abs(diff))}</span></td>'
+                f'<td class="number"><span class="tah p11 {color}">{_signed(pct)}%</span></td>')
+
+    # ─── finance.naver.com ─────────────────────────────────────────────────
+    async def handle_sise_rank(self, page: str, request):
+        stocks = self._market(request.query.get("sosok", "0"))
+        for s in stocks:
+            self._tick(s)
+        if page == "sise_rise":
+            stocks = sorted(stocks, key=lambda s: -self._change(s)[1])
+        elif page == "sise_fall":
+            stocks = sorted(stocks, key=lambda s: self._change(s)[1])
+        elif page == "sise_market_sum":
+            stocks = sorted(stocks, key=lambda s: -s["price"] * s["shares"])
+        else:
+            stocks = sorted(stocks, key=lambda s: -s["volume"])
+        rows = []
+        for rank, s in enumerate(stocks[:100], 1):
+            rows.append(
+                f'<tr><td class="no">{rank}</td>'
+                f'<td><a href="/item/main.naver?code={s["code"]}" class="tltle">{s["name"]}</a></td>'
+                f'<td class="number">{_fmt(s["price"])}</td>{self._rate_cells(s)}'
+                f'<td class="number">{_fmt(s["volume"])}</td>'
+                f'<td class="number">{_fmt(s["price"] * s["volume"] / 1_000_000)}</td>'
+                f'<td class="number">{_fmt(s["price"] * s["shares"] / 100_000_000)}</td>'
+                f'<td class="number">{self.rng.uniform(3, 40):.2f}</td><td class="number">{self.rng.uniform(-5, 25):.2f}</td></tr>'
+            )
+        head = "".join(f"<th>{h}</th>" for h in ("N", "종목명", "현재가", "전일비", "등락률", "거래량", "거래대금", "시가총액", "PER", "ROE"))
+        return self._html(f'<table class="type_2"><thead><tr>{head}</tr></thead><tbody>{"".join(rows)}</tbody></table>')
+
+    async def handle_deal_rank(self, request):
+        # 분 단위로 같은 표본 → 외국인/기관 목록이 일부 겹쳐야 쌍끌이 집계가 의미 있음
+        minute = int(time.time() // 60)
+        stocks = self._market(request.query.get("sosok", "01"))
+        rng = _stable_rng("deal", minute, request.query.get("sosok"), request.query.get("investor_gubun"))
+        picked = rng.sample(stocks[:120], min(40, len(stocks[:120])))
+        rows = "".join(
+            f'<tr><td class="title"><a href="/item/main.naver?code={s["code"]}">{s["name"]}</a></td>'
+            f'<td class="number">{_fmt(rng.randint(1, 500) * 1000)}</td><td class="number">{_fmt(rng.randint(1, 900))}</td></tr>'
+            for s in picked
+        )
+        return self._html(f'<table class="type_1"><tr><th>종목명</th><th>수량</th><th>금액</th></tr>{rows}</table>')
+
+    def _groups(self, kind: str):
+        names = THEMES if kind == "theme" else SECTORS
+        key = "theme" if kind == "theme" else "sector"
+        groups = []
+        for no, name in enumerate(names, 1):
+            members = [s for s in self.stocks if s[key] == no - 1]
+            avg = sum(self._change(s)[1] for s in members) / len(members) if members else 0.0
+            groups.append((no, name, avg, members))
+        return groups
+
+    async def handle_group_list(self, request):
+        kind = "theme" if request.path.endswith("theme.naver") else "upjong"
+        rows = []
+        for no, name, avg, _members in sorted(self._groups(kind), key=lambda g: -g[2]):
+            color = "red01" if avg >= 0 else "nv01"
+            rows.append(f'<tr><td class="col_type1"><a href="/sise/sise_group_detail.naver?type={kind}&no={no}">{name}</a></td>'
+                        f'<td class="number col_type2"><span class="tah p11 {color}">{_signed(avg)}%</span></td></tr>')
+        return self._html(f'<table class="type_1"><tr><th>{"테마명" if kind == "theme" else "업종명"}</th><th>전일대비</th></tr>{"".join(rows)}</table>')
+
+    async def handle_group_detail(self, request):
+        kind = request.query.get("type", "upjong")
+        no = int(request.query.get("no", "1") or 1)
+        groups = {g[0]: g for g in self._groups(kind)}
+        if no not in groups:
+            return self._html('<table class="type_5"></table>')
+        rows = []
+        for s in sorted(groups[no][3], key=lambda s: -self._change(s)[1])[:30]:
+            self._tick(s)
+            # 테마 상세는 종목명 다음에 편입 사유 열이 하나 더 있음 (등락률 index 4)
+            reason = '<td class="info_txt">편입 사유</td>' if kind == "theme" else ""
+            rows.append(f'<tr><td class="name"><a href="/item/main.naver?code={s["code"]}">{s["name"]}</a></td>{reason}'
+                        f'<td class="number">{_fmt(s["price"])}</td>{self._rate_cells(s)}<td class="number">{_fmt(s["volume"])}</td></tr>')
+        return self._html(f'<table class="type_5"><tr><th>종목명</th><th>현재가</th></tr>{"".join(rows)}</table>')
+
+    def _headlines(self, seed, count: int):
+        """분 단위로 조금씩 바뀌는 헤드라인 (중복 제거 로직 검증용으로 앞부분은 유지)"""
+        minute = int(time.time() // 60)
+        items = []
+        for i in range(count):
+            rng = _stable_rng("news", seed, minute - i // 3, i % 3)
+            stock = rng.choice(self.stocks)
+            office_id, press, domain = rng.choice(PRESSES)
+            title = rng.choice(NEWS_TEMPLATES).format(name=stock["name"], q=rng.randint(1, 4), n=rng.randint(2, 9),
+                                                      pct=rng.randint(5, 29))
+            published = datetime.datetime.now(KST) - datetime.timedelta(minutes=i * 3 + rng.randint(0, 2))
+            items.append({"stock": stock, "office_id": office_id, "press": press, "domain": domain, "title": title,
+                          "article_id": f"00{rng.randint(10_000_000, 99_999_999)}", "published": published})
+        return items
+
+    async def handle_main_news(self, request):
+        rows = "".join(
+            f'<dd class="articleSubject"><a href="/news/news_read.naver?article_id={n["article_id"]}&office_id={n["office_id"]}">{n["title"]}</a></dd>'
+            f'<dd class="articleSummary">요약 <span class="press">{n["press"]}</span></dd>'
+            for n in self._headlines("main", 20)
+        )
+        return self._html(f'<div class="mainNewsList"><dl class="articleList">{rows}</dl></div>')
+
+    async def handle_news_list(self, request):
+        rows = "".join(
+            f'<li><dl><dd class="articleSubject"><a href="/news/news_read.naver?article_id={n["article_id"]}&office_id={n["office_id"]}" '
+            f'title="[공시] {n["stock"]["name"]}, {DART_REPORTS[i % len(DART_REPORTS)]}">[공시] {n["stock"]["name"]}, {DART_REPORTS[i % len(DART_REPORTS)]}</a></dd>'
+            f'<dd class="articleSummary">요약<span class="press">{n["press"]}</span>'
+            f'<span class="wdate">{n["published"]:%Y-%m-%d %H:%M}</span></dd></dl></li>'
+            for i, n in enumerate(self._headlines("list", 20))
+        )
+        return self._html(f'<ul class="realtimeNewsList newsList">{rows}</ul>')
+
+    # ─── polling.finance.naver.com ─────────────────────────────────────────
+    def _polling_item(self, stock: dict) -> dict:
+        self._tick(stock)
+        diff, pct = self._change(stock)
+        return {
+            "itemCode": stock["code"], "stockName": stock["name"], "closePrice": _fmt(stock["price"]),
+            "prevClosePrice": _fmt(stock["prev"]), "compareToPreviousClosePrice": _fmt(diff),
+            "compareToPreviousPrice": _direction(diff), "fluctuationsRatio": f"{pct:.2f}",
+            "openPrice": _fmt(stock["open"]), "highPrice": _fmt(stock["high"]), "lowPrice": _fmt(stock["low"]),
+            "accumulatedTradingVolume": _fmt(stock["volume"]), "marketStatus": "OPEN",
+            "localTradedAt": datetime.datetime.now(KST).isoformat(timespec="seconds"),
+        }
+
+    async def handle_polling_domestic(self, request):
+        codes = [c for c in request.match_info["codes"].split(",") if c]
+        datas = [self._polling_item(self.by_code[c]) for c in codes if c in self.by_code]
+        return self._json({"pollingInterval": 7000, "datas": datas, "time": datetime.datetime.now(KST).strftime("%Y%m%d%H%M%S")})
+
+    async def handle_polling_service_item(self, request):
+        query = request.query.get("query", "")
+        codes = query.split(":", 1)[1].split(",") if ":" in query else []
+        datas = []
+        for code in codes:
+            s = self.by_code.get(code)
+            if not s:
+                continue
+            self._tick(s)
+            diff, pct = self._change(s)
+            datas.append({"cd": code, "nm": s["name"], "sv": s["prev"], "nv": s["price"], "cv": abs(diff), "cr": round(pct, 2),
+                          "rf": _direction(diff)["code"], "mt": "1" if s["market"] == "KOSPI" else "2", "ms": "OPEN",
+                          "pcv": s["prev"], "ov": s["open"], "hv": s["high"], "lv": s["low"],
+                          "ul": round(s["prev"] * 1.3, -1), "ll": round(s["prev"] * 0.7, -1),
+                          "aq": s["volume"], "aa": int(s["price"] * s["volume"])})
+        return self._json({"resultCode": "success", "result": {"pollingInterval": 7000, "time": int(time.time() * 1000),
+                                                               "areas": [{"name": "SERVICE_ITEM", "datas": datas}]}})
+
+    # ─── m.stock.naver.com / api.stock.naver.com ──────────────────────────
+    def _stock_or_404(self, code: str):
+        stock = self.by_code.get(code.split(".")[0])
+        if stock is None:
+            raise web.HTTPNotFound(text=json.dumps({"code": "StockNotFound", "message": f"{code} not found"}),
+                                   content_type="application/json")
+        return stock
+
+    def _basic(self, stock: dict) -> dict:
+        self._tick(stock)
+        diff, pct = self._change(stock)
+        return {
+            "stockEndType": "stock", "itemCode": stock["code"], "reutersCode": stock["code"], "stockName": stock["name"],
+            "sosok": "0" if stock["market"] == "KOSPI" else "1", "closePrice": _fmt(stock["price"]),
+            "compareToPreviousClosePrice": _fmt(diff), "compareToPreviousPrice": _direction(diff),
+            "fluctuationsRatio": f"{pct:.2f}", "marketStatus": "OPEN",
+            "localTradedAt": datetime.datetime.now(KST).isoformat(timespec="seconds"),
+            "stockExchangeType": {"code": "KS" if stock["market"] == "KOSPI" else "KQ", "nameEng": stock["market"]},
+        }
+
+    async def handle_stock_basic(self, request):
+        return self._json(self._basic(self._stock_or_404(request.match_info["code"])))
+
+    async def handle_stock_integration(self, request):
+        stock = self._stock_or_404(request.match_info["code"])
+        market_value_m = int(stock["price"] * stock["shares"] / 1_000_000)   # 백만원 단위
+        return self._json({
+            "itemCode": stock["code"], "stockName": stock["name"], "marketValue": _fmt(market_value_m),
+            "totalInfos": [{"code": "marketValue", "key": "시총", "value": f"{market_value_m // 100:,}억"},
+                           {"code": "per", "key": "PER", "value": f"{_stable_rng('per', stock['code']).uniform(4, 40):.2f}배"}],
+        })
+
+    async def handle_stock_trend(self, request):
+        stock = self._stock_or_404(request.match_info["code"])
+        size = min(int(request.query.get("pageSize", "10") or 10), 120)
+        rows, day, price = [], datetime.datetime.now(KST).date(), stock["prev"]
+        while len(rows) < size:
+            if day.weekday() < 5:
+                rng = _stable_rng("trend", stock["code"], day)
+                change = rng.gauss(0, 0.02)
+                foreign, organ = rng.randint(-300_000, 300_000), rng.randint(-200_000, 200_000)
+                rows.append({"itemCode": stock["code"], "bizdate": day.strftime("%Y%m%d"), "closePrice": _fmt(price),
+                             "compareToPreviousClosePrice": _fmt(abs(price * change)), "compareToPreviousPrice": _direction(change),
+                             "foreignerPureBuyQuant": f"{foreign:+,}", "organPureBuyQuant": f"{organ:+,}",
+                             "individualPureBuyQuant": f"{-(foreign + organ):+,}", "foreignerHoldRatio": f"{rng.uniform(5, 55):.2f}%",
+                             "accumulatedTradingVolume": _fmt(rng.randint(10_000, 5_000_000))})
+                price = round(price / (1 + change), -1)
+            day -= datetime.timedelta(days=1)
+        return self._json(rows)
+
+    async def handle_stock_news(self, request):
+        stock = self._stock_or_404(request.match_info["code"])
+        size = min(int(request.query.get("pageSize", "20") or 20), 100)
+        sections = []
+        for n in self._headlines(stock["code"], size):
+            sections.append({"total": 1, "items": [{
+                "id": f"{n['office_id']}{n['article_id']}", "officeId": n["office_id"], "articleId": n["article_id"],
+                "officeName": n["press"], "datetime": n["published"].strftime("%Y%m%d%H%M"), "type": 1,
+                "title": n["title"].replace(n["stock"]["name"], stock["name"]), "body": f"{stock['name']} 관련 기사 본문 요약",
+                "mobileNewsUrl": f"https://n.news.naver.com/mnews/article/{n['office_id']}/{n['article_id']}",
+            }]})
+        return self._json(sections)
+
+    async def handle_index_basic(self, request):
+        code = request.match_info["code"]
+        index = self.indices.get(code)
+        if index is None:
+            raise web.HTTPNotFound()
+        index["price"] = index["prev"] * (1 + self.rng.gauss(0, 0.002))
+        diff = index["price"] - index["prev"]
+        return self._json({"stockEndType": "index", "itemCode": code, "stockName": index["name"],
+                           "closePrice": _fmt(index["price"], 2), "compareToPreviousClosePrice": _fmt(diff, 2),
+                           "compareToPreviousPrice": _direction(diff), "fluctuationsRatio": f"{diff / index['prev'] * 100:.2f}"})
+
+    async def handle_popular_stock(self, request):
+        top = sorted(self.stocks[:200], key=lambda s: -s["volume"])[:20]
+        result = []
+        for s in top:
+            basic = self._basic(s)
+            result.append({**basic, "priceInfo": {k: basic[k] for k in ("closePrice", "compareToPreviousClosePrice", "fluctuationsRatio")}})
+        return self._json({"isSuccess": True, "detailCode": "", "message": "", "result": result})
+
+    # ─── stock.naver.com ───────────────────────────────────────────────────
+    async def handle_domestic_market(self, request):
+        order = request.query.get("orderType", "quantTop")
+        start = int(request.query.get("startIdx", "0") or 0)
+        size = min(int(request.query.get("pageSize", "15") or 15), 100)
+        key = {"quantTop": lambda s: -s["volume"], "priceTop": lambda s: -s["volume"] * s["price"]}.get(
+            order, lambda s: -s["price"] * s["shares"])
+        items = []
+        for s in sorted(self.stocks, key=key)[start:start + size]:
+            self._tick(s)
+            diff, pct = self._change(s)
+            items.append({"itemcode": s["code"], "itemname": s["name"], "nowPrice": _fmt(s["price"]),
+                          "prevChangePrice": _fmt(abs(diff)), "prevChangeRate": f"{pct:.2f}", "upDownGb": int(_direction(diff)["code"]),
+                          "tradeVolume": s["volume"], "tradeAmount": int(s["volume"] * s["price"] / 1_000_000),
+                          "marketValue": int(s["price"] * s["shares"] / 100_000_000)})
+        return self._json(items)
+
+    async def handle_search_top(self, request):
+        size = min(int(request.query.get("pageSize", "15") or 15), 100)
+        minute = int(time.time() // 60)
+        picked = _stable_rng("search", minute).sample(self.stocks[:300], min(size, len(self.stocks[:300])))
+        return self._json([{"reutersCode": s["code"], "itemCode": s["code"], "sumCount": 10_000 - i * 300, "rank": i + 1}
+                           for i, s in enumerate(picked)])
+
+    # ─── openapi.naver.com (뉴스 검색) ─────────────────────────────────────
+    async def handle_openapi_news(self, request):
+        if not request.headers.get("X-Naver-Client-Id") or not request.headers.get("X-Naver-Client-Secret"):
+            return self._json({"errorMessage": "Not Exist Client ID : Authentication failed. (인증에 실패했습니다.)",
+                               "errorCode": "024"}, status=401)
+        query = request.query.get("query", "")
+        display = max(1, min(int(request.query.get("display", "10") or 10), 100))
+        start = max(1, int(request.query.get("start", "1") or 1))
+        label = query.strip('"') or "증시"
+        items = []
+        for n in self._headlines(f"q:{query}", start - 1 + display)[start - 1:]:
+            title = n["title"].replace(n["stock"]["name"], f"<b>{label}</b>")
+            items.append({
+                "title": title, "originallink": f"https://www.{n['domain']}/news/{n['article_id']}",
+                "link": f"https://n.news.naver.com/mnews/article/{n['office_id']}/{n['article_id']}",
+                "description": f"{title} 관련 &quot;시장 반응&quot; 요약", "pubDate": format_datetime(n["published"]),
+            })
+        return self._json({"lastBuildDate": format_datetime(datetime.datetime.now(KST)), "total": 1000,
+                           "start": start, "display": len(items), "items": items})
+
+    # ─── opendart.fss.or.kr ────────────────────────────────────────────────
+    def _corp_code(self, stock: dict) -> str:
+        return f"00{stock['code']}"
+
+    def _new_filing(self, when: datetime.datetime) -> dict:
+        self._dart_seq += 1
+        stock = self.rng.choice(self.stocks)
+        report = self.rng.choice(DART_REPORTS)
+        if report == "결산실적공시예고":
+            report += f" ({(when + datetime.timedelta(days=self.rng.randint(3, 20))):%Y.%m.%d})"
+        return {"corp_code": self._corp_code(stock), "corp_name": stock["name"], "stock_code": stock["code"],
+                "corp_cls": "Y" if stock["market"] == "KOSPI" else "K", "report_nm": report,
+                "rcept_no": f"{when:%Y%m%d}{self._dart_seq:06d}", "flr_nm": stock["name"] if self.rng.random() < 0.7 else "국민연금공단",
+                "rcept_dt": f"{when:%Y%m%d}", "rm": self.rng.choice(["", "유", "코", "정"])}
+
+    def _seed_filings(self, count: int):
+        now = datetime.datetime.now(KST)
+        for i in range(count, 0, -1):
+            self.filings.append(self._new_filing(now - datetime.timedelta(hours=i * 3.6)))
+
+    def _advance_filings(self):
+        """마지막 조회 이후 경과 시간만큼 신규 공시 접수"""
+        per_sec = self.config["dart_per_minute"] / 60
+        now = time.time()
+        due = int((now - self._dart_clock) * per_sec)
+        if due > 0:
+            stamp = datetime.datetime.now(KST)
+            for _ in range(min(due, 500)):
+                self.filings.append(self._new_filing(stamp))
+            self._dart_clock += due / per_sec
+
+    @staticmethod
+    def _dart_key_error(request):
+        if not request.query.get("crtfc_key"):
+            return web.json_response({"status": "010", "message": "등록되지 않은 키입니다."})
+        return None
+
+    async def handle_dart_list(self, request):
+        error = self._dart_key_error(request)
+        if error:
+            return error
+        self._advance_filings()
+        q = request.query
+        bgn, end, corp = q.get("bgn_de", "00000000"), q.get("end_de", "99999999"), q.get("corp_code")
+        rows = [f for f in reversed(self.filings) if bgn <= f["rcept_dt"] <= end and (not corp or f["corp_code"] == corp)]
+        page_no = max(1, int(q.get("page_no", "1") or 1))
+        page_count = max(1, min(int(q.get("page_count", "10") or 10), 100))
+        page = rows[(page_no - 1) * page_count: page_no * page_count]
+        if not page:
+            return self._json({"status": "013", "message": "조회된 데이타가 없습니다."})
+        return self._json({"status": "000", "message": "정상", "page_no": page_no, "page_count": page_count,
+                           "total_count": len(rows), "total_page": -(-len(rows) // page_count), "list": page})
+
+    def _corp_filings(self, corp_code: str) -> List[dict]:
+        return [f for f in self.filings if f["corp_code"] == corp_code]
+
+    async def handle_dart_elestock(self, request):
+        error = self._dart_key_error(request)
+        if error:
+            return error
+        corp = request.query.get("corp_code", "")
+        items = []
+        for f in self._corp_filings(corp):
+            rng = _stable_rng("elestock", f["rcept_no"])
+            delta = rng.randint(-50_000, 50_000)
+            held = rng.randint(10_000, 5_000_000)
+            items.append({"rcept_no": f["rcept_no"], "rcept_dt": f["rcept_dt"], "corp_code": corp, "corp_name": f["corp_name"],
+                          "repror": rng.choice(["김철수", "이영희", "박민준", "최지우"]), "isu_exctv_rgist_at": "등기임원",
+                          "isu_exctv_ofcps": rng.choice(["대표이사", "사내이사", "전무", "상무"]), "isu_main_shrholdr": "-",
+                          "sp_stock_lmp_cnt": _fmt(held), "sp_stock_lmp_irds_cnt": f"{delta:+,}",
+                          "sp_stock_lmp_rate": f"{held / 1e8:.2f}", "sp_stock_lmp_irds_rate": f"{delta / 1e8:.2f}"})
+        if not items:
+            return self._json({"status": "013", "message": "조회된 데이타가 없습니다."})
+        return self._json({"status": "000", "message": "정상", "list": items})
+
+    async def handle_dart_majorstock(self, request):
+        error = self._dart_key_error(request)
+        if error:
+            return error
+        corp = request.query.get("corp_code", "")
+        items = []
+        for f in self._corp_filings(corp):
+            rng = _stable_rng("majorstock", f["rcept_no"])
+            qty, delta = rng.randint(1_000_000, 50_000_000), rng.randint(-2_000_000, 2_000_000)
+            items.append({"rcept_no": f["rcept_no"], "rcept_dt": f["rcept_dt"], "corp_code": corp, "corp_name": f["corp_name"],
+                          "report_tp": "일반", "repror": rng.choice(["국민연금공단", "BlackRock Fund Advisors", "삼성자산운용"]),
+                          "stkqy": _fmt(qty), "stkqy_irds": _fmt(delta), "stkrt": f"{rng.uniform(5, 15):.2f}",
+                          "stkrt_irds": f"{delta / 1e7:.2f}", "ctr_stkqy": _fmt(qty), "ctr_stkrt": f"{rng.uniform(5, 15):.2f}",
+                          "report_resn": rng.choice(["단순투자", "일반투자", "경영참가"])})
+        if not items:
+            return self._json({"status": "013", "message": "조회된 데이타가 없습니다."})
+        return self._json({"status": "000", "message": "정상", "list": items})
+
+    async def handle_dart_financials(self, request):
+        error = self._dart_key_error(request)
+        if error:
+            return error
+        q = request.query
+        corp, year, reprt = q.get("corp_code", ""), q.get("bsns_year", "2025"), q.get("reprt_code", "11011")
+        rng = _stable_rng("fin", corp, year, reprt)
+        revenue = rng.randint(1_000, 3_000_000) * 100_000_000
+        operating = int(revenue * rng.uniform(-0.05, 0.25))
+        net = int(operating * rng.uniform(0.5, 0.9))
+        assets = int(revenue * rng.uniform(0.8, 2.5))
+        liabilities = int(assets * rng.uniform(0.2, 0.7))
+        accounts = [("IS", "손익계산서", "매출액", revenue), ("IS", "손익계산서", "영업이익", operating),
+                    ("IS", "손익계산서", "법인세차감전 순이익", int(operating * 0.95)), ("IS", "손익계산서", "당기순이익", net),
+                    ("BS", "재무상태표", "자산총계", assets), ("BS", "재무상태표", "부채총계", liabilities),
+                    ("BS", "재무상태표", "자본총계", assets - liabilities)]
+        items = []
+        for fs_div, fs_nm in (("CFS", "연결재무제표"), ("OFS", "재무제표")):
+            scale = 1.0 if fs_div == "CFS" else 0.8
+            for order, (sj_div, sj_nm, name, amount) in enumerate(accounts, 1):
+                items.append({"rcept_no": f"{year}0314{order:06d}", "reprt_code": reprt, "bsns_year": year, "corp_code": corp,
+                              "stock_code": corp[2:], "fs_div": fs_div, "fs_nm": fs_nm, "sj_div": sj_div, "sj_nm": sj_nm,
+                              "account_nm": name, "thstrm_nm": f"제 {int(year) - 1969} 기", "thstrm_dt": f"{year}.12.31",
+                              "thstrm_amount": _fmt(amount * scale), "frmtrm_amount": _fmt(amount * scale * 0.92),
+                              "bfefrmtrm_amount": _fmt(amount * scale * 0.85), "ord": str(order), "currency": "KRW"})
+        return self._json({"status": "000", "message": "정상", "list": items})
+
+    # ─── www.sec.gov / data.sec.gov ────────────────────────────────────────
+    def _sec_company(self, cik: str):
+        cik_int = int(cik)
+        for ticker, c, name, price in US_COMPANIES:
+            if c == cik_int:
+                return ticker, name, price
+        raise web.HTTPNotFound(text="Not Found")
+
+    @staticmethod
+    def _sec_user_agent_error(request):
+        # SEC는 User-Agent 미기재 요청을 403으로 거절
+        if not request.headers.get("User-Agent"):
+            return web.Response(status=403, text="Undeclared Automated Tool")
+        return None
+
+    async def handle_sec_tickers(self, request):
+        error = self._sec_user_agent_error(request)
+        if error:
+            return error
+        return self._json({str(i): {"cik_str": cik, "ticker": ticker, "title": name}
+                           for i, (ticker, cik, name, _price) in enumerate(US_COMPANIES)})
+
+    async def handle_sec_submissions(self, request):
+        error = self._sec_user_agent_error(request)
+        if error:
+            return error
+        cik = request.match_info["cik"]
+        ticker, name, _price = self._sec_company(cik)
+        rng = _stable_rng("sec", cik, datetime.date.today())
+        today = datetime.date.today()
+        recent = {"accessionNumber": [], "filingDate": [], "reportDate": [], "form": [], "primaryDocument": []}
+        for i in range(40):
+            form = rng.choice(["4", "4", "4", "8-K", "10-Q", "SC 13G/A", "144", "10-K"])
+            filed = today - datetime.timedelta(days=i * 2 + rng.randint(0, 1))
+            recent["accessionNumber"].append(f"{int(cik):010d}-{filed:%y}-{rng.randint(1, 999_999):06d}")
+            recent["filingDate"].append(filed.isoformat())
+            recent["reportDate"].append((filed - datetime.timedelta(days=2)).isoformat())
+            recent["form"].append(form)
+            recent["primaryDocument"].append("xslF345X05/wk-form4.xml" if form == "4" else f"{ticker.lower()}-{filed:%Y%m%d}.htm")
+        return self._json({"cik": str(int(cik)), "entityType": "operating", "name": name, "tickers": [ticker],
+                           "exchanges": ["Nasdaq"], "filings": {"recent": recent, "files": []}})
+
+    async def handle_sec_facts(self, request):
+        error = self._sec_user_agent_error(request)
+        if error:
+            return error
+        cik = request.match_info["cik"]
+        _ticker, name, price = self._sec_company(cik)
+        rng = _stable_rng("facts", cik)
+        revenue = rng.randint(10, 400) * 1_000_000_000
+        this_year = datetime.date.today().year
+
+        def series(base: float, unit: str = "USD", growth: float = 0.08):
+            rows = []
+            for k, fy in enumerate(range(this_year - 5, this_year)):
+                val = base * (1 + growth) ** k
+                rows.append({"end": f"{fy}-12-31", "val": round(val, 2) if unit != "USD" else int(val), "fy": fy, "fp": "FY",
+                             "form": "10-K", "filed": f"{fy + 1}-02-15", "frame": f"CY{fy}"})
+                rows.append({"end": f"{fy}-09-30", "val": int(val / 4) if unit == "USD" else round(val / 4, 2), "fy": fy,
+                             "fp": "Q3", "form": "10-Q", "filed": f"{fy}-11-01"})
+            return {"label": "", "units": {unit: rows}}
+
+        assets = revenue * rng.uniform(1.0, 2.5)
+        facts = {
+            "Revenues": series(revenue), "OperatingIncomeLoss": series(revenue * 0.25),
+            "NetIncomeLoss": series(revenue * 0.2), "Assets": series(assets, growth=0.05),
+            "Liabilities": series(assets * 0.55, growth=0.04), "StockholdersEquity": series(assets * 0.45, growth=0.06),
+            "EarningsPerShareBasic": series(price / 30, unit="USD/shares"),
+        }
+        return self._json({"cik": int(cik), "entityName": name, "facts": {"us-gaap": facts}})
+
+
+async def _main(args):
+    server = UpstreamMockServer(args.host, args.port, universe=args.universe, latency=args.latency,
+                                error_rate=args.error_rate, rate_limit=args.rate_limit, slow_rate=args.slow_rate,
+                                slow_ms=args.slow_ms, dart_per_minute=args.dart_per_minute, seed=args.seed)
+    await server.start()
+    print(f"[UpstreamMock] export UPSTREAM_MOCK_URL=http://{args.host}:{args.port}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            total = sum(s["requests"] for s in server.stats.values())
+            limited = sum(s["limited"] for s in server.stats.values())
+            errors = sum(s["errors"] for s in server.stats.values())
+            print(f"[UpstreamMock] requests={total} limited={limited} errors={errors} filings={len(server.filings)}")
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock upstream server (Naver / OpenDART / SEC)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18090)
+    parser.add_argument("--universe", type=int, default=500, help="domestic symbol count")
+    parser.add_argument("--latency", default="0", help='ms: "0" | "50" | "20-80"')
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests delayed by --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=3000)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 5xx responses")
+    parser.add_argument("--rate-limit", type=float, default=0, help="requests/sec per upstream host (0 = unlimited)")
+    parser.add_argument("--dart-per-minute", type=float, default=6, help="new DART filings per minute")
+    parser.add_argument("--seed", type=int, default=None)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,342 @@
+"""
+🎞️ 외부 HTTP 호출 기록/재생 (오프라인 벤치마크 · 결정적 재현용)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+네이버/DART/yfinance 등을 매번 실시간으로 호출해서 성능 변화를 측정할 수 없던 문제 해결용.
+(debug_*.py / diag_*.py / simulate_v*.py 일회성 스크립트 대체)
+
+📌 모드 (UPSTREAM_MODE)
+  - record : 실제로 호출하고 응답을 fixture 디렉터리에 저장
+  - replay : fixture만으로 응답 (없으면 ConnectionError → 기존 오류 처리 경로를 그대로 탐)
+  - auto   : fixture가 있으면 재생, 없으면 호출 후 저장
+  - off    : 설치하지 않음 (기본값)
+
+📌 대상: requests.Session / aiohttp.ClientSession / curl_cffi.requests.Session (yfinance)
+📌 키: METHOD + 정규화 URL(쿼리 정렬, UPSTREAM_IGNORE_PARAMS 제외) + 요청 본문 해시
+   → fixtures/upstream/<host>/<hash>.json (본문은 디코딩된 바이트를 base64로 저장)
+📌 지연 주입 (UPSTREAM_LATENCY_MS): "0" | "50" | "20-80"(균등분포, UPSTREAM_LATENCY_SEED) | "recorded"
+
+사용 예:
+    UPSTREAM_MODE=record python bench_suite.py -k upstream     # 한 번 녹화
+    UPSTREAM_MODE=replay UPSTREAM_LATENCY_MS=recorded python bench_suite.py
+
+    from upstream_replay import replaying
+    with replaying(latency="30"):
+        gather_naver_stock_data("005930")
+"""
+
+import asyncio
+import base64
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES_DIR = os.path.join(BASE_DIR, "fixtures", "upstream")
+MODES = ("off", "record", "replay", "auto")
+
+# 캐시 무효화용으로 매번 바뀌는 쿼리 파라미터 (키에서 제외)
+IGNORED_PARAMS = {p.strip() for p in os.getenv("UPSTREAM_IGNORE_PARAMS", "_,t,ts,timestamp,nocache,callback").split(",") if p.strip()}
+# 재생 시 의미 없는 헤더 (본문은 이미 디코딩된 상태로 저장)
+DROPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "set-cookie", "connection"}
+
+
+class FixtureMissing(Exception):
+    pass
+
+
+def fixture_key(method: str, url: str, body: Optional[bytes] = None) -> str:
+    parts = urlsplit(str(url))
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in IGNORED_PARAMS)
+    normalized = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+    digest = hashlib.sha1(f"{method.upper()} {normalized}".encode("utf-8"))
+    if body:
+        digest.update(body if isinstance(body, bytes) else str(body).encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def _with_params(url, params) -> str:
+    """params= 인자를 URL에 합쳐 키를 계산 (실제 호출 인자는 그대로 전달)"""
+    url = str(url)
+    if not params:
+        return url
+    items = params.items() if hasattr(params, "items") else params
+    sep = "&" if "?" in url else "?"
+    return f"{url}{sep}{urlencode(sorted((str(k), str(v)) for k, v in items))}"
+
+
+def _body_bytes(data=None, json_body=None) -> Optional[bytes]:
+    if json_body is not None:
+        return json.dumps(json_body, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    if data is None:
+        return None
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, dict):
+        return urlencode(sorted(data.items())).encode("utf-8")
+    return str(data).encode("utf-8")
+
+
+class UpstreamReplay:
+    def __init__(self):
+        self.mode = "off"
+        self.fixtures_dir = DEFAULT_FIXTURES_DIR
+        self.latency = "0"
+        self._rng = random.Random(int(os.getenv("UPSTREAM_LATENCY_SEED", "0")))
+        self._originals: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.stats = {"replayed": 0, "recorded": 0, "missing": 0}
+
+    # ─── fixture 저장소 ─────────────────────────────────────────────────────
+    def _path(self, url: str, key: str) -> str:
+        host = urlsplit(str(url)).hostname or "unknown"
+        return os.path.join(self.fixtures_dir, host, f"{key}.json")
+
+    def load(self, method: str, url: str, body: Optional[bytes] = None) -> Optional[dict]:
+        path = self._path(url, fixture_key(method, url, body))
+        try:
+            with open(path, encoding="utf-8") as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            return None
+        fixture["body"] = base64.b64decode(fixture.pop("body_b64", ""))
+        return fixture
+
+    def save(self, method: str, url: str, body: Optional[bytes], status: int, headers, content: bytes, elapsed: float):
+        path = self._path(url, fixture_key(method, url, body))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fixture = {
+            "method": method.upper(),
+            "url": str(url),
+            "status": status,
+            "headers": {k: v for k, v in dict(headers).items() if k.lower() not in DROPPED_HEADERS},
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "recorded_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "body_b64": base64.b64encode(content or b"").decode("ascii"),
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+        with self._lock:
+            self.stats["recorded"] += 1
+
+    def _delay(self, fixture: dict) -> float:
+        spec = str(self.latency or "0")
+        if spec == "recorded":
+            return fixture.get("elapsed_ms", 0) / 1000
+        if "-" in spec:
+            low, high = (float(x) for x in spec.split("-", 1))
+            with self._lock:
+                return self._rng.uniform(low, high) / 1000
+        return float(spec) / 1000
+
+    def _lookup(self, method: str, url: str, body: Optional[bytes]) -> Optional[dict]:
+        """재생 대상이면 fixture 반환, 실제 호출이 필요하면 None. replay 모드에서 없으면 FixtureMissing"""
+        if self.mode == "record":
+            return None
+        fixture = self.load(method, url, body)
+        with self._lock:
+            self.stats["replayed" if fixture else "missing"] += 1
+        if fixture is None and self.mode == "replay":
+            raise FixtureMissing(f"No fixture for {method.upper()} {url} (record with UPSTREAM_MODE=record)")
+        return fixture
+
+    # ─── 설치 / 해제 ────────────────────────────────────────────────────────
+    def install(self, mode: Optional[str] = None, fixtures_dir: Optional[str] = None, latency: Optional[str] = None):
+        self.mode = (mode or os.getenv("UPSTREAM_MODE", "off")).lower()
+        if self.mode not in MODES:
+            raise ValueError(f"UPSTREAM_MODE must be one of {MODES}")
+        self.fixtures_dir = fixtures_dir or os.getenv("UPSTREAM_FIXTURES_DIR", DEFAULT_FIXTURES_DIR)
+        self.latency = latency if latency is not None else os.getenv("UPSTREAM_LATENCY_MS", "0")
+        if self.mode == "off":
+            return
+        self._patch_requests()
+        self._patch_aiohttp()
+        self._patch_curl_cffi()
+        print(f"[UpstreamReplay] mode={self.mode} fixtures={self.fixtures_dir} latency={self.latency}")
+
+    def uninstall(self):
+        for name, (owner, attr, original) in list(self._originals.items()):
+            setattr(owner, attr, original)
+        self._originals.clear()
+        self.mode = "off"
+
+    def _patch_requests(self):
+        try:
+            import requests
+            from requests.structures import CaseInsensitiveDict
+        except ImportError:
+            return
+        if "requests" in self._originals:
+            return
+        original = requests.Session.request
+        replay = self
+
+        def request(session, method, url, *args, **kwargs):
+            body = _body_bytes(kwargs.get("data"), kwargs.get("json"))
+            key_url = _with_params(url, kwargs.get("params"))
+            try:
+                fixture = replay._lookup(method, key_url, body)
+            except FixtureMissing as e:
+                raise requests.exceptions.ConnectionError(str(e))
+            if fixture is not None:
+                time.sleep(replay._delay(fixture))
+                response = requests.models.Response()
+                response.status_code = fixture["status"]
+                response._content = fixture["body"]
+                response.headers = CaseInsensitiveDict(fixture["headers"])
+                response.url = fixture["url"]
+                response.reason = "Replayed"
+                response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+                response.elapsed = datetime.timedelta(milliseconds=fixture.get("elapsed_ms", 0))
+                response.request = requests.Request(method, url).prepare()
+                return response
+            start = time.perf_counter()
+            response = original(session, method, url, *args, **kwargs)
+            replay.save(method, key_url, body, response.status_code, response.headers, response.content, time.perf_counter() - start)
+            return response
+
+        requests.Session.request = request
+        self._originals["requests"] = (requests.Session, "request", original)
+
+    def _patch_aiohttp(self):
+        try:
+            import aiohttp
+        except ImportError:
+            return
+        if "aiohttp" in self._originals:
+            return
+        original = aiohttp.ClientSession._request
+        replay = self
+
+        async def _request(session, method, str_or_url, *args, **kwargs):
+            body = _body_bytes(kwargs.get("data"), kwargs.get("json"))
+            url = _with_params(str_or_url, kwargs.get("params"))
+            try:
+                fixture = replay._lookup(method, url, body)
+            except FixtureMissing as e:
+                raise aiohttp.ClientConnectionError(str(e))
+            if fixture is not None:
+                await asyncio.sleep(replay._delay(fixture))
+                return ReplayedAioResponse(fixture)
+            start = time.perf_counter()
+            response = await original(session, method, str_or_url, *args, **kwargs)
+            content = await response.read()
+            replay.save(method, url, body, response.status, response.headers, content, time.perf_counter() - start)
+            return response
+
+        aiohttp.ClientSession._request = _request
+        self._originals["aiohttp"] = (aiohttp.ClientSession, "_request", original)
+
+    def _patch_curl_cffi(self):
+        try:
+            from curl_cffi import requests as curl_requests
+        except ImportError:
+            return
+        if "curl_cffi" in self._originals:
+            return
+        original = curl_requests.Session.request
+        replay = self
+
+        def request(session, method, url, *args, **kwargs):
+            body = _body_bytes(kwargs.get("data"), kwargs.get("json"))
+            key_url = _with_params(url, kwargs.get("params"))
+            try:
+                fixture = replay._lookup(method, key_url, body)
+            except FixtureMissing as e:
+                raise curl_requests.exceptions.ConnectionError(str(e))
+            if fixture is not None:
+                time.sleep(replay._delay(fixture))
+                # yfinance는 status_code/text/json()/headers만 사용 → requests.Response로 재생
+                import requests
+                from requests.structures import CaseInsensitiveDict
+                response = requests.models.Response()
+                response.status_code = fixture["status"]
+                response._content = fixture["body"]
+                response.headers = CaseInsensitiveDict(fixture["headers"])
+                response.url = fixture["url"]
+                response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+                return response
+            start = time.perf_counter()
+            response = original(session, method, url, *args, **kwargs)
+            replay.save(method, key_url, body, response.status_code, response.headers, response.content, time.perf_counter() - start)
+            return response
+
+        curl_requests.Session.request = request
+        self._originals["curl_cffi"] = (curl_requests.Session, "request", original)
+
+
+class ReplayedAioResponse:
+    """aiohttp.ClientResponse 중 코드베이스에서 쓰는 부분만 구현 (async with / text / json / read)"""
+
+    def __init__(self, fixture: dict):
+        from multidict import CIMultiDict
+        self.status = fixture["status"]
+        self.headers = CIMultiDict(fixture["headers"])
+        self.url = fixture["url"]
+        self.reason = "Replayed"
+        self._body = fixture["body"]
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("Content-Type", "application/octet-stream").split(";")[0].strip()
+
+    def _charset(self) -> str:
+        content_type = self.headers.get("Content-Type", "")
+        if "charset=" in content_type:
+            return content_type.split("charset=", 1)[1].split(";")[0].strip().strip('"')
+        return "utf-8"
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: Optional[str] = None, errors: str = "strict") -> str:
+        return self._body.decode(encoding or self._charset(), errors=errors)
+
+    async def json(self, *, encoding: Optional[str] = None, loads=json.loads, content_type: Optional[str] = "application/json"):
+        return loads(self._body.decode(encoding or self._charset()))
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            import aiohttp
+            raise aiohttp.ClientResponseError(None, (), status=self.status, message=self.reason)
+
+    def release(self):
+        pass
+
+    def close(self):
+        pass
+
+    async def wait_for_close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+# ─── 전역 인스턴스 ──────────────────────────────────────────────────────────
+upstream_replay = UpstreamReplay()
+
+
+@contextlib.contextmanager
+def replaying(mode: str = "replay", fixtures_dir: Optional[str] = None, latency: Optional[str] = None):
+    upstream_replay.install(mode, fixtures_dir, latency)
+    try:
+        yield upstream_replay
+    finally:
+        upstream_replay.uninstall()
@@ -3,6 +3,7 @@ import logging
 from typing import Dict
 from kis_api import KisApi
 from kis_ws import KisWebSocket
+from kis_mux import feed_mux
 from sockets import manager
 
 # Logger
@@ -11,6 +12,8 @@ logger = logging.getLogger("UserSessionManager")
 class UserSessionManager:
     """
     Manages user-specific KIS API and WebSocket sessions.
+    Each session keeps the user's own credentials, but quote subscriptions are
+    pooled through feed_mux so a symbol is subscribed/decoded once for all users.
     """
     def __init__(self):
         # user_id -> KisWebSocket
@@ -18,10 +21,16 @@ class UserSessionManager:
         # user_id -> KisApi
         self.user_rest_clients: Dict[str, KisApi] = {}
 
-    async def start_user_session(self, user_id: str, keys: dict, message_handler):
+    async def start_user_session(self, user_id: str, keys: dict, message_handler=None):
         """
-        Start a KIS WebSocket session for a specific user.
+        Start a KIS WebSocket session for a specific user and add it to the shared feed pool.
+        message_handler(symbol, price, change_rate, user_ids) receives each decoded tick once.
         """
+        if message_handler is not None:
+            feed_mux.set_tick_handler(message_handler)
+        if user_id in self.user_websockets:
+            # Another socket of the same user already authenticated
+            return True
         try:
             # 1. Create REST API client to get Approval Key
             kis_rest = KisApi(keys['kis_app_key'], keys['kis_secret'], keys['kis_account'])
@@ -36,13 +45,11 @@ class UserSessionManager:
             # 3. Create WebSocket Client
             ws_client = KisWebSocket(approval_key)
             
-            # 4. Set Callback to route messages to this user ONLY (or Public if desired)
-            # For now, we route to a specific handler that can decide
-            ws_client.set_callback(lambda s, p, c: message_handler(user_id, s, p, c))
-            
-            # 5. Connect
+            # 4. Connect, then join the pool (the multiplexer installs the tick callback
+            #    and may hand pending symbols of other users to this session)
             await ws_client.connect()
             self.user_websockets[user_id] = ws_client
+            await feed_mux.add_session(user_id, ws_client)
             logger.info(f"[UserSession] Started session for {user_id}")
             return True
 
@@ -54,8 +61,11 @@ class UserSessionManager:
         """
         Stop and cleanup user session.
         """
+        await feed_mux.unsubscribe_all(user_id)
         if user_id in self.user_websockets:
             try:
+                # Symbols carried by this session migrate to the remaining pooled sessions
+                await feed_mux.remove_session(user_id)
                 await self.user_websockets[user_id].close()
                 del self.user_websockets[user_id]
                 logger.info(f"[UserSession] Stopped session for {user_id}")
@@ -67,17 +77,14 @@ class UserSessionManager:
 
     async def subscribe_user_symbol(self, user_id: str, symbol: str):
         """
-        Subscribe a symbol on the user's private WebSocket.
+        Register the user's interest in a symbol on the shared feed
+        (upstream subscription happens only for the first interested user).
         """
         if user_id in self.user_websockets:
-            ws = self.user_websockets[user_id]
-            if ws.connected:
-                await ws.subscribe(symbol)
+            await feed_mux.subscribe(user_id, symbol)
 
     async def unsubscribe_user_symbol(self, user_id: str, symbol: str):
         if user_id in self.user_websockets:
-             ws = self.user_websockets[user_id]
-             if ws.connected:
-                 await ws.unsubscribe(symbol)
+            await feed_mux.unsubscribe(user_id, symbol)
 
 session_manager = UserSessionManager()